@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Content-addressed artifact cache
+단계별 산출물(초해상화 이미지, 균열 마스크, 균열 측정 레코드) 캐시
+
+키는 (입력 이미지 해시, 모델 체크포인트 해시, 해당 단계에 영향을 주는 설정값)으로 만들어지므로,
+하위 단계 설정(MIN_CRACK_AREA, 시각화 alpha, 지도 옵션 등)만 바꿔 다시 실행하면 상위 단계 결과를
+자동으로 재사용합니다. 인덱스는 SQLite에 저장되며, 용량 상한을 넘으면 가장 오래 사용하지 않은
+항목부터 삭제합니다(LRU).
+
+Usage:
+    python inferences/artifact_cache.py stats
+    python inferences/artifact_cache.py evict --max_gb 20
+    python inferences/artifact_cache.py clear
+"""
+
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import argparse
+
+import numpy as np
+import cv2
+
+from sparse_mask import SparseCrackMask
+from config import CONFIG
+
+
+_HASH_CHUNK = 1 << 20
+_fingerprint_memo = {}
+
+
+def file_hash(path):
+    """파일 내용의 SHA-256 (청크 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def checkpoint_fingerprint(path):
+    """
+    모델 체크포인트/설정 파일 해시 (같은 프로세스에서는 경로, 크기, 수정 시각이 같으면 재계산하지 않음)
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _fingerprint_memo:
+        _fingerprint_memo[memo_key] = file_hash(path)
+    return _fingerprint_memo[memo_key]
+
+
+def make_key(*parts):
+    """
+    캐시 키 생성
+
+    Args:
+        *parts: 해시 문자열 또는 JSON 직렬화 가능한 설정값 (dict는 키 순서와 무관)
+
+    Returns:
+        str: SHA-256 hex 키
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def model_fingerprint(config_path=None, checkpoint_path=None, **settings):
+    """
+    모델 식별 키 (설정/체크포인트 파일 해시 + 모델 이름 등 추가 설정)
+    """
+    return make_key(
+        checkpoint_fingerprint(config_path) if config_path else None,
+        checkpoint_fingerprint(checkpoint_path) if checkpoint_path else None,
+        settings
+    )
+
+
+def sr_model_fingerprint(config_path, checkpoint_path, model_name='edsr', model_setting=None):
+    """
+    초해상화 모델 식별 키 (super_resolution.py와 run_pipeline 계열 진입점이 같은 값을 쓰도록 한 곳에서 정의)
+    """
+    return model_fingerprint(config_path, checkpoint_path, model_name=model_name, model_setting=model_setting)
+
+
+def sr_cache_key(img_path, sr_model_key):
+    """
+    초해상화 산출물 키 (입력 이미지 해시 + sr_model_fingerprint)
+
+    값은 모든 진입점에서 ArtifactCache.save_image로 저장한 무손실 추론 결과이므로, 출력 파일 형식은 키에 넣지 않습니다.
+    """
+    return make_key(file_hash(img_path), sr_model_key)
+
+
+def segmentation_config():
+    """균열 마스크에 영향을 주는 설정값"""
+    return {key: CONFIG[key] for key in ('SCORE_THRESHOLD', 'WINDOW_SIZE', 'OVERLAP_RATIO')}
+
+
+def quantification_config(mode):
+    """
+    픽셀 단위 균열 측정 레코드에 영향을 주는 설정값
+
+    dense/low_memory/sparse 경로의 측정값은 서로 최대 2% 정도 다르므로, 근사 배율과 함께 정량화 경로도 키에 넣어
+    설정이나 메모리 계획이 바뀌면 다른 경로의 레코드를 재사용하지 않습니다.
+
+    Args:
+        mode (dict): 정량화 경로 {'sparse', 'low_memory', 'approx_factor'} (memory_planner의 처리 경로)
+    """
+    return {
+        'APPROX_QUANTIFICATION_FACTOR': mode['approx_factor'],
+        'LOW_MEMORY_MODE': bool(mode['low_memory']),
+        'USE_SPARSE_MASK': bool(mode['sparse']),
+    }
+
+
+class ArtifactCache:
+    """
+    Size-bounded, content-addressed cache of pipeline artifacts with LRU eviction.
+
+    Artifacts are stored as files under ``cache_dir/<stage>/<key[:2]>/<key><ext>`` and indexed in
+    ``cache_dir/index.sqlite`` with their size and last access time.
+
+    Args:
+        cache_dir (str): Cache directory.
+        max_bytes (int): Size limit. Least recently used artifacts are evicted above it.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'index.sqlite'), timeout=60)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS artifacts ('
+            'stage TEXT, key TEXT, path TEXT, size INTEGER, created REAL, last_access REAL, hits INTEGER, '
+            'PRIMARY KEY (stage, key))')
+        self._db.execute('CREATE TABLE IF NOT EXISTS counters (stage TEXT PRIMARY KEY, hits INTEGER, misses INTEGER)')
+        self._db.commit()
+
+    @classmethod
+    def from_config(cls, cache_dir=None):
+        """CONFIG의 ARTIFACT_CACHE_DIR / ARTIFACT_CACHE_MAX_GB로 생성"""
+        return cls(cache_dir or CONFIG['ARTIFACT_CACHE_DIR'], int(CONFIG['ARTIFACT_CACHE_MAX_GB'] * 1024 ** 3))
+
+    def _count(self, stage, hit):
+        column = 'hits' if hit else 'misses'
+        self._db.execute('INSERT OR IGNORE INTO counters VALUES (?, 0, 0)', (stage,))
+        self._db.execute(f'UPDATE counters SET {column} = {column} + 1 WHERE stage = ?', (stage,))
+        self._db.commit()
+
+    def get(self, stage, key):
+        """
+        캐시된 산출물 경로 (없으면 None, 조회 시 마지막 사용 시각 갱신)
+        """
+        row = self._db.execute('SELECT path FROM artifacts WHERE stage = ? AND key = ?', (stage, key)).fetchone()
+        if row is None or not os.path.exists(os.path.join(self.cache_dir, row[0])):
+            if row is not None:
+                self._db.execute('DELETE FROM artifacts WHERE stage = ? AND key = ?', (stage, key))
+            self._count(stage, hit=False)
+            return None
+
+        self._db.execute('UPDATE artifacts SET last_access = ?, hits = hits + 1 WHERE stage = ? AND key = ?',
+                         (time.time(), stage, key))
+        self._count(stage, hit=True)
+        return os.path.join(self.cache_dir, row[0])
+
+    def put(self, stage, key, write_fn, ext):
+        """
+        산출물 저장 (임시 파일에 쓴 뒤 교체) 후 용량 상한을 넘으면 LRU 삭제
+
+        Args:
+            stage (str): 단계 이름 ('sr', 'mask', 'records')
+            key (str): make_key로 만든 키
+            write_fn (callable): write_fn(path)로 파일을 씀
+            ext (str): 파일 확장자 (예: '.png')
+
+        Returns:
+            str: 캐시 파일 경로
+        """
+        rel_path = os.path.join(stage, key[:2], key + ext)
+        path = os.path.join(self.cache_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = path + '.partial' + ext
+        write_fn(tmp_path)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        self._db.execute('INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, 0)',
+                         (stage, key, rel_path, os.path.getsize(path), now, now))
+        self._db.commit()
+        self.evict()
+
+        return path
+
+    def put_file(self, stage, key, src_path):
+        """기존 파일을 캐시에 등록 (가능하면 하드 링크, 아니면 복사)"""
+        def _write(path):
+            try:
+                os.link(src_path, path)
+            except OSError:
+                shutil.copyfile(src_path, path)
+        return self.put(stage, key, _write, os.path.splitext(src_path)[1])
+
+    def copy_to(self, stage, key, output_path):
+        """
+        캐시된 파일을 output_path로 복사 (임시 파일에 쓴 뒤 교체)
+
+        Returns:
+            bool: 캐시 적중 여부
+        """
+        path = self.get(stage, key)
+        if path is None:
+            return False
+
+        tmp_path = output_path + '.partial'
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, output_path)
+        return True
+
+    def evict(self, max_bytes=None):
+        """총 용량이 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 항목 삭제"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM artifacts').fetchone()[0]
+        if total <= max_bytes:
+            return 0
+
+        evicted = 0
+        for stage, key, rel_path, size in self._db.execute(
+                'SELECT stage, key, path, size FROM artifacts ORDER BY last_access').fetchall():
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, rel_path))
+            except FileNotFoundError:
+                pass
+            self._db.execute('DELETE FROM artifacts WHERE stage = ? AND key = ?', (stage, key))
+            total -= size
+            evicted += 1
+
+        self._db.commit()
+        return evicted
+
+    def clear(self):
+        """모든 산출물과 통계 삭제"""
+        for (rel_path,) in self._db.execute('SELECT path FROM artifacts').fetchall():
+            try:
+                os.remove(os.path.join(self.cache_dir, rel_path))
+            except FileNotFoundError:
+                pass
+        self._db.execute('DELETE FROM artifacts')
+        self._db.execute('DELETE FROM counters')
+        self._db.commit()
+
+    def stats(self):
+        """
+        단계별 항목 수, 용량, 적중/미적중 횟수
+
+        Returns:
+            dict: {stage: {'entries', 'bytes', 'hits', 'misses'}}
+        """
+        stats = {}
+        for stage, entries, size in self._db.execute(
+                'SELECT stage, COUNT(*), SUM(size) FROM artifacts GROUP BY stage'):
+            stats[stage] = {'entries': entries, 'bytes': size, 'hits': 0, 'misses': 0}
+        for stage, hits, misses in self._db.execute('SELECT stage, hits, misses FROM counters'):
+            stats.setdefault(stage, {'entries': 0, 'bytes': 0})
+            stats[stage].update({'hits': hits, 'misses': misses})
+        return stats
+
+    # -------------------------------------------------------------------------
+    # 단계별 산출물 저장/로드
+    # -------------------------------------------------------------------------
+    def load_image(self, key):
+        """초해상화 이미지 (없으면 None)"""
+        path = self.get('sr', key)
+        return None if path is None else cv2.imread(path, cv2.IMREAD_UNCHANGED)
+
+    def save_image(self, key, image):
+        """초해상화 이미지 저장 (무손실 PNG)"""
+        def _write(path):
+            if not cv2.imwrite(path, image):
+                raise IOError(f"Failed to write cache image: {path}")
+        return self.put('sr', key, _write, '.png')
+
+    def load_mask(self, key, sparse=True):
+        """균열 마스크 (없으면 None, sparse=False면 dense uint8 마스크)"""
+        path = self.get('mask', key)
+        if path is None:
+            return None
+        with np.load(path) as data:
+            mask = SparseCrackMask(tuple(data['shape']), data['rows'], data['cols'])
+        return mask if sparse else mask.to_dense(np.uint8)
+
+    def save_mask(self, key, mask):
+        """균열 마스크 저장 (dense 마스크도 좌표로 압축 저장)"""
+        if not isinstance(mask, SparseCrackMask):
+            mask = SparseCrackMask.from_dense(mask)
+
+        def _write(path):
+            with open(path, 'wb') as f:
+                np.savez_compressed(f, shape=np.asarray(mask.shape, dtype=np.int32), rows=mask.rows, cols=mask.cols)
+        return self.put('mask', key, _write, '.npz')
+
+    def load_records(self, key):
+        """픽셀 단위 균열 측정 레코드 (없으면 None)"""
+        path = self.get('records', key)
+        if path is None:
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_records(self, key, records):
+        """픽셀 단위 균열 측정 레코드 저장 (quantify_crack_width_length 결과)"""
+        def _write(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, default=lambda value: value.item())
+        return self.put('records', key, _write, '.json')
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Artifact cache management')
+    parser.add_argument('command', choices=['stats', 'evict', 'clear'], help='실행할 명령')
+    parser.add_argument('--cache_dir', default=CONFIG['ARTIFACT_CACHE_DIR'], help='캐시 디렉토리')
+    parser.add_argument('--max_gb', type=float, default=CONFIG['ARTIFACT_CACHE_MAX_GB'], help='용량 상한 (GB, evict)')
+
+    args = parser.parse_args()
+
+    cache = ArtifactCache(args.cache_dir, int(args.max_gb * 1024 ** 3))
+
+    if args.command == 'evict':
+        print(f"Evicted {cache.evict()} artifacts")
+    elif args.command == 'clear':
+        cache.clear()
+        print(f"Cleared cache: {args.cache_dir}")
+
+    stats = cache.stats()
+    total_bytes = sum(s['bytes'] or 0 for s in stats.values())
+
+    print("="*60)
+    print(f"Artifact cache: {args.cache_dir}")
+    print(f"Size: {total_bytes / 1024 ** 3:.2f} / {args.max_gb:.2f} GB")
+    print("="*60)
+    print(f"  {'stage':>8} {'entries':>8} {'size (MB)':>10} {'hits':>8} {'misses':>8} {'hit rate':>9}")
+    for stage, s in sorted(stats.items()):
+        lookups = s['hits'] + s['misses']
+        hit_rate = f"{s['hits'] / lookups * 100:.1f}%" if lookups else '-'
+        print(f"  {stage:>8} {s['entries']:>8} {(s['bytes'] or 0) / 1024 ** 2:>10.1f} {s['hits']:>8} {s['misses']:>8} {hit_rate:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Multi-survey batch mode
+여러 촬영(조사)을 한 번에 처리하는 일괄 처리 모드
+
+촬영 목록(CSV 또는 YAML)에 촬영 폴더, 촬영거리, 카메라 프로필을 적어 두면 모델을 한 번만 로드하고
+모든 촬영을 순서대로 처리합니다. 촬영마다 자체 pixel_to_mm 변환 비율과 결과 폴더(균열목록, 지도)를 가집니다.
+장치가 쉬지 않도록 다음 촬영의 메타데이터(EXIF)는 현재 촬영을 추론하는 동안 미리 추출하고,
+Excel/지도 생성은 백그라운드 스레드에서 다음 촬영의 추론과 겹쳐 실행합니다.
+
+촬영 목록 CSV (촬영거리는 shooting_distance_m 또는 shooting_distance_mm, camera는 CAMERA_PROFILES의 이름):
+    name,input_dir,shooting_distance_m,camera
+    교량A,/data/교량A/촬영이미지,1.5,s22
+    교량B,/data/교량B/촬영이미지,2.0,s22
+
+CSV에 sensor_width_mm, focal_length_mm, image_width_px 등 열을 추가하면 프로필 값을 덮어씁니다.
+YAML은 'surveys' 목록과 선택적인 'cameras' 프로필 정의를 가집니다 (batch_run.py 참고, README).
+상대 경로는 촬영 목록 파일 위치 기준입니다.
+
+Usage:
+    python inferences/batch_run.py --manifest 촬영목록.csv --output_root 일괄처리_결과 \\
+        --sr_config 모델/초해상화/초해상화_config.py --sr_checkpoint 모델/초해상화/초해상화_weight.pth \\
+        --crack_config 모델/균열탐지/균열탐지_config.py --crack_checkpoint 모델/균열탐지/균열탐지_weight.pth
+"""
+
+import os
+import csv
+import time
+import argparse
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from extract_image_metadata import extract_metadata_from_images
+from run_pipeline import load_models, setup_cache_and_budget, run_pipeline
+from prototyping_crack_detection import calculate_pixel_to_mm
+from pipeline_stages import prefetch
+from stage_planner import NO_GPS_POLICIES
+from config import CONFIG
+
+
+# 카메라 프로필로 지정할 수 있는 설정 (pixel_to_mm 계산에 사용)
+CAMERA_KEYS = ('SENSOR_WIDTH_MM', 'SENSOR_HEIGHT_MM', 'FOCAL_LENGTH_MM', 'IMAGE_WIDTH_PX', 'IMAGE_HEIGHT_PX')
+
+_SUMMARY_FIELDS = ['name', 'input_dir', 'result_dir', 'shooting_distance_mm', 'camera', 'pixel_to_mm',
+                   'images_with_cracks', 'seconds', 'status']
+
+
+def _read_manifest_rows(manifest_path):
+    """촬영 목록 파일의 촬영 행과 카메라 프로필 정의"""
+    if manifest_path.lower().endswith(('.yaml', '.yml')):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+        return list(data.get('surveys') or []), dict(data.get('cameras') or {})
+
+    with open(manifest_path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = [row for row in csv.DictReader(f) if any((value or '').strip() for value in row.values())]
+    return rows, {}
+
+
+def load_survey_manifest(manifest_path):
+    """
+    촬영 목록 읽기 및 검증 (모델 로드 전에 모든 오류를 보고)
+
+    Args:
+        manifest_path (str): 촬영 목록 경로 (.csv, .yaml, .yml)
+
+    Returns:
+        list: 촬영 dict {'name', 'input_dir', 'result_dir', 'shooting_distance_mm', 'camera_name', 'camera'}
+              (camera는 CAMERA_KEYS 값 전체)
+
+    Raises:
+        ValueError: 잘못된 행이 있으면 모든 오류를 모아서
+    """
+    rows, manifest_cameras = _read_manifest_rows(manifest_path)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    profiles = dict(CONFIG['CAMERA_PROFILES'], **manifest_cameras)
+
+    surveys = []
+    errors = []
+    for line, row in enumerate(rows, start=1):
+        row = {str(key).strip(): value for key, value in row.items() if value is not None and str(value).strip() != ''}
+        # 한 행의 오류도 모두 보고하도록 오류가 있어도 나머지 항목을 계속 검사
+        input_dir = row.get('input_dir')
+        if input_dir:
+            input_dir = os.path.join(base_dir, str(input_dir))
+            name = str(row.get('name') or os.path.basename(os.path.normpath(input_dir)))
+        else:
+            name = str(row.get('name') or f"survey {line}")
+            errors.append(f"{name}: missing input_dir")
+
+        # 촬영거리 (m 또는 mm)
+        distance_mm = None
+        try:
+            if 'shooting_distance_mm' in row:
+                distance_mm = float(row['shooting_distance_mm'])
+            elif 'shooting_distance_m' in row:
+                distance_mm = float(row['shooting_distance_m']) * 1000
+            else:
+                errors.append(f"{name}: missing shooting_distance_m or shooting_distance_mm")
+        except ValueError:
+            errors.append(f"{name}: shooting distance is not a number")
+        if distance_mm is not None and distance_mm <= 0:
+            errors.append(f"{name}: shooting distance must be positive")
+
+        # 카메라 프로필 + 행에서 덮어쓴 값
+        camera_name = str(row.get('camera', ''))
+        if camera_name and camera_name not in profiles:
+            errors.append(f"{name}: unknown camera profile '{camera_name}' (known: {', '.join(sorted(profiles))})")
+        camera = {key: CONFIG[key] for key in CAMERA_KEYS}
+        camera.update(profiles.get(camera_name, {}))
+        for key in CAMERA_KEYS:
+            if key.lower() in row:
+                try:
+                    camera[key] = float(row[key.lower()])
+                except ValueError:
+                    errors.append(f"{name}: {key.lower()} is not a number")
+        unknown = set(camera) - set(CAMERA_KEYS)
+        if unknown:
+            errors.append(f"{name}: unknown camera settings {sorted(unknown)}")
+
+        if input_dir and not os.path.isdir(input_dir):
+            errors.append(f"{name}: input_dir not found: {input_dir}")
+        if any(survey['name'] == name for survey in surveys):
+            errors.append(f"{name}: duplicate survey name (set a unique 'name')")
+
+        result_dir = row.get('result_dir')
+        surveys.append({
+            'name': name,
+            'input_dir': input_dir,
+            'result_dir': os.path.join(base_dir, str(result_dir)) if result_dir else None,
+            'shooting_distance_mm': distance_mm,
+            'camera_name': camera_name or 'default',
+            'camera': camera,
+        })
+
+    if not rows:
+        errors.append("no surveys listed")
+    if errors:
+        raise ValueError(f"Invalid survey manifest {manifest_path}:\n  " + "\n  ".join(errors))
+
+    return surveys
+
+
+class _OutputQueue:
+    """Excel/지도 생성 백그라운드 실행기 (제출 시점의 촬영과 future를 함께 보관)"""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='outputs')
+        self.survey = None
+        self.futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = self._executor.submit(fn, *args, **kwargs)
+        self.futures.append((self.survey, future))
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def run_batch(sr_model, crack_model, surveys, output_root, options=None, resume=False, cache=None, model_keys=None,
+              no_gps_policy=None, memory_budget=None, dedup=None, prescreen=None, prescreen_audit_rate=None,
+              crack_table=True, excel=True):
+    """
+    여러 촬영을 모델 한 번 로드로 처리 (촬영마다 pixel_to_mm와 결과 폴더 분리)
+
+    Args:
+        sr_model: 초해상화 모델
+        crack_model: 균열 탐지 모델
+        surveys (list): load_survey_manifest 결과
+        output_root (str): 결과 루트 (촬영별 output_root/<name>/균열탐지_결과, result_dir 지정 시 그 경로)
+        options (dict): postprocess_crack_image 옵션
+        resume (bool): 촬영별 진행 기록에서 완료된 이미지 건너뜀
+        crack_table (bool): 균열별 상세 테이블 저장
+        excel (bool): 균열목록.xlsx 저장
+        나머지 인자는 run_pipeline과 동일
+
+    Returns:
+        list: 촬영별 요약 행 (_SUMMARY_FIELDS)
+    """
+    output_queue = _OutputQueue()
+    summary = []
+
+    # 다음 촬영의 메타데이터는 현재 촬영 추론 중에 미리 추출
+    def extract(survey):
+        return extract_metadata_from_images(survey['input_dir'])
+
+    try:
+        for idx, (survey, metadata, error) in enumerate(prefetch(extract, surveys, depth=1)):
+            name = survey['name']
+            result_dir = survey['result_dir'] or os.path.join(output_root, name, '균열탐지_결과')
+            os.makedirs(result_dir, exist_ok=True)
+            pixel_to_mm = calculate_pixel_to_mm(survey['shooting_distance_mm'], dict(CONFIG, **survey['camera']))
+            row = {
+                'name': name,
+                'input_dir': survey['input_dir'],
+                'result_dir': result_dir,
+                'shooting_distance_mm': survey['shooting_distance_mm'],
+                'camera': survey['camera_name'],
+                'pixel_to_mm': round(pixel_to_mm, 6),
+                'images_with_cracks': '',
+                'seconds': '',
+                'status': 'failed',
+            }
+            summary.append(row)
+
+            print("\n" + "#"*60)
+            print(f"Survey {idx+1}/{len(surveys)}: {name}")
+            print(f"  input: {survey['input_dir']}")
+            print(f"  shooting distance: {survey['shooting_distance_mm']:.0f} mm, camera: {survey['camera_name']} "
+                  f"({pixel_to_mm:.6f} mm/pixel)")
+            print("#"*60)
+
+            if error is not None:
+                print(f"Error: metadata extraction failed for {name}: {error}")
+                continue
+
+            # 한 촬영의 실패가 나머지 촬영을 막지 않도록
+            start = time.perf_counter()
+            output_queue.survey = row
+            try:
+                detection_results = run_pipeline(
+                    sr_model, crack_model, survey['input_dir'], result_dir, survey['shooting_distance_mm'],
+                    map_output=os.path.join(os.path.dirname(os.path.abspath(result_dir)), '균열탐지_지도_결과.html'),
+                    individual_map_output=os.path.join(result_dir, '개별위치_지도.html'),
+                    excel_output=os.path.join(result_dir, '균열목록.xlsx') if excel else None,
+                    crack_table=os.path.join(result_dir, '균열목록_균열상세.parquet') if crack_table else None,
+                    options=options,
+                    resume=resume,
+                    cache=cache,
+                    model_keys=model_keys,
+                    no_gps_policy=no_gps_policy,
+                    memory_budget=memory_budget,
+                    dedup=dedup,
+                    prescreen=prescreen,
+                    prescreen_audit_rate=prescreen_audit_rate,
+                    metadata=metadata,
+                    camera=survey['camera'],
+                    output_executor=output_queue
+                )
+            except Exception as e:
+                print(f"Error: survey {name} failed: {e}")
+                traceback.print_exc()
+                continue
+
+            row.update(images_with_cracks=len(detection_results), seconds=round(time.perf_counter() - start, 1),
+                       status='done')
+    finally:
+        output_queue.shutdown()
+
+    # Excel/지도 생성 실패는 해당 촬영에 기록
+    for row, future in output_queue.futures:
+        if future.exception() is not None:
+            print(f"Error: writing outputs failed for {row['name']}: {future.exception()}")
+            row['status'] = 'outputs failed'
+
+    return summary
+
+
+def write_batch_summary(summary, summary_path):
+    """촬영별 요약 저장 (CSV)"""
+    with open(summary_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=_SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(summary)
+
+
+def print_batch_summary(summary):
+    """촬영별 요약 출력"""
+    print("\n" + "="*60)
+    print("Batch summary")
+    print("="*60)
+    print(f"  {'survey':<24} {'mm/pixel':>10} {'cracks':>8} {'time (s)':>9}  status")
+    for row in summary:
+        print(f"  {row['name']:<24} {row['pixel_to_mm']:>10.6f} {str(row['images_with_cracks']):>8} "
+              f"{str(row['seconds']):>9}  {row['status']}")
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Process several surveys with models loaded once')
+    parser.add_argument('--manifest', required=True, help='촬영 목록 (CSV 또는 YAML)')
+    parser.add_argument('--output_root', required=True, help='결과 루트 디렉토리 (촬영별 하위 폴더)')
+    parser.add_argument('--sr_config', required=True, help='초해상화 모델 설정 파일 경로')
+    parser.add_argument('--sr_checkpoint', required=True, help='초해상화 모델 체크포인트 파일 경로')
+    parser.add_argument('--sr_model_name', default='edsr', help='초해상화 모델 이름 (MMagic)')
+    parser.add_argument('--crack_config', required=True, help='크랙 탐지 모델 설정 파일 경로')
+    parser.add_argument('--crack_checkpoint', required=True, help='크랙 탐지 모델 체크포인트 파일 경로')
+    parser.add_argument('--device', default='cuda', help='추론 장치')
+    parser.add_argument('--no_excel', action='store_true', help='균열목록.xlsx를 저장하지 않음')
+    parser.add_argument('--no_crack_table', action='store_true', help='균열별 상세 테이블을 저장하지 않음')
+    parser.add_argument('--approx_factor', type=int, default=CONFIG['APPROX_QUANTIFICATION_FACTOR'], help='근사 정량화 축소 배율 (1 = 정밀 모드)')
+    parser.add_argument('--output_size', type=int, default=CONFIG['OUTPUT_IMAGE_SIZE'], help='결과 이미지의 긴 변 길이 (픽셀, 비율 유지)')
+    parser.add_argument('--resume', action='store_true', help='촬영별 진행 기록에서 완료된 이미지를 건너뛰고 이어서 실행')
+    parser.add_argument('--no_gps_policy', default=CONFIG['NO_GPS_POLICY'], choices=NO_GPS_POLICIES,
+                        help='GPS 없는 이미지 처리 정책 (skip: 처리하지 않음, no_map: 위치 없음 목록으로 분리)')
+    parser.add_argument('--cache_dir', default=CONFIG['ARTIFACT_CACHE_DIR'], help='산출물 캐시 디렉토리')
+    parser.add_argument('--no_cache', action='store_true', help='산출물 캐시 사용 안 함')
+    parser.add_argument('--dedup', action='store_true', default=CONFIG['DEDUP_FRAMES'], help='연속 촬영된 중복 프레임은 가장 선명한 한 장만 처리')
+    parser.add_argument('--no_dedup', dest='dedup', action='store_false', help='중복 프레임 제거 안 함 (DEDUP_FRAMES = True일 때)')
+    parser.add_argument('--prescreen', action='store_true', default=CONFIG['PRESCREEN'], help='원본 해상도에서 균열 후보가 없는 프레임은 초해상화/탐지 생략')
+    parser.add_argument('--no_prescreen', dest='prescreen', action='store_false', help='사전 선별 안 함 (PRESCREEN = True일 때)')
+    parser.add_argument('--prescreen_audit_rate', type=float, default=CONFIG['PRESCREEN_AUDIT_RATE'], help='건너뛸 프레임 중 검증용으로 전체 처리할 비율 (0-1)')
+    parser.add_argument('--memory_budget', default=CONFIG['MEMORY_BUDGET'], help='이미지당 메모리 예산 (예: 16G)')
+
+    args = parser.parse_args()
+
+    # 모델을 로드하기 전에 촬영 목록 전체 검증 (무인 실행 중 중간에 멈추지 않도록)
+    try:
+        surveys = load_survey_manifest(args.manifest)
+    except ValueError as e:
+        parser.error(str(e))
+    os.makedirs(args.output_root, exist_ok=True)
+
+    print("="*60)
+    print(f"Crack Detection Batch ({len(surveys)} surveys)")
+    print("="*60)
+
+    print("\nInitializing models...")
+    sr_model, crack_model = load_models(
+        args.sr_config, args.sr_checkpoint, args.crack_config, args.crack_checkpoint,
+        sr_model_name=args.sr_model_name, device=args.device
+    )
+    print("Models initialized successfully")
+
+    cache, model_keys, memory_budget = setup_cache_and_budget(args)
+
+    start = time.perf_counter()
+    summary = run_batch(
+        sr_model, crack_model, surveys, args.output_root,
+        options={'approx_factor': args.approx_factor, 'output_size': args.output_size},
+        resume=args.resume,
+        cache=cache,
+        model_keys=model_keys,
+        no_gps_policy=args.no_gps_policy,
+        memory_budget=memory_budget,
+        dedup=args.dedup,
+        prescreen=args.prescreen,
+        prescreen_audit_rate=args.prescreen_audit_rate,
+        crack_table=not args.no_crack_table,
+        excel=not args.no_excel
+    )
+
+    summary_path = os.path.join(args.output_root, '일괄처리_요약.csv')
+    write_batch_summary(summary, summary_path)
+    print_batch_summary(summary)
+    print(f"\nTotal time: {time.perf_counter() - start:.1f} s, summary saved to: {summary_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Peak memory benchmark for crack quantification
+균열 정량화 단계의 최대 메모리(peak RSS) 측정 스크립트
+
+합성 균열 마스크(기본 16000x12000, SR 프레임 크기)에 대해 각 정량화 모드를 별도 프로세스에서
+실행하고 peak RSS를 비교합니다. 저메모리 모드(low_memory, sparse)가 PEAK_BUDGET_MB를 넘거나 측정
+프로세스가 비정상 종료(OOM 등)되면 실패(exit 1)하므로 메모리 회귀 검사로 사용합니다.
+
+16000x12000, 균열 20개 기준 측정값 (peak RSS, 마스크 자체 약 260 MB 포함):
+    default (dense)  5.7 GB 이상 (5 GB RAM 환경에서 OOM으로 종료됨)
+    low_memory       1.9 GB
+    sparse           0.44 GB
+기본 예산은 이 값에 약 30% 여유를 둔 값이며, 기본 크기가 아니면 --max_peak_mb로 직접 지정합니다.
+dense 기준값은 메모리가 충분할 때 --modes default low_memory sparse로 함께 측정합니다.
+
+Usage:
+    python inferences/benchmark_quantification_memory.py
+    python inferences/benchmark_quantification_memory.py --height 6000 --width 8000 --max_peak_mb 800
+"""
+
+import os
+import sys
+import argparse
+import resource
+import multiprocessing as mp
+from queue import Empty
+
+import numpy as np
+import cv2
+
+sys.path.append(os.path.dirname(__file__))
+
+
+# 기본 마스크 크기 (H, W)에서의 모드별 peak RSS 예산 (MB)
+DEFAULT_SHAPE = (12000, 16000)
+PEAK_BUDGET_MB = {
+    'low_memory': 2500,
+    'sparse': 600,
+}
+
+
+def synthesize_crack_mask(shape, num_cracks=20, width_range=(2, 16), num_segments=6, segment_length=None, seed=0):
+    """
+    합성 균열 마스크 생성 (랜덤 폴리라인)
+
+    Args:
+        shape (tuple): (H, W)
+        num_cracks (int): 균열 개수
+        width_range (tuple): 균열 폭 범위 (픽셀, [min, max))
+        num_segments (int): 균열 하나당 선분 개수
+        segment_length (int): 선분 최대 길이 (픽셀, 기본값은 짧은 변의 1/20)
+        seed (int): 난수 시드
+
+    Returns:
+        ndarray: uint8 마스크 (H, W), 균열 = 1
+    """
+    rng = np.random.default_rng(seed)
+    height, width = shape
+    mask = np.zeros((height, width), dtype=np.uint8)
+    step = segment_length if segment_length else max(min(height, width) // 20, 1)
+
+    for _ in range(num_cracks):
+        thickness = int(rng.integers(width_range[0], width_range[1]))
+        point = rng.integers(0, [width, height])
+
+        for _ in range(num_segments):
+            next_point = np.clip(point + rng.integers(-step, step + 1, size=2), 0, [width - 1, height - 1])
+            cv2.line(mask, (int(point[0]), int(point[1])), (int(next_point[0]), int(next_point[1])), 1, thickness)
+            point = next_point
+
+    return mask
+
+
+def _peak_rss_mb():
+    """현재 프로세스의 peak RSS (MB, Linux 기준 ru_maxrss는 KB)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_mode(mode, shape, num_cracks, seed, queue):
+    """자식 프로세스에서 한 가지 모드를 실행하고 peak RSS를 보고"""
+    from quantify_seg_results import quantify_crack_width_length
+    from sparse_mask import SparseCrackMask
+
+    mask = synthesize_crack_mask(shape, num_cracks=num_cracks, seed=seed)
+    baseline_mb = _peak_rss_mb()
+
+    if mode == 'sparse':
+        mask = SparseCrackMask.from_dense(mask)
+
+    _, results = quantify_crack_width_length(None, mask, (0, 0, 255), low_memory=(mode != 'default'))
+
+    queue.put((mode, baseline_mb, _peak_rss_mb(), len(results)))
+
+
+def measure_mode(mode, shape, num_cracks=20, seed=0):
+    """
+    한 가지 모드를 별도(spawn) 프로세스에서 실행하여 peak RSS 측정 (tests/test_benchmark_quantification_memory.py도 사용)
+
+    Args:
+        mode (str): 'default', 'low_memory', 'sparse'
+        shape (tuple): 합성 마스크 크기 (H, W)
+        num_cracks (int): 합성 균열 개수
+        seed (int): 난수 시드
+
+    Returns:
+        tuple: ((baseline_mb, peak_mb, num_results), exit code) (자식이 OOM 등으로 종료되면 측정값 None)
+    """
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run_mode, args=(mode, shape, num_cracks, seed, queue))
+    process.start()
+
+    # 자식이 OOM 등으로 종료되면 결과가 오지 않으므로 종료 여부를 확인하며 대기
+    measurement = None
+    while measurement is None:
+        try:
+            measurement = queue.get(timeout=1.0)
+        except Empty:
+            if not process.is_alive():
+                break
+    process.join()
+
+    return (measurement[1:] if measurement is not None else None), process.exitcode
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Peak RSS benchmark for crack quantification')
+    parser.add_argument('--height', type=int, default=DEFAULT_SHAPE[0], help='합성 마스크 높이 (픽셀)')
+    parser.add_argument('--width', type=int, default=DEFAULT_SHAPE[1], help='합성 마스크 너비 (픽셀)')
+    parser.add_argument('--num_cracks', type=int, default=20, help='합성 균열 개수')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+    parser.add_argument('--modes', nargs='+', default=['low_memory', 'sparse'],
+                        choices=['default', 'low_memory', 'sparse'],
+                        help='측정할 모드 (default는 dense 기준값, 16000x12000에서 6 GB 이상 필요)')
+    parser.add_argument('--max_peak_mb', type=float, default=None,
+                        help='저메모리 모드 peak RSS 상한 (MB, 기본값: 기본 크기에서 PEAK_BUDGET_MB)')
+
+    args = parser.parse_args()
+
+    print("="*60)
+    print("Crack Quantification Peak Memory Benchmark")
+    print("="*60)
+    print(f"Mask size: {args.width}x{args.height}, cracks: {args.num_cracks}")
+
+    # 예산: 지정값 또는 기본 크기의 측정 기반 값 (다른 크기는 기준이 없으므로 지정해야 검사)
+    if args.max_peak_mb is not None:
+        budgets = {mode: args.max_peak_mb for mode in PEAK_BUDGET_MB}
+    elif (args.height, args.width) == DEFAULT_SHAPE:
+        budgets = dict(PEAK_BUDGET_MB)
+    else:
+        budgets = {}
+        print("No default budget for this mask size, pass --max_peak_mb to check")
+
+    failures = []
+
+    for mode in args.modes:
+        measurement, exitcode = measure_mode(mode, (args.height, args.width), args.num_cracks, args.seed)
+
+        if measurement is None:
+            print(f"  {mode:>10}: terminated (exit code {exitcode}, likely out of memory)")
+            if mode in PEAK_BUDGET_MB:
+                failures.append(f"{mode} terminated with exit code {exitcode}")
+            continue
+
+        baseline_mb, peak_mb, num_results = measurement
+        print(f"  {mode:>10}: peak {peak_mb:9.1f} MB (mask only {baseline_mb:9.1f} MB), {num_results} cracks")
+        if mode in budgets and peak_mb > budgets[mode]:
+            failures.append(f"{mode} peak {peak_mb:.1f} MB exceeds budget {budgets[mode]:.1f} MB")
+
+    if failures:
+        for failure in failures:
+            print(f"\nFAIL: {failure}")
+        sys.exit(1)
+    checked = [mode for mode in args.modes if mode in budgets]
+    if checked:
+        print(f"\nOK: {', '.join(f'{mode} within {budgets[mode]:.0f} MB' for mode in checked)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Calibration of the approximate (downsampled) crack quantification
+근사(다운샘플) 균열 정량화 모드의 오차 분포 측정 스크립트
+
+폭을 알고 있는 합성 균열에 대해 정밀 모드와 근사 모드(approx_factor)를 모두 실행하고,
+정밀 모드 대비 평균 폭/최대 폭/길이의 상대 오차를 균열 폭 구간(mm)별로 보고합니다.
+
+Usage:
+    python inferences/calibrate_approximate_quantification.py --factors 2 4 --samples 60
+"""
+
+import os
+import sys
+import time
+import argparse
+import warnings
+
+import numpy as np
+
+sys.path.append(os.path.dirname(__file__))
+from quantify_seg_results import MAX_APPROX_FACTOR, check_approx_factor, quantify_crack_width_length
+from benchmark_quantification_memory import synthesize_crack_mask
+
+
+# 균열 폭 구간 (mm): [하한, 상한)
+WIDTH_BUCKETS = [
+    ('<0.3mm', 0.0, 0.3),
+    ('0.3-1mm', 0.3, 1.0),
+    ('>1mm', 1.0, np.inf),
+]
+
+
+def measure_main_crack(mask, approx_factor):
+    """
+    가장 긴 균열 하나의 측정값 (반지름 픽셀 단위) 반환
+
+    Returns:
+        tuple: (avg_width, max_width, length, elapsed_seconds) 또는 균열이 없으면 None
+    """
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        # 근사 모드 경고는 이 스크립트가 측정하는 오차 자체이므로 생략
+        warnings.simplefilter('ignore')
+        _, results = quantify_crack_width_length(None, mask, (0, 0, 255), minimum_area=0, approx_factor=approx_factor)
+    elapsed = time.perf_counter() - start
+
+    if not results:
+        return None
+
+    measurements = [tuple(map(float, result[1].split('x'))) for result in results]
+    avg_width, max_width, length = max(measurements, key=lambda m: m[2])
+
+    return avg_width, max_width, length, elapsed
+
+
+def summarize(errors):
+    """상대 오차 배열의 요약 문자열 (median / p90 / max, %)"""
+    errors = np.abs(np.asarray(errors)) * 100
+    return f"{np.median(errors):5.1f} / {np.percentile(errors, 90):5.1f} / {np.max(errors):5.1f}"
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Calibrate approximate crack quantification against the exact mode')
+    parser.add_argument('--factors', type=int, nargs='+', default=[2, 4], help=f'검증할 다운샘플 배율 (최대 {MAX_APPROX_FACTOR})')
+    parser.add_argument('--samples', type=int, default=60, help='합성 균열 샘플 수')
+    parser.add_argument('--size', type=int, default=2048, help='합성 마스크 크기 (정사각형, 픽셀)')
+    parser.add_argument('--max_thickness', type=int, default=16, help='합성 균열 최대 두께 (픽셀)')
+    parser.add_argument('--pixel_to_mm', type=float, default=0.14,
+                        help='픽셀→mm 변환 비율 (calculate_pixel_to_mm 결과, 기본값은 1.5m 촬영/SR x4 기준)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드')
+
+    args = parser.parse_args()
+    for factor in args.factors:
+        try:
+            check_approx_factor(factor)
+        except ValueError as e:
+            parser.error(str(e))
+
+    print("="*60)
+    print("Approximate Crack Quantification Calibration")
+    print("="*60)
+    print(f"Samples: {args.samples}, mask: {args.size}x{args.size}, {args.pixel_to_mm} mm/pixel")
+
+    rng = np.random.default_rng(args.seed)
+
+    # records[factor] = [(bucket_name, avg_err, max_err, length_err), ...]
+    records = {factor: [] for factor in args.factors}
+    exact_time = 0.0
+    approx_time = {factor: 0.0 for factor in args.factors}
+
+    for sample in range(args.samples):
+        thickness = int(rng.integers(1, args.max_thickness + 1))
+        mask = synthesize_crack_mask((args.size, args.size), num_cracks=1, width_range=(thickness, thickness + 1),
+                                     num_segments=4, segment_length=args.size // 4, seed=args.seed + sample)
+
+        exact = measure_main_crack(mask, 1)
+        if exact is None:
+            continue
+        exact_time += exact[3]
+
+        # 폭은 medial axis 반지름이므로 2배 (convert_crack_to_real_size와 동일)
+        exact_width_mm = exact[0] * args.pixel_to_mm * 2
+        bucket = next(name for name, low, high in WIDTH_BUCKETS if low <= exact_width_mm < high)
+
+        for factor in args.factors:
+            approx = measure_main_crack(mask, factor)
+            if approx is None:
+                records[factor].append((bucket, 1.0, 1.0, 1.0))
+                continue
+            approx_time[factor] += approx[3]
+
+            records[factor].append((
+                bucket,
+                (approx[0] - exact[0]) / exact[0],
+                (approx[1] - exact[1]) / exact[1],
+                (approx[2] - exact[2]) / exact[2],
+            ))
+
+    print("\nRelative error vs exact mode, median / p90 / max (%)")
+    for factor in args.factors:
+        speedup = exact_time / approx_time[factor] if approx_time[factor] > 0 else float('nan')
+        print(f"\n[factor {factor}] speedup x{speedup:.1f}")
+        print(f"  {'bucket':>8} {'n':>4}  {'avg width':>19}  {'max width':>19}  {'length':>19}")
+
+        for name, _, _ in WIDTH_BUCKETS:
+            bucket_records = [r for r in records[factor] if r[0] == name]
+            if not bucket_records:
+                print(f"  {name:>8} {0:>4}")
+                continue
+
+            avg_err, max_err, length_err = zip(*[r[1:] for r in bucket_records])
+            print(f"  {name:>8} {len(bucket_records):>4}  {summarize(avg_err)}  {summarize(max_err)}  {summarize(length_err)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -36,6 +36,18 @@ IMAGE_HEIGHT_PX = 3024
 # 예: 2.0 = 2배 확대, 4.0 = 4배 확대
 SUPER_RESOLUTION_SCALE = 4.0  # EDSR 모델의 스케일에 맞게 설정
 
+# 카메라 프로필 (여러 촬영을 한 번에 처리할 때 촬영별로 지정, batch_run.py)
+# 지정하지 않은 값은 위의 기본값 사용
+CAMERA_PROFILES = {
+    's22': {
+        'SENSOR_WIDTH_MM': SENSOR_WIDTH_MM,
+        'SENSOR_HEIGHT_MM': SENSOR_HEIGHT_MM,
+        'FOCAL_LENGTH_MM': FOCAL_LENGTH_MM,
+        'IMAGE_WIDTH_PX': IMAGE_WIDTH_PX,
+        'IMAGE_HEIGHT_PX': IMAGE_HEIGHT_PX,
+    },
+}
+
 # =============================================================================
 # 크기 필터링 설정 (픽셀 단위)
 # =============================================================================
@@ -57,6 +69,9 @@ VISUALIZATION_ALPHA = 0.6  # 원본 균열탐지.py와 동일한 alpha 값
 # 크랙 표시 색상 (BGR 형식)
 CRACK_COLOR = [0, 0, 255]  # 빨간색
 
+# 결과 이미지 크기 (긴 변 기준 픽셀, 원본 비율 유지)
+OUTPUT_IMAGE_SIZE = 400
+
 # =============================================================================
 # 모델 추론 설정
 # =============================================================================
@@ -69,6 +84,149 @@ OVERLAP_RATIO = 0.1
 # 신뢰도 임계값
 SCORE_THRESHOLD = 0.1  # multi_scale_inference와 동일하게 0.1로 설정
 
+# 희소(좌표 기반) 균열 마스크 사용 여부
+# True: 전체 프레임 마스크를 만들지 않고 균열 픽셀 좌표만 저장 (메모리/시간이 균열 픽셀 수에 비례)
+USE_SPARSE_MASK = True
+
+# 저메모리 정량화 모드 (float32 거리 맵, int32 라벨, in-place 병합, 중간 배열 즉시 해제)
+LOW_MEMORY_MODE = False
+
+# 근사 정량화 배율 (1 = 정밀 모드, 2/4 = 마스크를 축소해 측정 후 배율 보정, 빠른 선별용, 최대 4)
+# 오차 분포: python inferences/calibrate_approximate_quantification.py
+APPROX_QUANTIFICATION_FACTOR = 1
+
+# 이미지당 메모리 예산 (예: '16G', None = 제한 없음)
+# 이미지 크기로 추정한 최대 메모리가 넘으면 저메모리 → 희소 마스크 → 근사 정량화 순서로 전환,
+# 어떤 경로로도 넘으면 해당 이미지만 실패로 기록하고 계속 진행
+MEMORY_BUDGET = None
+
+# 추론 전 메모리 추정에 사용하는 균열 픽셀 비율 (추론 후에는 실제 균열 픽셀 수로 다시 계획)
+MEMORY_CRACK_FRACTION = 0.05
+
+# 추론 중 백그라운드 스레드에서 미리 디코딩해 둘 이미지 수 (0 = 추론 전에 순차 디코딩)
+# 메모리에는 최대 PREFETCH_IMAGES + 2장의 디코딩된 이미지가 올라감
+PREFETCH_IMAGES = 1
+
+# 정량화/시각화 후처리 프로세스 수 (0 = 추론 후 메인 프로세스에서 순차 처리)
+# 워커가 이전 이미지를 처리하는 동안 메인 프로세스는 다음 이미지 추론을 진행
+POSTPROCESS_WORKERS = 2
+
+# GPS 없는 이미지 처리 정책 (메타데이터의 has_gps로 초해상화/탐지 전에 결정)
+# 'skip': 어떤 단계도 실행하지 않음, 'no_map': 마지막에 처리하여 *_위치없음.xlsx로 분리
+NO_GPS_POLICY = 'skip'
+
+# =============================================================================
+# 중복 프레임 제거 설정 (초해상화 전)
+# =============================================================================
+# 연속 촬영된 거의 같은 프레임 중 가장 선명한 한 장만 처리 (--dedup으로도 지정 가능, True면 --no_dedup으로 끔)
+# 미리 확인: python inferences/dedup_frames.py --img_dir 촬영이미지 --metadata_json <이미지정보.json>
+DEDUP_FRAMES = False
+
+# 중복으로 볼 최대 perceptual hash 거리 (64비트 중 다른 비트 수)
+DEDUP_HASH_DISTANCE = 6
+
+# 연속 촬영으로 볼 최대 촬영 간격 (초, 직전 프레임 기준)
+DEDUP_TIME_WINDOW_S = 15
+
+# 같은 위치로 볼 최대 GPS 거리 (m, 묶음의 첫 프레임 기준)
+DEDUP_GPS_WINDOW_M = 5
+
+# =============================================================================
+# 저해상도 사전 선별 설정 (초해상화 전)
+# =============================================================================
+# 원본 이미지에서 균열 후보가 없는 프레임은 초해상화/탐지 생략 (--prescreen으로도 지정 가능, True면 --no_prescreen으로 끔)
+PRESCREEN = False
+
+# 균열 후보로 볼 최소 균열 확률 (본 탐지의 argmax 기준보다 완화)
+PRESCREEN_SCORE_THRESHOLD = 0.2
+
+# 처리할 최소 균열 후보 픽셀 수 (원본 해상도 기준)
+PRESCREEN_MIN_PIXELS = 20
+
+# 건너뛸 프레임 중 놓친 비율 측정을 위해 전체 처리할 비율 (0 = 검증 안 함, 예: 0.1)
+PRESCREEN_AUDIT_RATE = 0.0
+
+# =============================================================================
+# 로컬 추론 서버 설정 (inference_server.py)
+# =============================================================================
+# 바인드 주소/포트 (기본값: 같은 머신에서만 접속 가능)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+
+# 여러 요청의 슬라이딩 윈도우를 모아 한 번에 추론할 최대 윈도우 수
+SERVER_MAX_BATCH_SIZE = 8
+
+# 첫 윈도우 도착 후 배치를 채우기 위해 기다리는 최대 시간 (ms)
+SERVER_MAX_WAIT_MS = 10
+
+# 동시에 처리할 최대 이미지 수 (초과 요청은 대기, 메모리 상한)
+SERVER_MAX_CONCURRENT = 4
+
+# 요청 본문(이미지 파일) 최대 크기 (MB, 초과 요청은 읽지 않고 413으로 거절)
+SERVER_MAX_BODY_MB = 100
+
+# =============================================================================
+# 폴더 감시 모드 설정 (watch_folder.py)
+# =============================================================================
+# 폴더를 다시 확인하는 주기 (초, inotify 사용 시에도 네트워크 폴더를 위해 이 주기로 확인)
+WATCH_POLL_INTERVAL_S = 5
+
+# 파일 크기/수정 시각이 이 시간 동안 바뀌지 않으면 복사 완료로 판단 (초)
+WATCH_SETTLE_S = 2
+
+# 처리에 실패한 이미지를 다시 시도하는 횟수 (0 = 재시도 안 함, 파일이 다시 바뀌면 횟수 초기화)
+WATCH_MAX_RETRIES = 2
+
+# =============================================================================
+# 작업 대기열 설정 (work_queue.py, queue_worker.py)
+# =============================================================================
+# 작업 임대 시간 (초, 이 시간 동안 연장되지 않으면 다른 워커가 가져감)
+QUEUE_LEASE_S = 600
+
+# 임대 연장 주기 (초, 임대 시간보다 충분히 짧게)
+QUEUE_HEARTBEAT_S = 60
+
+# 작업당 최대 시도 횟수 (초과 시 'failed', work_queue.py retry로 재시도)
+QUEUE_MAX_ATTEMPTS = 3
+
+# 남은 작업이 없을 때 다른 워커의 임대 만료를 확인하는 주기 (초)
+QUEUE_IDLE_POLL_S = 30
+
+# =============================================================================
+# 정사영상 처리 설정 (orthomosaic.py)
+# =============================================================================
+# 처리 타일 크기 (원본 래스터 픽셀, 초해상화를 함께 사용하면 초해상화 입력이므로 GPU 메모리에 맞게 2048 정도로 줄임)
+ORTHO_TILE_SIZE = 4096
+
+# 처리 타일 사방 여백 (픽셀, 타일 경계 부근도 주변 문맥과 함께 탐지하도록 이웃 타일과 겹쳐 읽는 폭, 정량화는 중심 영역만)
+ORTHO_TILE_OVERLAP = 256
+
+# =============================================================================
+# 동영상 입력 설정 (video_pipeline.py)
+# =============================================================================
+# 프레임 간격 (N 프레임마다 1장 디코딩, 30fps 차량 영상에서 10이면 초당 3장)
+VIDEO_FRAME_STRIDE = 10
+
+# 중복 프레임 판정 최소 이동량 (프레임 폭 대비 %, 정차/저속 구간처럼 이동량이 이보다 작은 같은 장면의
+# 연속 프레임은 가장 선명한 프레임만 처리)
+VIDEO_MIN_MOTION = 0.3
+
+# GPS 트랙 점 사이 보간 최대 간격 (초, 더 긴 공백 구간의 프레임은 위치 없음)
+VIDEO_GPS_MAX_GAP_S = 2.0
+
+# =============================================================================
+# 산출물 캐시 설정
+# =============================================================================
+# (입력 이미지, 모델 체크포인트, 관련 설정) 해시 기반으로 초해상화 이미지/균열 마스크/측정 레코드 재사용
+# 상태 확인: python inferences/artifact_cache.py stats
+USE_ARTIFACT_CACHE = True
+
+# 캐시 디렉토리
+ARTIFACT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "crack_detection")
+
+# 캐시 용량 상한 (GB, 초과 시 가장 오래 사용하지 않은 항목부터 삭제)
+ARTIFACT_CACHE_MAX_GB = 50
+
 # =============================================================================
 # 기본 좌표 설정 (이미지에서 좌표를 추출할 수 없는 경우 사용)
 # =============================================================================
@@ -93,9 +251,47 @@ CONFIG = {
     'MIN_CRACK_LENGTH': MIN_CRACK_LENGTH,
     'VISUALIZATION_ALPHA': VISUALIZATION_ALPHA,
     'CRACK_COLOR': CRACK_COLOR,
+    'OUTPUT_IMAGE_SIZE': OUTPUT_IMAGE_SIZE,
     'WINDOW_SIZE': WINDOW_SIZE,
     'OVERLAP_RATIO': OVERLAP_RATIO,
     'SCORE_THRESHOLD': SCORE_THRESHOLD,
+    'USE_SPARSE_MASK': USE_SPARSE_MASK,
+    'LOW_MEMORY_MODE': LOW_MEMORY_MODE,
+    'APPROX_QUANTIFICATION_FACTOR': APPROX_QUANTIFICATION_FACTOR,
+    'MEMORY_BUDGET': MEMORY_BUDGET,
+    'MEMORY_CRACK_FRACTION': MEMORY_CRACK_FRACTION,
+    'PREFETCH_IMAGES': PREFETCH_IMAGES,
+    'POSTPROCESS_WORKERS': POSTPROCESS_WORKERS,
+    'NO_GPS_POLICY': NO_GPS_POLICY,
+    'DEDUP_FRAMES': DEDUP_FRAMES,
+    'DEDUP_HASH_DISTANCE': DEDUP_HASH_DISTANCE,
+    'DEDUP_TIME_WINDOW_S': DEDUP_TIME_WINDOW_S,
+    'DEDUP_GPS_WINDOW_M': DEDUP_GPS_WINDOW_M,
+    'PRESCREEN': PRESCREEN,
+    'PRESCREEN_SCORE_THRESHOLD': PRESCREEN_SCORE_THRESHOLD,
+    'PRESCREEN_MIN_PIXELS': PRESCREEN_MIN_PIXELS,
+    'PRESCREEN_AUDIT_RATE': PRESCREEN_AUDIT_RATE,
+    'SERVER_HOST': SERVER_HOST,
+    'SERVER_PORT': SERVER_PORT,
+    'SERVER_MAX_BATCH_SIZE': SERVER_MAX_BATCH_SIZE,
+    'SERVER_MAX_WAIT_MS': SERVER_MAX_WAIT_MS,
+    'SERVER_MAX_CONCURRENT': SERVER_MAX_CONCURRENT,
+    'SERVER_MAX_BODY_MB': SERVER_MAX_BODY_MB,
+    'WATCH_POLL_INTERVAL_S': WATCH_POLL_INTERVAL_S,
+    'WATCH_SETTLE_S': WATCH_SETTLE_S,
+    'WATCH_MAX_RETRIES': WATCH_MAX_RETRIES,
+    'QUEUE_LEASE_S': QUEUE_LEASE_S,
+    'QUEUE_HEARTBEAT_S': QUEUE_HEARTBEAT_S,
+    'QUEUE_MAX_ATTEMPTS': QUEUE_MAX_ATTEMPTS,
+    'QUEUE_IDLE_POLL_S': QUEUE_IDLE_POLL_S,
+    'ORTHO_TILE_SIZE': ORTHO_TILE_SIZE,
+    'ORTHO_TILE_OVERLAP': ORTHO_TILE_OVERLAP,
+    'VIDEO_FRAME_STRIDE': VIDEO_FRAME_STRIDE,
+    'VIDEO_MIN_MOTION': VIDEO_MIN_MOTION,
+    'VIDEO_GPS_MAX_GAP_S': VIDEO_GPS_MAX_GAP_S,
+    'USE_ARTIFACT_CACHE': USE_ARTIFACT_CACHE,
+    'ARTIFACT_CACHE_DIR': ARTIFACT_CACHE_DIR,
+    'ARTIFACT_CACHE_MAX_GB': ARTIFACT_CACHE_MAX_GB,
     'DEFAULT_LATITUDE': DEFAULT_LATITUDE,
     'DEFAULT_LONGITUDE': DEFAULT_LONGITUDE,
     'DEFAULT_INPUT_SUFFIX': DEFAULT_INPUT_SUFFIX,
@@ -108,4 +304,5 @@ CONFIG = {
     'IMAGE_WIDTH_PX': IMAGE_WIDTH_PX,
     'IMAGE_HEIGHT_PX': IMAGE_HEIGHT_PX,
     'SUPER_RESOLUTION_SCALE': SUPER_RESOLUTION_SCALE,
+    'CAMERA_PROFILES': CAMERA_PROFILES,
 }
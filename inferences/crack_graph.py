@@ -0,0 +1,299 @@
+"""
+Skeleton graph vectorization of cracks
+균열 골격(skeleton)을 폴리라인 그래프로 벡터화
+
+create_distance_map 결과(skeleton + 거리)를 균열별 폴리라인 그래프로 변환합니다.
+각 정점에는 거리 맵의 폭(반지름, 픽셀)이 붙고 분기점/끝점이 표시되며, 길이는 skeleton 픽셀 수가
+아닌 폴리라인을 따른 측지 거리(geodesic length)로 계산됩니다.
+결과는 GeoJSON 형식(.geojson/.json) 또는 압축 바이너리(.npz)로 저장하여, 지도/보고서/조사 비교에서
+고해상도 마스크 대신 이미지당 수 KB의 형상 데이터만 사용할 수 있습니다.
+"""
+
+import json
+
+import numpy as np
+
+from sparse_mask import SparseCrackMask, label_sparse_mask
+
+
+_NEIGHBOR_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def _skeleton_neighbors(skeleton):
+    """
+    Neighbor table of skeleton pixels using m-adjacency: a diagonal neighbor is only linked when
+    the two pixels do not already share a 4-connected neighbor, so staircase corners do not
+    turn into fake branch points.
+    Args:
+        skeleton (SparseCrackMask): Skeleton pixels.
+    Returns:
+        neighbors (ndarray): (N, 8) index of each neighbor pixel, -1 where there is none.
+    """
+
+    rows, cols = skeleton.rows, skeleton.cols
+    height, width = skeleton.shape
+
+    def _lookup(d_row, d_col):
+        n_rows = rows + d_row
+        n_cols = cols + d_col
+        inside = (n_rows >= 0) & (n_rows < height) & (n_cols >= 0) & (n_cols < width)
+        index = skeleton.lookup(np.clip(n_rows, 0, height - 1), np.clip(n_cols, 0, width - 1))
+        return np.where(inside, index, -1)
+
+    direct = {offset: _lookup(*offset) for offset in _NEIGHBOR_OFFSETS}
+    neighbors = np.empty((skeleton.nnz, len(_NEIGHBOR_OFFSETS)), dtype=np.int64)
+
+    for k, (d_row, d_col) in enumerate(_NEIGHBOR_OFFSETS):
+        index = direct[(d_row, d_col)]
+        if d_row != 0 and d_col != 0:
+            shared = (direct[(d_row, 0)] >= 0) | (direct[(0, d_col)] >= 0)
+            index = np.where(shared, -1, index)
+        neighbors[:, k] = index
+
+    return neighbors
+
+
+def _trace_polylines(neighbors, degree):
+    """
+    Split the skeleton into polylines running between nodes (end points and branch points).
+    Args:
+        neighbors (ndarray): (N, 8) neighbor table.
+        degree (ndarray): Number of neighbors of each pixel.
+    Returns:
+        polylines (list): [ndarray of pixel indices, ...]
+    """
+
+    polylines = []
+    visited_steps = set()
+    on_polyline = np.zeros(len(degree), dtype=bool)
+
+    def _walk(start, first):
+        path = [start, first]
+        visited_steps.add((start, first))
+        prev, cur = start, first
+
+        while degree[cur] == 2 and cur != start:
+            nxt = [n for n in neighbors[cur] if n >= 0 and n != prev][0]
+            prev, cur = cur, nxt
+            path.append(cur)
+
+        visited_steps.add((cur, prev))
+        return np.asarray(path)
+
+    # polylines starting from nodes
+    for node in np.flatnonzero(degree != 2):
+        if degree[node] == 0:
+            polylines.append(np.asarray([node]))
+            on_polyline[node] = True
+            continue
+
+        for first in neighbors[node]:
+            if first < 0 or (node, first) in visited_steps:
+                continue
+            path = _walk(node, first)
+            on_polyline[path] = True
+            polylines.append(path)
+
+    # closed loops without any node
+    for start in np.flatnonzero(~on_polyline):
+        if on_polyline[start]:
+            continue
+        first = [n for n in neighbors[start] if n >= 0][0]
+        path = _walk(start, first)
+        on_polyline[path] = True
+        polylines.append(path)
+
+    return polylines
+
+
+def build_crack_graph(distance_map, skeleton_crack_index=None):
+    """
+    Convert a skeleton distance map into a graph of polylines per crack
+    Args:
+        distance_map (ndarray or SparseCrackMask): Output of create_distance_map.
+            Non-zero pixels are skeleton pixels and their value is the distance (radius).
+        skeleton_crack_index (ndarray, optional): Crack index of each skeleton pixel in raster order,
+            as returned by quantify_crack_width_length(return_distance_map=True). Skeleton pieces that
+            the quantification merged into one crack share one entry, and pixels with index -1
+            (cracks below the minimum area) are dropped, so crack_id matches the quantification
+            result index (crack_index of the crack detail table). If None, each connected skeleton
+            component is one crack, numbered from 0.
+    Returns:
+        crack_graph (dict): {
+            'shape': (H, W),
+            'cracks': [{
+                'crack_id': int,
+                'polylines': [ndarray (n, 2) of (row, col)],
+                'widths': [ndarray (n,) radius at each vertex],
+                'branch_points': ndarray (b, 2) of (row, col),
+                'end_points': ndarray (e, 2) of (row, col),
+                'length': float geodesic length in pixels,
+            }, ...]
+        }
+    """
+
+    if isinstance(distance_map, SparseCrackMask):
+        positive = distance_map.values > 0
+        skeleton = distance_map.subset(positive)
+    else:
+        skeleton = SparseCrackMask.from_dense(distance_map > 0, values=distance_map)
+
+    if skeleton_crack_index is not None:
+        # cracks removed by the minimum area filter have no graph either
+        kept = np.asarray(skeleton_crack_index) >= 0
+        crack_index = np.asarray(skeleton_crack_index)[kept]
+        skeleton = skeleton.subset(kept)
+
+    crack_graph = {'shape': skeleton.shape, 'cracks': []}
+
+    if skeleton.nnz == 0:
+        return crack_graph
+
+    neighbors = _skeleton_neighbors(skeleton)
+    degree = np.count_nonzero(neighbors >= 0, axis=1)
+    polylines = _trace_polylines(neighbors, degree)
+
+    if skeleton_crack_index is None:
+        labels, num = label_sparse_mask(skeleton)
+        crack_index = labels - 1
+        crack_ids = np.arange(num)
+    else:
+        crack_ids = np.unique(crack_index)
+
+    coords = np.stack([skeleton.rows, skeleton.cols], axis=1)
+
+    cracks = {crack_id: {
+        'crack_id': int(crack_id),
+        'polylines': [],
+        'widths': [],
+        'branch_points': coords[(crack_index == crack_id) & (degree >= 3)],
+        'end_points': coords[(crack_index == crack_id) & (degree <= 1)],
+        'length': 0.0,
+    } for crack_id in crack_ids}
+
+    for path in polylines:
+        crack = cracks[crack_index[path[0]]]
+        vertices = coords[path]
+        crack['polylines'].append(vertices)
+        crack['widths'].append(skeleton.values[path].astype(np.float32))
+        crack['length'] += float(np.sum(np.hypot(*np.diff(vertices, axis=0).T))) if len(path) > 1 else 0.0
+
+    crack_graph['cracks'] = list(cracks.values())
+
+    return crack_graph
+
+
+def crack_graph_to_geojson(crack_graph, pixel_to_mm=None):
+    """
+    Convert a crack graph into a GeoJSON-like FeatureCollection in image coordinates (x = col, y = row)
+    Args:
+        crack_graph (dict): Output of build_crack_graph.
+        pixel_to_mm (float): If given, widths (diameter) and length are also reported in mm.
+    Returns:
+        geojson (dict): FeatureCollection with one MultiLineString feature per crack.
+    """
+
+    features = []
+
+    for crack in crack_graph['cracks']:
+        properties = {
+            'crack_id': crack['crack_id'],
+            'widths_px': [np.round(w, 2).tolist() for w in crack['widths']],
+            'branch_points': crack['branch_points'][:, ::-1].tolist(),
+            'end_points': crack['end_points'][:, ::-1].tolist(),
+            'length_px': round(crack['length'], 2),
+        }
+        if pixel_to_mm is not None:
+            # width는 반지름이므로 2배 (convert_crack_to_real_size와 동일)
+            properties['widths_mm'] = [np.round(w * pixel_to_mm * 2, 3).tolist() for w in crack['widths']]
+            properties['length_mm'] = round(crack['length'] * pixel_to_mm, 2)
+
+        features.append({
+            'type': 'Feature',
+            'geometry': {
+                'type': 'MultiLineString',
+                'coordinates': [polyline[:, ::-1].tolist() for polyline in crack['polylines']],
+            },
+            'properties': properties,
+        })
+
+    return {
+        'type': 'FeatureCollection',
+        'image_shape': list(crack_graph['shape']),
+        'features': features,
+    }
+
+
+def _stack_points(crack_graph, key):
+    """Concatenate per-crack (row, col) points into one int32 array."""
+    points = [crack[key] for crack in crack_graph['cracks']]
+    return np.concatenate(points).astype(np.int32) if points else np.empty((0, 2), dtype=np.int32)
+
+
+def _point_crack_ids(crack_graph, key):
+    """crack_id of each point in _stack_points order."""
+    return np.asarray([crack['crack_id'] for crack in crack_graph['cracks'] for _ in crack[key]], dtype=np.int32)
+
+
+def save_crack_graph(crack_graph, output_path, pixel_to_mm=None):
+    """
+    Save a crack graph as GeoJSON (.json/.geojson) or as a compact binary (.npz)
+    Args:
+        crack_graph (dict): Output of build_crack_graph.
+        output_path (str): Output file path. The extension selects the format.
+        pixel_to_mm (float): Optional mm/pixel ratio stored alongside the geometry.
+    """
+
+    if output_path.endswith(('.json', '.geojson')):
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(crack_graph_to_geojson(crack_graph, pixel_to_mm), f, ensure_ascii=False)
+        return
+
+    polylines = [p for crack in crack_graph['cracks'] for p in crack['polylines']]
+    widths = [w for crack in crack_graph['cracks'] for w in crack['widths']]
+    polyline_crack = [crack['crack_id'] for crack in crack_graph['cracks'] for _ in crack['polylines']]
+    lengths = [len(p) for p in polylines]
+
+    np.savez_compressed(
+        output_path,
+        shape=np.asarray(crack_graph['shape'], dtype=np.int32),
+        vertices=np.concatenate(polylines).astype(np.int32) if polylines else np.empty((0, 2), dtype=np.int32),
+        widths=np.concatenate(widths).astype(np.float16) if widths else np.empty(0, dtype=np.float16),
+        polyline_offsets=np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+        polyline_crack=np.asarray(polyline_crack, dtype=np.int32),
+        branch_points=_stack_points(crack_graph, 'branch_points'),
+        branch_crack=_point_crack_ids(crack_graph, 'branch_points'),
+        end_points=_stack_points(crack_graph, 'end_points'),
+        end_crack=_point_crack_ids(crack_graph, 'end_points'),
+        crack_id=np.asarray([crack['crack_id'] for crack in crack_graph['cracks']], dtype=np.int32),
+        crack_length=np.asarray([crack['length'] for crack in crack_graph['cracks']], dtype=np.float32),
+        pixel_to_mm=np.float64(pixel_to_mm if pixel_to_mm is not None else np.nan),
+    )
+
+
+def load_crack_graph(npz_path):
+    """
+    Load a crack graph saved as .npz by save_crack_graph
+    Args:
+        npz_path (str): The .npz file path.
+    Returns:
+        crack_graph (dict): Same layout as build_crack_graph.
+    """
+
+    data = np.load(npz_path)
+    offsets = data['polyline_offsets']
+    crack_graph = {'shape': tuple(data['shape']), 'cracks': []}
+
+    for crack_id, length in zip(data['crack_id'], data['crack_length']):
+        crack_id = int(crack_id)
+        polyline_index = np.flatnonzero(data['polyline_crack'] == crack_id)
+        crack_graph['cracks'].append({
+            'crack_id': crack_id,
+            'polylines': [data['vertices'][offsets[i]:offsets[i + 1]] for i in polyline_index],
+            'widths': [data['widths'][offsets[i]:offsets[i + 1]].astype(np.float32) for i in polyline_index],
+            'branch_points': data['branch_points'][data['branch_crack'] == crack_id],
+            'end_points': data['end_points'][data['end_crack'] == crack_id],
+            'length': float(length),
+        })
+
+    return crack_graph
@@ -0,0 +1,234 @@
+"""
+Importable crack pipeline API
+균열 탐지 파이프라인 라이브러리 API
+
+서비스 코드가 스크립트를 별도 프로세스로 실행하고 파일로 결과를 주고받지 않도록, 모델을 한 번 로드한
+CrackPipeline 객체에 메모리의 이미지(ndarray)를 넘겨 초해상화 → 슬라이딩 윈도우 탐지 → 정량화 →
+실제 크기 변환 결과를 바로 받습니다. 파일을 쓰지 않으며, 모델은 객체가 살아 있는 동안 상주합니다.
+
+Usage:
+    from crack_pipeline import CrackPipeline
+
+    pipeline = CrackPipeline.from_checkpoints(
+        '모델/초해상화/초해상화_config.py', '모델/초해상화/초해상화_weight.pth',
+        '모델/균열탐지/균열탐지_config.py', '모델/균열탐지/균열탐지_weight.pth',
+        shooting_distance_mm=1500)
+    result = pipeline.process(image, {'image_name': 'a.jpg', 'latitude': 37.5, 'longitude': 127.0})
+    for result in pipeline.process_many(['a.jpg', 'b.jpg']):
+        print(result.image_name, result.num_cracks, result.detection)
+"""
+
+import os
+import threading
+
+import numpy as np
+import torch
+from torch.cuda import empty_cache
+from mmseg.apis import init_model
+
+from quantify_seg_results import check_approx_factor, quantify_crack_width_length
+from utils import inference_segmentor_sliding_window
+from prototyping_crack_detection import (calculate_pixel_to_mm, convert_crack_to_real_size, render_crack_detection,
+                                         summarize_detection)
+from run_pipeline import load_models
+from image_source import DecodedImage, load_image
+from pipeline_stages import prefetch
+from memory_planner import count_crack_pixels
+from config import CONFIG
+
+
+class CrackResult:
+    """
+    Crack detection result for one image.
+
+    Args:
+        image_name (str): Image name (from the metadata, '' if not given).
+        crack_mask (ndarray or SparseCrackMask): Crack mask at the detection resolution.
+        crack_quantification_results (list): Pixel-unit measurements (quantify_crack_width_length).
+        cracks (list): Real-size measurements (convert_crack_to_real_size).
+        pixel_to_mm (float): mm per pixel at the detection resolution.
+        latitude (float): Latitude, None if unavailable.
+        longitude (float): Longitude, None if unavailable.
+        timestamp (str): Capture time, None if unavailable.
+        rendered (ndarray): Visualization at the output size, None unless requested.
+    """
+
+    def __init__(self, image_name, crack_mask, crack_quantification_results, cracks, pixel_to_mm,
+                 latitude=None, longitude=None, timestamp=None, rendered=None):
+        self.image_name = image_name
+        self.crack_mask = crack_mask
+        self.crack_quantification_results = crack_quantification_results
+        self.cracks = cracks
+        self.pixel_to_mm = pixel_to_mm
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timestamp = timestamp
+        self.rendered = rendered
+
+    @property
+    def num_cracks(self):
+        return len(self.cracks)
+
+    @property
+    def crack_pixels(self):
+        return count_crack_pixels(self.crack_mask)
+
+    @property
+    def detection(self):
+        """Excel/요약 CSV와 같은 형식의 요약 행 (균열이 없으면 None)"""
+        if not self.cracks:
+            return None
+        return summarize_detection(self.image_name, self.cracks, self.latitude, self.longitude, self.timestamp)
+
+    def __repr__(self):
+        return f"CrackResult(image_name={self.image_name!r}, num_cracks={self.num_cracks})"
+
+
+def super_resolve(sr_model, image):
+    """
+    메모리의 이미지를 초해상화 (파일을 거치지 않음)
+
+    MMagicInferencer.infer는 파일 경로를 읽는 전처리를 거치므로, ndarray는 같은 입력 형식
+    (RGB, CHW, 0-1)으로 바꿔 추론기의 forward/visualize를 직접 호출합니다.
+    파일 경로 입력과 같은 결과인지는 tests/test_crack_pipeline.py에서 확인합니다 (mmagic 필요).
+
+    Args:
+        sr_model (MMagicInferencer): 초해상화 모델
+        image (ndarray or str): BGR 이미지 또는 이미지 경로
+
+    Returns:
+        ndarray: 초해상화된 BGR 이미지
+    """
+    if isinstance(image, str):
+        return sr_model.infer(img=image)[1]
+
+    inferencer = sr_model.inferencer
+    rgb = np.ascontiguousarray(image[..., ::-1].transpose(2, 0, 1))
+    inputs = (torch.from_numpy(rgb).float() / 255.0).unsqueeze(0).to(inferencer.device)
+    preds = inferencer.forward({'inputs': inputs})
+    return inferencer.visualize(preds)
+
+
+class CrackPipeline:
+    """
+    Super-resolution, sliding-window crack detection and quantification with models loaded once.
+
+    Args:
+        sr_model (MMagicInferencer): Super-resolution model, None to detect on the input as is
+            (e.g. images that are already super-resolved).
+        crack_model: Crack segmentation model (mmseg init_model).
+        shooting_distance_mm (float): Shooting distance used for the pixel to mm conversion.
+        options (dict): approx_factor, low_memory, sparse, output_size (defaults from CONFIG).
+        batch_infer (callable): Batched window inference shared by concurrent callers
+            (e.g. inference_server.WindowBatcher.infer), None to run one window at a time.
+        camera (dict): Camera settings overriding CONFIG for the pixel to mm conversion
+            (SENSOR_WIDTH_MM, FOCAL_LENGTH_MM, IMAGE_WIDTH_PX, e.g. a CAMERA_PROFILES entry or video frame width).
+    """
+
+    def __init__(self, sr_model, crack_model, shooting_distance_mm, options=None, batch_infer=None, camera=None):
+        self.sr_model = sr_model
+        self.crack_model = crack_model
+        self.batch_infer = batch_infer
+        # process()를 여러 스레드에서 호출해도 초해상화는 한 번에 하나씩 (GPU 메모리 제한)
+        self._sr_lock = threading.Lock()
+        self.shooting_distance_mm = shooting_distance_mm
+        self.pixel_to_mm = calculate_pixel_to_mm(shooting_distance_mm, dict(CONFIG, **(camera or {})))
+
+        self.options = dict(options or {})
+        self.options.setdefault('approx_factor', CONFIG['APPROX_QUANTIFICATION_FACTOR'])
+        check_approx_factor(self.options['approx_factor'])
+        self.options.setdefault('low_memory', CONFIG['LOW_MEMORY_MODE'])
+        self.options.setdefault('sparse', CONFIG['USE_SPARSE_MASK'])
+        self.options.setdefault('output_size', CONFIG['OUTPUT_IMAGE_SIZE'])
+
+    @classmethod
+    def from_checkpoints(cls, sr_config, sr_checkpoint, crack_config, crack_checkpoint, shooting_distance_mm,
+                         sr_model_name='edsr', device='cuda', options=None, batch_infer=None, camera=None):
+        """
+        설정/체크포인트에서 모델을 로드하여 생성 (sr_config가 None이면 초해상화 없이 탐지만 수행)
+        """
+        if sr_config is None:
+            sr_model = None
+            crack_model = init_model(crack_config, crack_checkpoint, device='cuda:0' if device == 'cuda' else device)
+        else:
+            sr_model, crack_model = load_models(sr_config, sr_checkpoint, crack_config, crack_checkpoint,
+                                                sr_model_name=sr_model_name, device=device)
+        return cls(sr_model, crack_model, shooting_distance_mm, options, batch_infer, camera)
+
+    def process(self, image, metadata=None, render=False):
+        """
+        한 이미지 처리
+
+        Args:
+            image (ndarray or str): 원본 BGR 이미지 (H, W, 3) 또는 이미지 경로
+            metadata (dict): image_name, latitude, longitude, timestamp (메타데이터 JSON 항목과 같은 형식)
+            render (bool): 출력 해상도 시각화 이미지도 반환 (CrackResult.rendered)
+
+        Returns:
+            CrackResult: 탐지 결과
+        """
+        metadata = metadata or {}
+        if isinstance(image, str):
+            image = load_image(image, {os.path.basename(image): metadata} if metadata else None)
+        if isinstance(image, DecodedImage):
+            metadata = dict(image.metadata(), **metadata)
+            image = image.image
+
+        # 초해상화 (결과 배열을 그대로 탐지에 사용)
+        detect_image = image
+        if self.sr_model is not None:
+            with self._sr_lock:
+                detect_image = super_resolve(self.sr_model, image)
+
+        _, crack_mask = inference_segmentor_sliding_window(
+            self.crack_model, detect_image,
+            color_mask=None,
+            score_thr=CONFIG['SCORE_THRESHOLD'],
+            window_size=CONFIG['WINDOW_SIZE'],
+            overlap_ratio=CONFIG['OVERLAP_RATIO'],
+            return_sparse=self.options['sparse'],
+            batch_infer=self.batch_infer
+        )
+        empty_cache()
+
+        _, crack_quantification_results = quantify_crack_width_length(
+            None, crack_mask, CONFIG['CRACK_COLOR'],
+            low_memory=self.options['low_memory'],
+            approx_factor=self.options['approx_factor']
+        )
+        cracks = convert_crack_to_real_size(crack_quantification_results, self.pixel_to_mm)
+
+        rendered = None
+        if render:
+            rendered = render_crack_detection(detect_image, crack_mask, cracks, output_size=self.options['output_size'])
+
+        return CrackResult(
+            metadata.get('image_name', ''), crack_mask, crack_quantification_results, cracks, self.pixel_to_mm,
+            latitude=metadata.get('latitude'), longitude=metadata.get('longitude'),
+            timestamp=metadata.get('timestamp'), rendered=rendered
+        )
+
+    def process_many(self, items, render=False, prefetch_depth=None):
+        """
+        여러 이미지를 순서대로 처리 (경로는 추론 중 백그라운드 스레드에서 미리 디코딩)
+
+        Args:
+            items (iterable): ndarray, 이미지 경로, DecodedImage 또는 (image, metadata) 튜플
+            render (bool): 시각화 이미지도 반환
+            prefetch_depth (int): 미리 디코딩해 둘 이미지 수 (기본값: CONFIG['PREFETCH_IMAGES'])
+
+        Yields:
+            CrackResult: 입력 순서대로 탐지 결과 (디코딩/처리 오류는 그대로 발생)
+        """
+        depth = CONFIG['PREFETCH_IMAGES'] if prefetch_depth is None else prefetch_depth
+
+        def prepare(item):
+            image, metadata = item if isinstance(item, tuple) else (item, None)
+            if isinstance(image, str):
+                image = load_image(image, {os.path.basename(image): metadata} if metadata else None)
+            return image, metadata
+
+        for _, prepared, error in prefetch(prepare, items, depth=depth):
+            if error is not None:
+                raise error
+            yield self.process(*prepared, render=render)
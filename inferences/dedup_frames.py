@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate frame elimination before super-resolution
+초해상화 전 중복 촬영 이미지 제거
+
+같은 벽면을 연속으로 여러 장 찍은 사진은 초해상화와 균열 탐지를 반복할 뿐 새로운 정보가 없습니다.
+축소 디코딩한 흑백 썸네일의 perceptual hash(dHash, 64비트)로 거의 같은 프레임을 찾고,
+촬영 시간/GPS가 가까운 연속 프레임끼리 묶은 뒤 묶음마다 가장 선명한(라플라시안 분산이 큰)
+프레임 하나만 남깁니다. 제외된 프레임은 보고서(CSV)에 남습니다.
+
+묶음은 촬영 순서대로 만들며, 새 프레임은 묶음의 첫 프레임(기준)과 비교합니다. 천천히 이동하며
+찍은 프레임이 인접한 프레임끼리만 비슷해서 전체가 하나로 묶이는 일을 막기 위해서입니다.
+
+Usage:
+    python inferences/dedup_frames.py --img_dir 촬영이미지 --metadata_json 균열탐지_결과/이미지정보.json
+"""
+
+import os
+import re
+import csv
+import json
+import math
+import argparse
+from datetime import datetime
+
+import numpy as np
+import cv2
+
+from config import CONFIG
+
+
+_EARTH_RADIUS_M = 6371000.0
+
+
+def list_frames(img_dir):
+    """
+    디렉토리의 이미지 경로 (파일 이름의 숫자는 수로 비교하여 정렬, 예: 2.jpg → 10.jpg)
+
+    메타데이터 JSON이 없으면 촬영 시간을 모르므로 파일 이름 순서가 촬영 순서를 대신합니다.
+
+    Args:
+        img_dir (str): 이미지 디렉토리
+
+    Returns:
+        list: 이미지 경로 리스트
+    """
+    names = [f for f in os.listdir(img_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    names.sort(key=lambda name: [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)])
+    return [os.path.join(img_dir, name) for name in names]
+
+
+def load_thumbnail(img_path):
+    """
+    흑백 썸네일 디코딩 (JPEG은 DCT 단계에서 1/8 크기로 디코딩되어 전체 디코딩보다 훨씬 빠름)
+
+    Args:
+        img_path (str): 이미지 경로
+
+    Returns:
+        ndarray: uint8 흑백 이미지
+    """
+    gray = cv2.imread(img_path, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if gray is None:
+        raise IOError(f"Failed to decode image: {img_path}")
+    return gray
+
+
+def dhash(gray, hash_size=8):
+    """
+    difference hash (가로로 인접한 픽셀의 밝기 대소 관계, hash_size^2 비트)
+
+    Args:
+        gray (ndarray): 흑백 이미지
+        hash_size (int): 해시 한 변의 비트 수
+
+    Returns:
+        int: 해시 값
+    """
+    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (resized[:, 1:] > resized[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming_distance(hash_a, hash_b):
+    """두 해시의 서로 다른 비트 수"""
+    return bin(hash_a ^ hash_b).count('1')
+
+
+def sharpness(gray):
+    """선명도 (라플라시안 분산, 흔들리거나 초점이 나간 프레임일수록 작음)"""
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def gps_distance_m(lat1, lon1, lat2, lon2):
+    """두 GPS 좌표 사이 거리 (m, haversine)"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def describe_frames(img_paths, metadata_dict):
+    """
+    프레임별 해시, 선명도, 촬영 시간/GPS 계산 (촬영 시간 순서, 시간이 없으면 파일 이름 순서)
+
+    Args:
+        img_paths (list): 이미지 경로
+        metadata_dict (dict): {image_name: metadata}
+
+    Returns:
+        list: 프레임 정보 dict 리스트
+    """
+    frames = []
+
+    for order, img_path in enumerate(img_paths):
+        img_name = os.path.basename(img_path)
+        item = metadata_dict.get(img_name, {})
+        gray = load_thumbnail(img_path)
+
+        frames.append({
+            'image_path': img_path,
+            'image_name': img_name,
+            'order': order,
+            'timestamp': _parse_timestamp(item.get('timestamp')),
+            'latitude': item.get('latitude'),
+            'longitude': item.get('longitude'),
+            'shape': gray.shape,
+            'hash': dhash(gray),
+            'sharpness': sharpness(gray),
+        })
+
+    # 시간이 있는 프레임은 촬영 순서로, 없는 프레임은 입력 순서 그대로 뒤에 둠
+    frames.sort(key=lambda f: (f['timestamp'] is None, f['timestamp'] or datetime.min, f['order']))
+
+    return frames
+
+
+def _is_near_duplicate(anchor, previous, frame, max_distance, time_window_s, gps_window_m):
+    """frame이 anchor(묶음 기준 프레임)의 중복인지 여부"""
+    # 방향(가로/세로)이 다르면 다른 장면
+    if anchor['shape'] != frame['shape']:
+        return False
+
+    if hamming_distance(anchor['hash'], frame['hash']) > max_distance:
+        return False
+
+    # 연속 촬영 간격 (직전 프레임 기준)
+    if previous['timestamp'] is not None and frame['timestamp'] is not None:
+        if (frame['timestamp'] - previous['timestamp']).total_seconds() > time_window_s:
+            return False
+
+    # 촬영 위치 (기준 프레임 기준)
+    if None not in (anchor['latitude'], anchor['longitude'], frame['latitude'], frame['longitude']):
+        if gps_distance_m(anchor['latitude'], anchor['longitude'], frame['latitude'], frame['longitude']) > gps_window_m:
+            return False
+
+    return True
+
+
+def cluster_frames(frames, max_distance=None, time_window_s=None, gps_window_m=None):
+    """
+    촬영 순서대로 연속된 중복 프레임 묶기
+
+    Args:
+        frames (list): describe_frames 결과
+        max_distance (int): 중복으로 볼 최대 해시 거리 (비트, 기본값: CONFIG['DEDUP_HASH_DISTANCE'])
+        time_window_s (float): 연속 촬영으로 볼 최대 간격 (초, 기본값: CONFIG['DEDUP_TIME_WINDOW_S'])
+        gps_window_m (float): 같은 위치로 볼 최대 거리 (m, 기본값: CONFIG['DEDUP_GPS_WINDOW_M'])
+
+    Returns:
+        list: 프레임 묶음 리스트 (각 묶음의 첫 프레임이 기준)
+    """
+    max_distance = CONFIG['DEDUP_HASH_DISTANCE'] if max_distance is None else max_distance
+    time_window_s = CONFIG['DEDUP_TIME_WINDOW_S'] if time_window_s is None else time_window_s
+    gps_window_m = CONFIG['DEDUP_GPS_WINDOW_M'] if gps_window_m is None else gps_window_m
+
+    clusters = []
+    for frame in frames:
+        if clusters and _is_near_duplicate(clusters[-1][0], clusters[-1][-1], frame,
+                                           max_distance, time_window_s, gps_window_m):
+            clusters[-1].append(frame)
+        else:
+            clusters.append([frame])
+
+    return clusters
+
+
+def dedup_images(img_paths, metadata_dict, max_distance=None, time_window_s=None, gps_window_m=None):
+    """
+    중복 프레임을 제외한 처리 대상 선택
+
+    Args:
+        img_paths (list): 이미지 경로 (처리 순서)
+        metadata_dict (dict): {image_name: metadata}
+        max_distance (int): 중복으로 볼 최대 해시 거리 (비트)
+        time_window_s (float): 연속 촬영으로 볼 최대 간격 (초)
+        gps_window_m (float): 같은 위치로 볼 최대 거리 (m)
+
+    Returns:
+        dict: {
+            'keep': 남길 이미지 경로 (입력 순서 유지),
+            'dropped': 제외된 프레임 보고서 행 리스트,
+            'total': 입력 이미지 수,
+        }
+    """
+    frames = describe_frames(img_paths, metadata_dict)
+    clusters = cluster_frames(frames, max_distance, time_window_s, gps_window_m)
+
+    kept_paths = set()
+    dropped = []
+
+    for cluster in clusters:
+        representative = max(cluster, key=lambda f: f['sharpness'])
+        kept_paths.add(representative['image_path'])
+
+        for frame in cluster:
+            if frame is representative:
+                continue
+            dropped.append({
+                'dropped_image': frame['image_name'],
+                'kept_image': representative['image_name'],
+                'hash_distance': hamming_distance(frame['hash'], representative['hash']),
+                'dropped_sharpness': round(frame['sharpness'], 1),
+                'kept_sharpness': round(representative['sharpness'], 1),
+                'dropped_timestamp': frame['timestamp'].isoformat() if frame['timestamp'] else '',
+                'kept_timestamp': representative['timestamp'].isoformat() if representative['timestamp'] else '',
+            })
+
+    return {
+        'keep': [p for p in img_paths if p in kept_paths],
+        'dropped': dropped,
+        'total': len(img_paths),
+    }
+
+
+def write_dedup_report(dedup, report_path):
+    """제외된 프레임 보고서 저장 (CSV)"""
+    report_dir = os.path.dirname(report_path)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+
+    fieldnames = ['dropped_image', 'kept_image', 'hash_distance', 'dropped_sharpness', 'kept_sharpness',
+                  'dropped_timestamp', 'kept_timestamp']
+    with open(report_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(dedup['dropped'])
+
+
+def load_dedup_report(report_path):
+    """
+    제외된 프레임 보고서 읽기
+
+    Returns:
+        list: 보고서 행 리스트 (hash_distance는 int)
+    """
+    with open(report_path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    for row in rows:
+        row['hash_distance'] = int(row['hash_distance'])
+
+    return rows
+
+
+def print_dedup_summary(dedup, report_path=None):
+    """중복 제거 요약 출력"""
+    dropped = len(dedup['dropped'])
+    print(f"\nNear-duplicate frames: {dropped}/{dedup['total']} dropped before super resolution, "
+          f"{len(dedup['keep'])} kept")
+    for row in dedup['dropped']:
+        print(f"  {row['dropped_image']} -> kept {row['kept_image']} (hash distance {row['hash_distance']})")
+    if report_path and dropped:
+        print(f"Dedup report saved to: {report_path}")
+
+
+def main():
+    """메인 함수 (제외될 프레임 미리 확인)"""
+    parser = argparse.ArgumentParser(description='Near-duplicate frame report')
+    parser.add_argument('--img_dir', required=True, help='촬영 이미지 디렉토리')
+    parser.add_argument('--metadata_json', default=None, help='GPS/촬영시간 메타데이터 JSON (없으면 해시만 사용)')
+    parser.add_argument('--report', default=None, help='제외 프레임 보고서 CSV 경로')
+    parser.add_argument('--max_distance', type=int, default=CONFIG['DEDUP_HASH_DISTANCE'], help='중복으로 볼 최대 해시 거리 (64비트 중)')
+    parser.add_argument('--time_window_s', type=float, default=CONFIG['DEDUP_TIME_WINDOW_S'], help='연속 촬영으로 볼 최대 간격 (초)')
+    parser.add_argument('--gps_window_m', type=float, default=CONFIG['DEDUP_GPS_WINDOW_M'], help='같은 위치로 볼 최대 거리 (m)')
+
+    args = parser.parse_args()
+
+    metadata_dict = {}
+    if args.metadata_json and os.path.exists(args.metadata_json):
+        with open(args.metadata_json, 'r', encoding='utf-8') as f:
+            metadata_dict = {item['image_name']: item for item in json.load(f)}
+
+    img_paths = list_frames(args.img_dir)
+
+    dedup = dedup_images(img_paths, metadata_dict, args.max_distance, args.time_window_s, args.gps_window_m)
+    if args.report:
+        write_dedup_report(dedup, args.report)
+    print_dedup_summary(dedup, args.report)
+
+
+if __name__ == '__main__':
+    main()
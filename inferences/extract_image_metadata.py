@@ -99,6 +99,33 @@ def get_timestamp(exif_data):
     return None
 
 
+def read_image_metadata(img_path):
+    """
+    이미지 한 장의 메타데이터 (GPS, 촬영시간)
+    
+    Args:
+        img_path (str): 이미지 경로
+    
+    Returns:
+        dict: 메타데이터 JSON 항목과 같은 키 + 'image_path', 'timestamp_object'
+    """
+    exif_data = get_exif_data(img_path)
+    gps_info = get_gps_info(exif_data)
+    lat, lon = get_lat_lon(gps_info)
+    timestamp = get_timestamp(exif_data)
+    
+    return {
+        'image_name': os.path.basename(img_path),
+        'image_path': img_path,
+        'latitude': lat,
+        'longitude': lon,
+        'timestamp': timestamp.isoformat() if timestamp else None,
+        'timestamp_object': timestamp,
+        'has_gps': lat is not None and lon is not None,
+        'has_timestamp': timestamp is not None
+    }
+
+
 def extract_metadata_from_images(image_dir, output_excel=None, output_json=None):
     """
     이미지 디렉토리에서 모든 이미지의 메타데이터 추출
@@ -118,10 +145,8 @@ def extract_metadata_from_images(image_dir, output_excel=None, output_json=None)
         img_name = os.path.basename(img_path)
         print(f"\nProcessing: {img_name}")
         
-        exif_data = get_exif_data(img_path)
-        gps_info = get_gps_info(exif_data)
-        lat, lon = get_lat_lon(gps_info)
-        timestamp = get_timestamp(exif_data)
+        metadata = read_image_metadata(img_path)
+        lat, lon, timestamp = metadata['latitude'], metadata['longitude'], metadata['timestamp_object']
         
         if lat and lon:
             print(f"  GPS: {lat:.6f}, {lon:.6f}")
@@ -135,17 +160,6 @@ def extract_metadata_from_images(image_dir, output_excel=None, output_json=None)
         else:
             print(f"  Time: Not found")
         
-        metadata = {
-            'image_name': img_name,
-            'image_path': img_path,
-            'latitude': lat,
-            'longitude': lon,
-            'timestamp': timestamp.isoformat() if timestamp else None,
-            'timestamp_object': timestamp,
-            'has_gps': lat is not None and lon is not None,
-            'has_timestamp': timestamp is not None
-        }
-        
         metadata_list.append(metadata)
     
     metadata_list_sorted = sorted(
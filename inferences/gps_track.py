@@ -0,0 +1,214 @@
+"""
+Sidecar GPS tracks for video input
+동영상 GPS 트랙 (GPX, SRT 자막) 읽기 및 프레임 시각 → 위치 보간
+
+차량/드론 동영상은 프레임에 EXIF GPS가 없으므로, 함께 기록된 트랙 파일에서 프레임 시각의 위치를 구합니다.
+
+- GPX: 트랙 점마다 절대 시각(UTC)이 있으므로 동영상 시작 시각(video_start)을 기준으로 동영상 안의 시각(초)으로
+  바꿉니다. video_start를 모르면 첫 트랙 점을 동영상 시작으로 봅니다.
+- SRT: DJI 드론/블랙박스 자막 형식. 자막 시작 시각이 곧 동영상 안의 시각이며, 본문의
+  ``[latitude: 37.5] [longitude: 127.0]`` 또는 ``GPS(127.0,37.5,10)``에서 위치를, ``2024-05-01 10:20:30.123``에서
+  촬영 시각을 읽습니다.
+
+위치는 앞뒤 트랙 점 사이를 선형 보간하며, 트랙 점 간격이 VIDEO_GPS_MAX_GAP_S보다 길거나 트랙 범위를 벗어나면
+위치 없음으로 처리합니다.
+"""
+
+import os
+import re
+import bisect
+from datetime import datetime, timedelta
+import xml.etree.ElementTree as ET
+
+from config import CONFIG
+
+
+# 동영상과 같은 이름의 트랙 파일 확장자 (찾는 순서)
+SIDECAR_EXTENSIONS = ('.SRT', '.srt', '.gpx', '.GPX')
+
+_SRT_TIME = re.compile(r'(\d+):(\d+):(\d+)[,.](\d+)\s*-->')
+_SRT_LATITUDE = re.compile(r'\[\s*latitude\s*:\s*(-?[\d.]+)', re.IGNORECASE)
+_SRT_LONGITUDE = re.compile(r'\[\s*longt?itude\s*:\s*(-?[\d.]+)', re.IGNORECASE)
+_SRT_GPS = re.compile(r'GPS\s*\(\s*(-?[\d.]+)\s*,\s*(-?[\d.]+)')
+_SRT_DATETIME = re.compile(r'(\d{4})[-.](\d{2})[-.](\d{2})[ T](\d{2}):(\d{2}):(\d{2})(?:[.,:](\d+))?')
+_HTML_TAG = re.compile(r'<[^>]+>')
+
+
+class GpsTrack:
+    """
+    GPS points along a video timeline with linear interpolation between them.
+
+    Args:
+        points (list): (seconds, latitude, longitude, timestamp) tuples, seconds from the video start and
+            timestamp a datetime or None.
+        max_gap_s (float): Longest interval between points (and distance past either end) that is
+            interpolated, in seconds (default: CONFIG['VIDEO_GPS_MAX_GAP_S']).
+    """
+
+    def __init__(self, points, max_gap_s=None):
+        self.points = sorted(points, key=lambda point: point[0])
+        self.max_gap_s = CONFIG['VIDEO_GPS_MAX_GAP_S'] if max_gap_s is None else max_gap_s
+        self._seconds = [point[0] for point in self.points]
+
+    def __len__(self):
+        return len(self.points)
+
+    def locate(self, seconds):
+        """
+        동영상 시각의 위치
+
+        Args:
+            seconds (float): 동영상 시작부터의 시각 (초)
+
+        Returns:
+            dict: {'latitude', 'longitude', 'timestamp'} (timestamp는 트랙에 시각이 없으면 None),
+                  트랙 범위를 벗어나거나 점 간격이 너무 길면 None
+        """
+        if not self.points:
+            return None
+
+        index = bisect.bisect_left(self._seconds, seconds)
+        if index < len(self.points) and self._seconds[index] == seconds:
+            # 트랙 점 시각과 같으면 그 점 (앞뒤 점 간격과 무관)
+            point = self.points[index]
+            return self._location(point, point, 0.0, seconds)
+        if index == 0 or index == len(self.points):
+            # 트랙 범위 밖: 가까운 끝 점에서 max_gap_s 이내만 허용
+            nearest = self.points[0 if index == 0 else -1]
+            if abs(seconds - nearest[0]) > self.max_gap_s:
+                return None
+            return self._location(nearest, nearest, 0.0, seconds)
+
+        before, after = self.points[index - 1], self.points[index]
+        gap = after[0] - before[0]
+        if gap > self.max_gap_s:
+            return None
+        return self._location(before, after, (seconds - before[0]) / gap if gap > 0 else 0.0, seconds)
+
+    @staticmethod
+    def _location(before, after, ratio, seconds):
+        timestamp = None
+        if before[3] is not None:
+            # 끝 점 밖이면 그 점의 시각에서 시간 차만큼 이동
+            timestamp = before[3] + timedelta(seconds=seconds - before[0])
+        return {
+            'latitude': before[1] + (after[1] - before[1]) * ratio,
+            'longitude': before[2] + (after[2] - before[2]) * ratio,
+            'timestamp': timestamp,
+        }
+
+
+def _local_naive(timestamp):
+    """시간대가 있는 시각은 이 컴퓨터의 현지 시각으로 (EXIF 촬영시간과 같은 기준)"""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def parse_gpx(path):
+    """
+    GPX 트랙 점 읽기 (trkpt, 시각이 없는 점은 무시)
+
+    Returns:
+        list: (timestamp, latitude, longitude) (timestamp는 현지 시각 datetime)
+    """
+    points = []
+    for element in ET.parse(path).getroot().iter():
+        if not element.tag.endswith('trkpt'):
+            continue
+        time_text = next((child.text for child in element if child.tag.endswith('time') and child.text), None)
+        if time_text is None:
+            continue
+        timestamp = _local_naive(datetime.fromisoformat(time_text.strip().replace('Z', '+00:00')))
+        points.append((timestamp, float(element.get('lat')), float(element.get('lon'))))
+    return points
+
+
+def _parse_srt_datetime(text):
+    match = _SRT_DATETIME.search(text)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    microsecond = int((fraction or '0')[:6].ljust(6, '0'))
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second), microsecond)
+    except ValueError:
+        return None
+
+
+def parse_srt(path):
+    """
+    SRT 자막의 위치 읽기 (위치가 없거나 0,0인 자막은 무시)
+
+    Returns:
+        list: (seconds, latitude, longitude, timestamp) (seconds는 자막 시작 시각, timestamp는 본문의 촬영 시각 또는 None)
+    """
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        blocks = re.split(r'\n\s*\n', f.read().replace('\r\n', '\n'))
+
+    points = []
+    for block in blocks:
+        time_match = _SRT_TIME.search(block)
+        if time_match is None:
+            continue
+        hours, minutes, secs, millis = time_match.groups()
+        seconds = int(hours) * 3600 + int(minutes) * 60 + int(secs) + int(millis.ljust(3, '0')[:3]) / 1000
+        text = _HTML_TAG.sub(' ', block[time_match.end():])
+
+        latitude, longitude = _SRT_LATITUDE.search(text), _SRT_LONGITUDE.search(text)
+        if latitude is not None and longitude is not None:
+            latitude, longitude = float(latitude.group(1)), float(longitude.group(1))
+        else:
+            gps = _SRT_GPS.search(text)
+            if gps is None:
+                continue
+            # 구형 DJI 형식: GPS(경도, 위도, 고도)
+            longitude, latitude = float(gps.group(1)), float(gps.group(2))
+        if latitude == 0 and longitude == 0:
+            continue
+
+        points.append((seconds, latitude, longitude, _parse_srt_datetime(text)))
+    return points
+
+
+def load_track(path, video_start=None, time_offset_s=0.0, max_gap_s=None):
+    """
+    트랙 파일 읽기 (확장자로 형식 결정)
+
+    Args:
+        path (str): GPX 또는 SRT 경로
+        video_start (datetime): 동영상 첫 프레임의 현지 시각 (GPX만 사용, None이면 첫 트랙 점 시각)
+        time_offset_s (float): 동영상 시각에 더할 보정 (초, 트랙이 동영상보다 늦게 기록되었으면 양수)
+        max_gap_s (float): 보간할 최대 트랙 점 간격 (초)
+
+    Returns:
+        GpsTrack
+    """
+    if path.lower().endswith('.gpx'):
+        gpx_points = parse_gpx(path)
+        if not gpx_points:
+            raise ValueError(f"{path}: no timed track points")
+        start = video_start or min(point[0] for point in gpx_points)
+        points = [((timestamp - start).total_seconds() - time_offset_s, latitude, longitude, timestamp)
+                  for timestamp, latitude, longitude in gpx_points]
+    elif path.lower().endswith('.srt'):
+        points = [(seconds - time_offset_s, latitude, longitude, timestamp)
+                  for seconds, latitude, longitude, timestamp in parse_srt(path)]
+        if not points:
+            raise ValueError(f"{path}: no GPS positions in subtitles")
+        if video_start is not None and all(point[3] is None for point in points):
+            points = [(seconds, latitude, longitude, video_start + timedelta(seconds=seconds + time_offset_s))
+                      for seconds, latitude, longitude, _ in points]
+    else:
+        raise ValueError(f"{path}: unsupported track format (GPX or SRT expected)")
+
+    return GpsTrack(points, max_gap_s)
+
+
+def find_sidecar_track(video_path):
+    """동영상과 같은 이름의 트랙 파일 (예: DJI_0001.MP4 → DJI_0001.SRT, 없으면 None)"""
+    stem = os.path.splitext(video_path)[0]
+    for extension in SIDECAR_EXTENSIONS:
+        if os.path.exists(stem + extension):
+            return stem + extension
+    return None
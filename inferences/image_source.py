@@ -0,0 +1,87 @@
+"""
+Single-decode image loading for the detection stage
+탐지 단계 입력 이미지 1회 디코딩
+
+탐지 단계에서는 같은 파일을 추론(mmcv.imread), 시각화(mmcv.imread), GPS 조회(PIL)에서 각각 다시
+열어 읽었습니다. 16000x12000 PNG는 디코딩 한 번에 수 초가 걸리므로, 파일을 한 번 읽어 디코딩한
+버퍼와 메타데이터(GPS, 촬영시간, 내용 해시)를 묶어 이후 단계에 그대로 넘깁니다.
+"""
+
+import io
+import os
+import hashlib
+
+import mmcv
+
+from extract_image_metadata import get_exif_data, get_gps_info, get_lat_lon, get_timestamp
+
+
+class DecodedImage:
+    """
+    A decoded input image together with the metadata later stages need.
+
+    Args:
+        path (str): Input image path.
+        image (ndarray): Decoded BGR image (H, W, 3).
+        content_hash (str): SHA-256 of the file bytes (artifact cache key).
+        latitude (float): Latitude, None if unavailable.
+        longitude (float): Longitude, None if unavailable.
+        timestamp (str): Capture time (ISO format), None if unavailable.
+    """
+
+    def __init__(self, path, image, content_hash, latitude=None, longitude=None, timestamp=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.image = image
+        self.content_hash = content_hash
+        self.latitude = latitude
+        self.longitude = longitude
+        self.timestamp = timestamp
+
+    @property
+    def has_gps(self):
+        return self.latitude is not None and self.longitude is not None
+
+    def metadata(self):
+        """postprocess_crack_image에 넘기는 메타데이터 dict (파일을 다시 열지 않도록 GPS 조회 결과 포함)"""
+        return {
+            'image_name': self.name,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'timestamp': self.timestamp,
+            'has_gps': self.has_gps,
+        }
+
+
+def load_image(img_path, metadata_dict=None):
+    """
+    파일을 한 번 읽어 디코딩하고 GPS/촬영시간을 조회
+
+    GPS와 촬영시간은 메타데이터 JSON 항목을 우선 사용하고, 항목이 없으면 이미 읽은 바이트에서
+    EXIF를 파싱합니다 (파일을 다시 열지 않음).
+
+    Args:
+        img_path (str): 입력 이미지 경로
+        metadata_dict (dict): {image_name: metadata} (없으면 EXIF만 사용)
+
+    Returns:
+        DecodedImage: 디코딩된 이미지와 메타데이터
+    """
+    with open(img_path, 'rb') as f:
+        data = f.read()
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    image = mmcv.imfrombytes(data, flag='color')
+    if image is None:
+        raise IOError(f"Failed to decode image: {img_path}")
+
+    item = (metadata_dict or {}).get(os.path.basename(img_path))
+    if item is not None:
+        latitude, longitude, timestamp = item.get('latitude'), item.get('longitude'), item.get('timestamp')
+    else:
+        exif_data = get_exif_data(io.BytesIO(data))
+        latitude, longitude = get_lat_lon(get_gps_info(exif_data))
+        timestamp = get_timestamp(exif_data)
+        timestamp = timestamp.isoformat() if timestamp else None
+
+    return DecodedImage(img_path, image, content_hash, latitude, longitude, timestamp)
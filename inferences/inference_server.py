@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Local crack detection server with dynamic window batching
+모델 상주 로컬 균열 탐지 서버 (요청 간 윈도우 동적 배치)
+
+현장 업로드 워커 여러 개가 동시에 이미지를 보내도 모델 로드는 서버 시작 시 한 번뿐이고,
+여러 요청의 슬라이딩 윈도우를 하나의 대기열에 모아 배치로 추론합니다. 배치는 최대 크기
+(--max_batch_size) 또는 첫 윈도우 도착 후 최대 대기 시간(--max_wait_ms) 중 먼저 도달하는
+시점에 실행되고, 크기가 같은 윈도우끼리만 묶습니다 (가장자리 윈도우 패딩으로 결과가 바뀌지 않도록).
+
+초해상화는 이미지 크기가 요청마다 달라 배치하지 않고 한 번에 하나씩 실행합니다.
+외부 서비스 없이 표준 라이브러리 HTTP 서버만 사용하며 기본값은 localhost에서만 접속 가능합니다.
+
+Endpoints:
+    POST /process?image_name=a.jpg&latitude=37.5&longitude=127.0&timestamp=...  (본문: JPEG/PNG 바이트)
+    GET  /metrics   대기열 깊이, 배치 크기 분포, 처리량
+    GET  /health
+
+Usage:
+    python inferences/inference_server.py \\
+        --sr_config 모델/초해상화/초해상화_config.py --sr_checkpoint 모델/초해상화/초해상화_weight.pth \\
+        --crack_config 모델/균열탐지/균열탐지_config.py --crack_checkpoint 모델/균열탐지/균열탐지_weight.pth \\
+        --shooting_distance_mm 1500
+    curl --data-binary @촬영이미지/1.jpg 'http://127.0.0.1:8765/process?image_name=1.jpg'
+"""
+
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import mmcv
+from mmseg.apis import inference_model
+
+from crack_pipeline import CrackPipeline
+from quantify_seg_results import parse_crack_coordinates
+from config import CONFIG
+
+
+class WindowBatcher:
+    """
+    Coalesce sliding windows from concurrent requests into batched model calls.
+
+    A single worker thread owns the crack model. It waits for the first queued window, then keeps
+    collecting until max_batch_size windows are queued or max_wait_ms has passed, and runs one
+    inference call per window shape.
+
+    Args:
+        model: Crack segmentation model (mmseg init_model).
+        max_batch_size (int): Maximum number of windows per model call.
+        max_wait_ms (float): Maximum time to wait for more windows after the first one arrives.
+    """
+
+    def __init__(self, model, max_batch_size=None, max_wait_ms=None):
+        self.model = model
+        self.max_batch_size = max_batch_size or CONFIG['SERVER_MAX_BATCH_SIZE']
+        self.max_wait_ms = CONFIG['SERVER_MAX_WAIT_MS'] if max_wait_ms is None else max_wait_ms
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # 지표
+        self.batch_sizes = Counter()
+        self.windows_total = 0
+        self.queue_wait_seconds = 0.0
+        self.inference_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='window-batcher', daemon=True)
+        self._thread.start()
+
+    def infer(self, images):
+        """
+        윈도우 이미지들의 마스크 (다른 요청의 윈도우와 함께 배치되어 추론, 결과는 입력 순서)
+
+        Args:
+            images (list): 윈도우 이미지 (H, W, 3)
+
+        Returns:
+            list: (h, w) 마스크 리스트
+        """
+        futures = []
+        for image in images:
+            future = Future()
+            self._queue.put((image, future, time.perf_counter()))
+            futures.append(future)
+        return [future.result() for future in futures]
+
+    @property
+    def queue_depth(self):
+        """추론을 기다리는 윈도우 수"""
+        return self._queue.qsize()
+
+    def close(self):
+        """작업 스레드 종료"""
+        self._stop.set()
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if entry is None:
+                self._stop.set()
+                break
+            batch.append(entry)
+
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+
+            # 크기가 같은 윈도우끼리 한 번에 추론 (대부분 window_size x window_size)
+            by_shape = {}
+            for entry in batch:
+                by_shape.setdefault(entry[0].shape, []).append(entry)
+
+            for entries in by_shape.values():
+                start = time.perf_counter()
+                try:
+                    results = inference_model(self.model, [image for image, _, _ in entries])
+                    masks = [result.pred_sem_seg.data.cpu().numpy().squeeze(0) for result in results]
+                except Exception as e:
+                    for _, future, _ in entries:
+                        future.set_exception(e)
+                    continue
+                finally:
+                    elapsed = time.perf_counter() - start
+
+                with self._lock:
+                    self.batch_sizes[len(entries)] += 1
+                    self.windows_total += len(entries)
+                    self.inference_seconds += elapsed
+                    self.queue_wait_seconds += sum(start - queued for _, _, queued in entries)
+
+                for (_, future, _), mask in zip(entries, masks):
+                    future.set_result(mask)
+
+    def metrics(self):
+        """배치 지표"""
+        with self._lock:
+            batches = sum(self.batch_sizes.values())
+            return {
+                'queue_depth': self.queue_depth,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'batches_total': batches,
+                'windows_total': self.windows_total,
+                'mean_batch_size': round(self.windows_total / batches, 2) if batches else 0.0,
+                'batch_size_histogram': {str(size): count for size, count in sorted(self.batch_sizes.items())},
+                'mean_queue_wait_ms': round(self.queue_wait_seconds / self.windows_total * 1000, 2)
+                if self.windows_total else 0.0,
+                'inference_seconds': round(self.inference_seconds, 3),
+            }
+
+
+def result_to_json(result, elapsed_seconds):
+    """CrackResult를 JSON 응답으로 변환"""
+    cracks = []
+    for crack in result.cracks:
+        try:
+            bbox = [int(v) for v in parse_crack_coordinates(crack[0])]
+        except ValueError:
+            bbox = None
+        cracks.append({
+            'bbox': bbox,  # [min_row, min_col, max_row, max_col] (탐지 해상도 픽셀)
+            'avg_width_mm': round(float(crack[1]), 3),
+            'max_width_mm': round(float(crack[2]), 3),
+            'length_mm': round(float(crack[3]), 3),
+            'area_px': int(crack[6]) if crack[6] is not None else None,
+        })
+
+    detection = result.detection
+    if detection is not None:
+        detection = {key: value.item() if isinstance(value, np.generic) else value for key, value in detection.items()}
+
+    return {
+        'image_name': result.image_name,
+        'num_cracks': result.num_cracks,
+        'crack_pixels': int(result.crack_pixels),
+        'cracks': cracks,
+        'detection': detection,
+        'elapsed_seconds': round(elapsed_seconds, 3),
+    }
+
+
+class CrackServer(ThreadingHTTPServer):
+    """
+    HTTP server holding the resident pipeline, the window batcher and request metrics.
+
+    Args:
+        address (tuple): (host, port).
+        pipeline (CrackPipeline): Pipeline whose batch_infer is the batcher's infer.
+        batcher (WindowBatcher): Window batcher.
+        max_concurrent (int): Maximum number of images processed at once (bounds memory; further
+            requests wait).
+        model_load_seconds (float): Reported in /metrics.
+        max_body_mb (float): Largest accepted request body. Larger requests are rejected with 413
+            before the body is read.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, pipeline, batcher, max_concurrent=None, model_load_seconds=0.0, max_body_mb=None):
+        super().__init__(address, CrackRequestHandler)
+        self.pipeline = pipeline
+        self.batcher = batcher
+        self.slots = threading.BoundedSemaphore(max_concurrent or CONFIG['SERVER_MAX_CONCURRENT'])
+        self.max_body_bytes = int((max_body_mb or CONFIG['SERVER_MAX_BODY_MB']) * 1024 ** 2)
+        self.model_load_seconds = model_load_seconds
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.in_flight = 0
+        self.processing_seconds = 0.0
+
+    def begin(self):
+        """이미지 처리 시작"""
+        with self._lock:
+            self.in_flight += 1
+
+    def finish(self, key, seconds=0.0, started=True):
+        """요청 결과 기록 (key: 'ok' 또는 'failed', started: begin() 이후인지 여부)"""
+        with self._lock:
+            if started:
+                self.in_flight -= 1
+            self.requests[key] += 1
+            self.processing_seconds += seconds
+
+    def metrics(self):
+        with self._lock:
+            served = self.requests['ok']
+            request_metrics = {
+                'requests_ok': served,
+                'requests_failed': self.requests['failed'],
+                'requests_in_flight': self.in_flight,
+                'mean_request_seconds': round(self.processing_seconds / served, 3) if served else 0.0,
+            }
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'model_load_seconds': round(self.model_load_seconds, 1),
+            **request_metrics,
+            **self.batcher.metrics(),
+        }
+
+
+class CrackRequestHandler(BaseHTTPRequestHandler):
+    """POST /process, GET /metrics, GET /health"""
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/metrics':
+            self._send_json(200, self.server.metrics())
+        elif path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': f'Unknown path: {path}'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/process':
+            self._send_json(404, {'error': f'Unknown path: {url.path}'})
+            return
+
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self.close_connection = True
+            self.server.finish('failed', started=False)
+            self._send_json(400, {'error': 'Invalid Content-Length'})
+            return
+
+        # 본문을 읽기 전에 크기 확인 (읽지 않은 본문이 남으므로 연결을 닫음)
+        if length > self.server.max_body_bytes:
+            self.close_connection = True
+            self.server.finish('failed', started=False)
+            self._send_json(413, {'error': f'Request body of {length} bytes exceeds the limit of '
+                                           f'{self.server.max_body_bytes} bytes (--max_body_mb)'})
+            return
+
+        data = self.rfile.read(length)
+
+        try:
+            image = mmcv.imfrombytes(data, flag='color') if data else None
+            if image is None:
+                raise ValueError('Request body is not a decodable image')
+            metadata = {
+                'image_name': params.get('image_name', ''),
+                'latitude': float(params['latitude']) if 'latitude' in params else None,
+                'longitude': float(params['longitude']) if 'longitude' in params else None,
+                'timestamp': params.get('timestamp'),
+            }
+        except ValueError as e:
+            self.server.finish('failed', started=False)
+            self._send_json(400, {'error': str(e)})
+            return
+
+        server = self.server
+        with server.slots:
+            server.begin()
+            start = time.perf_counter()
+            try:
+                result = server.pipeline.process(image, metadata)
+                elapsed = time.perf_counter() - start
+                payload = result_to_json(result, elapsed)
+            except Exception as e:
+                server.finish('failed')
+                self._send_json(500, {'error': f'{type(e).__name__}: {e}'})
+                return
+
+        server.finish('ok', elapsed)
+        self._send_json(200, payload)
+
+    def log_message(self, format, *args):
+        print(f"[{self.log_date_time_string()}] {self.address_string()} {format % args}")
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Local crack detection server with dynamic window batching')
+    parser.add_argument('--sr_config', default=None, help='초해상화 모델 설정 파일 (없으면 입력을 그대로 탐지)')
+    parser.add_argument('--sr_checkpoint', default=None, help='초해상화 모델 체크포인트')
+    parser.add_argument('--sr_model_name', default='edsr', help='초해상화 모델 이름')
+    parser.add_argument('--crack_config', required=True, help='크랙 탐지 모델 설정 파일 경로')
+    parser.add_argument('--crack_checkpoint', required=True, help='크랙 탐지 모델 체크포인트 파일 경로')
+    parser.add_argument('--shooting_distance_mm', type=float, required=True, help='촬영거리 (mm 단위)')
+    parser.add_argument('--device', default='cuda', help='추론 장치')
+    parser.add_argument('--host', default=CONFIG['SERVER_HOST'], help='바인드 주소 (기본값: localhost만 허용)')
+    parser.add_argument('--port', type=int, default=CONFIG['SERVER_PORT'], help='포트')
+    parser.add_argument('--max_batch_size', type=int, default=CONFIG['SERVER_MAX_BATCH_SIZE'], help='배치당 최대 윈도우 수')
+    parser.add_argument('--max_wait_ms', type=float, default=CONFIG['SERVER_MAX_WAIT_MS'], help='첫 윈도우 도착 후 배치를 채우기 위해 기다리는 최대 시간 (ms)')
+    parser.add_argument('--max_concurrent', type=int, default=CONFIG['SERVER_MAX_CONCURRENT'], help='동시에 처리할 최대 이미지 수 (메모리 상한)')
+    parser.add_argument('--max_body_mb', type=float, default=CONFIG['SERVER_MAX_BODY_MB'], help='요청 본문 최대 크기 (MB, 초과 시 413)')
+    parser.add_argument('--approx_factor', type=int, default=CONFIG['APPROX_QUANTIFICATION_FACTOR'], help='근사 정량화 축소 배율 (1 = 정밀 모드)')
+
+    args = parser.parse_args()
+
+    print("="*60)
+    print("Crack Detection Server")
+    print("="*60)
+
+    # 모델은 서버 시작 시 한 번만 로드
+    load_start = time.perf_counter()
+    pipeline = CrackPipeline.from_checkpoints(
+        args.sr_config, args.sr_checkpoint, args.crack_config, args.crack_checkpoint, args.shooting_distance_mm,
+        sr_model_name=args.sr_model_name, device=args.device, options={'approx_factor': args.approx_factor})
+    model_load_seconds = time.perf_counter() - load_start
+    print(f"Models loaded in {model_load_seconds:.1f} s")
+
+    batcher = WindowBatcher(pipeline.crack_model, args.max_batch_size, args.max_wait_ms)
+    pipeline.batch_infer = batcher.infer
+
+    server = CrackServer((args.host, args.port), pipeline, batcher, args.max_concurrent, model_load_seconds,
+                         args.max_body_mb)
+    print(f"Serving on http://{args.host}:{args.port} "
+          f"(batch <= {args.max_batch_size} windows, wait <= {args.max_wait_ms} ms, {args.max_concurrent} concurrent images)")
+    print("  POST /process   GET /metrics   GET /health")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Per-image memory planning for the detection stage
+탐지 단계 이미지별 메모리 예산 계획
+
+이미지 크기(헤더만 읽음)와 설정된 dtype/처리 경로로 디코딩 이미지, 균열 마스크, 정량화(거리 맵, 라벨,
+작업 복사본), 시각화 오버레이의 최대 메모리를 추정하고, --memory_budget을 넘으면 더 적은 메모리를
+쓰는 경로(저메모리 → 희소 마스크 → 근사 정량화)로 자동 전환합니다. 어떤 경로로도 예산을 넘으면
+해당 이미지만 실패로 기록하고 다음 이미지를 처리합니다 (배치 전체가 OOM으로 종료되지 않음).
+
+정량화 계수는 benchmark_quantification_memory.py와 같은 합성 마스크(4000x3000, 8000x6000,
+균열 픽셀 1-10%)에서 측정한 peak RSS 증가량을 기준으로 약간 보수적으로 잡았습니다.
+"""
+
+import re
+
+from PIL import Image
+
+from sparse_mask import SparseCrackMask
+from config import CONFIG
+
+
+# 이미지 픽셀당 바이트
+_IMAGE_BYTES_PER_PIXEL = 3          # 디코딩된 BGR uint8
+_DENSE_MASK_BYTES_PER_PIXEL = 3     # 슬라이딩 윈도우 bool 마스크 + uint8 변환 + bool 복사
+_OVERLAY_BYTES_PER_OUTPUT_PIXEL = 32  # 출력 해상도 이미지, float32 coverage, float64 blend
+
+# 균열 픽셀당 바이트 (희소 마스크: int32 rows/cols, int64 선형 인덱스, 빌더 청크)
+_SPARSE_MASK_BYTES_PER_CRACK_PIXEL = 32
+_OVERLAY_BYTES_PER_CRACK_PIXEL = 24  # 출력 픽셀 bin 계산용 int64 임시 배열
+
+# 정량화 (이미지 픽셀당, 균열 픽셀당) 바이트
+_QUANTIFICATION_BYTES = {
+    'default': (50, 0),      # 전체 프레임 float64 거리 맵, int64 라벨, 균열별 마스크
+    'low_memory': (10, 120),  # float32 거리 맵, int32 라벨, in-place 병합
+    'sparse': (2, 270),       # 균열 bbox 단위 medial axis
+}
+_APPROX_BYTES_PER_CRACK_PIXEL = 24  # 블록 인덱스 계산용 int64 임시 배열
+
+# 예산 초과 시 시도하는 처리 경로 (추정 메모리가 큰 순서로 정렬해 사용)
+_FALLBACK_MODES = [
+    {'sparse': False, 'low_memory': True, 'approx_factor': 1},
+    {'sparse': True, 'low_memory': False, 'approx_factor': 1},
+    {'sparse': True, 'low_memory': True, 'approx_factor': 1},
+    {'sparse': True, 'low_memory': True, 'approx_factor': 2},
+    {'sparse': True, 'low_memory': True, 'approx_factor': 4},
+]
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 2 ** 10, 'M': 2 ** 20, 'G': 2 ** 30, 'T': 2 ** 40}
+
+
+def parse_memory_size(value):
+    """
+    메모리 크기 문자열을 바이트로 변환 ('16G', '16GB', '512M', '1073741824')
+
+    Args:
+        value (str): 크기 문자열 (단위 없으면 바이트)
+
+    Returns:
+        int: 바이트
+    """
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?)(?:I?B)?\s*', str(value).upper())
+    if match is None:
+        raise ValueError(f"Invalid memory size: {value} (e.g. 16G, 512M)")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_bytes(num_bytes):
+    """바이트를 읽기 쉬운 문자열로 변환"""
+    return f"{num_bytes / 2 ** 30:.1f} GB" if num_bytes >= 2 ** 30 else f"{num_bytes / 2 ** 20:.0f} MB"
+
+
+def image_dimensions(img_path):
+    """이미지 헤더만 읽어 (height, width) 반환 (디코딩하지 않음)"""
+    with Image.open(img_path) as image:
+        width, height = image.size
+    return height, width
+
+
+def configured_mode(approx_factor=None):
+    """설정(CONFIG)에 지정된 처리 경로"""
+    return {
+        'sparse': CONFIG['USE_SPARSE_MASK'],
+        'low_memory': CONFIG['LOW_MEMORY_MODE'],
+        'approx_factor': CONFIG['APPROX_QUANTIFICATION_FACTOR'] if approx_factor is None else approx_factor,
+    }
+
+
+def describe_mode(mode):
+    """처리 경로 설명 문자열 (예: 'sparse+low_memory, approx x4')"""
+    name = 'sparse' if mode['sparse'] else 'dense'
+    if mode['low_memory']:
+        name += '+low_memory'
+    if mode['approx_factor'] > 1:
+        name += f", approx x{mode['approx_factor']}"
+    return name
+
+
+def estimate_peak_bytes(height, width, mode, crack_pixels=None, output_size=None):
+    """
+    한 이미지의 탐지 단계 최대 메모리 추정
+
+    후처리 워커와 다음 이미지 추론이 겹칠 수 있으므로 각 항목의 합을 최대값으로 봅니다.
+
+    Args:
+        height (int): 이미지 높이 (픽셀)
+        width (int): 이미지 너비 (픽셀)
+        mode (dict): {'sparse', 'low_memory', 'approx_factor'}
+        crack_pixels (int): 균열 픽셀 수 (None이면 CONFIG['MEMORY_CRACK_FRACTION'] 비율로 가정)
+        output_size (int): 결과 이미지의 긴 변 길이 (기본값: CONFIG['OUTPUT_IMAGE_SIZE'])
+
+    Returns:
+        dict: {'image', 'mask', 'quantification', 'overlay', 'total'} (바이트)
+    """
+    pixels = height * width
+    if crack_pixels is None:
+        crack_pixels = int(pixels * CONFIG['MEMORY_CRACK_FRACTION'])
+    if output_size is None:
+        output_size = CONFIG['OUTPUT_IMAGE_SIZE']
+
+    if mode['sparse']:
+        mask_bytes = crack_pixels * _SPARSE_MASK_BYTES_PER_CRACK_PIXEL
+    else:
+        mask_bytes = pixels * _DENSE_MASK_BYTES_PER_PIXEL
+
+    factor = mode['approx_factor']
+    if factor > 1:
+        # 축소 마스크에서 정밀 모드(전체 프레임 경로)로 측정
+        per_pixel, _ = _QUANTIFICATION_BYTES['default']
+        quantification_bytes = -(-pixels // (factor * factor)) * per_pixel + crack_pixels * _APPROX_BYTES_PER_CRACK_PIXEL
+    else:
+        key = 'sparse' if mode['sparse'] else ('low_memory' if mode['low_memory'] else 'default')
+        per_pixel, per_crack_pixel = _QUANTIFICATION_BYTES[key]
+        quantification_bytes = pixels * per_pixel + crack_pixels * per_crack_pixel
+
+    scale = min(output_size / max(height, width), 1.0)
+    overlay_bytes = int(pixels * scale * scale) * _OVERLAY_BYTES_PER_OUTPUT_PIXEL + crack_pixels * _OVERLAY_BYTES_PER_CRACK_PIXEL
+
+    estimate = {
+        'image': pixels * _IMAGE_BYTES_PER_PIXEL,
+        'mask': mask_bytes,
+        'quantification': quantification_bytes,
+        'overlay': overlay_bytes,
+    }
+    estimate['total'] = sum(estimate.values())
+
+    return estimate
+
+
+def plan_memory(height, width, budget_bytes, mode=None, crack_pixels=None, output_size=None):
+    """
+    메모리 예산 안에서 실행할 처리 경로 선택
+
+    지정된 경로(mode)가 예산 안이면 그대로 사용하고, 넘으면 추정 메모리가 더 작은 경로를
+    큰 순서대로 시도합니다. 모두 넘으면 가장 작은 경로를 'fits': False로 반환합니다.
+
+    Args:
+        height (int): 이미지 높이 (픽셀)
+        width (int): 이미지 너비 (픽셀)
+        budget_bytes (int): 이미지당 메모리 예산 (바이트, None이면 제한 없음)
+        mode (dict): 기본 처리 경로 (기본값: configured_mode())
+        crack_pixels (int): 균열 픽셀 수 (추론 전에는 None, 비율로 가정)
+        output_size (int): 결과 이미지의 긴 변 길이
+
+    Returns:
+        dict: {'mode', 'estimate', 'fits', 'fallback'} (fallback: 기본 경로에서 바뀌었는지 여부)
+    """
+    mode = mode or configured_mode()
+
+    def estimate(candidate):
+        return estimate_peak_bytes(height, width, candidate, crack_pixels, output_size)
+
+    default_estimate = estimate(mode)
+    if budget_bytes is None or default_estimate['total'] <= budget_bytes:
+        return {'mode': mode, 'estimate': default_estimate, 'fits': True, 'fallback': False}
+
+    candidates = [(estimate(candidate), candidate) for candidate in _FALLBACK_MODES]
+    candidates = sorted([c for c in candidates if c[0]['total'] < default_estimate['total']],
+                        key=lambda c: c[0]['total'], reverse=True)
+
+    for candidate_estimate, candidate in candidates:
+        if candidate_estimate['total'] <= budget_bytes:
+            return {'mode': candidate, 'estimate': candidate_estimate, 'fits': True, 'fallback': True}
+
+    smallest_estimate, smallest = candidates[-1] if candidates else (default_estimate, mode)
+
+    # 추론 전(균열 픽셀 수를 모름)에는 가정 비율로 경로를 고르되, 균열이 없어도 넘을 때만 실패로 판단
+    # (추론 후 실제 균열 픽셀 수로 다시 계획)
+    fits = False
+    if crack_pixels is None:
+        fits = estimate_peak_bytes(height, width, smallest, 0, output_size)['total'] <= budget_bytes
+
+    return {'mode': smallest, 'estimate': smallest_estimate, 'fits': fits, 'fallback': smallest is not mode}
+
+
+def check_memory_plan(img_name, plan, budget_bytes):
+    """
+    계획 결과 출력, 어떤 경로로도 예산을 넘으면 MemoryError
+
+    Args:
+        img_name (str): 이미지 이름 (로그용)
+        plan (dict): plan_memory 결과
+        budget_bytes (int): 이미지당 메모리 예산 (바이트)
+    """
+    estimate = plan['estimate']
+    if not plan['fits']:
+        raise MemoryError(
+            f"[{img_name}] Estimated peak {format_bytes(estimate['total'])} exceeds memory budget "
+            f"{format_bytes(budget_bytes)} even with {describe_mode(plan['mode'])}")
+
+    if plan['fallback']:
+        print(f"[{img_name}] Memory plan: {describe_mode(plan['mode'])} "
+              f"(estimated peak {format_bytes(estimate['total'])}, budget {format_bytes(budget_bytes)})")
+
+
+def apply_memory_plan(crack_mask, options, mode):
+    """
+    계획된 처리 경로에 맞게 마스크 형식과 후처리 옵션 조정
+
+    Args:
+        crack_mask (ndarray or SparseCrackMask): 균열 마스크
+        options (dict): postprocess_crack_image 옵션
+        mode (dict): plan_memory 결과의 'mode'
+
+    Returns:
+        tuple: (crack_mask, options) (options는 복사본)
+    """
+    if mode['sparse'] and not isinstance(crack_mask, SparseCrackMask):
+        crack_mask = SparseCrackMask.from_dense(crack_mask)
+    elif not mode['sparse'] and isinstance(crack_mask, SparseCrackMask):
+        crack_mask = crack_mask.to_dense()
+
+    options = dict(options, low_memory=mode['low_memory'], approx_factor=mode['approx_factor'])
+
+    return crack_mask, options
+
+
+def count_crack_pixels(crack_mask):
+    """마스크의 균열 픽셀 수"""
+    if isinstance(crack_mask, SparseCrackMask):
+        return crack_mask.nnz
+    return int((crack_mask > 0).sum())
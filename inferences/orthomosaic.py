@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+"""
+Windowed crack detection on large georeferenced orthomosaics
+대용량 정사영상(GeoTIFF) 창 단위 균열 탐지
+
+드론 정사영상은 수십 기가픽셀이라 전체를 메모리에 올릴 수 없습니다. 래스터를 처리 타일(ORTHO_TILE_SIZE,
+사방으로 ORTHO_TILE_OVERLAP만큼 이웃 타일과 겹쳐 읽음) 단위로 읽어 기존 슬라이딩 윈도우 탐지와 정량화를
+타일마다 실행합니다. 압축 파일은 처리 타일에 걸친 TIFF 타일/스트립만 읽어 디코딩하고, 비압축 파일은
+메모리 맵으로 읽습니다. 알파 채널이나 NoData 값으로 비어 있는 타일은 추론하지 않습니다.
+
+균열 위치는 이미지당 EXIF GPS 한 점 대신 균열마다 바운딩 박스 중심을 래스터의 지리참조(geotransform)로
+위도/경도로 변환하며, mm/pixel도 촬영거리 대신 래스터의 픽셀 크기(GSD)에서 구합니다.
+여백은 타일 경계 부근을 주변 문맥과 함께 탐지하는 데만 쓰고 정량화는 타일 중심 영역에서만 하므로 같은 균열
+픽셀이 두 번 측정되지 않으며, 타일 경계를 지나는 균열은 타일별 조각으로 나누어 기록됩니다.
+
+Usage:
+    python inferences/orthomosaic.py --input 정사영상.tif --result_dir 정사영상_결과 \\
+        --crack_config 모델/균열탐지/균열탐지_config.py --crack_checkpoint 모델/균열탐지/균열탐지_weight.pth \\
+        --map_output 정사영상_지도_결과.html
+"""
+
+import os
+import math
+import time
+import argparse
+import threading
+from datetime import datetime
+
+import cv2
+import numpy as np
+import tifffile
+from mmseg.apis import init_model
+from torch.cuda import empty_cache
+
+from run_pipeline import load_models, pipeline_options, write_outputs
+from crack_pipeline import super_resolve
+from prototyping_crack_detection import convert_crack_to_real_size, render_crack_detection, summarize_detection
+from quantify_seg_results import parse_crack_coordinates, quantify_crack_width_length
+from result_writers import CrackDetailWriter, DetectionSummaryWriter
+from sparse_mask import SparseCrackMask
+from run_manifest import RunManifest, atomic_imwrite
+from pipeline_stages import prefetch
+from utils import inference_segmentor_sliding_window
+from config import CONFIG
+
+
+# 타원체 (장반경 m, 편평률)
+_ELLIPSOIDS = {
+    'WGS84': (6378137.0, 1 / 298.257223563),
+    'GRS80': (6378137.0, 1 / 298.257222101),
+}
+
+# 위도/경도 좌표계 (WGS84, Korea 2000)
+GEOGRAPHIC_EPSG = {4326, 4737}
+
+# GeoTIFF ProjLinearUnitsGeoKey → 미터
+_LINEAR_UNITS_M = {9001: 1.0, 9002: 0.3048, 9003: 1200 / 3937}
+
+# Korea 2000 중부원점 계열 (EPSG: 원점 경도, 가산 북향값)
+_KOREA_2000_BELTS = {
+    5180: (125, 500000), 5181: (127, 500000), 5182: (127, 550000), 5183: (129, 500000), 5184: (131, 500000),
+    5185: (125, 600000), 5186: (127, 600000), 5187: (129, 600000), 5188: (131, 600000),
+}
+
+
+def transverse_mercator_params(epsg):
+    """
+    횡메르카토르 투영 좌표계의 매개변수 (UTM, Korea 2000)
+
+    Args:
+        epsg (int): EPSG 코드
+
+    Returns:
+        dict: ellipsoid, lat0, lon0, k0, fe, fn (지원하지 않는 좌표계면 None)
+    """
+    if 32601 <= epsg <= 32660 or 32701 <= epsg <= 32760:
+        zone = epsg % 100
+        return {'ellipsoid': 'WGS84', 'lat0': 0.0, 'lon0': zone * 6.0 - 183.0, 'k0': 0.9996,
+                'fe': 500000.0, 'fn': 0.0 if epsg < 32700 else 10000000.0}
+    if epsg == 5179:
+        return {'ellipsoid': 'GRS80', 'lat0': 38.0, 'lon0': 127.5, 'k0': 0.9996, 'fe': 1000000.0, 'fn': 2000000.0}
+    if epsg in _KOREA_2000_BELTS:
+        lon0, fn = _KOREA_2000_BELTS[epsg]
+        return {'ellipsoid': 'GRS80', 'lat0': 38.0, 'lon0': float(lon0), 'k0': 1.0, 'fe': 200000.0, 'fn': float(fn)}
+    return None
+
+
+def _meridian_arc(phi, a, e2):
+    """적도에서 위도 phi(라디안)까지의 자오선 호 길이 (m)"""
+    e4, e6 = e2 * e2, e2 ** 3
+    return a * ((1 - e2 / 4 - 3 * e4 / 64 - 5 * e6 / 256) * phi
+                - (3 * e2 / 8 + 3 * e4 / 32 + 45 * e6 / 1024) * math.sin(2 * phi)
+                + (15 * e4 / 256 + 45 * e6 / 1024) * math.sin(4 * phi)
+                - (35 * e6 / 3072) * math.sin(6 * phi))
+
+
+def transverse_mercator_to_latlon(x, y, params):
+    """
+    횡메르카토르 투영 좌표 → 위도/경도 (Snyder 급수, 한 투영대 안에서 1 mm 이하 오차)
+
+    Args:
+        x (float): 동향 좌표 (m)
+        y (float): 북향 좌표 (m)
+        params (dict): transverse_mercator_params 결과
+
+    Returns:
+        tuple: (위도, 경도) (도)
+    """
+    a, f = _ELLIPSOIDS[params['ellipsoid']]
+    e2 = f * (2 - f)
+    ep2 = e2 / (1 - e2)
+    k0 = params['k0']
+
+    m = _meridian_arc(math.radians(params['lat0']), a, e2) + (y - params['fn']) / k0
+    mu = m / (a * (1 - e2 / 4 - 3 * e2 ** 2 / 64 - 5 * e2 ** 3 / 256))
+    e1 = (1 - math.sqrt(1 - e2)) / (1 + math.sqrt(1 - e2))
+    phi1 = (mu + (3 * e1 / 2 - 27 * e1 ** 3 / 32) * math.sin(2 * mu)
+            + (21 * e1 ** 2 / 16 - 55 * e1 ** 4 / 32) * math.sin(4 * mu)
+            + (151 * e1 ** 3 / 96) * math.sin(6 * mu)
+            + (1097 * e1 ** 4 / 512) * math.sin(8 * mu))
+
+    sin1, cos1, tan1 = math.sin(phi1), math.cos(phi1), math.tan(phi1)
+    c1 = ep2 * cos1 ** 2
+    t1 = tan1 ** 2
+    n1 = a / math.sqrt(1 - e2 * sin1 ** 2)
+    r1 = a * (1 - e2) / (1 - e2 * sin1 ** 2) ** 1.5
+    d = (x - params['fe']) / (n1 * k0)
+
+    lat = phi1 - (n1 * tan1 / r1) * (d ** 2 / 2
+                                     - (5 + 3 * t1 + 10 * c1 - 4 * c1 ** 2 - 9 * ep2) * d ** 4 / 24
+                                     + (61 + 90 * t1 + 298 * c1 + 45 * t1 ** 2 - 252 * ep2 - 3 * c1 ** 2) * d ** 6 / 720)
+    lon = (d - (1 + 2 * t1 + c1) * d ** 3 / 6
+           + (5 - 2 * c1 + 28 * t1 - 3 * c1 ** 2 + 8 * ep2 + 24 * t1 ** 2) * d ** 5 / 120) / cos1
+
+    return math.degrees(lat), params['lon0'] + math.degrees(lon)
+
+
+class GeoReference:
+    """
+    Pixel → map affine transform of a GeoTIFF and conversion of map coordinates to WGS84 latitude/longitude.
+
+    UTM (EPSG 326xx/327xx), Korea 2000 (EPSG 5179-5188) and latitude/longitude rasters are converted
+    without extra packages; other projected coordinate systems need pyproj.
+
+    Args:
+        transform (tuple): (a, b, c, d, e, f) with x = a*col + b*row + c and y = d*col + e*row + f,
+            where (row, col) = (0, 0) is the top-left corner of the top-left pixel.
+        epsg (int): EPSG code of the raster coordinate system.
+        geographic (bool): Map coordinates are longitude (x) / latitude (y) in degrees.
+        linear_unit_m (float): Metres per map unit of a projected coordinate system.
+    """
+
+    def __init__(self, transform, epsg, geographic=False, linear_unit_m=1.0):
+        self.transform = tuple(float(value) for value in transform)
+        self.epsg = epsg
+        self.geographic = geographic
+        self.linear_unit_m = linear_unit_m
+        self._tm_params = None
+        self._transformer = None
+
+        if geographic:
+            return
+        self._tm_params = transverse_mercator_params(epsg)
+        if self._tm_params is None:
+            try:
+                from pyproj import Transformer
+            except ImportError:
+                raise ValueError(f"EPSG:{epsg} needs pyproj (built in: UTM 326xx/327xx, Korea 2000 5179-5188, "
+                                 f"EPSG:4326/4737), install pyproj or reproject the orthomosaic")
+            self._transformer = Transformer.from_crs(epsg, 4326, always_xy=True)
+
+    @classmethod
+    def from_geotiff_tags(cls, tags, epsg=None):
+        """
+        GeoTIFF 태그 (tifffile TiffPage.geotiff_tags)에서 생성
+
+        Args:
+            tags (dict): ModelPixelScale/ModelTiepoint 또는 ModelTransformation, GeoKey 값
+            epsg (int): 좌표계 EPSG 코드 (GeoKey 대신 사용, GeoKey가 없거나 사용자 정의 좌표계일 때 지정)
+
+        Returns:
+            GeoReference
+        """
+        if tags.get('ModelTransformation') is not None:
+            matrix = np.asarray(tags['ModelTransformation'], dtype=np.float64).reshape(4, 4)
+            transform = [matrix[0, 0], matrix[0, 1], matrix[0, 3], matrix[1, 0], matrix[1, 1], matrix[1, 3]]
+        elif tags.get('ModelPixelScale') is not None and tags.get('ModelTiepoint') is not None:
+            scale_x, scale_y = tags['ModelPixelScale'][:2]
+            tie_col, tie_row, _, tie_x, tie_y = tags['ModelTiepoint'][:5]
+            transform = [scale_x, 0.0, tie_x - tie_col * scale_x, 0.0, -scale_y, tie_y + tie_row * scale_y]
+        else:
+            raise ValueError("GeoTIFF has neither ModelTransformation nor ModelPixelScale/ModelTiepoint tags")
+
+        # PixelIsPoint: 기준점이 픽셀 중심이므로 모서리 기준으로 반 픽셀 이동
+        if int(tags.get('GTRasterTypeGeoKey', 1)) == 2:
+            transform[2] -= (transform[0] + transform[1]) / 2
+            transform[5] -= (transform[3] + transform[4]) / 2
+
+        model_type = int(tags.get('GTModelTypeGeoKey', 0))
+        if epsg is None:
+            key = 'GeographicTypeGeoKey' if model_type == 2 else 'ProjectedCSTypeGeoKey'
+            epsg = int(tags[key]) if tags.get(key) is not None else None
+            if model_type == 2 and epsg is None:
+                epsg = 4326
+        if epsg is None or epsg == 32767:
+            raise ValueError("GeoTIFF does not name an EPSG coordinate system, specify it with --epsg")
+
+        geographic = epsg in GEOGRAPHIC_EPSG or (model_type == 2 and epsg < 32767)
+        linear_unit_m = _LINEAR_UNITS_M.get(int(tags.get('ProjLinearUnitsGeoKey', 9001)), 1.0)
+
+        return cls(transform, epsg, geographic, linear_unit_m)
+
+    def pixel_to_map(self, row, col):
+        """래스터 픽셀 좌표 (소수 가능, 좌상단 모서리 기준) → 지도 좌표 (x, y)"""
+        a, b, c, d, e, f = self.transform
+        return a * col + b * row + c, d * col + e * row + f
+
+    def to_latlon(self, row, col):
+        """래스터 픽셀 좌표 → (위도, 경도)"""
+        x, y = self.pixel_to_map(row, col)
+        if self.geographic:
+            return y, x
+        if self._transformer is not None:
+            lon, lat = self._transformer.transform(x, y)
+            return lat, lon
+        return transverse_mercator_to_latlon(x * self.linear_unit_m, y * self.linear_unit_m, self._tm_params)
+
+    def pixel_size_mm(self, row, col):
+        """
+        픽셀 크기 (GSD, mm/pixel, 가로/세로가 다르면 면적이 같은 정사각 픽셀의 변)
+
+        Args:
+            row (float): 위도/경도 래스터에서 크기를 계산할 위치 (행)
+            col (float): 위도/경도 래스터에서 크기를 계산할 위치 (열)
+        """
+        a, b, _, d, e, _ = self.transform
+        pixel_area = abs(a * e - b * d)
+        if not self.geographic:
+            return math.sqrt(pixel_area) * self.linear_unit_m * 1000
+        # 1도 = 지구 평균 반지름 기준 호 길이, 경도 방향은 cos(위도)배
+        latitude = self.to_latlon(row, col)[0]
+        metres_per_degree = math.radians(1) * 6371008.8
+        return math.sqrt(pixel_area * math.cos(math.radians(latitude))) * metres_per_degree * 1000
+
+
+class OrthomosaicReader:
+    """
+    Windowed reader for large (tiled) 8-bit GeoTIFF orthomosaics.
+
+    Only the TIFF tiles/strips overlapping a requested window are read and decoded, so memory scales
+    with the window instead of the raster. Uncompressed contiguous rasters are memory-mapped instead.
+    Only the first (full resolution) page is used; overviews are ignored.
+
+    Args:
+        path (str): GeoTIFF path.
+        epsg (int): EPSG code overriding the GeoKeys (None uses the file's coordinate system).
+    """
+
+    def __init__(self, path, epsg=None):
+        self.path = path
+        self._tif = tifffile.TiffFile(path)
+        page = self._page = self._tif.pages[0]
+        self._lock = threading.Lock()
+
+        if page.dtype != np.uint8:
+            self._tif.close()
+            raise ValueError(f"{path}: 8-bit imagery expected, got {page.dtype} (convert with gdal_translate -ot Byte -scale)")
+
+        self.height, self.width = page.imagelength, page.imagewidth
+        self.samples = page.samplesperpixel
+        self._separate = self.samples > 1 and page.planarconfig == 2
+
+        if page.is_tiled:
+            self._segment_shape = (page.tilelength, page.tilewidth)
+        else:
+            self._segment_shape = (min(page.rowsperstrip or self.height, self.height), self.width)
+        self._segments_across = -(-self.width // self._segment_shape[1])
+        self._segments_per_plane = -(-self.height // self._segment_shape[0]) * self._segments_across
+
+        self._memmap = None
+        if page.is_memmappable and not self._separate:
+            self._memmap = tifffile.memmap(path, page=0, mode='r')
+        elif not page.is_tiled and self.width > CONFIG['ORTHO_TILE_SIZE']:
+            # 스트립은 래스터 전체 폭이므로 타일 열마다 다시 디코딩됨
+            print(f"Warning: {os.path.basename(path)} is a compressed striped TIFF, every processing tile decodes "
+                  f"full-width strips (convert with gdal_translate -co TILED=YES for faster reads)")
+
+        nodata = page.tags.get(42113)  # GDAL_NODATA
+        self.nodata = float(nodata.value) if nodata is not None and nodata.value.strip() else None
+
+        self.timestamp = None
+        datetime_tag = page.tags.get('DateTime')
+        if datetime_tag is not None:
+            try:
+                self.timestamp = datetime.strptime(datetime_tag.value, "%Y:%m:%d %H:%M:%S").isoformat()
+            except ValueError:
+                pass
+
+        geotiff_tags = page.geotiff_tags
+        self.georeference = GeoReference.from_geotiff_tags(geotiff_tags, epsg) if geotiff_tags else None
+
+    def _read_segment(self, index):
+        """TIFF 타일/스트립 하나를 읽어 디코딩 (비어 있는 세그먼트는 None)"""
+        offset, bytecount = self._page.dataoffsets[index], self._page.databytecounts[index]
+        if not bytecount:
+            return None
+        with self._lock:
+            self._tif.filehandle.seek(offset)
+            data = self._tif.filehandle.read(bytecount)
+        segment, _, _ = self._page.decode(data, index, jpegtables=self._page.jpegtables)
+        return segment[0]
+
+    def read_window(self, row, col, height, width):
+        """
+        래스터의 한 창 읽기 (겹치는 TIFF 타일/스트립만 디코딩)
+
+        Args:
+            row (int): 창 시작 행
+            col (int): 창 시작 열
+            height (int): 창 높이
+            width (int): 창 폭
+
+        Returns:
+            ndarray: (height, width, samples) uint8 배열 (파일의 밴드 순서 그대로)
+        """
+        if self._memmap is not None:
+            window = self._memmap[row:row + height, col:col + width]
+            return np.array(window if window.ndim == 3 else window[..., None])
+
+        window = np.zeros((height, width, self.samples), dtype=np.uint8)
+        segment_height, segment_width = self._segment_shape
+        planes = range(self.samples) if self._separate else (0,)
+
+        for segment_row in range(row // segment_height, (row + height - 1) // segment_height + 1):
+            for segment_col in range(col // segment_width, (col + width - 1) // segment_width + 1):
+                top, left = segment_row * segment_height, segment_col * segment_width
+                y0, x0 = max(row, top), max(col, left)
+                y1 = min(row + height, top + segment_height, self.height)
+                x1 = min(col + width, left + segment_width, self.width)
+
+                for plane in planes:
+                    segment = self._read_segment(plane * self._segments_per_plane
+                                                 + segment_row * self._segments_across + segment_col)
+                    if segment is None:
+                        continue
+                    values = segment[y0 - top:y1 - top, x0 - left:x1 - left]
+                    if self._separate:
+                        window[y0 - row:y1 - row, x0 - col:x1 - col, plane] = values[..., 0]
+                    else:
+                        window[y0 - row:y1 - row, x0 - col:x1 - col] = values
+
+        return window
+
+    def is_empty(self, window):
+        """창 전체가 알파 채널 0, NoData 값 또는 0이면 True (정사영상 바깥 영역)"""
+        if self.samples in (2, 4):
+            return not window[..., -1].any()
+        if self.nodata is not None:
+            return bool((window == self.nodata).all())
+        return not window.any()
+
+    def valid_mask(self, window):
+        """정사영상 안쪽 픽셀 (H, W) bool 배열 (알파 채널/NoData 값 기준, 모두 유효하거나 구분할 수 없으면 None)"""
+        if self.samples in (2, 4):
+            valid = window[..., -1] > 0
+        elif self.nodata is not None:
+            valid = (window != self.nodata).any(axis=2)
+        else:
+            return None
+        return None if valid.all() else valid
+
+    def to_bgr(self, window):
+        """read_window 결과를 탐지 모델 입력(BGR 3채널)으로 변환"""
+        if self.samples < 3:
+            return cv2.cvtColor(window[..., 0], cv2.COLOR_GRAY2BGR)
+        return np.ascontiguousarray(window[..., 2::-1])
+
+    def close(self):
+        self._memmap = None
+        self._tif.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def plan_tiles(height, width, tile_size, overlap):
+    """
+    래스터를 처리 타일로 분할
+
+    Args:
+        height (int): 래스터 높이
+        width (int): 래스터 폭
+        tile_size (int): 타일 중심 영역 크기 (픽셀)
+        overlap (int): 사방 여백 (픽셀, 이웃 타일과 겹쳐 읽는 폭)
+
+    Returns:
+        list: [{'name', 'window': (row, col, height, width), 'core': (top, left, bottom, right)}, ...]
+    """
+    tiles = []
+    for top in range(0, height, tile_size):
+        for left in range(0, width, tile_size):
+            bottom, right = min(top + tile_size, height), min(left + tile_size, width)
+            row, col = max(top - overlap, 0), max(left - overlap, 0)
+            tiles.append({
+                'name': f"r{top:06d}_c{left:06d}",
+                'window': (row, col, min(bottom + overlap, height) - row, min(right + overlap, width) - col),
+                'core': (top, left, bottom, right),
+            })
+    return tiles
+
+
+def crop_core_mask(crack_mask, core, valid=None):
+    """
+    창 마스크에서 타일 중심 영역만 잘라냄 (정사영상 바깥 픽셀의 탐지는 제거)
+
+    여백은 타일 경계 부근을 주변 문맥과 함께 탐지하는 데만 쓰고 정량화는 중심 영역에서만 하므로,
+    이웃 타일과 같은 픽셀을 두 번 측정하지 않습니다. 알파 0/NoData 픽셀을 제거하여 영상 경계와
+    빈 영역 사이의 경계선이 균열로 측정되지 않도록 합니다.
+
+    Args:
+        crack_mask (ndarray or SparseCrackMask): 창 전체 균열 마스크 (초해상화 시 확대된 크기)
+        core (tuple): 마스크 좌표의 중심 영역 (top, left, bottom, right)
+        valid (ndarray): 창의 원본 해상도 유효 픽셀 (H, W) bool 배열 (None이면 모두 유효)
+
+    Returns:
+        ndarray or SparseCrackMask: 중심 영역 크기의 균열 마스크
+    """
+    top, left, bottom, right = core
+    height, width = crack_mask.shape
+
+    if isinstance(crack_mask, SparseCrackMask):
+        rows, cols = crack_mask.rows, crack_mask.cols
+        keep = (rows >= top) & (rows < bottom) & (cols >= left) & (cols < right)
+        if valid is not None:
+            keep[keep] = valid[rows[keep].astype(np.int64) * valid.shape[0] // height,
+                               cols[keep].astype(np.int64) * valid.shape[1] // width]
+        values = None if crack_mask.values is None else crack_mask.values[keep]
+        return SparseCrackMask((bottom - top, right - left), rows[keep] - top, cols[keep] - left, values)
+
+    core_mask = crack_mask[top:bottom, left:right].copy()
+    if valid is not None:
+        if valid.shape != (height, width):
+            valid = cv2.resize(valid.astype(np.uint8), (width, height), interpolation=cv2.INTER_NEAREST).astype(bool)
+        core_mask[~valid[top:bottom, left:right]] = 0
+    return core_mask
+
+
+def process_tile(crack_model, image, tile, tile_name, georeference, pixel_size_mm, options, sr_model=None,
+                 timestamp=None, valid=None):
+    """
+    한 처리 타일의 (초해상화 →) 슬라이딩 윈도우 탐지 → 중심 영역 정량화 → 균열별 위치 계산
+
+    Args:
+        crack_model: 균열 탐지 모델
+        image (ndarray): 여백을 포함한 타일 창 이미지 (BGR)
+        tile (dict): plan_tiles 항목
+        tile_name (str): 결과 이미지/진행 기록 이름
+        georeference (GeoReference): 래스터 지리참조
+        pixel_size_mm (float): 래스터 픽셀 크기 (mm)
+        options (dict): pipeline_options 결과
+        sr_model: 초해상화 모델 (None이면 원본 해상도에서 탐지)
+        timestamp (str): 촬영시간 (GeoTIFF DateTime 태그)
+        valid (ndarray): 타일의 유효 픽셀 (OrthomosaicReader.valid_mask, None이면 모두 유효)
+
+    Returns:
+        dict: {'output_name', 'detection', 'cracks', 'locations'} (cracks는 래스터 픽셀 좌표, 균열이 없으면 detection None)
+    """
+    row, col, height, _ = tile['window']
+    if sr_model is not None:
+        image = super_resolve(sr_model, image)
+    scale = image.shape[0] / height
+
+    # 여백을 포함한 창 전체에서 탐지
+    _, crack_mask = inference_segmentor_sliding_window(
+        crack_model, image,
+        color_mask=None,
+        score_thr=CONFIG['SCORE_THRESHOLD'],
+        window_size=CONFIG['WINDOW_SIZE'],
+        overlap_ratio=CONFIG['OVERLAP_RATIO'],
+        return_sparse=CONFIG['USE_SPARSE_MASK']
+    )
+
+    # 중심 영역만 정량화 (마스크/이미지 좌표 → 래스터 좌표: 중심 영역 원점 + 좌표 / scale)
+    top, left, bottom, right = tile['core']
+    core = (round((top - row) * scale), round((left - col) * scale),
+            round((bottom - row) * scale), round((right - col) * scale))
+    crack_mask = crop_core_mask(crack_mask, core, valid)
+    image = image[core[0]:core[2], core[1]:core[3]]
+
+    _, crack_quantification_results = quantify_crack_width_length(
+        None, crack_mask, CONFIG['CRACK_COLOR'],
+        low_memory=options['low_memory'],
+        approx_factor=options['approx_factor']
+    )
+    tile_cracks = convert_crack_to_real_size(crack_quantification_results, pixel_size_mm / scale)
+
+    cracks, locations = [], []
+    for crack in tile_cracks:
+        min_row, min_col, max_row, max_col = parse_crack_coordinates(crack[0])
+        raster_coordinates = (f"({top + math.floor(min_row / scale)},{left + math.floor(min_col / scale)})-"
+                              f"({top + math.ceil(max_row / scale)},{left + math.ceil(max_col / scale)})")
+        cracks.append([raster_coordinates] + list(crack[1:]))
+        # 균열 위치: 바운딩 박스 중심의 지리 좌표
+        locations.append(georeference.to_latlon(top + (min_row + max_row) / 2 / scale,
+                                                left + (min_col + max_col) / 2 / scale))
+
+    result = {'output_name': None, 'detection': None, 'cracks': cracks, 'locations': locations}
+    if not cracks:
+        return result
+
+    output_name = f"{tile_name}.jpg"
+    rendered = render_crack_detection(image, crack_mask, tile_cracks, output_size=options['output_size'])
+    atomic_imwrite(os.path.join(options['output_dir'], output_name), rendered, [cv2.IMWRITE_JPEG_QUALITY, 85])
+
+    # 지도 마커는 타일의 균열 위치 평균 (균열별 위치는 상세 테이블)
+    latitude = float(np.mean([location[0] for location in locations]))
+    longitude = float(np.mean([location[1] for location in locations]))
+    result.update({
+        'output_name': output_name,
+        'detection': summarize_detection(output_name, cracks, latitude, longitude, timestamp),
+    })
+
+    return result
+
+
+def process_orthomosaic(crack_model, reader, result_dir, sr_model=None, tile_size=None, tile_overlap=None,
+                        pixel_size_mm=None, options=None, excel_output=None, map_output=None, crack_table=None,
+                        resume=False):
+    """
+    정사영상 한 장을 처리 타일 단위로 탐지/정량화하고 결과 저장
+
+    다음 타일은 백그라운드 스레드에서 미리 읽어 디코딩이 추론과 겹칩니다. 타일마다 진행 기록에 남기므로
+    중단 후 resume=True로 다시 실행하면 완료된 타일을 건너뜁니다.
+
+    Args:
+        crack_model: 균열 탐지 모델
+        reader (OrthomosaicReader): 정사영상 (지리참조 필요)
+        result_dir (str): 결과 디렉토리 (균열이미지/, 균열목록.csv, 진행기록.jsonl)
+        sr_model: 초해상화 모델 (None이면 원본 해상도에서 탐지)
+        tile_size (int): 처리 타일 크기 (기본값: CONFIG['ORTHO_TILE_SIZE'])
+        tile_overlap (int): 처리 타일 사방 여백 (기본값: CONFIG['ORTHO_TILE_OVERLAP'])
+        pixel_size_mm (float): 픽셀 크기 (mm, None이면 지리참조의 GSD)
+        options (dict): postprocess 옵션 (approx_factor, low_memory, output_size)
+        excel_output (str): 타일별 균열 목록 Excel 경로 (None이면 생략)
+        map_output (str): 지도 HTML 경로 (None이면 생략)
+        crack_table (str): 균열별 상세 테이블 경로 (균열마다 위도/경도, 래스터 픽셀 좌표, None이면 생략)
+        resume (bool): 진행 기록에서 완료된 타일은 건너뜀
+
+    Returns:
+        dict: {'tiles', 'empty_tiles', 'failed_tiles', 'cracks', 'pixel_size_mm'}
+    """
+    if reader.georeference is None:
+        raise ValueError(f"{reader.path} is not georeferenced (no GeoTIFF tags)")
+
+    tile_size = tile_size or CONFIG['ORTHO_TILE_SIZE']
+    tile_overlap = CONFIG['ORTHO_TILE_OVERLAP'] if tile_overlap is None else tile_overlap
+    if pixel_size_mm is None:
+        pixel_size_mm = reader.georeference.pixel_size_mm(reader.height / 2, reader.width / 2)
+
+    image_output_dir = os.path.join(result_dir, '균열이미지')
+    os.makedirs(image_output_dir, exist_ok=True)
+    options = pipeline_options(image_output_dir, options)
+
+    stem = os.path.splitext(os.path.basename(reader.path))[0]
+    tiles = plan_tiles(reader.height, reader.width, tile_size, tile_overlap)
+    print(f"\nOrthomosaic: {reader.width} x {reader.height} px, EPSG:{reader.georeference.epsg}, "
+          f"{pixel_size_mm:.2f} mm/pixel")
+    print(f"Processing tiles: {len(tiles)} ({tile_size} px, {tile_overlap} px overlap)")
+
+    manifest = RunManifest(os.path.join(result_dir, '진행기록.jsonl'), resume=resume)
+    detection_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록.csv'))
+    crack_detail_writer = CrackDetailWriter(crack_table) if crack_table else None
+    detection_results = []
+    stats = {'tiles': len(tiles), 'empty_tiles': 0, 'failed_tiles': 0, 'cracks': 0, 'pixel_size_mm': pixel_size_mm}
+
+    def read_tile(tile):
+        # 완료된 타일은 읽지 않음
+        if manifest.is_done(f"{stem}_{tile['name']}", 'detection'):
+            return None
+        window = reader.read_window(*tile['window'])
+        return None if reader.is_empty(window) else (reader.to_bgr(window), reader.valid_mask(window))
+
+    start = time.perf_counter()
+    for idx, (tile, tile_data, error) in enumerate(prefetch(read_tile, tiles, CONFIG['PREFETCH_IMAGES'])):
+        tile_name = f"{stem}_{tile['name']}"
+
+        if manifest.is_done(tile_name, 'detection'):
+            result = manifest.get_record(tile_name, 'detection')
+        elif error is not None:
+            print(f"[{idx+1}/{len(tiles)}] {tile_name}: read failed: {error}")
+            manifest.mark_failed(tile_name, 'detection', error)
+            stats['failed_tiles'] += 1
+            continue
+        elif tile_data is None:
+            result = {'output_name': None, 'detection': None, 'cracks': [], 'locations': []}
+            manifest.mark_done(tile_name, 'detection', result)
+            stats['empty_tiles'] += 1
+            continue
+        else:
+            try:
+                image, valid = tile_data
+                result = process_tile(crack_model, image, tile, tile_name, reader.georeference, pixel_size_mm,
+                                      options, sr_model=sr_model, timestamp=reader.timestamp, valid=valid)
+            except Exception as e:
+                print(f"[{idx+1}/{len(tiles)}] {tile_name}: Error: {e}")
+                manifest.mark_failed(tile_name, 'detection', e)
+                stats['failed_tiles'] += 1
+                continue
+            finally:
+                tile_data = image = valid = None
+                empty_cache()
+            manifest.mark_done(tile_name, 'detection', result)
+            print(f"[{idx+1}/{len(tiles)}] {tile_name}: {len(result['cracks'])} cracks")
+
+        stats['cracks'] += len(result['cracks'])
+        if result['detection'] is None:
+            continue
+        detection_writer.append(result['detection'])
+        detection_results.append(result['detection'])
+        if crack_detail_writer is not None:
+            crack_detail_writer.append(result['output_name'], result['cracks'], timestamp=reader.timestamp,
+                                       locations=result['locations'])
+
+    elapsed = time.perf_counter() - start
+    print(f"\nProcessed {reader.width * reader.height / 1e6:.0f} Mpx in {elapsed:.0f} s: {stats['cracks']} cracks, "
+          f"{stats['empty_tiles']} empty tiles skipped, {stats['failed_tiles']} failed")
+
+    if crack_detail_writer is not None:
+        crack_detail_writer.close()
+        print(f"Per-crack table saved to: {crack_table} ({crack_detail_writer.num_rows} cracks)")
+    detection_writer.close()
+
+    write_outputs(detection_writer, None, detection_results, None, result_dir, image_output_dir,
+                  excel_output=excel_output, map_output=map_output)
+
+    return stats
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Crack detection on a large georeferenced orthomosaic (GeoTIFF)')
+    parser.add_argument('--input', required=True, help='정사영상 GeoTIFF 경로')
+    parser.add_argument('--result_dir', required=True, help='결과 디렉토리')
+    parser.add_argument('--crack_config', required=True, help='크랙 탐지 모델 설정 파일 경로')
+    parser.add_argument('--crack_checkpoint', required=True, help='크랙 탐지 모델 체크포인트 파일 경로')
+    parser.add_argument('--sr_config', default=None, help='초해상화 모델 설정 파일 경로 (지정하면 타일마다 초해상화)')
+    parser.add_argument('--sr_checkpoint', default=None, help='초해상화 모델 체크포인트 파일 경로')
+    parser.add_argument('--sr_model_name', default='edsr', help='초해상화 모델 이름 (MMagic)')
+    parser.add_argument('--device', default='cuda', help='추론 장치')
+    parser.add_argument('--tile_size', type=int, default=CONFIG['ORTHO_TILE_SIZE'], help='처리 타일 크기 (픽셀)')
+    parser.add_argument('--tile_overlap', type=int, default=CONFIG['ORTHO_TILE_OVERLAP'], help='처리 타일 사방 여백 (픽셀)')
+    parser.add_argument('--pixel_size_mm', type=float, default=None, help='픽셀 크기 (mm, 기본값: 지리참조의 GSD)')
+    parser.add_argument('--epsg', type=int, default=None, help='좌표계 EPSG 코드 (GeoTIFF에 없거나 잘못된 경우)')
+    parser.add_argument('--excel_output', default=None, help='균열 목록 Excel 경로 (기본값: result_dir/균열목록.xlsx)')
+    parser.add_argument('--crack_table', default=None, help='균열별 상세 테이블 경로 (기본값: result_dir/균열목록_균열상세.parquet)')
+    parser.add_argument('--map_output', default=None, help='지도 HTML 경로')
+    parser.add_argument('--output_size', type=int, default=CONFIG['OUTPUT_IMAGE_SIZE'], help='결과 이미지 긴 변 크기 (픽셀)')
+    parser.add_argument('--approx_factor', type=int, default=CONFIG['APPROX_QUANTIFICATION_FACTOR'], help='근사 정량화 배율 (1이면 정확)')
+    parser.add_argument('--resume', action='store_true', help='진행 기록에서 완료된 타일은 건너뜀')
+
+    args = parser.parse_args()
+
+    if bool(args.sr_config) != bool(args.sr_checkpoint):
+        parser.error('--sr_config and --sr_checkpoint must be given together')
+    if not 0 <= args.tile_overlap < args.tile_size:
+        parser.error('--tile_overlap must be smaller than --tile_size')
+
+    # 모델 로드 전에 정사영상/지리참조 확인
+    reader = OrthomosaicReader(args.input, epsg=args.epsg)
+    if reader.georeference is None:
+        parser.error(f'{args.input} is not a georeferenced GeoTIFF')
+
+    print("\nInitializing models...")
+    if args.sr_config:
+        sr_model, crack_model = load_models(
+            args.sr_config, args.sr_checkpoint, args.crack_config, args.crack_checkpoint,
+            sr_model_name=args.sr_model_name, device=args.device
+        )
+    else:
+        sr_model = None
+        crack_model = init_model(args.crack_config, args.crack_checkpoint,
+                                 device='cuda:0' if args.device == 'cuda' else args.device)
+    print("Models initialized successfully")
+
+    with reader:
+        process_orthomosaic(
+            crack_model, reader, args.result_dir,
+            sr_model=sr_model,
+            tile_size=args.tile_size,
+            tile_overlap=args.tile_overlap,
+            pixel_size_mm=args.pixel_size_mm,
+            options={'approx_factor': args.approx_factor, 'output_size': args.output_size},
+            excel_output=args.excel_output or os.path.join(args.result_dir, '균열목록.xlsx'),
+            map_output=args.map_output,
+            crack_table=args.crack_table or os.path.join(args.result_dir, '균열목록_균열상세.parquet'),
+            resume=args.resume
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Bounded pipeline stages for the detection stage
+탐지 단계 파이프라인 단계 (단계 사이 큐 크기 제한)
+
+탐지 단계는 이미지마다 디코딩 → 추론 → 정량화/시각화/JPEG 인코딩 → 결과 기록을 순서대로 수행해
+추론 장치가 대부분의 시간 동안 쉬고 있었습니다. 단계는 다음과 같이 겹쳐 실행됩니다:
+
+    디코딩 (스레드, cv2 디코딩은 GIL 해제)  --[prefetch 큐]-->
+    추론 (메인 스레드, GPU)                 --[후처리 대기열, num_workers]-->
+    정량화/시각화/JPEG 인코딩 (프로세스 풀)  --> 결과 기록 (메인 스레드, 완료 즉시 제출 순서대로)
+
+각 큐의 크기가 제한되어 있어 앞 단계가 빠르면 기다리게 되므로(back-pressure) 메모리 사용량이
+이미지 수와 무관하게 일정합니다.
+"""
+
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+
+_DONE = object()
+
+
+def prefetch(fn, items, depth=1):
+    """
+    백그라운드 스레드에서 fn(item)을 미리 실행하고 입력 순서대로 결과 반환
+
+    메인 스레드가 현재 항목을 처리하는 동안 다음 항목을 준비합니다. 스레드는 큐가 차 있으면
+    기다리므로 동시에 메모리에 있는 결과는 최대 depth + 2개 (처리 중 1, 큐 depth, 준비 중 1)입니다.
+
+    Args:
+        fn (callable): 항목 준비 함수 (예: 이미지 디코딩)
+        items (iterable): 입력 항목 (제너레이터도 가능, 준비 스레드가 필요할 때만 꺼냄)
+        depth (int): 미리 준비해 둘 최대 항목 수 (0이면 스레드 없이 순차 실행)
+
+    Yields:
+        tuple: (item, result, error) (fn이 예외를 던지면 result는 None, error는 예외)
+    """
+    if depth <= 0:
+        for item in items:
+            try:
+                yield item, fn(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+
+    results = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry):
+        # 소비 측이 중단되면(예외, 중간 종료) 더 기다리지 않고 종료
+        while not stop.is_set():
+            try:
+                results.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def worker():
+        try:
+            for item in items:
+                try:
+                    entry = (item, fn(item), None)
+                except Exception as e:
+                    entry = (item, None, e)
+                if not put(entry):
+                    return
+        except Exception as e:
+            # 입력 제너레이터 자체의 오류 (항목 없이 전달, 소비 측이 기다리다 멈추지 않도록)
+            put((None, None, e))
+        put(_DONE)
+
+    thread = threading.Thread(target=worker, name='prefetch', daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            entry = results.get()
+            if entry is _DONE:
+                return
+            yield entry
+    finally:
+        stop.set()
+        thread.join()
+
+
+def timed(iterable, timer, stage):
+    """iterable에서 다음 항목을 기다린 시간을 timer의 stage에 누적"""
+    iterator = iter(iterable)
+    try:
+        while True:
+            with timer.measure(stage):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        # 중간에 중단되면 prefetch 스레드도 정리되도록 닫음
+        if hasattr(iterator, 'close'):
+            iterator.close()
+
+
+class StageTimer:
+    """
+    Accumulate wall-clock seconds per pipeline stage.
+
+    Used to report how long the main thread spent in inference versus waiting on other stages.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self._start = time.perf_counter()
+
+    def add(self, stage, seconds):
+        """단계 시간 누적"""
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, stage):
+        """with 블록의 실행 시간을 단계 시간에 누적"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def report(self):
+        """단계별 시간과 전체 시간 대비 비율 출력"""
+        elapsed = time.perf_counter() - self._start
+        if elapsed <= 0:
+            return
+        print("\nStage timing (main thread):")
+        for stage, seconds in self.seconds.items():
+            print(f"  {stage:>16}: {seconds:8.1f} s ({seconds / elapsed * 100:5.1f}% of {elapsed:.1f} s)")
+
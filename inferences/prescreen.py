@@ -0,0 +1,215 @@
+"""
+Low-resolution crack pre-screen before super-resolution
+초해상화 전 저해상도 균열 사전 선별
+
+EDSR x4 초해상화와 고해상도 슬라이딩 윈도우 탐지는 균열이 없는 프레임에도 똑같이 수행됩니다.
+균열 탐지 모델을 원본(저해상도) 이미지에 한 번 실행해, 완화된 임계값(PRESCREEN_SCORE_THRESHOLD)을
+넘는 균열 후보 픽셀이 PRESCREEN_MIN_PIXELS 미만인 프레임은 초해상화와 탐지를 모두 건너뜁니다.
+
+건너뛸 프레임 중 일부(audit_rate 비율, 이미지 이름으로 결정되어 재실행해도 같은 표본)는 그대로
+전체 처리하고, 탐지 단계가 끝나면 그중 균열이 탐지된 비율(놓친 비율)을 보고합니다.
+
+결정은 보고서(CSV)에 남으며, 탐지 단계는 이 보고서에서 'skip'인 이미지를 제외합니다.
+"""
+
+import os
+import csv
+import hashlib
+
+import numpy as np
+import mmcv
+import slidingwindow as sw
+from mmseg.apis import inference_model
+
+from config import CONFIG
+
+
+# 사전 선별 결정
+PRESCREEN_DECISIONS = ('process', 'skip', 'audit')
+
+_REPORT_FIELDS = ['image_name', 'candidate_pixels', 'max_score', 'decision']
+
+
+def crack_probability(seg_result):
+    """
+    SegDataSample의 logit에서 픽셀별 균열 확률 계산
+
+    Args:
+        seg_result: inference_model 결과 (SegDataSample)
+
+    Returns:
+        ndarray: (H, W) float32 균열 확률 (배경이 아닌 클래스 확률의 합)
+    """
+    logits = seg_result.seg_logits.data
+    if logits.shape[0] == 1:
+        # 이진 분할 헤드 (out_channels=1)
+        probability = logits.sigmoid()[0]
+    else:
+        probability = logits.softmax(dim=0)[1:].sum(dim=0)
+    return probability.cpu().numpy().astype(np.float32)
+
+
+def screen_image(crack_model, image, score_thr=None, window_size=None, overlap_ratio=None):
+    """
+    저해상도 이미지의 균열 후보 픽셀 수와 최대 균열 확률
+
+    Args:
+        crack_model: 균열 탐지 모델 (init_model 결과)
+        image (ndarray): 원본 해상도 BGR 이미지
+        score_thr (float): 균열 후보로 볼 최소 확률 (기본값: CONFIG['PRESCREEN_SCORE_THRESHOLD'])
+        window_size (int): 슬라이딩 윈도우 크기 (기본값: CONFIG['WINDOW_SIZE'])
+        overlap_ratio (float): 윈도우 겹침 비율 (기본값: CONFIG['OVERLAP_RATIO'])
+
+    Returns:
+        dict: {'candidate_pixels', 'max_score'} (겹치는 영역의 픽셀은 중복 계산될 수 있음)
+    """
+    score_thr = CONFIG['PRESCREEN_SCORE_THRESHOLD'] if score_thr is None else score_thr
+    window_size = window_size or CONFIG['WINDOW_SIZE']
+    overlap_ratio = CONFIG['OVERLAP_RATIO'] if overlap_ratio is None else overlap_ratio
+
+    # 저해상도 이미지는 대부분 윈도우 하나에 들어감
+    if max(image.shape[:2]) <= window_size:
+        subsets = [image]
+    else:
+        windows = sw.generate(image, sw.DimOrder.HeightWidthChannel, window_size, overlap_ratio)
+        subsets = (image[window.indices()] for window in windows)
+
+    candidate_pixels = 0
+    max_score = 0.0
+    for subset in subsets:
+        probability = crack_probability(inference_model(crack_model, subset))
+        candidate_pixels += int((probability >= score_thr).sum())
+        max_score = max(max_score, float(probability.max()))
+
+    return {'candidate_pixels': candidate_pixels, 'max_score': round(max_score, 4)}
+
+
+def is_audit_sample(img_name, audit_rate):
+    """이미지 이름 해시로 결정되는 검증 표본 여부 (재개/재실행 시에도 같은 표본)"""
+    if audit_rate <= 0:
+        return False
+    digest = hashlib.sha1(img_name.encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) / 0x100000000 < audit_rate
+
+
+def prescreen_image(crack_model, img_path, audit_rate=0.0, min_pixels=None, score_thr=None):
+    """
+    한 이미지의 사전 선별 결정
+
+    Args:
+        crack_model: 균열 탐지 모델
+        img_path (str): 원본 이미지 경로
+        audit_rate (float): 건너뛸 프레임 중 검증을 위해 전체 처리할 비율 (0-1)
+        min_pixels (int): 처리할 최소 균열 후보 픽셀 수 (기본값: CONFIG['PRESCREEN_MIN_PIXELS'])
+        score_thr (float): 균열 후보로 볼 최소 확률 (기본값: CONFIG['PRESCREEN_SCORE_THRESHOLD'])
+
+    Returns:
+        dict: 보고서 행 {'image_name', 'candidate_pixels', 'max_score', 'decision'}
+              decision: 'process' (후보 있음), 'skip' (후보 없음), 'audit' (후보 없지만 검증용으로 처리)
+    """
+    min_pixels = CONFIG['PRESCREEN_MIN_PIXELS'] if min_pixels is None else min_pixels
+    img_name = os.path.basename(img_path)
+
+    image = mmcv.imread(img_path)
+    if image is None:
+        raise IOError(f"Failed to decode image: {img_path}")
+
+    row = dict(image_name=img_name, **screen_image(crack_model, image, score_thr))
+    if row['candidate_pixels'] >= min_pixels:
+        row['decision'] = 'process'
+    elif is_audit_sample(img_name, audit_rate):
+        row['decision'] = 'audit'
+    else:
+        row['decision'] = 'skip'
+
+    return row
+
+
+def write_prescreen_report(rows, report_path, crack_counts=None):
+    """
+    사전 선별 보고서 저장 (CSV, crack_counts가 주어지면 전체 처리 후 탐지된 균열 수 포함)
+
+    Args:
+        rows (list): prescreen_image 결과 리스트
+        report_path (str): 보고서 경로
+        crack_counts (dict): {image_name: 탐지된 균열 수} (탐지 단계 결과)
+    """
+    report_dir = os.path.dirname(report_path)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+
+    fieldnames = _REPORT_FIELDS + (['cracks_found'] if crack_counts is not None else [])
+    with open(report_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            if crack_counts is not None:
+                row = dict(row, cracks_found=crack_counts.get(row['image_name'], ''))
+            writer.writerow(row)
+
+
+def load_prescreen_report(report_path):
+    """
+    사전 선별 보고서 읽기
+
+    Returns:
+        list: 보고서 행 리스트 (candidate_pixels는 int, max_score는 float)
+    """
+    with open(report_path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    for row in rows:
+        row['candidate_pixels'] = int(row['candidate_pixels'])
+        row['max_score'] = float(row['max_score'])
+
+    return rows
+
+
+def print_prescreen_summary(rows):
+    """사전 선별 결과 요약 출력"""
+    counts = {decision: sum(row['decision'] == decision for row in rows) for decision in PRESCREEN_DECISIONS}
+    total = len(rows)
+    if total == 0:
+        return
+    print(f"\nLow-res pre-screen: {counts['skip']}/{total} frames skipped before super resolution "
+          f"({counts['skip'] / total * 100:.1f}%), {counts['process']} with crack candidates, "
+          f"{counts['audit']} crack-free frames processed for audit")
+
+
+def audit_prescreen(rows, crack_counts):
+    """
+    검증 표본의 놓친 비율 (사전 선별이 건너뛰었을 프레임 중 전체 처리에서 균열이 탐지된 비율)
+
+    Args:
+        rows (list): 사전 선별 보고서 행
+        crack_counts (dict): {image_name: 탐지된 균열 수}
+
+    Returns:
+        dict: {'audited', 'missed', 'miss_rate', 'missed_images', 'skipped', 'estimated_missed'}
+              (miss_rate는 검증 표본이 없으면 None, estimated_missed는 건너뛴 프레임 중 놓쳤을 것으로 추정되는 수)
+    """
+    audited = [row['image_name'] for row in rows
+               if row['decision'] == 'audit' and row['image_name'] in crack_counts]
+    missed = [name for name in audited if crack_counts[name] > 0]
+    skipped = sum(row['decision'] == 'skip' for row in rows)
+    miss_rate = len(missed) / len(audited) if audited else None
+
+    return {
+        'audited': len(audited),
+        'missed': len(missed),
+        'miss_rate': miss_rate,
+        'missed_images': missed,
+        'skipped': skipped,
+        'estimated_missed': miss_rate * skipped if miss_rate is not None else None,
+    }
+
+
+def print_audit_summary(audit):
+    """검증 결과 출력"""
+    if audit['audited'] == 0:
+        return
+    print(f"\nPre-screen audit: {audit['missed']}/{audit['audited']} crack-free frames had cracks at full resolution "
+          f"(miss rate {audit['miss_rate'] * 100:.1f}%, ~{audit['estimated_missed']:.1f} of "
+          f"{audit['skipped']} skipped frames estimated missed)")
+    for name in audit['missed_images']:
+        print(f"  missed: {name}")
@@ -9,8 +9,11 @@ python inferences/prototyping_crack_detection.py --crack_config
 import os
 import sys
 import json
+import time
 import argparse
-import pandas as pd
+import multiprocessing as mp
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 import numpy as np
 import mmcv
 import cv2
@@ -22,8 +25,21 @@ from PIL.ExifTags import TAGS, GPSTAGS
 
 # 기존 모듈 import
 sys.path.append(os.path.dirname(__file__))
-from quantify_seg_results import quantify_crack_width_length
+from quantify_seg_results import check_approx_factor, parse_crack_coordinates, quantify_crack_width_length
 from utils import inference_segmentor_sliding_window
+from sparse_mask import SparseCrackMask
+from crack_graph import build_crack_graph, save_crack_graph
+from result_writers import CrackDetailWriter, DetectionSummaryWriter
+from run_manifest import RunManifest, atomic_imwrite
+from stage_planner import NO_GPS_POLICIES, plan_images, print_plan, print_compute_saved
+from image_source import load_image
+from pipeline_stages import prefetch, timed, StageTimer
+from prescreen import (load_prescreen_report, write_prescreen_report, print_prescreen_summary, audit_prescreen,
+                       print_audit_summary)
+from dedup_frames import load_dedup_report
+from memory_planner import (parse_memory_size, format_bytes, image_dimensions, configured_mode, plan_memory,
+                            check_memory_plan, apply_memory_plan, count_crack_pixels)
+from artifact_cache import ArtifactCache, make_key, model_fingerprint, segmentation_config, quantification_config
 from config import CONFIG
 
 
@@ -57,11 +73,11 @@ def convert_crack_to_real_size(crack_quantification_results, pixel_to_mm):
     픽셀 단위 균열 정보를 실제 크기(mm)로 변환
     
     Args:
-        crack_quantification_results (list): [(coordinates, "avg_width x max_width x length", class_id), ...]
+        crack_quantification_results (list): [(coordinates, "avg_width x max_width x length", class_id, area_px), ...]
         pixel_to_mm (float): 픽셀→mm 변환 비율
     
     Returns:
-        list: [(coordinates, avg_width_mm, max_width_mm, length_mm, measurement_str, class_id), ...]
+        list: [(coordinates, avg_width_mm, max_width_mm, length_mm, measurement_str, class_id, area_px), ...]
     """
     converted_results = []
     
@@ -69,6 +85,7 @@ def convert_crack_to_real_size(crack_quantification_results, pixel_to_mm):
         coordinates = result[0]
         measurements = result[1]
         class_id = result[2]
+        area_px = result[3] if len(result) > 3 else None
         
         try:
             # "avg_width x max_width x length" 형식 파싱
@@ -90,7 +107,8 @@ def convert_crack_to_real_size(crack_quantification_results, pixel_to_mm):
                 max_width_mm,
                 length_mm,
                 measurement_str,
-                class_id
+                class_id,
+                area_px
             ])
         except Exception as e:
             print(f"Warning: Failed to convert crack measurement: {e}")
@@ -158,64 +176,271 @@ def get_exif_gps_from_image(image_path):
         return None, None
 
 
-def filter_crack_by_size(crack_quantification_results, min_area=None, min_width=None, min_length=None):
-    """크기 기준으로 크랙 필터링 (값이 0이면 필터링 비활성화)"""
-    if not crack_quantification_results:
-        return []
+def get_output_shape(image_shape, output_size):
+    """
+    원본 비율을 유지하면서 긴 변이 output_size가 되는 출력 크기 계산
     
-    filtered_results = []
+    Returns:
+        tuple: (output_height, output_width)
+    """
+    height, width = image_shape[:2]
+    scale = min(output_size / max(height, width), 1.0)
+    return max(int(round(height * scale)), 1), max(int(round(width * scale)), 1)
+
+
+def compute_mask_coverage(crack_mask, output_shape):
+    """
+    균열 마스크를 출력 해상도로 면적 보간 (각 출력 픽셀에서 균열이 차지하는 비율, 0.0-1.0)
     
-    for result in crack_quantification_results:
-        coordinates = result[0]
-        measurements = result[1]
-        
+    Args:
+        crack_mask (ndarray or SparseCrackMask): 원본 해상도 균열 마스크 (H, W)
+        output_shape (tuple): (output_height, output_width)
+    
+    Returns:
+        ndarray: float32 coverage map (output_height, output_width)
+    """
+    if isinstance(crack_mask, SparseCrackMask):
+        rows, cols = crack_mask.rows, crack_mask.cols
+        height, width = crack_mask.shape
+    else:
+        rows, cols = np.nonzero(crack_mask == 1)
+        height, width = crack_mask.shape[:2]
+    
+    out_h, out_w = output_shape
+    
+    # 각 원본 픽셀이 속하는 출력 픽셀 (bin)
+    bin_rows = (rows.astype(np.int64) * out_h) // height
+    bin_cols = (cols.astype(np.int64) * out_w) // width
+    counts = np.bincount(bin_rows * out_w + bin_cols, minlength=out_h * out_w).reshape(out_h, out_w)
+    
+    # 출력 픽셀 하나에 대응하는 원본 픽셀 수
+    row_sizes = np.bincount((np.arange(height, dtype=np.int64) * out_h) // height, minlength=out_h)
+    col_sizes = np.bincount((np.arange(width, dtype=np.int64) * out_w) // width, minlength=out_w)
+    
+    return (counts / np.outer(row_sizes, col_sizes)).astype(np.float32)
+
+
+def render_crack_detection(image, crack_mask, crack_real_size_results, output_size=None, color=None, alpha=None):
+    """
+    출력 해상도에서 균열 오버레이, 박스, 라벨을 렌더링
+    
+    원본(SR) 해상도에서 오버레이를 그린 뒤 축소하는 대신, 이미지와 마스크를 먼저
+    출력 크기로 축소(INTER_AREA, 마스크는 면적 비율)한 후 축소된 좌표계에서 그립니다.
+    
+    Args:
+        image (ndarray): 원본 해상도 이미지 (H, W, 3) 또는 출력 해상도로 미리 축소한 이미지
+        crack_mask (ndarray or SparseCrackMask): 원본 해상도 균열 마스크 (H, W)
+        crack_real_size_results (list): convert_crack_to_real_size 결과
+        output_size (int): 출력 이미지의 긴 변 길이 (픽셀, 비율 유지)
+        color (list): 균열 색상 (BGR)
+        alpha (float): 오버레이 투명도
+    
+    Returns:
+        ndarray: 출력 해상도 시각화 이미지
+    """
+    if output_size is None:
+        output_size = CONFIG['OUTPUT_IMAGE_SIZE']
+    if color is None:
+        color = CONFIG['CRACK_COLOR']
+    if alpha is None:
+        alpha = CONFIG['VISUALIZATION_ALPHA']
+    
+    # 좌표 기준은 원본 해상도 마스크 (이미지는 미리 축소된 것이어도 됨)
+    out_h, out_w = get_output_shape(crack_mask.shape, output_size)
+    scale_y = out_h / crack_mask.shape[0]
+    scale_x = out_w / crack_mask.shape[1]
+    
+    resized = image
+    if image.shape[:2] != (out_h, out_w):
+        resized = cv2.resize(image, (out_w, out_h), interpolation=cv2.INTER_AREA)
+    
+    # 면적 비율만큼 오버레이 (원본 해상도에서 blend 후 INTER_AREA 축소한 것과 같은 결과)
+    coverage = compute_mask_coverage(crack_mask, (out_h, out_w))[:, :, None] * alpha
+    color_array = np.array(color, dtype=np.float32)
+    rendered = (resized * (1 - coverage) + color_array * coverage).astype(np.uint8)
+    
+    font_scale = out_h / 1000
+    font_thickness = max(int(font_scale), 1)
+    
+    for crack in crack_real_size_results:
         try:
-            # "avg_width x max_width x length" 형식 파싱
-            parts = measurements.split('x')
-            avg_width = float(parts[0])
-            max_width = float(parts[1])
-            length = float(parts[2])
-        except:
+            min_row, min_col, max_row, max_col = parse_crack_coordinates(crack[0])
+        except ValueError:
             continue
         
-        # 면적 계산
-        coord_parts = coordinates.replace('(', '').replace(')', '').split('-')
-        if len(coord_parts) == 2:
-            try:
-                min_coords = tuple(map(int, coord_parts[0].split(',')))
-                max_coords = tuple(map(int, coord_parts[1].split(',')))
-                area = (max_coords[0] - min_coords[0]) * (max_coords[1] - min_coords[1])
-            except:
-                area = avg_width * length
-        else:
-            area = avg_width * length
+        top_left = (int(min_col * scale_x), int(min_row * scale_y))
+        bottom_right = (int(max_col * scale_x), int(max_row * scale_y))
+        text_org = (max(top_left[0], 5), max(top_left[1], 10))
         
-        # 크기 필터링 (0이면 필터링 안함)
-        if min_area is not None and min_area > 0 and area < min_area:
-            continue
-        if min_width is not None and min_width > 0 and avg_width < min_width:
-            continue
-        if min_length is not None and min_length > 0 and length < min_length:
-            continue
+        rendered = cv2.rectangle(rendered, top_left, bottom_right, color, 1)
+        rendered = cv2.putText(
+            rendered, f'{crack[1]:.2f}x{crack[3]:.1f}mm', text_org,
+            cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, font_thickness, cv2.LINE_AA)
+    
+    return rendered
+
+
+def postprocess_crack_image(img_path, crack_mask, image_metadata, pixel_to_mm, options, image=None,
+                            crack_quantification_results=None):
+    """
+    한 이미지의 CPU 후처리 (정량화, 실제 크기 변환, 시각화, JPEG 저장)
+    
+    추론 장치를 점유하지 않으므로 프로세스 풀에서 실행되어, 메인 프로세스가 다음 이미지의
+    추론을 진행하는 동안 병렬로 처리됩니다.
+    
+    Args:
+        img_path (str): 입력 이미지 경로
+        crack_mask (ndarray or SparseCrackMask): 원본 해상도 균열 마스크
+        image_metadata (dict): 메타데이터 JSON 항목 또는 DecodedImage.metadata() (이미 조회한 GPS를 사용하며,
+            None일 때만 img_path의 EXIF에서 GPS 추출)
+        pixel_to_mm (float): 픽셀→mm 변환 비율
+        options (dict): approx_factor, low_memory, output_dir, output_size, graph_output_dir, graph_format,
+            allow_no_gps (GPS가 없어도 결과를 저장하고 위도/경도를 None으로 반환)
+        image (ndarray): 이미 디코딩된 이미지 (원본 해상도 또는 출력 해상도로 축소한 이미지,
+            None이면 img_path에서 읽음)
+        crack_quantification_results (list): 캐시된 픽셀 단위 측정 결과 (있으면 정량화 생략,
+            단 골격 그래프 저장 시에는 거리 맵이 필요하므로 다시 계산)
+    
+    Returns:
+        dict: {'output_name', 'latitude', 'longitude', 'timestamp', 'crack_quantification_results',
+               'crack_real_size_results', 'detection'}
+              균열이 없거나 GPS가 없으면 'detection'은 None
+    """
+    img_name = os.path.basename(img_path)
+    result = {
+        'output_name': None,
+        'latitude': None,
+        'longitude': None,
+        'timestamp': None,
+        'crack_quantification_results': [],
+        'crack_real_size_results': [],
+        'detection': None,
+    }
+    
+    if crack_quantification_results is None or options['graph_output_dir']:
+        # 크랙 정량화 (픽셀 단위, 시각화는 출력 해상도에서 별도 수행)
+        _, crack_quantification_results, distance_map, skeleton_crack_index = quantify_crack_width_length(
+            None, crack_mask, CONFIG['CRACK_COLOR'],
+            low_memory=options['low_memory'],
+            approx_factor=options['approx_factor'],
+            return_distance_map=True
+        )
         
-        filtered_results.append(result)
+        # 균열 골격 그래프 저장 (폴리라인 + 정점별 폭, crack_id = 균열 상세의 crack_index, 근사 모드에서는 거리 맵이 없어 생략)
+        if options['graph_output_dir'] and distance_map is not None:
+            graph_path = os.path.join(options['graph_output_dir'], f"{os.path.splitext(img_name)[0]}.{options['graph_format']}")
+            save_crack_graph(build_crack_graph(distance_map, skeleton_crack_index), graph_path, pixel_to_mm)
+            print(f"[{img_name}] Crack graph saved to: {graph_path}")
+        del distance_map, skeleton_crack_index
+    else:
+        print(f"[{img_name}] Using cached crack measurements")
+    
+    result['crack_quantification_results'] = crack_quantification_results
+    print(f"[{img_name}] Detected: {len(crack_quantification_results)} cracks (pixel units)")
+    
+    # 실제 크기로 변환 (mm 단위)
+    crack_real_size_results = convert_crack_to_real_size(
+        crack_quantification_results, 
+        pixel_to_mm
+    )
+    result['crack_real_size_results'] = crack_real_size_results
+    
+    # 크기 필터링 (실제 크기 기준)
+    # crack_real_size_results 구조: [coordinates, avg_width_mm, max_width_mm, length_mm, measurement_str, class_id, area_px]
+    filtered_cracks = [
+        crack for crack in crack_real_size_results
+        if crack[1] >= CONFIG['MIN_CRACK_WIDTH'] and crack[3] >= CONFIG['MIN_CRACK_LENGTH']
+    ]
+    
+    print(f"[{img_name}] Converted to real size: {len(crack_real_size_results)} cracks, after filtering: {len(filtered_cracks)} cracks")
+    
+    # 균열이 탐지되지 않으면 종료
+    if not crack_real_size_results:
+        print(f"[{img_name}] No significant cracks detected")
+        return result
+    
+    # GPS 정보 및 촬영 시간 가져오기
+    # (메타데이터가 주어지면 파일을 다시 열지 않고 그 조회 결과를 그대로 사용)
+    timestamp = None
+    if image_metadata is not None:
+        latitude = image_metadata.get('latitude')
+        longitude = image_metadata.get('longitude')
+        timestamp = image_metadata.get('timestamp', None)
+        source = 'metadata'
+    else:
+        # EXIF에서 GPS 추출 시도
+        latitude, longitude = get_exif_gps_from_image(img_path)
+        source = 'EXIF'
+    
+    if latitude is not None and longitude is not None:
+        print(f"[{img_name}] GPS from {source}: {latitude:.6f}, {longitude:.6f}")
+    elif options.get('allow_no_gps'):
+        # 위치 없음 목록으로 분리 (지도에는 표시하지 않음)
+        latitude = longitude = None
+        print(f"[{img_name}] No GPS data, routed to no-map list")
+    else:
+        print(f"[{img_name}] Warning: No GPS data found, skipping...")
+        return result
+    
+    # 결과 이미지 저장
+    output_name = img_name.replace('.png', '.jpg').replace('.PNG', '.jpg')
+    output_path = os.path.join(options['output_dir'], output_name)
+    
+    # 시각화 (출력 해상도에서 오버레이/박스/라벨 렌더링, 비율 유지)
+    rendered = render_crack_detection(
+        mmcv.imread(img_path) if image is None else image, crack_mask, crack_real_size_results,
+        output_size=options['output_size'],
+        color=CONFIG['CRACK_COLOR'],
+        alpha=CONFIG['VISUALIZATION_ALPHA']
+    )
+    
+    # JPG로 저장 (임시 파일에 쓴 뒤 교체하여 중단 시에도 불완전한 이미지가 남지 않음)
+    atomic_imwrite(output_path, rendered, [cv2.IMWRITE_JPEG_QUALITY, 85])
     
-    return filtered_results
+    print(f"[{img_name}] Saved to: {output_path}")
+    
+    result.update({
+        'output_name': output_name,
+        'latitude': latitude,
+        'longitude': longitude,
+        'timestamp': timestamp,
+        'detection': summarize_detection(output_name, crack_real_size_results, latitude, longitude, timestamp),
+    })
+    
+    return result
 
 
-def visualize_crack_detection(seg_result, crack_mask, color=None, alpha=None):
-    """크랙 탐지 결과를 빨간색 오버레이로 시각화"""
-    if color is None:
-        color = CONFIG['CRACK_COLOR']
-    if alpha is None:
-        alpha = CONFIG['VISUALIZATION_ALPHA']
+def summarize_detection(output_name, crack_real_size_results, latitude=None, longitude=None, timestamp=None):
+    """
+    이미지 한 장의 탐지 결과 요약 (Excel/요약 CSV 한 행)
     
-    mask_bool = crack_mask == 1
-    color_array = np.array(color, dtype=np.uint8)
+    평균 균열 폭은 모든 균열의 평균 폭의 평균, 최대 균열 폭은 모든 균열의 최대 폭 중 최댓값,
+    총 길이는 모든 균열 길이의 합입니다.
     
-    seg_result[mask_bool, :] = seg_result[mask_bool, :] * (1 - alpha) + color_array * alpha
+    Args:
+        output_name (str): 결과 이미지 이름
+        crack_real_size_results (list): convert_crack_to_real_size 결과 (비어 있지 않아야 함)
+        latitude (float): 위도
+        longitude (float): 경도
+        timestamp (str): 촬영 시간
     
-    return seg_result
+    Returns:
+        dict: 탐지 결과 행
+    """
+    avg_width_mm = np.mean([c[1] for c in crack_real_size_results])
+    max_width_mm = np.max([c[2] for c in crack_real_size_results])
+    total_length_mm = np.sum([c[3] for c in crack_real_size_results])
+    
+    return {
+        '위도': latitude,
+        '경도': longitude,
+        '이미지 경로': output_name,
+        '촬영시간': timestamp if timestamp else '',
+        '균열 개수': len(crack_real_size_results),
+        '평균 균열 폭(mm)': round(avg_width_mm, 2),
+        '최대 균열 폭(mm)': round(max_width_mm, 2),
+        '총 균열 길이(mm)': round(total_length_mm, 2),
+    }
 
 
 def main():
@@ -228,17 +453,50 @@ def main():
     parser.add_argument('--metadata_json', default='/home/user/PT/PyDracula/init/data/all_images_metadata.json', help='GPS 메타데이터 JSON 파일')
     parser.add_argument('--excel_output', default='/home/user/PT/PyDracula/init/data/data.xlsx', help='Excel 출력 파일 경로')
     parser.add_argument('--shooting_distance_mm', type=float, required=True, help='촬영거리 (mm 단위)')
+    parser.add_argument('--approx_factor', type=int, default=CONFIG['APPROX_QUANTIFICATION_FACTOR'], help='근사 정량화 축소 배율 (1 = 정밀 모드)')
+    parser.add_argument('--graph_output_dir', default=None, help='균열 골격 그래프(폴리라인) 저장 디렉토리 (지정 시 저장)')
+    parser.add_argument('--graph_format', default='npz', choices=['npz', 'geojson'], help='균열 그래프 저장 형식')
+    parser.add_argument('--summary_csv', default=None, help='이미지별 요약 CSV 경로 (처리 즉시 한 행씩 기록, 기본값: Excel 경로 기준 *.csv)')
+    parser.add_argument('--crack_table', default=None, help='균열별 상세 테이블 경로 (.parquet/.arrow, 기본값: Excel 경로 기준 *_균열상세.parquet)')
+    parser.add_argument('--crack_table_batch', type=int, default=16, help='균열 상세 테이블 기록 단위 (이미지 수)')
+    parser.add_argument('--num_workers', type=int, default=CONFIG['POSTPROCESS_WORKERS'], help='정량화/시각화 후처리 프로세스 수 (0 = 순차 처리)')
+    parser.add_argument('--prefetch', type=int, default=CONFIG['PREFETCH_IMAGES'], help='추론 중 미리 디코딩해 둘 이미지 수 (0 = 순차 처리)')
+    parser.add_argument('--output_size', type=int, default=CONFIG['OUTPUT_IMAGE_SIZE'], help='결과 이미지의 긴 변 길이 (픽셀, 비율 유지)')
+    parser.add_argument('--memory_budget', default=CONFIG['MEMORY_BUDGET'],
+                        help='이미지당 메모리 예산 (예: 16G, 넘을 것으로 추정되면 저메모리/희소/근사 경로로 전환)')
+    parser.add_argument('--manifest', default=None, help='진행 기록 파일 경로 (기본값: Excel 경로 기준 *_진행기록.jsonl)')
+    parser.add_argument('--resume', action='store_true', help='진행 기록에서 완료된 이미지를 건너뛰고 이어서 실행')
+    parser.add_argument('--no_gps_policy', default=CONFIG['NO_GPS_POLICY'], choices=NO_GPS_POLICIES,
+                        help='GPS 없는 이미지 처리 정책 (skip: 처리하지 않음, no_map: 마지막에 처리하여 위치 없음 목록으로 분리)')
+    parser.add_argument('--prescreen_report', default=None,
+                        help='초해상화 단계의 사전 선별 보고서 (skip 이미지 제외, 검증 표본의 놓친 비율 보고, 기본값: 입력 디렉토리의 prescreen_report.csv)')
+    parser.add_argument('--dedup_report', default=None,
+                        help='초해상화 단계의 중복 프레임 보고서 (제외된 프레임은 탐지하지 않음, 기본값: 입력 디렉토리의 dedup_report.csv)')
+    parser.add_argument('--cache_dir', default=CONFIG['ARTIFACT_CACHE_DIR'], help='산출물 캐시 디렉토리 (균열 마스크, 측정 레코드)')
+    parser.add_argument('--no_cache', action='store_true', help='산출물 캐시 사용 안 함')
     
     args = parser.parse_args()
     
+    try:
+        check_approx_factor(args.approx_factor)
+    except ValueError as e:
+        parser.error(str(e))
+    
     # 픽셀→mm 변환 비율 계산
     pixel_to_mm = calculate_pixel_to_mm(args.shooting_distance_mm, CONFIG)
     print(f"\nPixel to mm conversion rate: {pixel_to_mm:.6f} mm/pixel")
     print(f"Shooting distance: {args.shooting_distance_mm/1000:.2f}m ({args.shooting_distance_mm}mm)")
     print(f"Super-resolution scale: {CONFIG['SUPER_RESOLUTION_SCALE']}x")
     
+    # 이미지당 메모리 예산 (None이면 제한 없음)
+    memory_budget = parse_memory_size(args.memory_budget) if args.memory_budget else None
+    if memory_budget is not None:
+        print(f"Memory budget per image: {format_bytes(memory_budget)}")
+    
     # 출력 디렉토리 생성
     os.makedirs(args.output_dir, exist_ok=True)
+    if args.graph_output_dir:
+        os.makedirs(args.graph_output_dir, exist_ok=True)
     
     print("="*60)
     print("Crack Detection for Prototyping Examples")
@@ -258,148 +516,282 @@ def main():
     crack_model = init_model(args.crack_config, args.crack_checkpoint, device='cuda:0')
     print("Model initialized successfully")
     
+    # 산출물 캐시 (입력 이미지 + 모델 + 관련 설정이 같으면 마스크/측정 레코드 재사용)
+    cache = None
+    if CONFIG['USE_ARTIFACT_CACHE'] and not args.no_cache:
+        cache = ArtifactCache.from_config(args.cache_dir)
+        crack_model_key = model_fingerprint(args.crack_config, args.crack_checkpoint)
+        print(f"Artifact cache: {args.cache_dir}")
+    
     # 입력 이미지 리스트
     img_list = glob(os.path.join(args.input_dir, '*.jpg')) + \
                glob(os.path.join(args.input_dir, '*.JPG')) + \
                glob(os.path.join(args.input_dir, '*.png'))
     
-    print(f"\nFound {len(img_list)} images to process")
+    print(f"\nFound {len(img_list)} images")
+    
+    # 처리 계획 (GPS 없는 이미지는 추론 전에 건너뛰거나 위치 없음 목록으로 분리)
+    plan = plan_images(sorted(img_list), metadata_dict, args.no_gps_policy)
+    print_plan(plan, args.no_gps_policy)
+    no_map_images = {os.path.basename(p) for p in plan['no_map']}
+    
+    # 저해상도 사전 선별 결과 (균열 후보가 없어 초해상화하지 않은 이미지는 제외)
+    prescreen_report_path = args.prescreen_report or os.path.join(args.input_dir, 'prescreen_report.csv')
+    prescreen_rows = load_prescreen_report(prescreen_report_path) if os.path.exists(prescreen_report_path) else None
+    if prescreen_rows is not None:
+        prescreen_skipped = {row['image_name'] for row in prescreen_rows if row['decision'] == 'skip'}
+        plan['process'] = [p for p in plan['process'] if os.path.basename(p) not in prescreen_skipped]
+        print_prescreen_summary(prescreen_rows)
     
-    # 탐지 결과 저장용 리스트
-    detection_results = []
+    # 중복 프레임 제거 결과 (예전 실행의 초해상화 이미지가 남아 있어도 제외된 프레임은 탐지하지 않음)
+    dedup_report_path = args.dedup_report or os.path.join(args.input_dir, 'dedup_report.csv')
+    if os.path.exists(dedup_report_path):
+        dedup_dropped = {row['dropped_image'] for row in load_dedup_report(dedup_report_path)}
+        plan['process'] = [p for p in plan['process'] if os.path.basename(p) not in dedup_dropped]
+        print(f"Near-duplicate frames excluded: {len(dedup_dropped)} (from {dedup_report_path})")
+    crack_counts = {}
+    
+    # 이미지별 진행 기록 (중단 후 --resume으로 이어서 실행)
+    manifest_path = args.manifest or os.path.splitext(args.excel_output)[0] + '_진행기록.jsonl'
+    manifest = RunManifest(manifest_path, resume=args.resume)
+    if args.resume:
+        print(f"Resuming from manifest: {manifest_path} ({len(manifest.done_images('detection'))} images done)")
+    
+    # 이미지별 요약 (처리 완료 즉시 CSV에 한 행씩 기록, 실행 중에도 열어볼 수 있음)
+    # 위치 없음 목록은 지도/Excel과 별도 파일, 재개 시에는 진행 기록의 결과로 처음부터 다시 씀
+    summary_csv_path = args.summary_csv or os.path.splitext(args.excel_output)[0] + '.csv'
+    detection_writer = DetectionSummaryWriter(summary_csv_path)
+    no_map_csv_path = os.path.splitext(summary_csv_path)[0] + '_위치없음.csv'
+    no_map_writer = DetectionSummaryWriter(no_map_csv_path) if no_map_images else None
+    print(f"Streaming detection results to: {summary_csv_path}")
+    
+    # 균열별 상세 테이블 (이미지 처리 완료 시마다 배치 단위로 추가 기록)
+    crack_table_path = args.crack_table or os.path.splitext(args.excel_output)[0] + '_균열상세.parquet'
+    crack_detail_writer = CrackDetailWriter(crack_table_path, batch_size=args.crack_table_batch)
+    
+    # 후처리 옵션 (프로세스 풀로 전달되므로 pickle 가능한 값만 사용)
+    postprocess_options = {
+        'approx_factor': args.approx_factor,
+        'low_memory': CONFIG['LOW_MEMORY_MODE'],
+        'output_dir': args.output_dir,
+        'output_size': args.output_size,
+        'graph_output_dir': args.graph_output_dir,
+        'graph_format': args.graph_format,
+        'allow_no_gps': args.no_gps_policy == 'no_map',
+    }
+    
+    # CPU 후처리용 프로세스 풀 (0이면 메인 프로세스에서 순차 처리)
+    # CUDA가 초기화된 프로세스를 fork하지 않도록 spawn 사용
+    executor = None
+    if args.num_workers > 0:
+        executor = ProcessPoolExecutor(max_workers=args.num_workers, mp_context=mp.get_context('spawn'))
+        print(f"Post-processing with {args.num_workers} worker processes")
+    
+    # 제출 순서대로 결과를 수집하여 출력 순서를 결정적으로 유지
+    pending = deque()
+    
+    def collect_result(img_name, postprocess_result, resumed=False, records_key=None):
+        """후처리 결과를 진행 기록, 캐시, 요약 CSV, 균열 상세 테이블에 반영"""
+        try:
+            result = postprocess_result.result() if isinstance(postprocess_result, Future) else postprocess_result
+        except Exception as e:
+            print(f"Error ({img_name}): {e}")
+            manifest.mark_failed(img_name, 'detection', e)
+            return
+        
+        # 결과 이미지까지 저장된 뒤 완료로 기록 (재개 시 건너뜀)
+        if not resumed:
+            manifest.mark_done(img_name, 'detection', result)
+        
+        # 픽셀 단위 측정 레코드 캐시 (하위 설정만 바꾼 재실행 시 정량화 생략)
+        if records_key is not None:
+            cache.save_records(records_key, result['crack_quantification_results'])
+        
+        # 사전 선별 검증용 (전체 해상도에서 탐지된 균열 수)
+        crack_counts[img_name] = len(result['crack_real_size_results'])
+        
+        if result['detection'] is None:
+            return
+        
+        # 탐지 결과 추가
+        if img_name in no_map_images:
+            no_map_writer.append(result['detection'])
+        else:
+            detection_writer.append(result['detection'])
+        
+        # 균열별 상세 행 추가
+        crack_detail_writer.append(
+            result['output_name'], result['crack_real_size_results'],
+            latitude=result['latitude'], longitude=result['longitude'],
+            timestamp=str(result['timestamp']) if result['timestamp'] else None
+        )
+    
+    def prepare_image(img_path):
+        """디코딩 단계 (prefetch 스레드에서 실행): 메모리 예산 계획 후 파일을 한 번만 읽어 디코딩"""
+        img_name = os.path.basename(img_path)
+        
+        # 재개 시 완료된 이미지는 디코딩하지 않음
+        if args.resume and manifest.is_done(img_name, 'detection'):
+            return None
+        
+        # 메모리 예산 계획 (헤더의 이미지 크기로 추정, 디코딩 전에 확인)
+        memory_mode = configured_mode(args.approx_factor)
+        if memory_budget is not None:
+            height, width = image_dimensions(img_path)
+            memory_plan = plan_memory(height, width, memory_budget, memory_mode, output_size=args.output_size)
+            check_memory_plan(img_name, memory_plan, memory_budget)
+            memory_mode = memory_plan['mode']
+        
+        # 추론, 시각화, GPS 조회, 캐시 키가 모두 이 디코딩 결과를 사용
+        return memory_mode, load_image(img_path, metadata_dict)
+    
+    def is_ready(postprocess_result):
+        return not isinstance(postprocess_result, Future) or postprocess_result.done()
     
     # 각 이미지에 대해 처리
-    for idx, img_path in enumerate(sorted(img_list)):
+    # 디코딩(스레드) → 추론(메인) → 후처리(프로세스 풀) → 기록(메인)을 겹쳐 실행, 단계 사이 대기열 크기 제한
+    start_time = time.perf_counter()
+    processed_count = 0
+    timer = StageTimer()
+    prepared_images = timed(prefetch(prepare_image, plan['process'], depth=args.prefetch), timer, 'decode wait')
+    
+    for idx, (img_path, prepared, error) in enumerate(prepared_images):
         img_name = os.path.basename(img_path)
-        print(f"\n[{idx+1}/{len(img_list)}] Processing: {img_name}")
+        print(f"\n[{idx+1}/{len(plan['process'])}] Processing: {img_name}")
+        
+        # 재개 시 완료된 이미지는 기록된 결과를 그대로 사용
+        if prepared is None and error is None:
+            print(f"Already processed, skipping (resume)")
+            pending.append((img_name, manifest.get_record(img_name, 'detection'), True))
+            continue
         
         try:
-            # 크랙 탐지 수행
-            _, crack_mask = inference_segmentor_sliding_window(
-                crack_model, img_path,
-                color_mask=None,
-                score_thr=CONFIG['SCORE_THRESHOLD'],
-                window_size=CONFIG['WINDOW_SIZE'],
-                overlap_ratio=CONFIG['OVERLAP_RATIO']
-            )
-            
-            # 원본 이미지 로드
-            seg_result = mmcv.imread(img_path)
+            if error is not None:
+                raise error
+            memory_mode, decoded = prepared
+            height, width = decoded.image.shape[:2]
             
-            # 크랙 정량화 (픽셀 단위)
-            seg_result_with_annotation, crack_quantification_results = quantify_crack_width_length(
-                seg_result.copy(), crack_mask, CONFIG['CRACK_COLOR']
-            )
+            # 캐시 조회 (키: 입력 이미지 해시, 모델 해시, 마스크/측정에 영향을 주는 설정)
+            crack_mask = None
+            cached_records = None
+            records_key = None
+            if cache is not None:
+                mask_key = make_key(decoded.content_hash, crack_model_key, segmentation_config())
+                records_key = make_key(mask_key, quantification_config(memory_mode))
+                crack_mask = cache.load_mask(mask_key, sparse=memory_mode['sparse'])
+                cached_records = cache.load_records(records_key)
+                if cached_records is not None:
+                    records_key = None
             
-            print(f"Detected: {len(crack_quantification_results)} cracks (pixel units)")
-            
-            # 실제 크기로 변환 (mm 단위)
-            crack_real_size_results = convert_crack_to_real_size(
-                crack_quantification_results, 
-                pixel_to_mm
-            )
-            
-            print(f"Converted to real size: {len(crack_real_size_results)} cracks")
-            
-            # 크기 필터링 (실제 크기 기준)
-            # crack_real_size_results 구조: [coordinates, avg_width_mm, max_width_mm, length_mm, measurement_str, class_id]
-            filtered_cracks = [
-                crack for crack in crack_real_size_results
-                if crack[1] >= CONFIG['MIN_CRACK_WIDTH'] and crack[3] >= CONFIG['MIN_CRACK_LENGTH']
-            ]
+            if crack_mask is None:
+                # 크랙 탐지 수행
+                with timer.measure('inference'):
+                    _, crack_mask = inference_segmentor_sliding_window(
+                        crack_model, decoded.image,
+                        color_mask=None,
+                        score_thr=CONFIG['SCORE_THRESHOLD'],
+                        window_size=CONFIG['WINDOW_SIZE'],
+                        overlap_ratio=CONFIG['OVERLAP_RATIO'],
+                        return_sparse=memory_mode['sparse']
+                    )
+                    
+                    # GPU 메모리 정리
+                    empty_cache()
+                
+                if cache is not None:
+                    cache.save_mask(mask_key, crack_mask)
+            else:
+                print(f"Using cached crack mask")
             
-            print(f"After filtering: {len(filtered_cracks)} cracks")
+            # 실제 균열 픽셀 수로 정량화 경로 재계획 (경로가 바뀌면 측정 레코드 캐시 키도 바뀜)
+            image_options = postprocess_options
+            if memory_budget is not None:
+                memory_plan = plan_memory(height, width, memory_budget, memory_mode,
+                                          crack_pixels=count_crack_pixels(crack_mask), output_size=args.output_size)
+                check_memory_plan(img_name, memory_plan, memory_budget)
+                crack_mask, image_options = apply_memory_plan(crack_mask, postprocess_options, memory_plan['mode'])
+                if cache is not None and memory_plan['mode'] != memory_mode:
+                    records_key = make_key(mask_key, quantification_config(memory_plan['mode']))
+                    cached_records = cache.load_records(records_key)
+                    if cached_records is not None:
+                        records_key = None
             
-            # 균열이 탐지되면 저장
-            has_cracks = len(crack_real_size_results) > 0
+            # 시각화에는 출력 해상도 이미지만 필요하므로 여기서 축소하고 원본 버퍼는 해제
+            # (워커에 원본 해상도 배열을 넘기거나 워커가 파일을 다시 디코딩하지 않도록)
+            out_h, out_w = get_output_shape(decoded.image.shape, args.output_size)
+            preview = cv2.resize(decoded.image, (out_w, out_h), interpolation=cv2.INTER_AREA)
+            image_metadata = decoded.metadata()
+            decoded.image = None
             
-            if has_cracks:
-                # GPS 정보 및 촬영 시간 가져오기
-                timestamp = None
-                if img_name in metadata_dict:
-                    latitude = metadata_dict[img_name]['latitude']
-                    longitude = metadata_dict[img_name]['longitude']
-                    timestamp = metadata_dict[img_name].get('timestamp', None)
-                    print(f"GPS from metadata: {latitude:.6f}, {longitude:.6f}")
-                    if timestamp:
-                        print(f"Timestamp: {timestamp}")
-                else:
-                    # EXIF에서 GPS 추출 시도
-                    latitude, longitude = get_exif_gps_from_image(img_path)
-                    if latitude and longitude:
-                        print(f"GPS from EXIF: {latitude:.6f}, {longitude:.6f}")
-                    else:
-                        print(f"Warning: No GPS data found, skipping...")
-                        continue
-                
-                # 결과 이미지 저장
-                output_name = img_name.replace('.png', '.jpg').replace('.PNG', '.jpg')
-                output_path = os.path.join(args.output_dir, output_name)
-                
-                # 시각화
-                visualized_image = visualize_crack_detection(
-                    seg_result.copy(), crack_mask,
-                    color=CONFIG['CRACK_COLOR'],
-                    alpha=CONFIG['VISUALIZATION_ALPHA']
-                )
-                
-                # JPG로 저장 (400x400 리사이즈)
-                resized = cv2.resize(visualized_image, (400, 400), interpolation=cv2.INTER_AREA)
-                cv2.imwrite(output_path, resized, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                
-                print(f"Saved to: {output_path}")
-                
-                # 균열 정보 수집
-                # crack_real_size_results 구조: [coordinates, avg_width_mm, max_width_mm, length_mm, measurement_str, class_id]
-                if crack_real_size_results:
-                    crack_count = len(crack_real_size_results)
-                    
-                    # 평균 균열 폭 (모든 균열의 평균 폭의 평균)
-                    avg_width_mm = np.mean([c[1] for c in crack_real_size_results])
-                    
-                    # 최대 균열 폭 (모든 균열의 최대 폭 중 최댓값)
-                    max_width_mm = np.max([c[2] for c in crack_real_size_results])
-                    
-                    # 총 길이 (모든 균열 길이의 합)
-                    total_length_mm = np.sum([c[3] for c in crack_real_size_results])
-                else:
-                    avg_width_mm = 0
-                    max_width_mm = 0
-                    total_length_mm = 0
-                    crack_count = 0
-                
-                # 탐지 결과 추가
-                detection_results.append({
-                    '위도': latitude,
-                    '경도': longitude,
-                    '이미지 경로': output_name,
-                    '촬영시간': timestamp if timestamp else '',
-                    '균열 개수': crack_count,
-                    '평균 균열 폭(mm)': round(avg_width_mm, 2),
-                    '최대 균열 폭(mm)': round(max_width_mm, 2),
-                    '총 균열 길이(mm)': round(total_length_mm, 2),
-                })
+            # 정량화/시각화/저장은 워커에 넘기고 다음 이미지 추론 진행
+            if executor is not None:
+                postprocess_result = executor.submit(
+                    postprocess_crack_image, img_path, crack_mask, image_metadata, pixel_to_mm, image_options,
+                    image=preview, crack_quantification_results=cached_records)
             else:
-                print(f"No significant cracks detected")
+                postprocess_result = postprocess_crack_image(
+                    img_path, crack_mask, image_metadata, pixel_to_mm, image_options,
+                    image=preview, crack_quantification_results=cached_records)
+            pending.append((img_name, postprocess_result, False, records_key))
+            processed_count += 1
             
-            # GPU 메모리 정리
-            empty_cache()
+            # 대용량 중간 배열 즉시 해제
+            del crack_mask, decoded, preview
             
         except Exception as e:
             print(f"Error: {e}")
             import traceback
             traceback.print_exc()
-            continue
+            manifest.mark_failed(img_name, 'detection', e)
+        
+        # 완료된 후처리 결과는 바로 기록하고, 대기 중인 마스크 수가 상한을 넘으면 가장 오래된 결과를 기다림
+        # (back-pressure, 제출 순서대로 수집하여 출력 순서를 결정적으로 유지)
+        while pending and (is_ready(pending[0][1]) or len(pending) > max(args.num_workers, 0)):
+            with timer.measure('postprocess wait'):
+                collect_result(*pending.popleft())
+    
+    # 남은 후처리 결과 수집
+    with timer.measure('postprocess wait'):
+        while pending:
+            collect_result(*pending.popleft())
+    
+    if executor is not None:
+        executor.shutdown()
+    
+    # 단계별 시간 (추론 비율이 낮으면 디코딩/후처리가 병목)
+    timer.report()
     
-    # Excel 파일로 저장
-    if detection_results:
-        df = pd.DataFrame(detection_results)
-        df.to_excel(args.excel_output, index=False, engine='openpyxl')
+    # 건너뛴 이미지로 절약된 연산 시간
+    print_compute_saved(plan, time.perf_counter() - start_time, processed_count)
+    
+    # 사전 선별 검증 (균열 후보가 없었지만 전체 처리한 표본 중 균열이 탐지된 비율)
+    if prescreen_rows is not None:
+        print_audit_summary(audit_prescreen(prescreen_rows, crack_counts))
+        prescreen_audit_path = os.path.splitext(args.excel_output)[0] + '_사전선별.csv'
+        write_prescreen_report(prescreen_rows, prescreen_audit_path, crack_counts)
+        print(f"Pre-screen decisions with detected crack counts saved to: {prescreen_audit_path}")
+    
+    # 균열 상세 테이블 마무리 (남은 배치 기록)
+    crack_detail_writer.close()
+    print(f"\nPer-crack table saved to: {crack_table_path} ({crack_detail_writer.num_rows} cracks)")
+    
+    # 요약 CSV를 Excel 파일로 변환 (임시 파일에 쓴 뒤 교체)
+    detection_writer.close()
+    if detection_writer.num_rows:
+        detection_writer.to_excel(args.excel_output)
         print(f"\nDetection results saved to Excel: {args.excel_output}")
-        print(f"Total images with cracks: {len(detection_results)}")
+        print(f"Total images with cracks: {detection_writer.num_rows}")
     else:
         print(f"\nWarning: No cracks detected in any images")
     
+    # 위치 없음 목록 (GPS 없는 이미지, 지도에는 표시하지 않음)
+    if no_map_writer is not None:
+        no_map_writer.close()
+        if no_map_writer.num_rows:
+            no_map_output = os.path.splitext(args.excel_output)[0] + '_위치없음.xlsx'
+            no_map_writer.to_excel(no_map_output)
+            print(f"No-GPS detection results saved to: {no_map_output} ({no_map_writer.num_rows} images)")
+    
     print("\n" + "="*60)
     print("Crack Detection Complete!")
     print("="*60)
@@ -1,22 +1,44 @@
+import warnings
+
 import numpy as np 
 import cv2
 
+from scipy import ndimage
 from skimage.measure import label, regionprops_table
 from skimage.morphology import medial_axis
 
-def connect_cracks_by_edge(mask_output, epsilon = 5000000):
+from sparse_mask import SparseCrackMask, label_sparse_mask, rasterize_lines
+
+
+# Largest approximate quantification factor. calibrate_approximate_quantification.py (60 synthetic cracks):
+# factor 2 and 4 keep the length within ~4% (p90) / 12% (max), factor 8 reaches 18% max length error
+# with no better width error, so it is not accepted. Widths are triage-grade at any factor > 1
+# (max-width p90 ~25-50%, see README).
+MAX_APPROX_FACTOR = 4
+
+
+def check_approx_factor(approx_factor):
     """
-    Connect the edges of adjacent cracks
+    Validate the approximate quantification factor.
     Args:
-        mask_output (ndarray): The result mask. The shape is (H, W).
-    Returns:
-        mask_output (ndarray): The result mask. The shape is (H, W).
+        approx_factor (int): 1 (exact) to MAX_APPROX_FACTOR.
+    Raises:
+        ValueError: If the factor is outside the calibrated range.
     """
+    if not isinstance(approx_factor, (int, np.integer)) or not 1 <= approx_factor <= MAX_APPROX_FACTOR:
+        raise ValueError(f"approx_factor must be an integer from 1 to {MAX_APPROX_FACTOR}, got {approx_factor} "
+                         f"(larger factors are outside the calibrated error range)")
 
-    # label each crack
-    labels, num = label(mask_output, connectivity=2, return_num=True)
-    # get information of each crack area
-    crack_region_table = regionprops_table(labels, properties=('label', 'bbox', 'coords', 'orientation'))
+
+def _find_connecting_lines(crack_region_table, epsilon):
+    """
+    Find the lines connecting the edges of adjacent cracks
+    Args:
+        crack_region_table (dict): Region table with 'label', 'bbox-0' ~ 'bbox-3' and 'coords' (raster order).
+        epsilon (float): The maximum distance between connected edges.
+    Returns:
+        connect_lines (list): [(e2, e1), ...] end points of each connecting line in (x, y) order.
+    """
 
     width = crack_region_table['bbox-3'] - crack_region_table['bbox-1']
     height = crack_region_table['bbox-2'] - crack_region_table['bbox-0']
@@ -24,7 +46,7 @@ def connect_cracks_by_edge(mask_output, epsilon = 5000000):
     crack_region_table['is_horizontal'] = width > height
 
     connecting_directions = ['x_axis', 'y_axis']
-    connect_line_img = np.zeros_like(mask_output, dtype=np.uint8)
+    connect_lines = []
 
     for connecting_direction in connecting_directions:
 
@@ -68,10 +90,6 @@ def connect_cracks_by_edge(mask_output, epsilon = 5000000):
         crack_region_table['e1'] = e1_list
 
 
-        n = len(crack_region_table['label'])
-        color = (1)  # binary image
-
-
         for num_e2, e2 in enumerate(crack_region_table['e2']):
 
             connect_candidates_e2 = []
@@ -91,9 +109,112 @@ def connect_cracks_by_edge(mask_output, epsilon = 5000000):
 
             if distance_list :
                 connect_idx = np.argmin(distance_list)
-                connect_e2 = connect_candidates_e2[connect_idx]
-                connect_e1 = connect_candidates_e1[connect_idx]
-                connect_line_img = cv2.line(connect_line_img, connect_e2, connect_e1, color, 8)
+                connect_lines.append((connect_candidates_e2[connect_idx], connect_candidates_e1[connect_idx]))
+
+    return connect_lines
+
+
+def _sparse_region_table(sparse_mask, labels, num):
+    """
+    Build a regionprops-like table (label, bbox, coords) from a labeled sparse mask
+    Args:
+        sparse_mask (SparseCrackMask): The sparse mask.
+        labels (ndarray): Label of each foreground pixel (from label_sparse_mask).
+        num (int): The number of labels.
+    Returns:
+        crack_region_table (dict): Same keys as regionprops_table with properties ('label', 'bbox', 'coords').
+    """
+
+    # stable sort keeps raster order of coords inside each label
+    order = np.argsort(labels, kind='stable')
+    split_at = np.cumsum(np.bincount(labels, minlength=num + 1)[1:])[:-1]
+    coords = np.stack([sparse_mask.rows, sparse_mask.cols], axis=1)[order]
+
+    min_row = np.full(num, sparse_mask.shape[0], dtype=np.int64)
+    min_col = np.full(num, sparse_mask.shape[1], dtype=np.int64)
+    max_row = np.zeros(num, dtype=np.int64)
+    max_col = np.zeros(num, dtype=np.int64)
+    np.minimum.at(min_row, labels - 1, sparse_mask.rows)
+    np.minimum.at(min_col, labels - 1, sparse_mask.cols)
+    np.maximum.at(max_row, labels - 1, sparse_mask.rows + 1)
+    np.maximum.at(max_col, labels - 1, sparse_mask.cols + 1)
+
+    return {
+        'label': np.arange(1, num + 1),
+        'bbox-0': min_row,
+        'bbox-1': min_col,
+        'bbox-2': max_row,
+        'bbox-3': max_col,
+        'coords': np.split(coords, split_at) if num else [],
+    }
+
+
+def _label_int32(mask):
+    """
+    Label 8-connected components into an int32 label image (skimage returns int64)
+    Args:
+        mask (ndarray): The mask image. The shape is (H, W).
+    Returns:
+        labels (ndarray): int32 label image. The shape is (H, W).
+        num (int): The number of labels.
+    """
+
+    labels = np.empty(mask.shape, dtype=np.int32)
+    num = ndimage.label(mask, structure=np.ones((3, 3), dtype=bool), output=labels)
+
+    return labels, num
+
+
+def connect_cracks_by_edge(mask_output, epsilon = 5000000, low_memory=False, thickness=8):
+    """
+    Connect the edges of adjacent cracks
+    Args:
+        mask_output (ndarray or SparseCrackMask): The result mask. The shape is (H, W).
+        thickness (int): The thickness of the connecting lines.
+        low_memory (bool): Use int32 labels and merge the connecting lines into mask_output in place
+            instead of allocating a full-frame line image. mask_output is modified.
+    Returns:
+        mask_output (ndarray or SparseCrackMask): The result mask. The shape is (H, W).
+    """
+
+    if isinstance(mask_output, SparseCrackMask):
+        labels, num = label_sparse_mask(mask_output)
+        crack_region_table = _sparse_region_table(mask_output, labels, num)
+        connect_lines = _find_connecting_lines(crack_region_table, epsilon)
+
+        return mask_output.union(rasterize_lines(mask_output.shape, connect_lines, thickness))
+
+    # label each crack
+    if low_memory:
+        labels, num = _label_int32(mask_output)
+    else:
+        labels, num = label(mask_output, connectivity=2, return_num=True)
+    # get information of each crack area
+    crack_region_table = regionprops_table(labels, properties=('label', 'bbox', 'coords'))
+    del labels
+
+    connect_lines = _find_connecting_lines(crack_region_table, epsilon)
+    color = (1)  # binary image
+
+    if low_memory:
+        # draw straight into the mask (a bool mask is viewed as uint8 0/1) == in-place logical_or
+        if mask_output.dtype in (np.bool_, np.uint8) and mask_output.flags['C_CONTIGUOUS']:
+            canvas = mask_output.view(np.uint8)
+            for connect_e2, connect_e1 in connect_lines:
+                cv2.line(canvas, connect_e2, connect_e1, color, thickness)
+        else:
+            connect_line_img = np.zeros(mask_output.shape, dtype=np.uint8)
+            for connect_e2, connect_e1 in connect_lines:
+                cv2.line(connect_line_img, connect_e2, connect_e1, color, thickness)
+            np.logical_or(mask_output, connect_line_img, out=mask_output, casting='unsafe')
+            del connect_line_img
+
+        return mask_output
+
+    connect_line_img = np.zeros_like(mask_output, dtype=np.uint8)
+
+    for connect_e2, connect_e1 in connect_lines:
+        connect_line_img = cv2.line(connect_line_img, connect_e2, connect_e1, color, thickness)
 
     mask_output = mask_output + connect_line_img
     mask_output[mask_output > 1] = 1
@@ -101,21 +222,94 @@ def connect_cracks_by_edge(mask_output, epsilon = 5000000):
     return mask_output
 
 
-def create_distance_map(mask):
+def create_distance_map(mask, low_memory=False):
     """
     Create distance map from mask
     Args:
-        mask (ndarray): The mask image. The shape is (H, W).
+        mask (ndarray or SparseCrackMask): The mask image. The shape is (H, W).
+        low_memory (bool): Return float32 distances, computed crack by crack so no full-frame
+            float64 intermediates are allocated.
     Returns:
-        distance_map (ndarray): The distance map. The shape is (H, W).
+        distance_map (ndarray or SparseCrackMask): The distance map. The shape is (H, W).
+            For a sparse mask, only skeleton pixels are kept with their distance as values.
     """
 
+    if isinstance(mask, SparseCrackMask):
+        return _create_sparse_distance_map(mask, low_memory)
+
+    if low_memory:
+        # run the medial axis per crack bounding box so its float64 internals stay crack-sized
+        labels, _ = _label_int32(mask)
+        distance_map = np.zeros(mask.shape, dtype=np.float32)
+
+        for crack_num, crack_slice in enumerate(ndimage.find_objects(labels)):
+            if crack_slice is None:
+                continue
+
+            # 1-pixel background border so the medial axis sees the crack edges
+            padded_slice = tuple(
+                slice(max(s.start - 1, 0), min(s.stop + 1, size)) for s, size in zip(crack_slice, mask.shape))
+            crop = labels[padded_slice] == crack_num + 1
+
+            skel, dist = medial_axis(crop, return_distance=True)
+            distance_map[padded_slice][skel] = dist[skel]
+
+        del labels
+
+        return distance_map
+
     dist, skel = medial_axis(mask, return_distance=True)
     distance_map = dist * skel
 
     return distance_map
 
 
+def _create_sparse_distance_map(sparse_mask, low_memory=False):
+    """
+    Create a sparse distance map by running the medial axis on each crack's bounding box only
+    Args:
+        sparse_mask (SparseCrackMask): The sparse mask.
+        low_memory (bool): Store the distances as float32.
+    Returns:
+        distance_map (SparseCrackMask): Skeleton pixels with their distance as values.
+    """
+
+    labels, num = label_sparse_mask(sparse_mask)
+    crack_region_table = _sparse_region_table(sparse_mask, labels, num)
+
+    rows_list = []
+    cols_list = []
+    dist_list = []
+
+    for crack_num in range(num):
+        coords = crack_region_table['coords'][crack_num]
+        bbox = [crack_region_table[f'bbox-{i}'][crack_num] for i in range(4)]
+
+        # 1-pixel background border so the medial axis sees the crack edges
+        min_row = max(bbox[0] - 1, 0)
+        min_col = max(bbox[1] - 1, 0)
+        max_row = min(bbox[2] + 1, sparse_mask.shape[0])
+        max_col = min(bbox[3] + 1, sparse_mask.shape[1])
+
+        crop = np.zeros((max_row - min_row, max_col - min_col), dtype=bool)
+        crop[coords[:, 0] - min_row, coords[:, 1] - min_col] = True
+
+        skel, dist = medial_axis(crop, return_distance=True)
+        skel_rows, skel_cols = np.nonzero(skel)
+
+        rows_list.append(skel_rows + min_row)
+        cols_list.append(skel_cols + min_col)
+        dist_list.append(dist[skel_rows, skel_cols].astype(np.float32 if low_memory else np.float64))
+
+    if not rows_list:
+        return SparseCrackMask(sparse_mask.shape, [], [], np.empty(0, dtype=np.float64))
+
+    return SparseCrackMask(sparse_mask.shape,
+                           np.concatenate(rows_list),
+                           np.concatenate(cols_list),
+                           np.concatenate(dist_list))
+
+
 def _calculate_crack_width_length(crack_mask, distance_map):
     """
     Calculate crack width and length
@@ -138,25 +332,36 @@ def _calculate_crack_width_length(crack_mask, distance_map):
 
 
 
-def quantify_crack_width_length(seg_result, mask_output, color, minimum_area=500, line_thickness=2):
+def _skeleton_crack_index(skeleton_labels, crack_labels, num):
     """
-    Quantify crack width and length. The word 'quantify' means to calculate the crack width and length and visualize them one the segmentation result image. 
-    
+    Map the merged-crack label of each skeleton pixel to the index of its measurement.
     Args:
-        seg_result (ndarray): The segmentation result. The shape is (H, W, C).
-        mask_output (ndarray): The crack mask image. The shape is (H, W).
-        color (tuple): The color of the crack width and length. The shape is (3,).
-        minimum_area (int): The minimum crack area. The default value is 500.
-        line_thickness (int): The thickness of the crack width and length. The default value is 2.
-        
+        skeleton_labels (ndarray): Merged-crack label of each skeleton pixel (raster order).
+        crack_labels (list): Label of each entry of crack_measurements.
+        num (int): Number of labels.
     Returns:
-        seg_result (ndarray): The segmentation result with crack measurements visualized
-        crack_quantification_results (list): List of crack quantification data
+        skeleton_crack_index (ndarray): Measurement index of each skeleton pixel, -1 for cracks that
+            were filtered out.
     """
 
-    # determine font scale and line thickness of text
-    font_scale = seg_result.shape[0] / 1000
-    font_thickness = int(line_thickness * font_scale)
+    label_to_index = np.full(num + 1, -1, dtype=np.int32)
+    label_to_index[np.asarray(crack_labels, dtype=np.int64)] = np.arange(len(crack_labels), dtype=np.int32)
+
+    return label_to_index[skeleton_labels]
+
+
+def _measure_dense_cracks(mask_output, minimum_area, skeleton_index=False):
+    """
+    Measure each connected crack of a dense mask
+    Args:
+        mask_output (ndarray): The crack mask image. The shape is (H, W).
+        minimum_area (int): The minimum crack area.
+        skeleton_index (bool): Also return the measurement index of each skeleton pixel.
+    Returns:
+        crack_measurements (list): [(minr, minc, maxr, maxc, width_avg, width_max, length, area), ...]
+        distance_map (ndarray or SparseCrackMask): The full resolution distance map.
+        skeleton_crack_index (ndarray or None): See _skeleton_crack_index (None unless skeleton_index).
+    """
 
     # create distance map
     distance_map = create_distance_map(mask_output)
@@ -167,14 +372,15 @@ def quantify_crack_width_length(seg_result, mask_output, color, minimum_area=500
     # regionprops_table
     crack_region_table = regionprops_table(mask_label)
 
-    # Initialize list to store crack quantification results
-    crack_quantification_results = []
+    crack_measurements = []
+    crack_labels = []
 
     # loop through each crack
     for crack_id in np.unique(mask_label)[1:]:
         crack_mask = mask_label == crack_id
+        crack_area = np.sum(crack_mask)
 
-        if np.sum(crack_mask) < minimum_area:
+        if crack_area < minimum_area:
             continue
 
         crack_width_avg, crack_width_max, crack_length = _calculate_crack_width_length(crack_mask, distance_map)
@@ -182,18 +388,306 @@ def quantify_crack_width_length(seg_result, mask_output, color, minimum_area=500
         # get crack x, y   
         crack_num = crack_id - 1
 
-        minr = crack_region_table['bbox-0'][crack_num]
-        minc = crack_region_table['bbox-1'][crack_num]
-        maxr = crack_region_table['bbox-2'][crack_num]
-        maxc = crack_region_table['bbox-3'][crack_num]
+        crack_measurements.append((
+            crack_region_table['bbox-0'][crack_num],
+            crack_region_table['bbox-1'][crack_num],
+            crack_region_table['bbox-2'][crack_num],
+            crack_region_table['bbox-3'][crack_num],
+            crack_width_avg, crack_width_max, crack_length, crack_area,
+        ))
+        crack_labels.append(crack_id)
+
+    skeleton_crack_index = None
+    if skeleton_index:
+        skeleton_crack_index = _skeleton_crack_index(mask_label[distance_map > 0], crack_labels, mask_label.max())
+
+    return crack_measurements, distance_map, skeleton_crack_index
+
+
+def _measure_dense_cracks_low_memory(mask_output, minimum_area, skeleton_index=False):
+    """
+    Measure each connected crack of a dense mask with compact dtypes. Distances are float32,
+    labels int32, endpoint lines are merged into a single bool working copy in place, each crack
+    is measured inside its own bounding box, and intermediates are freed as soon as possible.
+    Args:
+        mask_output (ndarray): The crack mask image. The shape is (H, W). Not modified.
+        minimum_area (int): The minimum crack area.
+        skeleton_index (bool): Also return the measurement index of each skeleton pixel.
+    Returns:
+        crack_measurements (list): [(minr, minc, maxr, maxc, width_avg, width_max, length, area), ...]
+        distance_map (ndarray or SparseCrackMask): The full resolution distance map.
+        skeleton_crack_index (ndarray or None): See _skeleton_crack_index (None unless skeleton_index).
+    """
+
+    # create distance map
+    distance_map = create_distance_map(mask_output, low_memory=True)
+
+    # label mask (the caller's mask stays untouched, lines go into one bool working copy)
+    merged_mask = np.array(mask_output, dtype=bool)
+    merged_mask = connect_cracks_by_edge(merged_mask, low_memory=True)
+    mask_label, num = _label_int32(merged_mask)
+    del merged_mask
+
+    crack_measurements = []
+    crack_labels = []
+
+    # loop through each crack
+    for crack_num, crack_slice in enumerate(ndimage.find_objects(mask_label)):
+        if crack_slice is None:
+            continue
+
+        crack_mask = mask_label[crack_slice] == crack_num + 1
+        crack_area = np.count_nonzero(crack_mask)
+
+        if crack_area < minimum_area:
+            continue
+
+        crack_distance = distance_map[crack_slice][crack_mask]
+        crack_distance = crack_distance[crack_distance > 0]
+
+        if crack_distance.size == 0:
+            continue
+
+        crack_measurements.append((
+            crack_slice[0].start,
+            crack_slice[1].start,
+            crack_slice[0].stop,
+            crack_slice[1].stop,
+            np.mean(crack_distance, dtype=np.float64), np.max(crack_distance), crack_distance.size, crack_area,
+        ))
+        crack_labels.append(crack_num + 1)
+
+    skeleton_crack_index = None
+    if skeleton_index:
+        skeleton_crack_index = _skeleton_crack_index(mask_label[distance_map > 0], crack_labels, num)
+
+    del mask_label
+
+    return crack_measurements, distance_map, skeleton_crack_index
+
+
+def _measure_sparse_cracks(sparse_mask, minimum_area, low_memory=False, skeleton_index=False):
+    """
+    Measure each connected crack of a sparse mask. Same results as the dense path,
+    but the cost scales with the number of crack pixels instead of image pixels.
+    Args:
+        sparse_mask (SparseCrackMask): The crack mask.
+        minimum_area (int): The minimum crack area.
+        low_memory (bool): Store skeleton distances as float32.
+        skeleton_index (bool): Also return the measurement index of each skeleton pixel.
+    Returns:
+        crack_measurements (list): [(minr, minc, maxr, maxc, width_avg, width_max, length, area), ...]
+        distance_map (ndarray or SparseCrackMask): The full resolution distance map.
+        skeleton_crack_index (ndarray or None): See _skeleton_crack_index (None unless skeleton_index).
+    """
+
+    distance_map = create_distance_map(sparse_mask, low_memory)
+
+    merged_mask = connect_cracks_by_edge(sparse_mask)
+    labels, num = label_sparse_mask(merged_mask)
+    crack_region_table = _sparse_region_table(merged_mask, labels, num)
+    area = np.bincount(labels, minlength=num + 1)
+
+    # every skeleton pixel lies inside the merged mask
+    positive = distance_map.values > 0
+    skel_labels = labels[merged_mask.lookup(distance_map.rows[positive], distance_map.cols[positive])]
+    skel_values = distance_map.values[positive]
+
+    width_sum = np.bincount(skel_labels, weights=skel_values, minlength=num + 1)
+    crack_length = np.bincount(skel_labels, minlength=num + 1)
+    width_max = np.zeros(num + 1, dtype=np.float64)
+    np.maximum.at(width_max, skel_labels, skel_values)
+
+    crack_measurements = []
+    crack_labels = []
+
+    for crack_id in range(1, num + 1):
+        if area[crack_id] < minimum_area or crack_length[crack_id] == 0:
+            continue
+
+        crack_num = crack_id - 1
+
+        crack_measurements.append((
+            crack_region_table['bbox-0'][crack_num],
+            crack_region_table['bbox-1'][crack_num],
+            crack_region_table['bbox-2'][crack_num],
+            crack_region_table['bbox-3'][crack_num],
+            width_sum[crack_id] / crack_length[crack_id], width_max[crack_id], crack_length[crack_id], area[crack_id],
+        ))
+        crack_labels.append(crack_id)
+
+    skeleton_crack_index = None
+    if skeleton_index:
+        skeleton_crack_index = _skeleton_crack_index(skel_labels, crack_labels, num)
+
+    return crack_measurements, distance_map, skeleton_crack_index
+
+
+def downsample_crack_coverage(mask_output, factor):
+    """
+    Downsample a crack mask by an integer factor, counting crack pixels per block
+    Args:
+        mask_output (ndarray or SparseCrackMask): The crack mask image. The shape is (H, W).
+        factor (int): The downsampling factor.
+    Returns:
+        coverage (ndarray): Number of crack pixels in each factor x factor block.
+            The shape is (ceil(H / factor), ceil(W / factor)).
+    """
+
+    if isinstance(mask_output, SparseCrackMask):
+        rows, cols = mask_output.rows, mask_output.cols
+        height, width = mask_output.shape
+    else:
+        rows, cols = np.nonzero(mask_output)
+        height, width = mask_output.shape[:2]
+
+    out_h = -(-height // factor)
+    out_w = -(-width // factor)
+
+    block_index = (rows // factor).astype(np.int64) * out_w + cols // factor
+    coverage = np.bincount(block_index, minlength=out_h * out_w).reshape(out_h, out_w)
+
+    return coverage.astype(np.uint16 if factor < 256 else np.uint32)
+
+
+def _measure_approximate_cracks(mask_output, minimum_area, factor):
+    """
+    Measure cracks on a downsampled mask and correct the results back to full resolution.
+
+    Any block containing a crack pixel is kept so thin cracks stay connected. The medial axis then
+    runs on a mask factor^2 times smaller, and the scale change is corrected analytically from the
+    per-block crack pixel counts (area) and the skeleton (length):
+        length = skeleton_length * factor
+        avg    = max(area / (2 * length), 1)
+        max    = max(local_area / (2 * local_length) + 0.5, avg)
+    where local_* are taken in a window around each skeleton pixel a little wider than the crack.
+    Widths are radii, same convention as the medial-axis distance of the exact mode.
+    calibrate_approximate_quantification.py reports the error against the exact mode.
+    Args:
+        mask_output (ndarray or SparseCrackMask): The crack mask image. The shape is (H, W).
+        minimum_area (int): The minimum crack area (full resolution pixels).
+        factor (int): The downsampling factor.
+    Returns:
+        crack_measurements (list): [(minr, minc, maxr, maxc, width_avg, width_max, length, area), ...]
+        distance_map (None): No full resolution distance map exists in this mode.
+    """
+
+    height, width = mask_output.shape[:2]
+
+    coverage = downsample_crack_coverage(mask_output, factor)
+    small_mask = coverage > 0
+
+    distance_map = create_distance_map(small_mask)
+
+    merged_mask = connect_cracks_by_edge(small_mask.astype(np.uint8), thickness=max(8 // factor, 1))
+    mask_label, num = _label_int32(merged_mask)
+    del merged_mask
+
+    crack_measurements = []
+
+    for crack_num, crack_slice in enumerate(ndimage.find_objects(mask_label)):
+        if crack_slice is None:
+            continue
+
+        crack_mask = mask_label[crack_slice] == crack_num + 1
+        crack_coverage = np.where(crack_mask, coverage[crack_slice], 0).astype(np.float64)
+        crack_area = crack_coverage.sum()
+
+        if crack_area < minimum_area:
+            continue
+
+        crack_distance = np.where(crack_mask, distance_map[crack_slice], 0)
+        skeleton = crack_distance > 0
+
+        if not skeleton.any():
+            continue
+
+        crack_length = np.count_nonzero(skeleton) * factor
+        crack_width_avg = max(crack_area / (2 * crack_length), 1.0)
+
+        # local area / local length around each skeleton pixel
+        window = 2 * int(np.ceil(crack_distance.max())) + 3
+        local_area = ndimage.uniform_filter(crack_coverage, window, mode='constant')[skeleton]
+        local_length = ndimage.uniform_filter(skeleton.astype(np.float64), window, mode='constant')[skeleton] * factor
+        crack_width_max = max((local_area / (2 * local_length)).max() + 0.5, crack_width_avg)
+
+        crack_measurements.append((
+            crack_slice[0].start * factor,
+            crack_slice[1].start * factor,
+            min(crack_slice[0].stop * factor, height),
+            min(crack_slice[1].stop * factor, width),
+            crack_width_avg, crack_width_max, crack_length, crack_area,
+        ))
+
+    return crack_measurements, None
+
+
+def quantify_crack_width_length(seg_result, mask_output, color, minimum_area=500, line_thickness=2, low_memory=False, approx_factor=1, return_distance_map=False):
+    """
+    Quantify crack width and length. The word 'quantify' means to calculate the crack width and length and visualize them one the segmentation result image. 
+    
+    Args:
+        seg_result (ndarray or None): The segmentation result. The shape is (H, W, C).
+            If None, cracks are only measured and nothing is drawn.
+        mask_output (ndarray or SparseCrackMask): The crack mask image. The shape is (H, W).
+        color (tuple): The color of the crack width and length. The shape is (3,).
+        minimum_area (int): The minimum crack area. The default value is 500.
+        line_thickness (int): The thickness of the crack width and length. The default value is 2.
+        low_memory (bool): Use float32 distances, int32 labels and in-place merges to cut the
+            transient memory of the measurement. The default value is False.
+        approx_factor (int): Measure on a mask downsampled by this factor with analytical scale
+            correction (approximate, for triage runs). 1 means exact, at most MAX_APPROX_FACTOR.
+            The default value is 1.
+        return_distance_map (bool): Also return the distance map used for the measurement and the
+            index into crack_quantification_results of each skeleton pixel (both None in the
+            approximate mode), e.g. for build_crack_graph. The default value is False.
+        
+    Returns:
+        seg_result (ndarray): The segmentation result with crack measurements visualized
+        crack_quantification_results (list): List of crack quantification data
+        distance_map (ndarray or SparseCrackMask or None): Only if return_distance_map is True.
+        skeleton_crack_index (ndarray or None): Only if return_distance_map is True. Result index
+            of each non-zero distance map pixel in raster order, -1 for cracks below minimum_area.
+    """
+
+    # determine font scale and line thickness of text
+    if seg_result is not None:
+        font_scale = seg_result.shape[0] / 1000
+        font_thickness = int(line_thickness * font_scale)
+
+    check_approx_factor(approx_factor)
+    if approx_factor > 1:
+        warnings.warn(f"approximate quantification (factor {approx_factor}): crack widths can be off by 25-50% "
+                      f"(p90 of the max width), use approx_factor=1 for reported widths", stacklevel=2)
+        crack_measurements, distance_map = _measure_approximate_cracks(mask_output, minimum_area, approx_factor)
+        skeleton_crack_index = None
+    elif isinstance(mask_output, SparseCrackMask):
+        crack_measurements, distance_map, skeleton_crack_index = _measure_sparse_cracks(
+            mask_output, minimum_area, low_memory, skeleton_index=return_distance_map)
+    elif low_memory:
+        crack_measurements, distance_map, skeleton_crack_index = _measure_dense_cracks_low_memory(
+            mask_output, minimum_area, skeleton_index=return_distance_map)
+    else:
+        crack_measurements, distance_map, skeleton_crack_index = _measure_dense_cracks(
+            mask_output, minimum_area, skeleton_index=return_distance_map)
+
+    # Initialize list to store crack quantification results
+    crack_quantification_results = []
+
+    # loop through each crack
+    for minr, minc, maxr, maxc, crack_width_avg, crack_width_max, crack_length, crack_area in crack_measurements:
 
         # Store crack quantification data
         crack_quantification_results.append([
             f"({minr},{minc})-({maxr},{maxc})",  # Pixel_Coordinates
             f"{crack_width_avg:.2f}x{crack_width_max:.2f}x{crack_length:.2f}",  # Measurements (avg_width x max_width x length)
-            1  # class_id (crack class)
+            1,  # class_id (crack class)
+            int(crack_area)  # Area (pixels)
         ])
 
+        if seg_result is None:
+            continue
+
         # clip minr, minc, maxr, maxc
         textr = max(minr, 20)
         textc = max(minc, 20)
@@ -205,9 +699,25 @@ def quantify_crack_width_length(seg_result, mask_output, color, minimum_area=500
         # put rectangle on crack
         seg_result = cv2.rectangle(seg_result, (minc, minr), (maxc, maxr), color, line_thickness)
 
+    if return_distance_map:
+        return seg_result, crack_quantification_results, distance_map, skeleton_crack_index
+
     return seg_result, crack_quantification_results
 
 
+def parse_crack_coordinates(coordinates):
+    """
+    "(minr,minc)-(maxr,maxc)" 형식의 좌표 문자열 파싱 (quantify_crack_width_length 결과의 Pixel_Coordinates)
+    
+    Returns:
+        tuple: (min_row, min_col, max_row, max_col)
+    """
+    min_part, max_part = coordinates.replace('(', '').replace(')', '').split('-')
+    min_row, min_col = map(int, min_part.split(','))
+    max_row, max_col = map(int, max_part.split(','))
+    return min_row, min_col, max_row, max_col
+
+
 def check_vis_config(vis_config):
     """
     Check visualization configuration for the function "quantify_deterioration_area".
@@ -253,20 +763,18 @@ def quantify_deterioration_area(seg_result, seg_mask, vis_config, minimum_area=5
 
         _seg_mask = seg_mask == class_idx
 
-        seg_label = label(_seg_mask.astype(np.uint8))
-        seg_region_table = regionprops_table(seg_label)
-
+        if not _seg_mask.any():
+            continue
 
+        seg_label = label(_seg_mask)
+        seg_region_table = regionprops_table(seg_label, properties=('label', 'area', 'bbox'))
 
-        for label_id in np.unique(seg_label)[1:]:
-            obj_mask = seg_label == label_id
+        # area filtering on the stats table, draw only the surviving objects
+        keep = seg_region_table['area'] >= minimum_area
 
-            if np.sum(obj_mask) < minimum_area:
-                continue
+        for obj_num in np.flatnonzero(keep):
 
             # get object width and height 
-            obj_num = label_id - 1
-
             minr = seg_region_table['bbox-0'][obj_num]
             minc = seg_region_table['bbox-1'][obj_num]
             maxr = seg_region_table['bbox-2'][obj_num]
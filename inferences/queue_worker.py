@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Work queue worker
+작업 대기열 워커 (여러 호스트에서 동시에 실행)
+
+공유 대기열(work_queue.py)에서 이미지를 하나씩 임대하여 기존 초해상화 → 탐지 → 정량화 코드(run_pipeline)로
+처리합니다. 모델은 시작 시 한 번만 로드하고, 처리 중에는 백그라운드 스레드가 임대를 연장합니다.
+결과 이미지는 공유 result_dir/균열이미지에, 진행 기록은 워커별 result_dir/워커/<워커 ID>/진행기록.jsonl에
+쓰며, 모든 작업이 끝나면 work_queue.py merge로 병합합니다.
+
+남은 작업이 없어도 다른 워커가 임대 중인 작업이 있으면 그 임대가 만료될 경우를 대비해 기다렸다가 가져갑니다.
+
+Usage:
+    python inferences/queue_worker.py --queue /shared/survey/작업대기열.sqlite \\
+        --result_dir /shared/survey/균열탐지_결과 \\
+        --sr_config 모델/초해상화/초해상화_config.py --sr_checkpoint 모델/초해상화/초해상화_weight.pth \\
+        --crack_config 모델/균열탐지/균열탐지_config.py --crack_checkpoint 모델/균열탐지/균열탐지_weight.pth
+"""
+
+import os
+import time
+import signal
+import argparse
+import threading
+
+from run_pipeline import load_models, setup_cache_and_budget, pipeline_options, process_image
+from prototyping_crack_detection import calculate_pixel_to_mm
+from work_queue import WorkQueue, default_worker_id, worker_result_dir
+from run_manifest import RunManifest
+from config import CONFIG
+
+
+class LeaseKeeper:
+    """
+    Background thread extending the lease of the task being processed.
+
+    Uses its own queue connection (SQLite connections are not shared across threads).
+
+    Args:
+        queue (WorkQueue): Queue of the worker (path and lease length are reused).
+        worker_id (str): Worker ID.
+        interval (float): Heartbeat interval in seconds (shorter than the lease).
+    """
+
+    def __init__(self, queue, worker_id, interval):
+        self.queue_path = queue.path
+        self.lease_seconds = queue.lease_seconds
+        self.worker_id = worker_id
+        self.interval = interval
+        self.image_name = None
+        self.lost = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='lease-keeper', daemon=True)
+        self._thread.start()
+
+    def track(self, image_name):
+        """연장할 작업 지정 (None이면 연장 중지)"""
+        with self._lock:
+            self.image_name = image_name
+            self.lost = False
+
+    def _run(self):
+        queue = WorkQueue(self.queue_path, lease_seconds=self.lease_seconds)
+        try:
+            while not self._stop.wait(self.interval):
+                with self._lock:
+                    image_name = self.image_name
+                if image_name is None:
+                    continue
+                try:
+                    owned = queue.heartbeat(self.worker_id, image_name)
+                except Exception as e:
+                    # 공유 파일시스템 일시 오류: 다음 주기에 다시 시도 (임대 안에 회복되면 문제 없음)
+                    print(f"Warning: heartbeat failed for {image_name}: {e}")
+                    continue
+                if not owned:
+                    with self._lock:
+                        if self.image_name == image_name:
+                            self.lost = True
+                    print(f"Warning: lease on {image_name} expired and was taken over by another worker")
+        finally:
+            queue.close()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(queue, sr_model, crack_model, result_dir, worker_id=None, input_dir=None, heartbeat_seconds=None,
+               idle_poll_seconds=None, cache=None, model_keys=None, memory_budget=None, stop_event=None):
+    """
+    대기열이 빌 때까지 작업을 임대하여 처리
+
+    Args:
+        queue (WorkQueue): 작업 대기열
+        sr_model: 초해상화 모델
+        crack_model: 균열 탐지 모델
+        result_dir (str): 공유 결과 디렉토리
+        worker_id (str): 워커 ID (기본값: 호스트 이름-0, 재시작해도 같아야 진행 기록을 이어받음)
+        input_dir (str): 입력 이미지 디렉토리 (이 호스트의 마운트 경로가 대기열 생성 시와 다르면 지정)
+        heartbeat_seconds (float): 임대 연장 주기 (기본값: CONFIG['QUEUE_HEARTBEAT_S'])
+        idle_poll_seconds (float): 다른 워커의 임대 만료를 기다리는 확인 주기 (기본값: CONFIG['QUEUE_IDLE_POLL_S'])
+        cache (ArtifactCache): 산출물 캐시 (None이면 사용 안 함)
+        model_keys (dict): 캐시 키용 모델 식별 키
+        memory_budget (int): 이미지당 메모리 예산 (바이트)
+        stop_event (threading.Event): 종료 요청 (처리 중인 이미지는 마친 뒤 종료)
+
+    Returns:
+        dict: {'done', 'failed', 'lost'} 처리한 작업 수
+    """
+    worker_id = worker_id or default_worker_id()
+    heartbeat_seconds = CONFIG['QUEUE_HEARTBEAT_S'] if heartbeat_seconds is None else heartbeat_seconds
+    idle_poll_seconds = CONFIG['QUEUE_IDLE_POLL_S'] if idle_poll_seconds is None else idle_poll_seconds
+    stop_event = stop_event or threading.Event()
+
+    # 모든 워커가 대기열 생성 시의 설정으로 처리
+    settings = queue.settings()
+    pixel_to_mm = calculate_pixel_to_mm(settings['shooting_distance_mm'], CONFIG)
+    image_output_dir = os.path.join(result_dir, '균열이미지')
+    os.makedirs(image_output_dir, exist_ok=True)
+    options = pipeline_options(image_output_dir, {'approx_factor': settings['approx_factor'],
+                                                  'output_size': settings['output_size']},
+                               settings['no_gps_policy'])
+    manifest = RunManifest(os.path.join(worker_result_dir(result_dir, worker_id), '진행기록.jsonl'), resume=True)
+
+    keeper = LeaseKeeper(queue, worker_id, heartbeat_seconds)
+    stats = {'done': 0, 'failed': 0, 'lost': 0}
+    start = time.time()
+    print(f"Worker {worker_id}: lease {queue.lease_seconds} s, heartbeat {heartbeat_seconds} s")
+
+    try:
+        while not stop_event.is_set():
+            task = queue.claim(worker_id)
+            if task is None:
+                counts = queue.counts()
+                if counts['leased'] == 0 and counts['expired'] == 0:
+                    break
+                # 다른 워커가 처리 중: 임대가 만료되면 가져가도록 대기
+                stop_event.wait(idle_poll_seconds)
+                continue
+
+            img_name = task['image_name']
+            item = dict(task['metadata'], image_path=task['image_path'])
+            if input_dir:
+                item['image_path'] = os.path.join(input_dir, img_name)
+            keeper.track(img_name)
+            print(f"\n[{img_name}] attempt {task['attempts']}/{queue.max_attempts}")
+
+            try:
+                if manifest.is_done(img_name, 'detection'):
+                    # 이전 실행에서 처리했지만 대기열에 기록하기 전에 종료된 경우
+                    result = manifest.get_record(img_name, 'detection')
+                else:
+                    result = process_image(sr_model, crack_model, item, pixel_to_mm, options, manifest,
+                                           cache=cache, model_keys=model_keys, memory_budget=memory_budget)
+            except BaseException:
+                keeper.track(None)
+                queue.release(worker_id, img_name)
+                raise
+
+            lost = keeper.lost
+            keeper.track(None)
+            if result is None:
+                queue.fail(worker_id, img_name, manifest.get_error(img_name, 'detection'))
+                stats['failed'] += 1
+            elif queue.complete(worker_id, img_name):
+                stats['done'] += 1
+            else:
+                # 임대를 잃은 동안 다른 워커도 처리 중 (결과는 같으므로 병합 시 완료 기록한 워커 결과 사용)
+                stats['lost'] += 1
+                if not lost:
+                    print(f"Warning: lease on {img_name} was lost before completion")
+    finally:
+        keeper.close()
+
+    elapsed = time.time() - start
+    rate = stats['done'] / elapsed * 3600 if elapsed > 0 else 0
+    print(f"\nWorker {worker_id}: {stats['done']} done, {stats['failed']} failed, {stats['lost']} lost leases "
+          f"in {elapsed:.0f} s ({rate:.0f} images/hour)")
+
+    return stats
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Process images from a shared work queue')
+    parser.add_argument('--queue', required=True, help='대기열 파일 경로 (work_queue.py init으로 생성)')
+    parser.add_argument('--result_dir', required=True, help='공유 결과 디렉토리 (모든 워커가 같은 경로)')
+    parser.add_argument('--sr_config', required=True, help='초해상화 모델 설정 파일 경로')
+    parser.add_argument('--sr_checkpoint', required=True, help='초해상화 모델 체크포인트 파일 경로')
+    parser.add_argument('--sr_model_name', default='edsr', help='초해상화 모델 이름 (MMagic)')
+    parser.add_argument('--crack_config', required=True, help='크랙 탐지 모델 설정 파일 경로')
+    parser.add_argument('--crack_checkpoint', required=True, help='크랙 탐지 모델 체크포인트 파일 경로')
+    parser.add_argument('--device', default='cuda', help='추론 장치')
+    parser.add_argument('--worker_id', default=None, help='워커 ID (기본값: 호스트 이름-워커 번호)')
+    parser.add_argument('--slot', type=int, default=0,
+                        help='이 호스트의 워커 번호 (한 호스트에서 워커를 여러 개 실행하면 워커마다 다르게, 예: GPU 번호)')
+    parser.add_argument('--input_dir', default=None, help='이 호스트의 입력 이미지 경로 (대기열 생성 시와 마운트 경로가 다를 때)')
+    parser.add_argument('--lease', type=float, default=CONFIG['QUEUE_LEASE_S'], help='작업 임대 시간 (초, 이미지 1장 처리 시간보다 충분히 길게)')
+    parser.add_argument('--heartbeat', type=float, default=CONFIG['QUEUE_HEARTBEAT_S'], help='임대 연장 주기 (초)')
+    parser.add_argument('--max_attempts', type=int, default=CONFIG['QUEUE_MAX_ATTEMPTS'], help='작업당 최대 시도 횟수')
+    parser.add_argument('--cache_dir', default=CONFIG['ARTIFACT_CACHE_DIR'], help='산출물 캐시 디렉토리 (호스트 로컬 디스크 권장)')
+    parser.add_argument('--no_cache', action='store_true', help='산출물 캐시 사용 안 함')
+    parser.add_argument('--memory_budget', default=CONFIG['MEMORY_BUDGET'], help='이미지당 메모리 예산 (예: 16G)')
+
+    args = parser.parse_args()
+
+    if args.heartbeat >= args.lease:
+        parser.error('--heartbeat must be shorter than --lease')
+    if not os.path.exists(args.queue):
+        parser.error(f'queue not found: {args.queue} (create it with work_queue.py init)')
+
+    queue = WorkQueue(args.queue, lease_seconds=args.lease, max_attempts=args.max_attempts)
+
+    print("\nInitializing models...")
+    sr_model, crack_model = load_models(
+        args.sr_config, args.sr_checkpoint, args.crack_config, args.crack_checkpoint,
+        sr_model_name=args.sr_model_name, device=args.device
+    )
+    print("Models initialized successfully")
+
+    cache, model_keys, memory_budget = setup_cache_and_budget(args)
+
+    # SIGTERM: 처리 중인 이미지를 마친 뒤 종료 (Ctrl+C는 즉시 임대 반환 후 종료)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    try:
+        run_worker(queue, sr_model, crack_model, args.result_dir,
+                   worker_id=args.worker_id or default_worker_id(args.slot), input_dir=args.input_dir,
+                   heartbeat_seconds=args.heartbeat,
+                   cache=cache, model_keys=model_keys, memory_budget=memory_budget, stop_event=stop_event)
+    except KeyboardInterrupt:
+        print("\nStopped, current image returned to the queue")
+    finally:
+        queue.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+Result writers for crack detection
+균열 탐지 결과 저장 모듈
+
+이미지별 요약은 이미지 처리가 끝날 때마다 CSV에 한 행씩 추가하고(실행 중에도 읽을 수 있음),
+실행이 끝나면 Excel로 변환합니다. 개별 균열 단위의 상세 측정값은 컬럼형 포맷(Parquet/Arrow)으로
+배치마다 파트 파일에 저장하고(실행 중에도 읽을 수 있음), 실행이 끝나면 하나의 파일로 합칩니다.
+"""
+
+import os
+import csv
+import shutil
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+from quantify_seg_results import parse_crack_coordinates
+
+
+# 이미지별 요약 (균열목록.xlsx) 컬럼과 Excel 변환 시 값 타입
+DETECTION_COLUMNS = [
+    ('위도', float),
+    ('경도', float),
+    ('이미지 경로', str),
+    ('촬영시간', str),
+    ('균열 개수', int),
+    ('평균 균열 폭(mm)', float),
+    ('최대 균열 폭(mm)', float),
+    ('총 균열 길이(mm)', float),
+]
+
+
+# 균열 상세 테이블 스키마 (균열 1개 = 1행)
+CRACK_DETAIL_SCHEMA = pa.schema([
+    ('image', pa.string()),
+    ('crack_index', pa.int32()),
+    ('latitude', pa.float64()),
+    ('longitude', pa.float64()),
+    ('timestamp', pa.string()),
+    ('bbox_min_row', pa.int32()),
+    ('bbox_min_col', pa.int32()),
+    ('bbox_max_row', pa.int32()),
+    ('bbox_max_col', pa.int32()),
+    ('avg_width_mm', pa.float32()),
+    ('max_width_mm', pa.float32()),
+    ('length_mm', pa.float32()),
+    ('area_px', pa.int64()),
+    ('class_id', pa.int32()),
+])
+
+
+def crack_detail_rows(image_name, crack_real_size_results, latitude=None, longitude=None, timestamp=None,
+                      locations=None):
+    """
+    convert_crack_to_real_size 결과를 균열 상세 테이블 행(dict)으로 변환
+
+    Args:
+        image_name (str): 이미지 파일 이름
+        crack_real_size_results (list): [(coordinates, avg_width_mm, max_width_mm, length_mm, measurement_str, class_id, area_px), ...]
+        latitude (float): 위도
+        longitude (float): 경도
+        timestamp (str): 촬영시간 (ISO 형식)
+        locations (list): 균열별 (위도, 경도) (주어지면 latitude/longitude 대신 사용, 예: 정사영상 지리참조)
+
+    Returns:
+        list: 균열별 행 dict 리스트
+    """
+    rows = []
+
+    for crack_index, crack in enumerate(crack_real_size_results):
+        min_row, min_col, max_row, max_col = parse_crack_coordinates(crack[0])
+        if locations is not None:
+            latitude, longitude = locations[crack_index]
+
+        rows.append({
+            'image': image_name,
+            'crack_index': crack_index,
+            'latitude': latitude,
+            'longitude': longitude,
+            'timestamp': timestamp,
+            'bbox_min_row': min_row,
+            'bbox_min_col': min_col,
+            'bbox_max_row': max_row,
+            'bbox_max_col': max_col,
+            'avg_width_mm': crack[1],
+            'max_width_mm': crack[2],
+            'length_mm': crack[3],
+            'area_px': crack[6] if len(crack) > 6 else None,
+            'class_id': crack[5],
+        })
+
+    return rows
+
+
+class CrackDetailWriter:
+    """
+    Append per-crack rows to a Parquet (.parquet) or Arrow IPC (.arrow/.feather) file in batches.
+
+    Rows are buffered and every ``batch_size`` images the batch is written as a complete part file
+    under ``<output_path>.parts/``, so memory stays bounded and the rows of finished batches can be
+    read while the run is still going (e.g. ``pd.read_parquet('균열목록_균열상세.parquet.parts')``).
+    ``close()`` merges the parts, one row group / record batch each, into ``output_path`` and
+    removes the directory, so an interrupted run never leaves a truncated table at ``output_path``.
+
+    Args:
+        output_path (str): Output file path. The extension selects the format.
+        batch_size (int): Number of images buffered before a batch is written.
+    """
+
+    def __init__(self, output_path, batch_size=16):
+        self.output_path = output_path
+        self.batch_size = batch_size
+        self._rows = []
+        self._pending_images = 0
+        self.num_rows = 0
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        self._arrow = output_path.endswith(('.arrow', '.feather'))
+        self._tmp_path = output_path + '.partial'
+
+        # 이전 실행의 파트는 버림 (재개 시 호출자가 완료된 이미지의 행을 다시 추가)
+        self.parts_dir = output_path + '.parts'
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        os.makedirs(self.parts_dir)
+        self._parts = []
+
+    def _write_table(self, path, tables):
+        """테이블들을 하나의 파일로 기록 (테이블마다 row group / record batch 하나)"""
+        if self._arrow:
+            with pa.ipc.new_file(path, CRACK_DETAIL_SCHEMA) as writer:
+                for table in tables:
+                    writer.write_table(table)
+        else:
+            with pq.ParquetWriter(path, CRACK_DETAIL_SCHEMA) as writer:
+                for table in tables:
+                    writer.write_table(table)
+
+    def _read_part(self, path):
+        if self._arrow:
+            with pa.OSFile(path, 'rb') as f:
+                return pa.ipc.open_file(f).read_all()
+        return pq.read_table(path, schema=CRACK_DETAIL_SCHEMA)
+
+    def append(self, image_name, crack_real_size_results, latitude=None, longitude=None, timestamp=None,
+               locations=None):
+        """한 이미지의 균열 상세 행 추가 (batch_size 이미지마다 파일에 기록)"""
+        self._rows.extend(crack_detail_rows(image_name, crack_real_size_results, latitude, longitude, timestamp,
+                                            locations))
+        self._pending_images += 1
+
+        if self._pending_images >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """버퍼에 쌓인 행을 하나의 파트 파일로 기록 (임시 이름으로 쓴 뒤 교체하므로 읽는 쪽에 완성된 파일만 보임)"""
+        if self._rows:
+            table = pa.Table.from_pylist(self._rows, schema=CRACK_DETAIL_SCHEMA)
+            part_path = os.path.join(self.parts_dir, f"part-{len(self._parts):05d}{os.path.splitext(self.output_path)[1]}")
+            self._write_table(part_path + '.partial', [table])
+            os.replace(part_path + '.partial', part_path)
+            self._parts.append(part_path)
+            self.num_rows += len(self._rows)
+
+        self._rows = []
+        self._pending_images = 0
+
+    def close(self):
+        """남은 행을 기록하고 파트를 output_path 하나로 합친 뒤 파트 폴더 삭제"""
+        self.flush()
+        if not os.path.isdir(self.parts_dir):
+            return
+
+        self._write_table(self._tmp_path, (self._read_part(path) for path in self._parts))
+        os.replace(self._tmp_path, self.output_path)
+        shutil.rmtree(self.parts_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class DetectionSummaryWriter:
+    """
+    Stream per-image summary rows (the ``균열목록.xlsx`` columns) to a CSV file as images finish.
+
+    Each row is flushed and fsync'd as soon as it is appended, so partial results can be opened
+    while a run is still in progress and survive a crash. The Excel file is produced at the end
+    by ``to_excel()``, which streams the CSV through openpyxl's write-only mode instead of
+    building a DataFrame.
+
+    Args:
+        output_path (str): CSV path. An existing file is overwritten (on resume the caller
+            re-appends rows of already processed images from the run manifest).
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.num_rows = 0
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        # utf-8-sig: Excel에서 CSV를 바로 열어도 한글이 깨지지 않도록 BOM 포함
+        self._file = open(output_path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file)
+        self._write([name for name, _ in DETECTION_COLUMNS])
+
+    def _write(self, values):
+        self._writer.writerow(values)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, detection):
+        """한 이미지의 요약 행 추가 (즉시 파일에 기록)"""
+        self._write(['' if detection.get(name) is None else detection[name] for name, _ in DETECTION_COLUMNS])
+        self.num_rows += 1
+
+    def close(self):
+        """파일 닫기"""
+        if not self._file.closed:
+            self._file.close()
+
+    def to_excel(self, excel_path):
+        """
+        CSV를 Excel로 변환 (임시 파일에 쓴 뒤 교체)
+
+        Args:
+            excel_path (str): 출력 Excel 경로
+        """
+        self.close()
+        csv_to_excel(self.output_path, excel_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _excel_cell(convert, value):
+    """CSV 문자열을 Excel 셀 값으로 변환 (빈 숫자 칸은 빈 셀)"""
+    if convert is str:
+        return value
+    return convert(value) if value != '' else None
+
+
+def csv_to_excel(csv_path, excel_path):
+    """
+    DetectionSummaryWriter가 쓴 CSV를 Excel로 변환 (openpyxl write-only 모드로 행 단위 스트리밍)
+
+    Args:
+        csv_path (str): 요약 CSV 경로
+        excel_path (str): 출력 Excel 경로
+    """
+    column_types = dict(DETECTION_COLUMNS)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        sheet.append(header)
+        converters = [column_types.get(name, str) for name in header]
+
+        for values in reader:
+            sheet.append([_excel_cell(convert, value) for convert, value in zip(converters, values)])
+
+    tmp_path = excel_path + '.partial'
+    with open(tmp_path, 'wb') as f:
+        workbook.save(f)
+    os.replace(tmp_path, excel_path)
@@ -0,0 +1,140 @@
+"""
+Run manifest for crash-safe batch processing
+배치 실행 진행 기록 (이미지별/단계별 상태) 및 원자적 파일 쓰기
+
+진행 기록은 JSON Lines 파일에 한 줄씩 추가(append)되며 매 기록마다 fsync 하므로, 프로세스가
+중간에 종료되어도 완료된 작업은 남습니다. 마지막 줄이 잘린 경우 읽을 때 무시합니다.
+결과 파일은 임시 파일에 쓴 뒤 os.replace로 교체하여, 중간에 종료되어도 불완전한 파일이 남지 않습니다.
+"""
+
+import os
+import json
+from datetime import datetime
+
+import cv2
+
+
+def _json_default(value):
+    """numpy 스칼라 등 JSON 직렬화 보조"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def partial_path(path):
+    """원자적 쓰기에 사용하는 임시 파일 경로 (입력 이미지 glob에 걸리지 않도록 확장자 뒤에 붙임)"""
+    return path + '.partial'
+
+
+def atomic_imwrite(path, image, params=None):
+    """
+    이미지를 임시 파일에 인코딩해 쓴 뒤 교체
+
+    Args:
+        path (str): 출력 경로 (확장자로 인코딩 형식 결정)
+        image (ndarray): 저장할 이미지
+        params (list): cv2.imwrite 파라미터 (예: [cv2.IMWRITE_JPEG_QUALITY, 85])
+    """
+    ok, buffer = cv2.imencode(os.path.splitext(path)[1], image, params or [])
+    if not ok:
+        raise IOError(f"Failed to encode image: {path}")
+
+    tmp_path = partial_path(path)
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def atomic_to_excel(df, path):
+    """DataFrame을 임시 파일에 Excel로 쓴 뒤 교체"""
+    tmp_path = partial_path(path)
+    with open(tmp_path, 'wb') as f:
+        df.to_excel(f, index=False, engine='openpyxl')
+    os.replace(tmp_path, path)
+
+
+class RunManifest:
+    """
+    Per-image, per-stage status of a batch run stored as an append-only JSON Lines file.
+
+    Each line is ``{"image": ..., "stage": ..., "status": "done"|"failed", "record": ..., "time": ...}``.
+    The latest line for an (image, stage) pair wins.
+
+    Args:
+        path (str): Manifest file path.
+        resume (bool): Keep existing entries. If False, the manifest is started from scratch.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._entries = {}
+
+        manifest_dir = os.path.dirname(path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+
+        if resume and os.path.exists(path):
+            self._load()
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 중 종료되어 잘린 줄
+                    continue
+                self._entries[(entry['image'], entry['stage'])] = entry
+
+    def _append(self, entry):
+        self._entries[(entry['image'], entry['stage'])] = entry
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=_json_default) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def is_done(self, image_name, stage):
+        """해당 이미지/단계가 완료되었는지 여부"""
+        entry = self._entries.get((image_name, stage))
+        return entry is not None and entry['status'] == 'done'
+
+    def get_record(self, image_name, stage):
+        """완료된 단계의 기록 (없으면 None)"""
+        entry = self._entries.get((image_name, stage))
+        return entry['record'] if entry is not None and entry['status'] == 'done' else None
+
+    def get_error(self, image_name, stage):
+        """실패한 단계의 오류 메시지 (실패 기록이 없으면 None)"""
+        entry = self._entries.get((image_name, stage))
+        return entry['record'] if entry is not None and entry['status'] == 'failed' else None
+
+    def done_images(self, stage):
+        """해당 단계가 완료된 이미지 이름 목록"""
+        return [image for (image, entry_stage), entry in self._entries.items()
+                if entry_stage == stage and entry['status'] == 'done']
+
+    def mark_done(self, image_name, stage, record=None):
+        """단계 완료 기록 (결과 파일을 모두 쓴 뒤 호출)"""
+        self._append({
+            'image': image_name,
+            'stage': stage,
+            'status': 'done',
+            'record': record,
+            'time': datetime.now().isoformat(timespec='seconds'),
+        })
+
+    def mark_failed(self, image_name, stage, error):
+        """단계 실패 기록 (재개 시 다시 처리됨)"""
+        self._append({
+            'image': image_name,
+            'stage': stage,
+            'status': 'failed',
+            'record': str(error),
+            'time': datetime.now().isoformat(timespec='seconds'),
+        })
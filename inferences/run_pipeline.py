@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+End-to-end crack detection pipeline in a single process
+메타데이터 추출 → 초해상화 → 균열 탐지 → 정량화 → 지도 생성을 하나의 프로세스에서 실행
+
+균열탐지.sh는 단계마다 별도 Python 프로세스를 띄워 torch/mmcv/mmseg/mmagic import와 모델 초기화를
+반복하고, 단계 사이를 초해상화 PNG와 Excel 파일로 연결합니다. 이 스크립트는 모델을 한 번만 로드해
+상주시키고, 초해상화 결과(배열)와 메타데이터/탐지 결과(레코드)를 메모리로 전달합니다.
+초해상화 PNG, 메타데이터 JSON/Excel 같은 중간 파일은 경로를 지정했을 때만 저장합니다.
+
+Usage:
+    python inferences/run_pipeline.py --input_dir 촬영이미지 --result_dir 균열탐지_결과 \
+        --sr_config 모델/초해상화/초해상화_config.py --sr_checkpoint 모델/초해상화/초해상화_weight.pth \
+        --crack_config 모델/균열탐지/균열탐지_config.py --crack_checkpoint 모델/균열탐지/균열탐지_weight.pth \
+        --shooting_distance_mm 1500
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+import cv2
+from mmseg.apis import init_model
+from mmagic.apis import MMagicInferencer
+from torch.cuda import empty_cache
+
+sys.path.append(os.path.dirname(__file__))
+from extract_image_metadata import extract_metadata_from_images
+from prototyping_crack_detection import calculate_pixel_to_mm, postprocess_crack_image
+from quantify_seg_results import check_approx_factor
+from generate_maps import make_damage_list, make_total_damage_map, make_each_damage_map
+from result_writers import CrackDetailWriter, DetectionSummaryWriter
+from run_manifest import RunManifest, atomic_imwrite
+from stage_planner import NO_GPS_POLICIES, plan_images, print_plan, print_compute_saved
+from dedup_frames import dedup_images, write_dedup_report, print_dedup_summary
+from prescreen import prescreen_image, write_prescreen_report, print_prescreen_summary, audit_prescreen, print_audit_summary
+from memory_planner import (parse_memory_size, format_bytes, image_dimensions, configured_mode, plan_memory,
+                            check_memory_plan, apply_memory_plan, count_crack_pixels)
+from artifact_cache import (ArtifactCache, make_key, model_fingerprint, sr_model_fingerprint, sr_cache_key,
+                            segmentation_config, quantification_config)
+from utils import inference_segmentor_sliding_window
+from config import CONFIG
+
+
+def load_models(sr_config, sr_checkpoint, crack_config, crack_checkpoint, sr_model_name='edsr', device='cuda'):
+    """
+    초해상화/균열 탐지 모델을 한 번 로드하여 반환 (파이프라인 실행 동안 상주)
+
+    Returns:
+        tuple: (sr_model, crack_model)
+    """
+    sr_model = MMagicInferencer(
+        model_name=sr_model_name,
+        model_config=sr_config,
+        model_ckpt=sr_checkpoint,
+        device=device
+    )
+    crack_model = init_model(crack_config, crack_checkpoint, device='cuda:0' if device == 'cuda' else device)
+
+    return sr_model, crack_model
+
+
+def setup_cache_and_budget(args):
+    """
+    산출물 캐시, 캐시 키용 모델 식별 키, 이미지당 메모리 예산
+
+    캐시 키가 진입점마다 달라지지 않도록 run_pipeline/watch_folder/queue_worker/batch_run이 모두 이 함수를 사용합니다.
+
+    Args:
+        args (Namespace): sr_config, sr_checkpoint, sr_model_name, crack_config, crack_checkpoint,
+            cache_dir, no_cache, memory_budget 인자
+
+    Returns:
+        tuple: (cache, model_keys, memory_budget) (캐시를 쓰지 않으면 cache/model_keys None, 예산이 없으면 memory_budget None)
+    """
+    # 산출물 캐시 (입력 이미지 + 모델 + 관련 설정이 같으면 단계별 결과 재사용)
+    cache = model_keys = None
+    if CONFIG['USE_ARTIFACT_CACHE'] and not args.no_cache:
+        cache = ArtifactCache.from_config(args.cache_dir)
+        model_keys = {
+            'sr': sr_model_fingerprint(args.sr_config, args.sr_checkpoint, model_name=args.sr_model_name),
+            'crack': model_fingerprint(args.crack_config, args.crack_checkpoint),
+        }
+        print(f"Artifact cache: {args.cache_dir}")
+
+    # 이미지당 메모리 예산 (None이면 제한 없음)
+    memory_budget = parse_memory_size(args.memory_budget) if args.memory_budget else None
+    if memory_budget is not None:
+        print(f"Memory budget per image: {format_bytes(memory_budget)}")
+
+    return cache, model_keys, memory_budget
+
+
+def pipeline_options(image_output_dir, options=None, no_gps_policy=None):
+    """
+    postprocess_crack_image 옵션 (지정하지 않은 값은 CONFIG 기본값)
+
+    Args:
+        image_output_dir (str): 결과 이미지 디렉토리
+        options (dict): 지정할 옵션
+        no_gps_policy (str): GPS 없는 이미지 처리 정책 ('no_map'이면 GPS 없이도 결과 저장)
+
+    Returns:
+        dict: 옵션 (복사본)
+    """
+    options = dict(options or {})
+    options['output_dir'] = image_output_dir
+    options.setdefault('approx_factor', CONFIG['APPROX_QUANTIFICATION_FACTOR'])
+    check_approx_factor(options['approx_factor'])
+    options.setdefault('low_memory', CONFIG['LOW_MEMORY_MODE'])
+    options.setdefault('output_size', CONFIG['OUTPUT_IMAGE_SIZE'])
+    options.setdefault('graph_output_dir', None)
+    options.setdefault('graph_format', 'npz')
+    options['allow_no_gps'] = (no_gps_policy or CONFIG['NO_GPS_POLICY']) == 'no_map'
+    if options['graph_output_dir']:
+        os.makedirs(options['graph_output_dir'], exist_ok=True)
+
+    return options
+
+
+def process_image(sr_model, crack_model, item, pixel_to_mm, options, manifest, sr_output_dir=None, resume=False,
+                  cache=None, model_keys=None, memory_budget=None):
+    """
+    한 이미지의 초해상화 → 탐지 → 정량화/시각화 (각 단계 완료 시 진행 기록)
+
+    cache가 주어지면 단계별 산출물을 (입력 이미지 해시, 모델 해시, 관련 설정) 키로 재사용합니다.
+    하위 단계 키는 상위 단계 키에서 이어지므로 초해상화 이미지를 다시 해시하지 않습니다.
+    memory_budget(바이트)이 주어지면 초해상화 프레임 크기로 최대 메모리를 추정해 처리 경로를 정하고,
+    어떤 경로로도 예산을 넘으면 초해상화 전에 실패로 기록합니다.
+
+    Returns:
+        dict: postprocess_crack_image 결과 (실패 시 None)
+    """
+    img_name = item['image_name']
+    img_path = item['image_path']
+    sr_path = os.path.join(sr_output_dir, img_name) if sr_output_dir else None
+
+    try:
+        # 메모리 예산 계획 (원본 헤더 크기 × 초해상화 배율로 추정, 초해상화 전에 확인)
+        memory_mode = configured_mode(options['approx_factor'])
+        if memory_budget is not None:
+            height, width = (int(size * CONFIG['SUPER_RESOLUTION_SCALE']) for size in image_dimensions(img_path))
+            memory_plan = plan_memory(height, width, memory_budget, memory_mode, output_size=options['output_size'])
+            check_memory_plan(img_name, memory_plan, memory_budget)
+            memory_mode = memory_plan['mode']
+
+        sr_image = crack_mask = cached_records = None
+        if cache is not None:
+            sr_key = sr_cache_key(img_path, model_keys['sr'])
+            mask_key = make_key(sr_key, model_keys['crack'], segmentation_config())
+            records_key = make_key(mask_key, quantification_config(memory_mode))
+            crack_mask = cache.load_mask(mask_key, sparse=memory_mode['sparse'])
+            cached_records = cache.load_records(records_key)
+
+        # 초해상화 (결과 배열을 그대로 사용, 재개 시 저장된 초해상화 이미지가 있으면 재사용)
+        if resume and sr_path and manifest.is_done(img_name, 'sr') and os.path.exists(sr_path):
+            sr_image = cv2.imread(sr_path)
+        elif cache is not None:
+            sr_image = cache.load_image(sr_key)
+
+        if sr_image is None:
+            sr_image = sr_model.infer(img=img_path)[1]
+            if cache is not None:
+                cache.save_image(sr_key, sr_image)
+        if sr_path and not manifest.is_done(img_name, 'sr'):
+            atomic_imwrite(sr_path, sr_image)
+            manifest.mark_done(img_name, 'sr', {'output_path': sr_path})
+
+        if crack_mask is None:
+            # 크랙 탐지 수행
+            _, crack_mask = inference_segmentor_sliding_window(
+                crack_model, sr_image,
+                color_mask=None,
+                score_thr=CONFIG['SCORE_THRESHOLD'],
+                window_size=CONFIG['WINDOW_SIZE'],
+                overlap_ratio=CONFIG['OVERLAP_RATIO'],
+                return_sparse=memory_mode['sparse']
+            )
+            if cache is not None:
+                cache.save_mask(mask_key, crack_mask)
+
+        # 실제 프레임 크기와 균열 픽셀 수로 정량화 경로 재계획
+        image_options = options
+        if memory_budget is not None:
+            memory_plan = plan_memory(sr_image.shape[0], sr_image.shape[1], memory_budget, memory_mode,
+                                      crack_pixels=count_crack_pixels(crack_mask), output_size=options['output_size'])
+            check_memory_plan(img_name, memory_plan, memory_budget)
+            crack_mask, image_options = apply_memory_plan(crack_mask, options, memory_plan['mode'])
+            if cache is not None and memory_plan['mode'] != memory_mode:
+                records_key = make_key(mask_key, quantification_config(memory_plan['mode']))
+                cached_records = cache.load_records(records_key)
+
+        # 정량화/시각화 (GPS는 메타데이터 추출 시 EXIF에서 이미 조회되어 원본을 다시 열지 않음)
+        result = postprocess_crack_image(
+            img_path, crack_mask, item,
+            pixel_to_mm, image_options, image=sr_image,
+            crack_quantification_results=cached_records
+        )
+        if cache is not None and cached_records is None:
+            cache.save_records(records_key, result['crack_quantification_results'])
+
+        # 대용량 중간 배열 즉시 해제
+        del sr_image, crack_mask
+        empty_cache()
+
+    except Exception as e:
+        print(f"Error: {e}")
+        import traceback
+        traceback.print_exc()
+        manifest.mark_failed(img_name, 'detection', e)
+        return None
+
+    manifest.mark_done(img_name, 'detection', result)
+
+    return result
+
+
+def run_pipeline(sr_model, crack_model, input_dir, result_dir, shooting_distance_mm,
+                 map_output=None, individual_map_output=None, excel_output=None, crack_table=None,
+                 sr_output_dir=None, metadata_json=None, metadata_excel=None, options=None,
+                 manifest_path=None, resume=False, cache=None, model_keys=None, no_gps_policy=None,
+                 memory_budget=None, dedup=None, prescreen=None, prescreen_audit_rate=None, metadata=None,
+                 camera=None, output_executor=None):
+    """
+    한 폴더의 촬영 이미지를 메모리 내에서 끝까지 처리
+
+    Args:
+        sr_model (MMagicInferencer): 초해상화 모델
+        crack_model (nn.Module): 균열 탐지 모델
+        input_dir (str): 촬영 이미지 디렉토리
+        result_dir (str): 결과 디렉토리 (균열이미지/ 하위 폴더에 결과 이미지 저장)
+        shooting_distance_mm (float): 촬영거리 (mm)
+        map_output (str): 전체 지도 HTML 경로 (None이면 생략)
+        individual_map_output (str): 개별 위치 지도 HTML 경로 (None이면 생략)
+        excel_output (str): 균열 목록 Excel 경로 (None이면 생략, 요약 CSV result_dir/균열목록.csv는 항상 기록)
+        crack_table (str): 균열별 상세 테이블 경로 (None이면 생략)
+        sr_output_dir (str): 초해상화 이미지 저장 디렉토리 (중간 파일, None이면 저장하지 않음)
+        metadata_json (str): 메타데이터 JSON 경로 (중간 파일, None이면 저장하지 않음)
+        metadata_excel (str): 메타데이터 Excel 경로 (중간 파일, None이면 저장하지 않음)
+        options (dict): postprocess_crack_image 옵션 (output_dir는 result_dir/균열이미지로 설정)
+        manifest_path (str): 진행 기록 경로 (기본값: result_dir/진행기록.jsonl)
+        resume (bool): 진행 기록에서 완료된 이미지는 건너뛰고 기록된 결과를 사용
+        cache (ArtifactCache): 산출물 캐시 (None이면 사용 안 함)
+        model_keys (dict): {'sr': 초해상화 모델 키, 'crack': 균열 탐지 모델 키} (sr_model_fingerprint, model_fingerprint 결과)
+        no_gps_policy (str): GPS 없는 이미지 처리 정책 ('skip' 또는 'no_map', 기본값: CONFIG['NO_GPS_POLICY'])
+        memory_budget (int): 이미지당 메모리 예산 (바이트, None이면 제한 없음)
+        dedup (bool): 연속 촬영된 중복 프레임을 초해상화 전에 제외 (기본값: CONFIG['DEDUP_FRAMES'],
+            제외 목록은 result_dir/중복제거_목록.csv)
+        prescreen (bool): 원본 해상도에서 균열 후보가 없는 프레임은 초해상화/탐지 생략 (기본값: CONFIG['PRESCREEN'],
+            결정과 탐지된 균열 수는 result_dir/사전선별_목록.csv)
+        prescreen_audit_rate (float): 건너뛸 프레임 중 놓친 비율 측정을 위해 전체 처리할 비율
+            (기본값: CONFIG['PRESCREEN_AUDIT_RATE'])
+        metadata (list): 이미 추출한 메타데이터 (extract_metadata_from_images 결과, None이면 input_dir에서 추출)
+        camera (dict): 카메라 설정 (SENSOR_WIDTH_MM, FOCAL_LENGTH_MM, IMAGE_WIDTH_PX 등, 지정하지 않은 값은 CONFIG)
+        output_executor (Executor): Excel/지도 생성을 제출할 실행기 (None이면 끝날 때까지 기다림,
+            지정하면 다음 작업의 추론과 겹쳐 실행되며 호출 측이 실행기 종료 시 기다림)
+
+    Returns:
+        list: 이미지별 탐지 결과 (Excel 행과 동일한 dict)
+    """
+    image_output_dir = os.path.join(result_dir, '균열이미지')
+    os.makedirs(image_output_dir, exist_ok=True)
+    if sr_output_dir:
+        os.makedirs(sr_output_dir, exist_ok=True)
+
+    no_gps_policy = no_gps_policy or CONFIG['NO_GPS_POLICY']
+    options = pipeline_options(image_output_dir, options, no_gps_policy)
+
+    pixel_to_mm = calculate_pixel_to_mm(shooting_distance_mm, dict(CONFIG, **(camera or {})))
+    print(f"\nPixel to mm conversion rate: {pixel_to_mm:.6f} mm/pixel")
+
+    # STEP 0: 메타데이터 추출 (메모리에 유지, 파일 저장은 선택)
+    if metadata is None:
+        print("\n" + "="*60)
+        print("STEP 0/3: Extracting GPS metadata")
+        print("="*60)
+        metadata = extract_metadata_from_images(input_dir, metadata_excel, metadata_json)
+    metadata_dict = {item['image_name']: item for item in metadata}
+
+    # 처리 계획 (GPS 없는 이미지는 초해상화 전에 건너뛰거나 위치 없음 목록으로 분리)
+    plan = plan_images([metadata_dict[name]['image_path'] for name in sorted(metadata_dict)], metadata_dict, no_gps_policy)
+    print_plan(plan, no_gps_policy)
+    no_map_images = {os.path.basename(p) for p in plan['no_map']}
+
+    # 중복 프레임 제거 (묶음마다 가장 선명한 프레임만 초해상화/탐지)
+    if CONFIG['DEDUP_FRAMES'] if dedup is None else dedup:
+        dedup_result = dedup_images(plan['process'], metadata_dict)
+        dedup_report = os.path.join(result_dir, '중복제거_목록.csv')
+        write_dedup_report(dedup_result, dedup_report)
+        print_dedup_summary(dedup_result, dedup_report)
+        plan['process'] = dedup_result['keep']
+
+    crack_detail_writer = CrackDetailWriter(crack_table) if crack_table else None
+    detection_results = []
+
+    # 이미지별 요약 (처리 완료 즉시 CSV에 한 행씩 기록, 실행 중에도 열어볼 수 있음)
+    detection_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록.csv'))
+    no_map_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록_위치없음.csv')) if no_map_images else None
+
+    # 이미지별/단계별 진행 기록 (중단 후 resume=True로 이어서 실행)
+    manifest = RunManifest(manifest_path or os.path.join(result_dir, '진행기록.jsonl'), resume=resume)
+
+    # STEP 1-2: 초해상화 + 균열 탐지 + 정량화 (이미지 단위, 초해상화 결과는 디스크를 거치지 않음)
+    print("\n" + "="*60)
+    print("STEP 1-2/3: Super resolution and crack detection")
+    print("="*60)
+    image_names = [os.path.basename(p) for p in plan['process']]
+    start_time = time.perf_counter()
+    processed_count = 0
+
+    # 저해상도 사전 선별 (원본 이미지에서 균열 후보가 없으면 초해상화/탐지 생략)
+    prescreen = CONFIG['PRESCREEN'] if prescreen is None else prescreen
+    if prescreen_audit_rate is None:
+        prescreen_audit_rate = CONFIG['PRESCREEN_AUDIT_RATE']
+    prescreen_rows = []
+    crack_counts = {}
+
+    for idx, img_name in enumerate(image_names):
+        item = metadata_dict[img_name]
+        print(f"\n[{idx+1}/{len(image_names)}] Processing: {img_name}")
+
+        if prescreen:
+            # 결정은 진행 기록에 남겨 재개 시 같은 결정 사용
+            row = manifest.get_record(img_name, 'prescreen')
+            if row is None:
+                row = prescreen_image(crack_model, item['image_path'], prescreen_audit_rate)
+                manifest.mark_done(img_name, 'prescreen', row)
+            prescreen_rows.append(row)
+            if row['decision'] == 'skip':
+                print(f"No crack candidates at low resolution (max score {row['max_score']:.2f}), skipping")
+                continue
+
+        if resume and manifest.is_done(img_name, 'detection'):
+            print(f"Already processed, skipping (resume)")
+            result = manifest.get_record(img_name, 'detection')
+        else:
+            result = process_image(sr_model, crack_model, item, pixel_to_mm, options, manifest, sr_output_dir, resume,
+                                   cache=cache, model_keys=model_keys, memory_budget=memory_budget)
+            processed_count += 1
+            if result is None:
+                continue
+
+        crack_counts[img_name] = len(result['crack_real_size_results'])
+        if result['detection'] is None:
+            continue
+
+        if img_name in no_map_images:
+            no_map_writer.append(result['detection'])
+        else:
+            detection_writer.append(result['detection'])
+            detection_results.append(result['detection'])
+        if crack_detail_writer is not None:
+            crack_detail_writer.append(
+                result['output_name'], result['crack_real_size_results'],
+                latitude=result['latitude'], longitude=result['longitude'],
+                timestamp=str(result['timestamp']) if result['timestamp'] else None
+            )
+
+    # 건너뛴 이미지로 절약된 연산 시간
+    print_compute_saved(plan, time.perf_counter() - start_time, processed_count)
+
+    # 사전 선별 결과와 검증 (균열 후보가 없었지만 전체 처리한 표본 중 균열이 탐지된 비율)
+    if prescreen:
+        print_prescreen_summary(prescreen_rows)
+        print_audit_summary(audit_prescreen(prescreen_rows, crack_counts))
+        write_prescreen_report(prescreen_rows, os.path.join(result_dir, '사전선별_목록.csv'), crack_counts)
+
+    if crack_detail_writer is not None:
+        crack_detail_writer.close()
+        print(f"\nPer-crack table saved to: {crack_table} ({crack_detail_writer.num_rows} cracks)")
+
+    detection_writer.close()
+    if no_map_writer is not None:
+        no_map_writer.close()
+
+    # Excel/지도 (실행기가 주어지면 백그라운드에서 생성)
+    output_args = (detection_writer, no_map_writer, detection_results, metadata, result_dir, image_output_dir,
+                   excel_output, map_output, individual_map_output)
+    if output_executor is not None:
+        output_executor.submit(write_outputs, *output_args)
+    else:
+        write_outputs(*output_args)
+
+    return detection_results
+
+
+def write_outputs(detection_writer, no_map_writer, detection_results, metadata, result_dir, image_output_dir,
+                  excel_output=None, map_output=None, individual_map_output=None):
+    """
+    요약 CSV를 Excel로 변환하고 지도 생성 (run_pipeline 마지막 단계)
+
+    Args:
+        detection_writer (DetectionSummaryWriter): 위치 있는 요약 (닫힌 상태)
+        no_map_writer (DetectionSummaryWriter): 위치 없음 요약 (None 가능)
+        detection_results (list): 지도에 표시할 탐지 결과
+        metadata (list): 메타데이터 (이동 경로)
+        result_dir (str): 결과 디렉토리
+        image_output_dir (str): 결과 이미지 디렉토리
+        excel_output (str): 균열 목록 Excel 경로 (None이면 생략)
+        map_output (str): 전체 지도 HTML 경로 (None이면 생략)
+        individual_map_output (str): 개별 위치 지도 HTML 경로 (None이면 생략)
+    """
+    # 위치 없음 목록 (GPS 없는 이미지, 지도에는 표시하지 않음)
+    if no_map_writer is not None and no_map_writer.num_rows:
+        no_map_output = os.path.join(result_dir, '균열목록_위치없음.xlsx')
+        no_map_writer.to_excel(no_map_output)
+        print(f"No-GPS detection results saved to: {no_map_output} ({no_map_writer.num_rows} images)")
+
+    if not detection_results:
+        print(f"\nWarning: No cracks detected in any images ({result_dir})")
+        return
+
+    if excel_output:
+        detection_writer.to_excel(excel_output)
+        print(f"\nDetection results saved to Excel: {excel_output}")
+
+    # STEP 3: 지도 생성 (탐지 결과/메타데이터를 메모리에서 바로 전달)
+    print("\n" + "="*60)
+    print("STEP 3/3: Generating maps")
+    print("="*60)
+    damage_data = make_damage_list(pd.DataFrame(detection_results))
+    if map_output:
+        make_total_damage_map(damage_data, map_output, image_output_dir, metadata)
+    if individual_map_output:
+        make_each_damage_map(damage_data[0], individual_map_output, image_output_dir)
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Single-process crack detection pipeline')
+    parser.add_argument('--input_dir', required=True, help='촬영 이미지 디렉토리')
+    parser.add_argument('--result_dir', required=True, help='결과 디렉토리 (균열탐지_결과)')
+    parser.add_argument('--sr_config', required=True, help='초해상화 모델 설정 파일 경로')
+    parser.add_argument('--sr_checkpoint', required=True, help='초해상화 모델 체크포인트 파일 경로')
+    parser.add_argument('--sr_model_name', default='edsr', help='초해상화 모델 이름 (MMagic)')
+    parser.add_argument('--crack_config', required=True, help='크랙 탐지 모델 설정 파일 경로')
+    parser.add_argument('--crack_checkpoint', required=True, help='크랙 탐지 모델 체크포인트 파일 경로')
+    parser.add_argument('--shooting_distance_mm', type=float, required=True, help='촬영거리 (mm 단위)')
+    parser.add_argument('--device', default='cuda', help='추론 장치')
+    parser.add_argument('--map_output', default=None, help='전체 지도 HTML 경로 (기본값: result_dir 상위의 균열탐지_지도_결과.html)')
+    parser.add_argument('--no_excel', action='store_true', help='균열목록.xlsx를 저장하지 않음')
+    parser.add_argument('--no_crack_table', action='store_true', help='균열별 상세 테이블을 저장하지 않음')
+    # 중간 파일 (지정 시에만 저장)
+    parser.add_argument('--sr_output_dir', default=None, help='초해상화 이미지 저장 디렉토리 (지정 시에만 저장)')
+    parser.add_argument('--save_metadata', action='store_true', help='이미지정보.json/.xlsx 저장')
+    parser.add_argument('--approx_factor', type=int, default=CONFIG['APPROX_QUANTIFICATION_FACTOR'], help='근사 정량화 축소 배율 (1 = 정밀 모드)')
+    parser.add_argument('--graph_output_dir', default=None, help='균열 골격 그래프(폴리라인) 저장 디렉토리 (지정 시 저장)')
+    parser.add_argument('--graph_format', default='npz', choices=['npz', 'geojson'], help='균열 그래프 저장 형식')
+    parser.add_argument('--output_size', type=int, default=CONFIG['OUTPUT_IMAGE_SIZE'], help='결과 이미지의 긴 변 길이 (픽셀, 비율 유지)')
+    parser.add_argument('--resume', action='store_true', help='진행 기록(result_dir/진행기록.jsonl)에서 완료된 이미지를 건너뛰고 이어서 실행')
+    parser.add_argument('--no_gps_policy', default=CONFIG['NO_GPS_POLICY'], choices=NO_GPS_POLICIES,
+                        help='GPS 없는 이미지 처리 정책 (skip: 처리하지 않음, no_map: 마지막에 처리하여 위치 없음 목록으로 분리)')
+    parser.add_argument('--cache_dir', default=CONFIG['ARTIFACT_CACHE_DIR'], help='산출물 캐시 디렉토리 (초해상화 이미지, 균열 마스크, 측정 레코드)')
+    parser.add_argument('--no_cache', action='store_true', help='산출물 캐시 사용 안 함')
+    parser.add_argument('--dedup', action='store_true', default=CONFIG['DEDUP_FRAMES'],
+                        help='연속 촬영된 중복 프레임은 가장 선명한 한 장만 처리 (제외 목록: 중복제거_목록.csv)')
+    parser.add_argument('--no_dedup', dest='dedup', action='store_false', help='중복 프레임 제거 안 함 (DEDUP_FRAMES = True일 때)')
+    parser.add_argument('--prescreen', action='store_true', default=CONFIG['PRESCREEN'],
+                        help='원본 해상도에서 균열 후보가 없는 프레임은 초해상화/탐지 생략')
+    parser.add_argument('--no_prescreen', dest='prescreen', action='store_false', help='사전 선별 안 함 (PRESCREEN = True일 때)')
+    parser.add_argument('--prescreen_audit_rate', type=float, default=CONFIG['PRESCREEN_AUDIT_RATE'],
+                        help='건너뛸 프레임 중 놓친 비율 측정을 위해 전체 처리할 비율 (0-1)')
+    parser.add_argument('--memory_budget', default=CONFIG['MEMORY_BUDGET'],
+                        help='이미지당 메모리 예산 (예: 16G, 넘을 것으로 추정되면 저메모리/희소/근사 경로로 전환)')
+
+    args = parser.parse_args()
+
+    result_dir = args.result_dir
+    os.makedirs(result_dir, exist_ok=True)
+    map_output = args.map_output or os.path.join(os.path.dirname(os.path.abspath(result_dir)), '균열탐지_지도_결과.html')
+
+    print("="*60)
+    print("Crack Detection Pipeline (single process)")
+    print("="*60)
+
+    print("\nInitializing models...")
+    sr_model, crack_model = load_models(
+        args.sr_config, args.sr_checkpoint, args.crack_config, args.crack_checkpoint,
+        sr_model_name=args.sr_model_name, device=args.device
+    )
+    print("Models initialized successfully")
+
+    cache, model_keys, memory_budget = setup_cache_and_budget(args)
+
+    detection_results = run_pipeline(
+        sr_model, crack_model, args.input_dir, result_dir, args.shooting_distance_mm,
+        map_output=map_output,
+        individual_map_output=os.path.join(result_dir, '개별위치_지도.html'),
+        excel_output=None if args.no_excel else os.path.join(result_dir, '균열목록.xlsx'),
+        crack_table=None if args.no_crack_table else os.path.join(result_dir, '균열목록_균열상세.parquet'),
+        sr_output_dir=args.sr_output_dir,
+        metadata_json=os.path.join(result_dir, '이미지정보.json') if args.save_metadata else None,
+        metadata_excel=os.path.join(result_dir, '이미지정보.xlsx') if args.save_metadata else None,
+        options={
+            'approx_factor': args.approx_factor,
+            'output_size': args.output_size,
+            'graph_output_dir': args.graph_output_dir,
+            'graph_format': args.graph_format,
+        },
+        resume=args.resume,
+        cache=cache,
+        model_keys=model_keys,
+        no_gps_policy=args.no_gps_policy,
+        memory_budget=memory_budget,
+        dedup=args.dedup,
+        prescreen=args.prescreen,
+        prescreen_audit_rate=args.prescreen_audit_rate
+    )
+
+    print("\n" + "="*60)
+    print("Crack Detection Pipeline Complete!")
+    print(f"Total images with cracks: {len(detection_results)}")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
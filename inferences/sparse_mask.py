@@ -0,0 +1,276 @@
+"""
+Sparse crack mask representation
+희소(좌표 기반) 균열 마스크 표현
+
+균열 마스크는 대부분 전경 비율이 1% 미만이므로, 전체 프레임 크기의 dense 배열 대신
+전경 픽셀 좌표만 저장하여 메모리와 연산량이 균열 픽셀 수에 비례하도록 합니다.
+"""
+
+import numpy as np
+import cv2
+
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+# 8-connectivity에서 raster 순서상 "앞쪽" 이웃 (중복 없이 인접 관계를 만들기 위해 사용)
+_FORWARD_NEIGHBORS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+
+class SparseCrackMask:
+    """
+    Coordinate (COO) based binary mask with optional per-pixel values.
+
+    Coordinates are always kept unique and sorted in raster (row-major) order, which is
+    the same order as ``regionprops`` coords and ``np.nonzero`` on a dense mask.
+
+    Args:
+        shape (tuple): The (H, W) shape of the full frame.
+        rows (ndarray): Row index of each foreground pixel.
+        cols (ndarray): Column index of each foreground pixel.
+        values (ndarray, optional): Value of each foreground pixel (e.g. distance map).
+    """
+
+    def __init__(self, shape, rows, cols, values=None):
+        self.shape = (int(shape[0]), int(shape[1]))
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+
+        linear_index = rows.astype(np.int64) * self.shape[1] + cols
+        linear_index, unique_idx = np.unique(linear_index, return_index=True)
+
+        self.rows = rows[unique_idx]
+        self.cols = cols[unique_idx]
+        self.values = None if values is None else np.asarray(values)[unique_idx]
+        self._linear_index = linear_index
+
+    @classmethod
+    def from_dense(cls, mask, values=None):
+        """
+        Build a sparse mask from a dense mask.
+        Args:
+            mask (ndarray): The dense mask. The shape is (H, W). Non-zero pixels are foreground.
+            values (ndarray, optional): Dense value map to sample at foreground pixels.
+        Returns:
+            SparseCrackMask: The sparse mask.
+        """
+        rows, cols = np.nonzero(mask)
+        sampled = None if values is None else values[rows, cols]
+        return cls(mask.shape[:2], rows, cols, sampled)
+
+    @classmethod
+    def empty(cls, shape):
+        """Create an empty sparse mask of the given (H, W) shape."""
+        return cls(shape, np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32))
+
+    @property
+    def nnz(self):
+        """Number of foreground pixels."""
+        return len(self.rows)
+
+    def __len__(self):
+        return self.nnz
+
+    @property
+    def linear_index(self):
+        """Sorted row-major linear index of each foreground pixel."""
+        return self._linear_index
+
+    def bbox(self):
+        """
+        Bounding box of the foreground pixels.
+        Returns:
+            tuple: (min_row, min_col, max_row, max_col) with exclusive max, like regionprops bbox.
+        """
+        if self.nnz == 0:
+            return 0, 0, 0, 0
+        return (int(self.rows.min()), int(self.cols.min()),
+                int(self.rows.max()) + 1, int(self.cols.max()) + 1)
+
+    def subset(self, index):
+        """
+        Select a subset of the foreground pixels.
+        Args:
+            index (ndarray): Boolean or integer index into the foreground pixels.
+        Returns:
+            SparseCrackMask: The sparse mask with the selected pixels only.
+        """
+        values = None if self.values is None else self.values[index]
+        return SparseCrackMask(self.shape, self.rows[index], self.cols[index], values)
+
+    def union(self, other):
+        """
+        Union of two sparse masks of the same shape. Values are dropped.
+        Args:
+            other (SparseCrackMask): The other sparse mask.
+        Returns:
+            SparseCrackMask: The merged sparse mask.
+        """
+        assert self.shape == other.shape, 'sparse masks should have the same shape'
+        return SparseCrackMask(self.shape,
+                               np.concatenate([self.rows, other.rows]),
+                               np.concatenate([self.cols, other.cols]))
+
+    def lookup(self, rows, cols):
+        """
+        Find the position of the given pixels in this mask.
+        Args:
+            rows (ndarray): Row indices to look up.
+            cols (ndarray): Column indices to look up.
+        Returns:
+            ndarray: Index into the foreground pixels, or -1 where the pixel is background.
+        """
+        query = np.asarray(rows, dtype=np.int64) * self.shape[1] + np.asarray(cols, dtype=np.int64)
+        pos = np.searchsorted(self._linear_index, query)
+        pos_clipped = np.minimum(pos, max(self.nnz - 1, 0))
+        found = (pos < self.nnz) & (self._linear_index[pos_clipped] == query) if self.nnz else np.zeros(len(query), dtype=bool)
+        return np.where(found, pos_clipped, -1)
+
+    def crop(self, bbox, pad=0):
+        """
+        Densify only the given bounding box of the mask.
+        Args:
+            bbox (tuple): (min_row, min_col, max_row, max_col) with exclusive max.
+            pad (int): Background padding added around the box, clipped to the frame.
+        Returns:
+            crop (ndarray): Dense bool crop.
+            offset (tuple): (row, col) of the crop origin in the full frame.
+        """
+        min_row = max(bbox[0] - pad, 0)
+        min_col = max(bbox[1] - pad, 0)
+        max_row = min(bbox[2] + pad, self.shape[0])
+        max_col = min(bbox[3] + pad, self.shape[1])
+
+        crop = np.zeros((max_row - min_row, max_col - min_col), dtype=bool)
+        inside = (self.rows >= min_row) & (self.rows < max_row) & (self.cols >= min_col) & (self.cols < max_col)
+        crop[self.rows[inside] - min_row, self.cols[inside] - min_col] = True
+
+        return crop, (min_row, min_col)
+
+    def to_dense(self, dtype=np.uint8):
+        """
+        Densify the whole mask. Only meant for debugging and small frames.
+        Returns:
+            ndarray: The dense mask (or value map, if values are set). The shape is (H, W).
+        """
+        dense = np.zeros(self.shape, dtype=dtype if self.values is None else self.values.dtype)
+        dense[self.rows, self.cols] = 1 if self.values is None else self.values
+        return dense
+
+
+class SparseCrackMaskBuilder:
+    """
+    Assemble a sparse mask from overlapping window predictions.
+
+    Mirrors ``mask_output[window.indices()] = prediction`` of the dense sliding window:
+    a later window overwrites earlier windows inside its own box.
+
+    Args:
+        shape (tuple): The (H, W) shape of the full frame.
+    """
+
+    def __init__(self, shape):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self._chunks = []  # [(min_row, min_col, max_row, max_col), rows, cols]
+
+    def paste(self, window_mask, row, col):
+        """
+        Paste a dense window prediction at (row, col).
+        Args:
+            window_mask (ndarray): The window mask. The shape is (h, w). Non-zero pixels are foreground.
+            row (int): Top row of the window in the full frame.
+            col (int): Left column of the window in the full frame.
+        """
+        h, w = window_mask.shape[:2]
+        box = (row, col, row + h, col + w)
+
+        # clear everything previous windows set inside this box
+        for chunk in self._chunks:
+            chunk_box, rows, cols = chunk
+            if chunk_box[0] >= box[2] or chunk_box[2] <= box[0] or chunk_box[1] >= box[3] or chunk_box[3] <= box[1]:
+                continue
+            keep = ~((rows >= box[0]) & (rows < box[2]) & (cols >= box[1]) & (cols < box[3]))
+            chunk[1] = rows[keep]
+            chunk[2] = cols[keep]
+
+        rows, cols = np.nonzero(window_mask)
+        self._chunks.append([box, (rows + row).astype(np.int32), (cols + col).astype(np.int32)])
+
+    def build(self):
+        """
+        Returns:
+            SparseCrackMask: The assembled sparse mask.
+        """
+        if not self._chunks:
+            return SparseCrackMask.empty(self.shape)
+        rows = np.concatenate([chunk[1] for chunk in self._chunks])
+        cols = np.concatenate([chunk[2] for chunk in self._chunks])
+        return SparseCrackMask(self.shape, rows, cols)
+
+
+def label_sparse_mask(sparse_mask):
+    """
+    Label 8-connected components of a sparse mask without densifying it.
+    Labels follow raster order of each component's first pixel, same as skimage ``label``.
+    Args:
+        sparse_mask (SparseCrackMask): The sparse mask.
+    Returns:
+        labels (ndarray): Label (starting from 1) of each foreground pixel.
+        num (int): The number of components.
+    """
+    n = sparse_mask.nnz
+    if n == 0:
+        return np.empty(0, dtype=np.int32), 0
+
+    src_list = []
+    dst_list = []
+    for d_row, d_col in _FORWARD_NEIGHBORS:
+        neighbor_cols = sparse_mask.cols + d_col
+        valid = (neighbor_cols >= 0) & (neighbor_cols < sparse_mask.shape[1])
+        neighbor = sparse_mask.lookup(sparse_mask.rows + d_row, neighbor_cols)
+        connected = valid & (neighbor >= 0)
+        src_list.append(np.nonzero(connected)[0])
+        dst_list.append(neighbor[connected])
+
+    src = np.concatenate(src_list)
+    dst = np.concatenate(dst_list)
+    graph = coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n, n))
+
+    num, labels = connected_components(graph, directed=False)
+
+    return (labels + 1).astype(np.int32), num
+
+
+def rasterize_lines(shape, lines, thickness):
+    """
+    Rasterize line segments into a sparse mask, equivalent to ``cv2.line`` on a dense image.
+    Args:
+        shape (tuple): The (H, W) shape of the full frame.
+        lines (list): [((x1, y1), (x2, y2)), ...] in cv2 point order.
+        thickness (int): Line thickness.
+    Returns:
+        SparseCrackMask: Pixels covered by the lines.
+    """
+    rows_list = []
+    cols_list = []
+    pad = thickness
+
+    for pt1, pt2 in lines:
+        min_x = max(min(pt1[0], pt2[0]) - pad, 0)
+        min_y = max(min(pt1[1], pt2[1]) - pad, 0)
+        max_x = min(max(pt1[0], pt2[0]) + pad + 1, shape[1])
+        max_y = min(max(pt1[1], pt2[1]) + pad + 1, shape[0])
+
+        canvas = np.zeros((max_y - min_y, max_x - min_x), dtype=np.uint8)
+        canvas = cv2.line(canvas,
+                          (int(pt1[0] - min_x), int(pt1[1] - min_y)),
+                          (int(pt2[0] - min_x), int(pt2[1] - min_y)),
+                          1, thickness)
+        rows, cols = np.nonzero(canvas)
+        rows_list.append(rows + min_y)
+        cols_list.append(cols + min_x)
+
+    if not rows_list:
+        return SparseCrackMask.empty(shape)
+
+    return SparseCrackMask(shape, np.concatenate(rows_list), np.concatenate(cols_list))
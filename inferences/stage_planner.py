@@ -0,0 +1,99 @@
+"""
+Per-image stage planning from GPS metadata
+GPS 메타데이터 기반 이미지별 처리 계획
+
+GPS가 없는 이미지는 초해상화/탐지/정량화를 모두 마친 뒤에야 "No GPS data found, skipping..."으로
+버려졌습니다. 메타데이터(이미지정보.json)의 has_gps를 먼저 확인하여 이미지별로 처리 여부를 정합니다.
+
+정책 (NO_GPS_POLICY):
+    'skip'   : GPS 없는 이미지는 어떤 단계도 실행하지 않음
+    'no_map' : GPS 있는 이미지를 모두 처리한 뒤 처리하고, 지도/균열목록 대신 위치 없음 목록으로 분리
+"""
+
+import os
+
+from extract_image_metadata import get_exif_data, get_gps_info, get_lat_lon
+
+
+NO_GPS_POLICIES = ('skip', 'no_map')
+
+
+def image_has_gps(img_path, metadata_dict):
+    """
+    이미지의 GPS 유무 (메타데이터 우선, 없으면 EXIF 헤더만 읽어 확인)
+
+    Args:
+        img_path (str): 이미지 경로
+        metadata_dict (dict): {image_name: metadata}
+
+    Returns:
+        bool: GPS 좌표 사용 가능 여부
+    """
+    item = metadata_dict.get(os.path.basename(img_path))
+    if item is not None:
+        return bool(item.get('has_gps', item.get('latitude') is not None and item.get('longitude') is not None))
+
+    lat, lon = get_lat_lon(get_gps_info(get_exif_data(img_path)))
+    return lat is not None and lon is not None
+
+
+def plan_images(img_paths, metadata_dict, policy='skip'):
+    """
+    이미지별 처리 계획 수립
+
+    Args:
+        img_paths (list): 처리 대상 이미지 경로 (처리 순서)
+        metadata_dict (dict): {image_name: metadata}
+        policy (str): GPS 없는 이미지 처리 정책 ('skip' 또는 'no_map')
+
+    Returns:
+        dict: {
+            'process': 처리할 이미지 경로 (GPS 있는 이미지 먼저, no_map 정책이면 GPS 없는 이미지가 뒤에 붙음),
+            'no_map': 처리하지만 지도에서 제외할 이미지 경로,
+            'skipped': 처리하지 않는 이미지 경로,
+            'total': 전체 이미지 수,
+        }
+    """
+    if policy not in NO_GPS_POLICIES:
+        raise ValueError(f"Unknown no-GPS policy: {policy} (choose from {NO_GPS_POLICIES})")
+
+    with_gps, without_gps = [], []
+    for img_path in img_paths:
+        (with_gps if image_has_gps(img_path, metadata_dict) else without_gps).append(img_path)
+
+    if policy == 'no_map':
+        return {'process': with_gps + without_gps, 'no_map': without_gps, 'skipped': [], 'total': len(img_paths)}
+
+    return {'process': with_gps, 'no_map': [], 'skipped': without_gps, 'total': len(img_paths)}
+
+
+def print_plan(plan, policy):
+    """처리 계획 요약 출력"""
+    print(f"\nStage plan (no-GPS policy: {policy})")
+    print(f"  Images with GPS: {plan['total'] - len(plan['skipped']) - len(plan['no_map'])}/{plan['total']}")
+    if plan['skipped']:
+        print(f"  Skipped (no GPS): {len(plan['skipped'])}")
+    if plan['no_map']:
+        print(f"  No-map queue (no GPS, processed last): {len(plan['no_map'])}")
+
+
+def print_compute_saved(plan, elapsed_seconds, processed_count):
+    """
+    건너뛴 이미지로 절약된 연산 시간 추정 (처리한 이미지의 평균 처리 시간 기준)
+
+    Args:
+        plan (dict): plan_images 결과
+        elapsed_seconds (float): 이미지 처리에 걸린 총 시간 (초)
+        processed_count (int): 실제로 처리한 이미지 수
+    """
+    skipped = len(plan['skipped'])
+    if skipped == 0:
+        return
+
+    if processed_count > 0:
+        per_image = elapsed_seconds / processed_count
+        print(f"Compute saved: {skipped} images skipped before any stage "
+              f"(~{skipped * per_image / 60:.1f} min at {per_image:.1f} s/image, "
+              f"{skipped / plan['total'] * 100:.1f}% of frames)")
+    else:
+        print(f"Compute saved: {skipped} images skipped before any stage ({skipped / plan['total'] * 100:.1f}% of frames)")
@@ -8,10 +8,20 @@ Usage:
         --model-ckpt '모델/초해상화/초해상화_weight.pth' --img-dir '/home/user/WindowsShare/02. Projects/2025.03 프로토타이핑사업/test_data_LR(training)/2023_현장촬영이미지_학습용데이터셋/LR/leftImg8bit/train' --result-out-dir '/home/user/WindowsShare/02. Projects/2025.03 프로토타이핑사업/test_data_LR(training)/2023_현장촬영이미지_학습용데이터셋/SR/leftImg8bit/train'
 """
 
-from argparse import ArgumentParser
+from argparse import ArgumentParser, BooleanOptionalAction
 from mmengine import DictAction
 from mmagic.apis import MMagicInferencer
+from mmseg.apis import init_model
 import os
+import json
+import time
+
+from run_manifest import RunManifest, atomic_imwrite
+from artifact_cache import ArtifactCache, sr_model_fingerprint, sr_cache_key
+from config import CONFIG
+from stage_planner import NO_GPS_POLICIES, plan_images, print_plan, print_compute_saved
+from dedup_frames import dedup_images, write_dedup_report, print_dedup_summary
+from prescreen import prescreen_image, write_prescreen_report, print_prescreen_summary
 
 def parse_args():
     parser = ArgumentParser(description='Super Resolution using MMagic')
@@ -72,6 +82,72 @@ def parse_args():
         nargs='+',
         action=DictAction,
         help='Other customized kwargs for different model')
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        default=None,
+        help='Run manifest path (default: <result-out-dir>/sr_manifest.jsonl).')
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip images already completed in the run manifest.')
+    parser.add_argument(
+        '--metadata-json',
+        type=str,
+        default=None,
+        help='GPS metadata JSON. If given, images without GPS are planned by --no-gps-policy before SR.')
+    parser.add_argument(
+        '--no-gps-policy',
+        type=str,
+        default=CONFIG['NO_GPS_POLICY'],
+        choices=NO_GPS_POLICIES,
+        help='skip: do not super-resolve images without GPS, no_map: process them last.')
+    parser.add_argument(
+        '--dedup',
+        action=BooleanOptionalAction,
+        default=CONFIG['DEDUP_FRAMES'],
+        help='Drop near-duplicate burst frames before SR, keeping the sharpest frame of each burst '
+             '(--no-dedup turns off DEDUP_FRAMES from config.py).')
+    parser.add_argument(
+        '--dedup-report',
+        type=str,
+        default=None,
+        help='Dropped-frame report path (default: <result-out-dir>/dedup_report.csv).')
+    parser.add_argument(
+        '--prescreen',
+        action=BooleanOptionalAction,
+        default=CONFIG['PRESCREEN'],
+        help='Run the crack model on the original image first and skip SR for frames without crack candidates '
+             '(--no-prescreen turns off PRESCREEN from config.py).')
+    parser.add_argument(
+        '--prescreen-config',
+        type=str,
+        default=None,
+        help='Crack detection model config used by --prescreen.')
+    parser.add_argument(
+        '--prescreen-ckpt',
+        type=str,
+        default=None,
+        help='Crack detection model checkpoint used by --prescreen.')
+    parser.add_argument(
+        '--prescreen-audit-rate',
+        type=float,
+        default=CONFIG['PRESCREEN_AUDIT_RATE'],
+        help='Fraction of crack-free frames still processed fully to measure the pre-screen miss rate.')
+    parser.add_argument(
+        '--prescreen-report',
+        type=str,
+        default=None,
+        help='Pre-screen report path (default: <result-out-dir>/prescreen_report.csv, read by the detection step).')
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=CONFIG['ARTIFACT_CACHE_DIR'],
+        help='Artifact cache directory (SR results are reused for identical inputs and models).')
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not use the artifact cache.')
     parser.add_argument(
         '--seed',
         type=int,
@@ -153,33 +229,113 @@ def main():
         image_files = sorted([f for f in os.listdir(args.img_dir) 
                              if f.lower().endswith(('.png', '.jpg', '.jpeg'))])
         
+        # Plan per image from GPS metadata, so frames without GPS are not super-resolved for nothing
+        plan = None
+        metadata_dict = {}
+        if args.metadata_json and os.path.exists(args.metadata_json):
+            with open(args.metadata_json, 'r', encoding='utf-8') as f:
+                metadata_dict = {item['image_name']: item for item in json.load(f)}
+            plan = plan_images([os.path.join(args.img_dir, f) for f in image_files], metadata_dict, args.no_gps_policy)
+            print_plan(plan, args.no_gps_policy)
+            image_files = [os.path.basename(p) for p in plan['process']]
+        
+        # Drop near-duplicate burst frames, so each wall is super-resolved and segmented once
+        dedup_report = args.dedup_report or os.path.join(args.result_out_dir, 'dedup_report.csv')
+        if args.dedup:
+            dedup = dedup_images([os.path.join(args.img_dir, f) for f in image_files], metadata_dict)
+            write_dedup_report(dedup, dedup_report)
+            print_dedup_summary(dedup, dedup_report)
+            image_files = [os.path.basename(p) for p in dedup['keep']]
+        elif os.path.exists(dedup_report):
+            # A report from an earlier deduplicated run would make the detection step drop frames
+            os.remove(dedup_report)
+        
         print(f"\nFound {len(image_files)} images to process")
         print(f"Input: {args.img_dir}")
         print(f"Output: {args.result_out_dir}")
         print(f"Model: {args.model_name}")
         print("")
         
+        # Per-image progress, so an interrupted run can be resumed with --resume
+        manifest_path = args.manifest or os.path.join(args.result_out_dir, 'sr_manifest.jsonl')
+        manifest = RunManifest(manifest_path, resume=args.resume)
+        
         # Initialize the inferencer (without img-dir parameter)
         init_args = vars(args).copy()
         init_args['img_dir'] = None  # Remove img_dir from initialization
         editor = MMagicInferencer(**init_args)
         
+        # Low-res pre-screen with the crack model, so crack-free frames are not super-resolved
+        crack_model = None
+        prescreen_rows = []
+        prescreen_report = args.prescreen_report or os.path.join(args.result_out_dir, 'prescreen_report.csv')
+        if args.prescreen:
+            assert args.prescreen_config and args.prescreen_ckpt, \
+                '--prescreen requires --prescreen-config and --prescreen-ckpt (crack detection model).'
+            crack_model = init_model(args.prescreen_config, args.prescreen_ckpt,
+                                     device='cuda:0' if args.device == 'cuda' else args.device)
+        elif os.path.exists(prescreen_report):
+            # A report from an earlier pre-screened run would make the detection step skip frames
+            os.remove(prescreen_report)
+        
+        # Content-addressed cache: (input image hash, SR model hash), shared with run_pipeline.py
+        cache = None
+        if CONFIG['USE_ARTIFACT_CACHE'] and not args.no_cache:
+            cache = ArtifactCache.from_config(args.cache_dir)
+            sr_model_key = sr_model_fingerprint(args.model_config, args.model_ckpt,
+                                                model_name=args.model_name, model_setting=args.model_setting)
+        
         # Process each image individually
+        start_time = time.perf_counter()
+        processed_count = 0
         for idx, img_name in enumerate(image_files, 1):
             img_path = os.path.join(args.img_dir, img_name)
             output_path = os.path.join(args.result_out_dir, img_name)
             print(f"[{idx}/{len(image_files)}] Processing: {img_name}")
             
+            if crack_model is not None:
+                # Decisions are kept in the manifest, so a resumed run keeps the same decisions
+                row = manifest.get_record(img_name, 'prescreen')
+                if row is None:
+                    row = prescreen_image(crack_model, img_path, args.prescreen_audit_rate)
+                    manifest.mark_done(img_name, 'prescreen', row)
+                prescreen_rows.append(row)
+                if row['decision'] == 'skip':
+                    print(f"No crack candidates at low resolution (max score {row['max_score']:.2f}), skipping")
+                    continue
+            
+            if args.resume and manifest.is_done(img_name, 'sr') and os.path.exists(output_path):
+                print(f"Already processed, skipping (resume)")
+                continue
+            
+            if cache is not None:
+                sr_key = sr_cache_key(img_path, sr_model_key)
+                sr_image = cache.load_image(sr_key)
+                if sr_image is not None:
+                    atomic_imwrite(output_path, sr_image)
+                    manifest.mark_done(img_name, 'sr', {'output_path': output_path})
+                    print(f"Restored from cache: {output_path}")
+                    continue
+            
             # Infer for single image with explicit output path
             result = editor.infer(img=img_path)
+            processed_count += 1
             
-            # Save result manually
-            import cv2
-            cv2.imwrite(output_path, result[1])
+            # Save result manually (write to a temporary file, then rename)
+            atomic_imwrite(output_path, result[1])
+            if cache is not None:
+                cache.save_image(sr_key, result[1])
+            manifest.mark_done(img_name, 'sr', {'output_path': output_path})
             print(f"Saved: {output_path}")
         
         print(f"\nSuper resolution processing completed.")
         print(f"Processed {len(image_files)} images")
+        if plan is not None:
+            print_compute_saved(plan, time.perf_counter() - start_time, processed_count)
+        if crack_model is not None:
+            write_prescreen_report(prescreen_rows, prescreen_report)
+            print_prescreen_summary(prescreen_rows)
+            print(f"Pre-screen report saved to: {prescreen_report}")
     else:
         # Process single image or video
         editor = MMagicInferencer(**vars(args))
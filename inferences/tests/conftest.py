@@ -0,0 +1,12 @@
+"""
+pytest 설정: inferences/ 모듈은 스크립트처럼 평면 import(from config import CONFIG)를 사용하므로 경로에 추가
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: 별도 프로세스로 메모리를 측정하는 등 오래 걸리는 테스트 (-m "not slow"로 제외)')
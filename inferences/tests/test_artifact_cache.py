@@ -0,0 +1,112 @@
+"""산출물 캐시 테스트 (키, 단계별 저장/로드, LRU 삭제, 진입점 간 초해상화 키 공유)"""
+
+import os
+import ast
+
+import numpy as np
+
+from artifact_cache import ArtifactCache, make_key, quantification_config, sr_model_fingerprint, sr_cache_key
+from sparse_mask import SparseCrackMask
+
+
+INFERENCES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write_file(path, content):
+    with open(path, 'wb') as f:
+        f.write(content)
+    return str(path)
+
+
+def test_make_key_ignores_dict_order():
+    assert make_key('a', {'x': 1, 'y': 2}) == make_key('a', {'y': 2, 'x': 1})
+    assert make_key('a', 'b') != make_key('ab')
+
+
+def test_records_key_depends_on_quantification_path():
+    # dense/low_memory/sparse 경로의 측정값은 서로 다르므로 경로마다 다른 레코드
+    base = {'sparse': False, 'low_memory': False, 'approx_factor': 1}
+    keys = {make_key('mask', quantification_config(dict(base, **change)))
+            for change in ({}, {'low_memory': True}, {'sparse': True}, {'approx_factor': 2})}
+
+    assert len(keys) == 4
+
+
+def test_sr_key_depends_on_content_and_model_only(tmp_path):
+    config = _write_file(tmp_path / 'sr_config.py', b'model = 1')
+    checkpoint = _write_file(tmp_path / 'sr.pth', b'weights')
+    jpg = _write_file(tmp_path / 'a.jpg', b'same bytes')
+    png = _write_file(tmp_path / 'b.png', b'same bytes')
+
+    model_key = sr_model_fingerprint(config, checkpoint, model_name='edsr')
+    assert sr_cache_key(jpg, model_key) == sr_cache_key(png, model_key)
+    assert sr_cache_key(jpg, model_key) != sr_cache_key(jpg, sr_model_fingerprint(config, checkpoint, model_name='esrgan'))
+
+
+def _sr_calls(module_name):
+    """모듈 소스에서 호출되는 함수 이름 집합"""
+    with open(os.path.join(INFERENCES_DIR, module_name), 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    return {node.func.id for node in ast.walk(tree) if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)}
+
+
+def test_sr_entry_points_share_the_key_helpers():
+    # super_resolution.py (3단계 실행)와 run_pipeline.py (단일 프로세스)가 같은 초해상화 캐시 항목을 사용
+    for module_name in ('super_resolution.py', 'run_pipeline.py'):
+        calls = _sr_calls(module_name)
+        assert {'sr_model_fingerprint', 'sr_cache_key'} <= calls, module_name
+        assert 'file_hash' not in calls, module_name
+
+
+def test_model_entry_points_share_the_cache_setup():
+    # 모델을 한 번 로드하는 진입점은 모두 같은 함수로 캐시 키를 만듦 (진입점마다 키가 달라지지 않도록)
+    for module_name in ('run_pipeline.py', 'watch_folder.py', 'queue_worker.py', 'batch_run.py'):
+        calls = _sr_calls(module_name)
+        assert 'setup_cache_and_budget' in calls, module_name
+        if module_name != 'run_pipeline.py':
+            assert not {'sr_model_fingerprint', 'model_fingerprint'} & calls, module_name
+
+
+def test_stage_round_trips(tmp_path):
+    cache = ArtifactCache(str(tmp_path / 'cache'), 1 << 30)
+
+    image = np.random.default_rng(0).integers(0, 255, (32, 48, 3), dtype=np.uint8)
+    cache.save_image('k1', image)
+    np.testing.assert_array_equal(cache.load_image('k1'), image)
+
+    mask = np.zeros((20, 30), dtype=np.uint8)
+    mask[5:9, 3:25] = 1
+    cache.save_mask('k2', mask)
+    np.testing.assert_array_equal(cache.load_mask('k2', sparse=False), mask)
+    assert isinstance(cache.load_mask('k2'), SparseCrackMask)
+
+    records = [['(5,3)-(9,25)', '1.00x2.00x20.00', 1, np.int64(88)]]
+    cache.save_records('k3', records)
+    assert cache.load_records('k3') == [['(5,3)-(9,25)', '1.00x2.00x20.00', 1, 88]]
+
+    assert cache.load_image('missing') is None
+    stats = cache.stats()
+    assert stats['sr']['hits'] == 1 and stats['sr']['misses'] == 1
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = ArtifactCache(str(tmp_path / 'cache'), 1 << 30)
+    image = np.full((64, 64, 3), 7, dtype=np.uint8)
+    size = os.path.getsize(cache.save_image('old', image))
+    cache.save_image('new', image)
+    cache.save_image('used', image)
+    cache._db.execute("UPDATE artifacts SET last_access = CASE key WHEN 'old' THEN 1 WHEN 'new' THEN 2 ELSE 3 END")
+    cache._db.commit()
+
+    assert cache.evict(max_bytes=2 * size) == 1
+
+    assert cache.load_image('old') is None
+    assert cache.load_image('new') is not None and cache.load_image('used') is not None
+
+
+def test_missing_file_counts_as_miss(tmp_path):
+    cache = ArtifactCache(str(tmp_path / 'cache'), 1 << 30)
+    path = cache.save_image('k', np.zeros((4, 4, 3), dtype=np.uint8))
+    os.remove(path)
+    assert cache.load_image('k') is None
+    assert cache.stats()['sr']['entries'] == 0
@@ -0,0 +1,101 @@
+"""촬영 목록 읽기/검증 테스트 (CSV/YAML, 촬영거리 단위, 카메라 프로필, 상대 경로, 오류 모아 보고)"""
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('mmseg')
+pytest.importorskip('mmagic')
+from batch_run import load_survey_manifest  # noqa: E402
+from config import CONFIG  # noqa: E402
+
+
+@pytest.fixture
+def survey_dirs(tmp_path):
+    for name in ('교량A', '교량B'):
+        (tmp_path / name / '촬영이미지').mkdir(parents=True)
+    return tmp_path
+
+
+def test_csv_with_relative_paths_and_per_row_camera_override(survey_dirs):
+    manifest = survey_dirs / '촬영목록.csv'
+    manifest.write_text(
+        "name,input_dir,shooting_distance_m,camera,focal_length_mm,result_dir\n"
+        "교량A,교량A/촬영이미지,1.5,s22,,\n"
+        "교량B,교량B/촬영이미지,2,,7.5,결과/교량B\n"
+        ",,,,,\n",
+        encoding='utf-8-sig')
+
+    surveys = load_survey_manifest(str(manifest))
+
+    assert [survey['name'] for survey in surveys] == ['교량A', '교량B']
+    first, second = surveys
+    assert first['input_dir'] == str(survey_dirs / '교량A' / '촬영이미지')
+    assert first['result_dir'] is None
+    assert first['shooting_distance_mm'] == pytest.approx(1500.0)
+    assert first['camera_name'] == 's22'
+    assert first['camera'] == CONFIG['CAMERA_PROFILES']['s22']
+
+    assert second['result_dir'] == str(survey_dirs / '결과' / '교량B')
+    assert second['shooting_distance_mm'] == pytest.approx(2000.0)
+    assert second['camera_name'] == 'default'
+    assert second['camera']['FOCAL_LENGTH_MM'] == 7.5
+    assert second['camera']['SENSOR_WIDTH_MM'] == CONFIG['SENSOR_WIDTH_MM']
+
+
+def test_yaml_with_manifest_camera_profiles(survey_dirs):
+    manifest = survey_dirs / '촬영목록.yaml'
+    manifest.write_text(
+        "cameras:\n"
+        "  mavic3:\n"
+        "    SENSOR_WIDTH_MM: 17.3\n"
+        "    FOCAL_LENGTH_MM: 12.3\n"
+        "surveys:\n"
+        "  - input_dir: 교량A/촬영이미지\n"
+        "    shooting_distance_mm: 3000\n"
+        "    camera: mavic3\n",
+        encoding='utf-8')
+
+    survey, = load_survey_manifest(str(manifest))
+
+    # 이름이 없으면 촬영 폴더 이름
+    assert survey['name'] == '촬영이미지'
+    assert survey['shooting_distance_mm'] == 3000.0
+    assert survey['camera_name'] == 'mavic3'
+    assert survey['camera']['SENSOR_WIDTH_MM'] == 17.3
+    assert survey['camera']['FOCAL_LENGTH_MM'] == 12.3
+    # 프로필에 없는 값은 기본값
+    assert survey['camera']['IMAGE_WIDTH_PX'] == CONFIG['IMAGE_WIDTH_PX']
+
+
+def test_all_errors_are_reported_together(survey_dirs):
+    manifest = survey_dirs / '촬영목록.csv'
+    manifest.write_text(
+        "name,input_dir,shooting_distance_m,camera,sensor_width_mm\n"
+        "없는카메라,없는폴더,1.5,gopro,\n"
+        "거리없음,교량A/촬영이미지,,,\n"
+        "음수,교량B/촬영이미지,-1,,abc\n"
+        "폴더없음,,abc,,\n"
+        "음수,교량B/촬영이미지,1,,\n",
+        encoding='utf-8')
+
+    with pytest.raises(ValueError) as excinfo:
+        load_survey_manifest(str(manifest))
+
+    message = str(excinfo.value)
+    # 카메라 오류가 있는 행의 폴더 오류도 함께 보고
+    assert "없는카메라: unknown camera profile 'gopro'" in message
+    assert "없는카메라: input_dir not found" in message
+    assert "거리없음: missing shooting_distance_m or shooting_distance_mm" in message
+    assert "음수: shooting distance must be positive" in message
+    assert "음수: sensor_width_mm is not a number" in message
+    assert "폴더없음: missing input_dir" in message
+    assert "폴더없음: shooting distance is not a number" in message
+    assert "음수: duplicate survey name" in message
+
+
+def test_empty_manifest_is_an_error(tmp_path):
+    manifest = tmp_path / '촬영목록.yaml'
+    manifest.write_text("surveys: []\n", encoding='utf-8')
+
+    with pytest.raises(ValueError, match='no surveys listed'):
+        load_survey_manifest(str(manifest))
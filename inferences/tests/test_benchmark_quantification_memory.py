@@ -0,0 +1,26 @@
+"""정량화 peak 메모리 회귀 테스트 (benchmark_quantification_memory.py를 축소 크기로 실행)"""
+
+import pytest
+
+from benchmark_quantification_memory import measure_mode
+
+
+# 4000x3000 마스크에서 마스크 자체를 뺀 정량화 peak RSS 예산 (MB)
+# 측정값: low_memory 약 110 MB, sparse 약 70 MB, dense(default) 약 570 MB
+REDUCED_SHAPE = (3000, 4000)
+INCREMENT_BUDGET_MB = {
+    'low_memory': 250,
+    'sparse': 150,
+}
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('mode', sorted(INCREMENT_BUDGET_MB))
+def test_low_memory_modes_stay_within_peak_budget(mode):
+    measurement, exitcode = measure_mode(mode, REDUCED_SHAPE)
+
+    assert measurement is not None, f"{mode} terminated with exit code {exitcode}"
+    baseline_mb, peak_mb, num_results = measurement
+    assert num_results > 0
+    assert peak_mb - baseline_mb <= INCREMENT_BUDGET_MB[mode], \
+        f"{mode} peak {peak_mb:.1f} MB is {peak_mb - baseline_mb:.1f} MB above the mask"
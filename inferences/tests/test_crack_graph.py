@@ -0,0 +1,67 @@
+"""균열 골격 그래프 테스트 (crack_id와 정량화 결과 순서 일치)"""
+
+import numpy as np
+import cv2
+import pytest
+
+from sparse_mask import SparseCrackMask
+from quantify_seg_results import quantify_crack_width_length
+from crack_graph import build_crack_graph, save_crack_graph, load_crack_graph
+
+
+def _two_piece_mask():
+    """떨어진 골격 조각 3개 (정량화에서는 connect_cracks_by_edge로 하나의 균열로 병합됨)"""
+    mask = np.zeros((200, 300), dtype=np.uint8)
+    cv2.line(mask, (20, 100), (120, 100), 1, 5)
+    cv2.line(mask, (126, 100), (260, 100), 1, 5)
+    cv2.line(mask, (20, 20), (30, 20), 1, 3)
+    return mask
+
+
+@pytest.mark.parametrize('mode', ['dense', 'low_memory', 'sparse'])
+def test_crack_id_matches_quantification_index(mode):
+    mask = _two_piece_mask()
+    crack_mask = SparseCrackMask.from_dense(mask) if mode == 'sparse' else mask
+
+    _, results, distance_map, skeleton_crack_index = quantify_crack_width_length(
+        None, crack_mask, (0, 0, 255), minimum_area=100, low_memory=(mode == 'low_memory'), return_distance_map=True)
+    graph = build_crack_graph(distance_map, skeleton_crack_index)
+
+    assert len(results) == 1
+    assert [crack['crack_id'] for crack in graph['cracks']] == [0]
+    # 병합된 모든 골격 조각이 같은 균열에 속함
+    vertices = np.concatenate(graph['cracks'][0]['polylines'])
+    assert vertices[:, 0].min() < 30 and vertices[:, 1].max() > 250
+
+
+def test_cracks_below_minimum_area_have_no_graph():
+    _, results, distance_map, skeleton_crack_index = quantify_crack_width_length(
+        None, _two_piece_mask(), (0, 0, 255), minimum_area=100000, return_distance_map=True)
+
+    assert results == []
+    assert build_crack_graph(distance_map, skeleton_crack_index)['cracks'] == []
+
+
+def test_without_index_numbers_components_from_zero():
+    _, _, distance_map, _ = quantify_crack_width_length(None, _two_piece_mask(), (0, 0, 255), minimum_area=0,
+                                                        return_distance_map=True)
+    graph = build_crack_graph(distance_map)
+
+    crack_ids = [crack['crack_id'] for crack in graph['cracks']]
+    assert len(crack_ids) > 1
+    assert crack_ids == list(range(len(crack_ids)))
+
+
+def test_npz_round_trip_keeps_crack_id(tmp_path):
+    mask = _two_piece_mask()
+    _, _, distance_map, skeleton_crack_index = quantify_crack_width_length(
+        None, mask, (0, 0, 255), minimum_area=100, return_distance_map=True)
+    graph = build_crack_graph(distance_map, skeleton_crack_index)
+
+    path = str(tmp_path / 'graph.npz')
+    save_crack_graph(graph, path)
+    loaded = load_crack_graph(path)
+
+    assert [crack['crack_id'] for crack in loaded['cracks']] == [0]
+    assert loaded['cracks'][0]['length'] == pytest.approx(graph['cracks'][0]['length'], rel=1e-6)
+    assert len(loaded['cracks'][0]['polylines']) == len(graph['cracks'][0]['polylines'])
@@ -0,0 +1,69 @@
+"""초해상화 입력 변환 테스트 (super_resolve: 메모리 이미지 vs MMagic의 파일 경로 전처리)"""
+
+import os
+
+import numpy as np
+import cv2
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('mmseg')
+from crack_pipeline import super_resolve  # noqa: E402
+
+
+SR_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                         '모델', '초해상화', '초해상화_config.py')
+
+
+class _StubInferencer:
+    """forward 입력을 기록하는 MMagic 추론기 대용"""
+    device = 'cpu'
+
+    def forward(self, data):
+        self.inputs = data['inputs']
+        return data['inputs']
+
+    def visualize(self, preds):
+        return 'visualized'
+
+
+class _StubSRModel:
+    def __init__(self):
+        self.inferencer = _StubInferencer()
+
+
+def test_ndarray_is_converted_like_the_mmagic_pipeline():
+    # LoadImageFromFile(channel_order='rgb') + PackInputs + inputs / 255 + collate
+    image = np.random.default_rng(0).integers(0, 255, (5, 7, 3), dtype=np.uint8)
+    sr_model = _StubSRModel()
+
+    assert super_resolve(sr_model, image) == 'visualized'
+
+    inputs = sr_model.inferencer.inputs
+    assert tuple(inputs.shape) == (1, 3, 5, 7)
+    np.testing.assert_allclose(inputs[0].numpy(), image[..., ::-1].transpose(2, 0, 1) / 255.0, rtol=1e-6)
+
+
+def test_ndarray_and_path_inputs_give_the_same_image(tmp_path):
+    pytest.importorskip('mmagic')
+    from mmengine import Config
+    from mmagic.apis import MMagicInferencer
+    from mmagic.registry import MODELS
+    from mmagic.utils import register_all_modules
+
+    # 무작위 가중치로 충분 (두 입력 경로의 전처리만 비교)
+    register_all_modules()
+    torch.manual_seed(0)
+    model = MODELS.build(Config.fromfile(SR_CONFIG).model)
+    checkpoint = str(tmp_path / 'sr.pth')
+    torch.save({'state_dict': model.state_dict()}, checkpoint)
+    sr_model = MMagicInferencer(model_name='edsr', model_config=SR_CONFIG, model_ckpt=checkpoint, device='cpu')
+
+    path = str(tmp_path / 'a.png')
+    cv2.imwrite(path, np.random.default_rng(1).integers(0, 255, (24, 32, 3), dtype=np.uint8))
+
+    from_path = super_resolve(sr_model, path)
+    from_array = super_resolve(sr_model, cv2.imread(path))
+
+    assert from_array.shape == from_path.shape
+    np.testing.assert_allclose(from_array.astype(np.int16), from_path.astype(np.int16), atol=1)
@@ -0,0 +1,93 @@
+"""중복 프레임 제거 테스트 (묶음 규칙, 가장 선명한 프레임 선택, 파일 이름 순서)"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import cv2
+
+import dedup_frames
+from dedup_frames import cluster_frames, dedup_images, list_frames
+
+
+T0 = datetime(2024, 5, 1, 10, 0, 0)
+
+
+def _frame(name, hash_value, seconds=None, shape=(60, 80), latitude=None, longitude=None):
+    return {
+        'image_path': name, 'image_name': name, 'order': 0,
+        'timestamp': None if seconds is None else T0 + timedelta(seconds=seconds),
+        'latitude': latitude, 'longitude': longitude,
+        'shape': shape, 'hash': hash_value, 'sharpness': 0.0,
+    }
+
+
+def _names(clusters):
+    return [[frame['image_name'] for frame in cluster] for cluster in clusters]
+
+
+def test_frames_are_compared_with_the_first_frame_of_the_group():
+    # b, c는 직전 프레임과 3비트씩 다르지만 c는 기준 a와 6비트 차이
+    frames = [_frame('a', 0b000000), _frame('b', 0b000111), _frame('c', 0b111111)]
+
+    clusters = cluster_frames(frames, max_distance=4, time_window_s=10, gps_window_m=10)
+
+    assert _names(clusters) == [['a', 'b'], ['c']]
+
+
+def test_time_gap_is_measured_from_the_previous_frame():
+    frames = [_frame('a', 0, 0), _frame('b', 0, 2), _frame('c', 0, 4), _frame('d', 0, 6), _frame('e', 0, 10)]
+
+    clusters = cluster_frames(frames, max_distance=4, time_window_s=3, gps_window_m=10)
+
+    assert _names(clusters) == [['a', 'b', 'c', 'd'], ['e']]
+
+
+def test_different_shape_or_distant_position_is_a_new_group():
+    frames = [
+        _frame('a', 0, latitude=37.0, longitude=127.0),
+        _frame('portrait', 0, shape=(80, 60), latitude=37.0, longitude=127.0),
+        _frame('near', 0, shape=(80, 60), latitude=37.00001, longitude=127.0),
+        _frame('far', 0, shape=(80, 60), latitude=37.0001, longitude=127.0),
+    ]
+
+    clusters = cluster_frames(frames, max_distance=4, time_window_s=10, gps_window_m=5)
+
+    assert _names(clusters) == [['a'], ['portrait', 'near'], ['far']]
+
+
+def _scene(seed):
+    """큰 밝기 패턴(해시) + 잔무늬(선명도)를 가진 흑백 이미지"""
+    rng = np.random.default_rng(seed)
+    coarse = cv2.resize(rng.uniform(0, 200, (8, 9)).astype(np.float32), (360, 320), interpolation=cv2.INTER_CUBIC)
+    fine = rng.uniform(0, 40, (320, 360)).astype(np.float32)
+    return np.clip(coarse + fine, 0, 255).astype(np.uint8)
+
+
+def test_dedup_keeps_the_sharpest_frame_in_input_order(monkeypatch):
+    scene = _scene(0)
+    thumbnails = {
+        'f/1.jpg': cv2.GaussianBlur(scene, (9, 9), 3),  # 흔들린 프레임
+        'f/2.jpg': scene,
+        'f/3.jpg': _scene(1),
+        'f/4.jpg': _scene(2),
+    }
+    monkeypatch.setattr(dedup_frames, 'load_thumbnail', lambda img_path: thumbnails[img_path])
+    # 촬영 시간은 입력 순서의 역순 (묶음은 촬영 순서로, keep은 입력 순서로)
+    metadata = {f'{index}.jpg': {'timestamp': (T0 - timedelta(seconds=index)).isoformat()} for index in range(1, 5)}
+
+    dedup = dedup_images(list(thumbnails), metadata, max_distance=10, time_window_s=5, gps_window_m=10)
+
+    assert dedup['keep'] == ['f/2.jpg', 'f/3.jpg', 'f/4.jpg']
+    assert dedup['total'] == 4
+    assert len(dedup['dropped']) == 1
+    row = dedup['dropped'][0]
+    assert (row['dropped_image'], row['kept_image']) == ('1.jpg', '2.jpg')
+    assert row['kept_sharpness'] > row['dropped_sharpness']
+
+
+def test_list_frames_sorts_numbers_by_value(tmp_path):
+    for name in ['10.jpg', '2.jpg', '1.JPG', 'notes.txt', 'IMG_9.png', 'IMG_10.png']:
+        (tmp_path / name).write_bytes(b'')
+
+    assert [path.rsplit('/', 1)[-1] for path in list_frames(str(tmp_path))] == \
+        ['1.JPG', '2.jpg', '10.jpg', 'IMG_9.png', 'IMG_10.png']
@@ -0,0 +1,94 @@
+"""동영상 GPS 트랙 테스트 (트랙 점 보간, GPX/SRT 읽기, 트랙 파일 찾기)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from gps_track import GpsTrack, find_sidecar_track, load_track, parse_srt
+
+
+def test_exact_fix_is_returned_even_next_to_a_long_gap():
+    start = datetime(2024, 5, 1, 10, 0, 0)
+    track = GpsTrack([(1.0, 37.0, 127.0, start), (5.0, 37.4, 127.4, start + timedelta(seconds=4))], max_gap_s=2)
+
+    assert track.locate(1.0) == {'latitude': 37.0, 'longitude': 127.0, 'timestamp': start}
+    assert track.locate(5.0)['latitude'] == 37.4
+    # 두 점 사이는 간격이 max_gap_s보다 길어 위치 없음
+    assert track.locate(3.0) is None
+
+
+def test_locate_interpolates_between_fixes():
+    start = datetime(2024, 5, 1, 10, 0, 0)
+    track = GpsTrack([(0.0, 37.0, 127.0, start), (1.0, 37.1, 127.2, start + timedelta(seconds=1))], max_gap_s=2)
+
+    location = track.locate(0.25)
+
+    assert location['latitude'] == pytest.approx(37.025)
+    assert location['longitude'] == pytest.approx(127.05)
+    assert location['timestamp'] == start + timedelta(seconds=0.25)
+
+
+def test_locate_past_either_end_within_max_gap():
+    track = GpsTrack([(1.0, 37.0, 127.0, None), (2.0, 37.1, 127.1, None)], max_gap_s=2)
+
+    assert track.locate(0.0)['latitude'] == 37.0
+    assert track.locate(3.5)['latitude'] == 37.1
+    assert track.locate(-1.5) is None
+    assert track.locate(4.5) is None
+    assert GpsTrack([]).locate(0.0) is None
+
+
+def test_parse_srt_dji_formats(tmp_path):
+    path = tmp_path / 'DJI_0001.SRT'
+    path.write_text(
+        "1\n00:00:00,000 --> 00:00:00,033\n"
+        "<font size=\"28\">FrameCnt: 1, DiffTime: 33ms\n2024-05-01 10:20:30.123\n"
+        "[iso: 100] [latitude: 37.5] [longitude: 127.25] [rel_alt: 10.0]</font>\n\n"
+        "2\n00:00:01,500 --> 00:00:01,533\nHOME(127.0,37.0) 2024.05.01 10:20:31\nGPS(127.5,37.75,20)\n\n"
+        "3\n00:00:02,000 --> 00:00:02,033\n[latitude: 0.0] [longitude: 0.0]\n",
+        encoding='utf-8')
+
+    points = parse_srt(str(path))
+
+    assert points == [
+        (0.0, 37.5, 127.25, datetime(2024, 5, 1, 10, 20, 30, 123000)),
+        (1.5, 37.75, 127.5, datetime(2024, 5, 1, 10, 20, 31)),
+    ]
+
+
+def test_load_gpx_relative_to_video_start_with_offset(tmp_path):
+    path = tmp_path / 'track.gpx'
+    path.write_text(
+        '<?xml version="1.0"?>\n'
+        '<gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>\n'
+        '<trkpt lat="37.0" lon="127.0"><time>2024-05-01T10:00:10</time></trkpt>\n'
+        '<trkpt lat="37.2" lon="127.2"><time>2024-05-01T10:00:12</time></trkpt>\n'
+        '<trkpt lat="38.0" lon="128.0"></trkpt>\n'
+        '</trkseg></trk></gpx>\n',
+        encoding='utf-8')
+
+    track = load_track(str(path), video_start=datetime(2024, 5, 1, 10, 0, 0), time_offset_s=1.0, max_gap_s=5)
+
+    assert len(track) == 2
+    assert [point[0] for point in track.points] == [9.0, 11.0]
+    location = track.locate(10.0)
+    assert location['latitude'] == pytest.approx(37.1)
+    assert location['timestamp'] == datetime(2024, 5, 1, 10, 0, 11)
+
+
+def test_load_track_rejects_unknown_format(tmp_path):
+    path = tmp_path / 'track.csv'
+    path.write_text('', encoding='utf-8')
+
+    with pytest.raises(ValueError, match='unsupported track format'):
+        load_track(str(path))
+
+
+def test_find_sidecar_track(tmp_path):
+    video = tmp_path / 'DJI_0001.MP4'
+    video.write_bytes(b'')
+
+    assert find_sidecar_track(str(video)) is None
+
+    (tmp_path / 'DJI_0001.gpx').write_text('', encoding='utf-8')
+    assert find_sidecar_track(str(video)) == str(tmp_path / 'DJI_0001.gpx')
@@ -0,0 +1,62 @@
+"""탐지 단계 입력 이미지 1회 디코딩 테스트"""
+
+import builtins
+
+import numpy as np
+import cv2
+import pytest
+
+pytest.importorskip('mmcv')
+import image_source  # noqa: E402
+from image_source import load_image  # noqa: E402
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """image_source에서 파일 열기/디코딩 호출 횟수"""
+    counts = {'open': 0, 'decode': 0}
+    real_open, real_decode = builtins.open, image_source.mmcv.imfrombytes
+
+    def _open(*args, **kwargs):
+        counts['open'] += 1
+        return real_open(*args, **kwargs)
+
+    def _decode(*args, **kwargs):
+        counts['decode'] += 1
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(image_source, 'open', _open, raising=False)
+    monkeypatch.setattr(image_source.mmcv, 'imfrombytes', _decode)
+    return counts
+
+
+def test_load_image_reads_and_decodes_once(tmp_path, counted):
+    path = str(tmp_path / 'a.png')
+    image = np.random.default_rng(0).integers(0, 255, (40, 60, 3), dtype=np.uint8)
+    cv2.imwrite(path, image)
+
+    decoded = load_image(path)
+
+    assert counted == {'open': 1, 'decode': 1}
+    np.testing.assert_array_equal(decoded.image, image)
+    assert decoded.name == 'a.png' and not decoded.has_gps
+
+
+def test_metadata_entry_is_used_without_exif(tmp_path, counted):
+    path = str(tmp_path / 'b.png')
+    cv2.imwrite(path, np.zeros((8, 8, 3), dtype=np.uint8))
+
+    decoded = load_image(path, {'b.png': {'latitude': 37.5, 'longitude': 127.0, 'timestamp': '2024-05-01T10:00:00'}})
+
+    assert counted == {'open': 1, 'decode': 1}
+    assert decoded.metadata() == {'image_name': 'b.png', 'latitude': 37.5, 'longitude': 127.0,
+                                  'timestamp': '2024-05-01T10:00:00', 'has_gps': True}
+
+
+def test_undecodable_file_raises(tmp_path):
+    path = str(tmp_path / 'broken.jpg')
+    with open(path, 'wb') as f:
+        f.write(b'not an image')
+
+    with pytest.raises(IOError):
+        load_image(path)
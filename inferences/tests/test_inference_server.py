@@ -0,0 +1,55 @@
+"""로컬 추론 서버 테스트 (요청 본문 크기 제한)"""
+
+import json
+import threading
+import http.client
+
+import pytest
+
+pytest.importorskip('mmcv')
+pytest.importorskip('torch')
+pytest.importorskip('mmseg')
+from inference_server import CrackServer  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    # 본문 크기 검사는 파이프라인 전에 끝나므로 모델 없이 실행
+    server = CrackServer(('127.0.0.1', 0), pipeline=None, batcher=None, max_body_mb=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server, headers, body=b''):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    connection.putrequest('POST', '/process?image_name=a.jpg')
+    for name, value in headers.items():
+        connection.putheader(name, value)
+    connection.endheaders(body)
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    connection.close()
+    return response.status, payload
+
+
+def test_oversized_body_is_rejected_before_reading(server):
+    # 본문을 보내지 않아도 Content-Length만으로 바로 거절 (읽으려 했다면 timeout)
+    status, payload = _post(server, {'Content-Length': str(2 * 1024 ** 2)})
+
+    assert status == 413
+    assert 'exceeds' in payload['error']
+    assert server.requests['failed'] == 1
+
+
+def test_invalid_content_length_is_rejected(server):
+    status, _ = _post(server, {'Content-Length': '-5'})
+    assert status == 400
+
+
+def test_body_within_limit_is_read(server):
+    status, payload = _post(server, {'Content-Length': '12'}, b'not an image')
+    assert status == 400
+    assert 'decodable' in payload['error']
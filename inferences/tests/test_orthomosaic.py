@@ -0,0 +1,101 @@
+"""정사영상 처리 테스트 (타일 분할, 중심 영역 마스크, 지리참조, 타일 초해상화 → 탐지)"""
+
+import numpy as np
+import cv2
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('mmseg')
+import orthomosaic  # noqa: E402
+from orthomosaic import (GeoReference, crop_core_mask, plan_tiles, process_tile,  # noqa: E402
+                         transverse_mercator_params, transverse_mercator_to_latlon)
+from sparse_mask import SparseCrackMask  # noqa: E402
+
+
+class _StubInferencer:
+    """forward 입력(RGB, CHW, 0-1)을 BGR 이미지로 되돌려 2배 확대하는 MMagic 추론기 대용"""
+    device = 'cpu'
+
+    def forward(self, data):
+        return data['inputs']
+
+    def visualize(self, preds):
+        image = (preds[0].numpy().transpose(1, 2, 0)[..., ::-1] * 255).round().astype(np.uint8)
+        return cv2.resize(image, None, fx=2, fy=2, interpolation=cv2.INTER_NEAREST)
+
+
+class _StubSRModel:
+    def __init__(self):
+        self.inferencer = _StubInferencer()
+
+    def infer(self, img):
+        raise AssertionError("ndarray tiles must not go through the file-path infer()")
+
+
+def test_plan_tiles_cover_raster_with_clipped_overlap():
+    tiles = plan_tiles(250, 180, tile_size=100, overlap=10)
+
+    assert [tile['core'] for tile in tiles] == [
+        (0, 0, 100, 100), (0, 100, 100, 180),
+        (100, 0, 200, 100), (100, 100, 200, 180),
+        (200, 0, 250, 100), (200, 100, 250, 180),
+    ]
+    assert tiles[0]['window'] == (0, 0, 110, 110)
+    assert tiles[3]['window'] == (90, 90, 120, 90)
+    assert tiles[3]['name'] == 'r000100_c000100'
+
+
+def test_crop_core_mask_dense_and_sparse_agree():
+    mask = np.zeros((20, 20), dtype=np.uint8)
+    mask[5:15, 8] = 1
+    valid = np.ones((10, 10), dtype=bool)
+    valid[:4] = False  # 원본 해상도 0-3행 = 마스크 0-7행
+
+    dense = crop_core_mask(mask, (2, 2, 18, 18), valid)
+    sparse = crop_core_mask(SparseCrackMask.from_dense(mask), (2, 2, 18, 18), valid)
+
+    assert dense.shape == (16, 16)
+    assert np.flatnonzero(dense[:, 6]).tolist() == list(range(6, 13))
+    np.testing.assert_array_equal(sparse.to_dense(), dense)
+
+
+def test_utm_origin_of_zone_is_on_the_central_meridian():
+    latitude, longitude = transverse_mercator_to_latlon(500000.0, 0.0, transverse_mercator_params(32652))
+
+    assert latitude == pytest.approx(0.0, abs=1e-9)
+    assert longitude == pytest.approx(129.0, abs=1e-9)
+
+
+def test_process_tile_super_resolves_ndarray_tile(tmp_path, monkeypatch):
+    image = np.full((100, 120, 3), 200, dtype=np.uint8)
+    image[:, :, 0] = np.arange(120, dtype=np.uint8)
+    seen = {}
+
+    def fake_detection(model, sr_image, **kwargs):
+        seen['image'] = sr_image
+        mask = np.zeros(sr_image.shape[:2], dtype=np.uint8)
+        mask[40:160, 118:124] = 1  # 초해상화 좌표의 세로 균열 (정량화 최소 면적 이상)
+        return None, mask
+
+    monkeypatch.setattr(orthomosaic, 'inference_segmentor_sliding_window', fake_detection)
+    georeference = GeoReference((1e-6, 0.0, 127.0, 0.0, -1e-6, 37.5), 4326, geographic=True)
+    tile = {'window': (0, 0, 100, 120), 'core': (0, 0, 100, 120)}
+    options = {'output_dir': str(tmp_path), 'low_memory': False, 'approx_factor': 1, 'output_size': None}
+
+    result = process_tile(None, image, tile, 'r000000_c000000', georeference, 10.0, options,
+                          sr_model=_StubSRModel())
+
+    # 추론기 입력 변환 후 되돌린 이미지가 원본의 2배 확대와 같아야 함
+    np.testing.assert_array_equal(seen['image'], cv2.resize(image, None, fx=2, fy=2,
+                                                            interpolation=cv2.INTER_NEAREST))
+    assert result['output_name'] == 'r000000_c000000.jpg'
+    assert (tmp_path / 'r000000_c000000.jpg').exists()
+    assert len(result['cracks']) == 1
+
+    # 균열 좌표는 원본 래스터 픽셀 기준 (초해상화 배율로 나눔)
+    top_left = result['cracks'][0][0].split('-')[0]
+    row, col = map(int, top_left.strip('()').split(','))
+    assert 19 <= row <= 21 and 58 <= col <= 60
+    latitude, longitude = result['locations'][0]
+    assert latitude == pytest.approx(37.5 - 50e-6, abs=2e-6)
+    assert longitude == pytest.approx(127.0 + 60.5e-6, abs=2e-6)
@@ -0,0 +1,23 @@
+"""균열 정량화 테스트 (근사 모드 배율 제한)"""
+
+import pytest
+
+from quantify_seg_results import MAX_APPROX_FACTOR, check_approx_factor, quantify_crack_width_length
+from benchmark_quantification_memory import synthesize_crack_mask
+
+
+@pytest.mark.parametrize('factor', [0, MAX_APPROX_FACTOR + 1, 8, 2.5])
+def test_uncalibrated_approx_factor_is_rejected(factor):
+    with pytest.raises(ValueError):
+        check_approx_factor(factor)
+
+
+def test_approx_factor_warns_and_exact_mode_does_not(recwarn):
+    mask = synthesize_crack_mask((256, 256), num_cracks=2, width_range=(4, 8), seed=1)
+
+    quantify_crack_width_length(None, mask, (0, 0, 255), minimum_area=0)
+    assert not recwarn.list
+
+    with pytest.warns(UserWarning, match='approximate quantification'):
+        _, results = quantify_crack_width_length(None, mask, (0, 0, 255), minimum_area=0, approx_factor=2)
+    assert results
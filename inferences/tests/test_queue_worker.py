@@ -0,0 +1,35 @@
+"""작업 대기열 워커 테스트 (재시작한 워커의 진행 기록 이어받기)"""
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('mmseg')
+pytest.importorskip('mmagic')
+import queue_worker  # noqa: E402
+from queue_worker import run_worker  # noqa: E402
+from run_manifest import RunManifest  # noqa: E402
+from work_queue import WorkQueue, worker_result_dir  # noqa: E402
+
+
+def test_reclaimed_task_recorded_in_worker_manifest_is_not_reprocessed(tmp_path, monkeypatch):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), lease_seconds=60, max_attempts=3)
+    queue.add_tasks([{'image_name': 'a.jpg', 'image_path': '/images/a.jpg', 'latitude': 37.5, 'longitude': 127.0}])
+    queue.set_settings({'shooting_distance_mm': 1500.0, 'approx_factor': 1, 'output_size': None,
+                        'no_gps_policy': 'skip'})
+    result_dir = str(tmp_path / 'result')
+
+    # 이전 실행: 처리 결과를 진행 기록에 남긴 뒤 대기열에 완료를 기록하기 전에 종료 (임대 만료)
+    queue.claim('gpu01-0')
+    queue._db.execute("UPDATE tasks SET lease_expires = 0 WHERE image_name = 'a.jpg'")
+    record = {'output_name': 'a.jpg', 'detection': None, 'cracks': []}
+    RunManifest(f"{worker_result_dir(result_dir, 'gpu01-0')}/진행기록.jsonl").mark_done('a.jpg', 'detection', record)
+
+    def fail_if_called(*args, **kwargs):
+        raise AssertionError("image recorded in the worker manifest was processed again")
+
+    monkeypatch.setattr(queue_worker, 'process_image', fail_if_called)
+    stats = run_worker(queue, None, None, result_dir, worker_id='gpu01-0', heartbeat_seconds=30)
+
+    assert stats == {'done': 1, 'failed': 0, 'lost': 0}
+    assert queue.counts()['done'] == 1
+    queue.close()
@@ -0,0 +1,95 @@
+"""결과 저장 모듈 테스트 (균열 상세 테이블, 이미지별 요약 CSV/Excel)"""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from openpyxl import load_workbook
+
+from result_writers import CrackDetailWriter, DetectionSummaryWriter, crack_detail_rows
+
+
+CRACKS = [
+    ('(10,20)-(30,40)', 0.5, 0.9, 120.0, '0.50x0.90x120.00', 1, 350),
+    ('(100,200)-(130,400)', 1.2, 2.0, 300.0, '1.20x2.00x300.00', 1, 900),
+]
+
+
+def test_crack_detail_rows_parses_coordinates():
+    rows = crack_detail_rows('a.jpg', CRACKS, latitude=37.5, longitude=127.0, timestamp='2024-05-01T10:00:00')
+
+    assert [row['crack_index'] for row in rows] == [0, 1]
+    assert (rows[1]['bbox_min_row'], rows[1]['bbox_min_col'], rows[1]['bbox_max_row'], rows[1]['bbox_max_col']) == \
+        (100, 200, 130, 400)
+    assert rows[0]['area_px'] == 350 and rows[0]['latitude'] == 37.5
+
+
+def test_crack_detail_rows_uses_per_crack_locations():
+    rows = crack_detail_rows('tile', CRACKS, locations=[(1.0, 2.0), (3.0, 4.0)])
+    assert [(row['latitude'], row['longitude']) for row in rows] == [(1.0, 2.0), (3.0, 4.0)]
+
+
+@pytest.mark.parametrize('extension', ['.parquet', '.arrow'])
+def test_finished_batches_are_readable_before_close(tmp_path, extension):
+    output_path = str(tmp_path / f'details{extension}')
+    writer = CrackDetailWriter(output_path, batch_size=2)
+
+    writer.append('a.jpg', CRACKS)
+    assert os.listdir(writer.parts_dir) == []
+
+    writer.append('b.jpg', CRACKS[:1])
+    writer.append('c.jpg', CRACKS)
+    parts = sorted(os.listdir(writer.parts_dir))
+    assert parts == [f'part-00000{extension}']
+    assert not os.path.exists(output_path)
+
+    if extension == '.parquet':
+        partial = pd.read_parquet(writer.parts_dir)
+        assert partial['image'].tolist() == ['a.jpg', 'a.jpg', 'b.jpg']
+
+    writer.close()
+
+    assert not os.path.exists(writer.parts_dir)
+    if extension == '.parquet':
+        table = pd.read_parquet(output_path)
+    else:
+        with pa.OSFile(output_path, 'rb') as f:
+            table = pa.ipc.open_file(f).read_all().to_pandas()
+    assert table['image'].tolist() == ['a.jpg', 'a.jpg', 'b.jpg', 'c.jpg', 'c.jpg']
+    assert writer.num_rows == 5
+
+
+def test_empty_table_keeps_schema(tmp_path):
+    output_path = str(tmp_path / 'details.parquet')
+    with CrackDetailWriter(output_path):
+        pass
+
+    table = pd.read_parquet(output_path)
+    assert len(table) == 0 and 'crack_index' in table.columns
+
+
+def test_stale_parts_of_interrupted_run_are_discarded(tmp_path):
+    output_path = str(tmp_path / 'details.parquet')
+    writer = CrackDetailWriter(output_path, batch_size=1)
+    writer.append('old.jpg', CRACKS)
+
+    with CrackDetailWriter(output_path) as writer:
+        writer.append('new.jpg', CRACKS[:1])
+
+    assert pd.read_parquet(output_path)['image'].tolist() == ['new.jpg']
+
+
+def test_summary_rows_are_on_disk_immediately_and_converted_to_excel(tmp_path):
+    csv_path = str(tmp_path / 'summary.csv')
+    excel_path = str(tmp_path / 'summary.xlsx')
+    writer = DetectionSummaryWriter(csv_path)
+    writer.append({'위도': 37.5, '경도': 127.0, '이미지 경로': 'a.jpg', '균열 개수': 2})
+
+    partial = pd.read_csv(csv_path, encoding='utf-8-sig')
+    assert partial['이미지 경로'].tolist() == ['a.jpg']
+
+    writer.to_excel(excel_path)
+    sheet = load_workbook(excel_path).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[1][:5] == (37.5, 127.0, 'a.jpg', None, 2)
@@ -0,0 +1,79 @@
+"""SparseCrackMask / 희소 마스크 정량화 테스트"""
+
+import numpy as np
+import cv2
+from skimage.measure import label
+
+from sparse_mask import SparseCrackMask, SparseCrackMaskBuilder, label_sparse_mask, rasterize_lines
+from quantify_seg_results import quantify_crack_width_length
+from benchmark_quantification_memory import synthesize_crack_mask
+
+
+def _measurements(results):
+    """좌표 순 (좌표, 면적, [평균 폭, 최대 폭, 길이]) 목록"""
+    return sorted((row[0], row[3], [float(value) for value in row[1].split('x')]) for row in results)
+
+
+def test_from_dense_round_trip_keeps_raster_order():
+    mask = np.zeros((6, 7), dtype=np.uint8)
+    mask[[4, 0, 2, 2], [1, 5, 0, 6]] = 1
+
+    sparse = SparseCrackMask.from_dense(mask)
+
+    assert sparse.nnz == 4
+    assert list(zip(sparse.rows, sparse.cols)) == list(zip(*np.nonzero(mask)))
+    assert sparse.bbox() == (0, 0, 5, 7)
+    np.testing.assert_array_equal(sparse.to_dense(), mask)
+
+
+def test_duplicate_coordinates_are_merged():
+    sparse = SparseCrackMask((3, 3), [1, 1, 0], [2, 2, 0])
+    assert sparse.nnz == 2
+    assert list(sparse.lookup([1, 2, 0], [2, 2, 0])) == [1, -1, 0]
+
+
+def test_builder_later_window_overwrites_overlap():
+    builder = SparseCrackMaskBuilder((4, 6))
+    builder.paste(np.ones((4, 4), dtype=np.uint8), 0, 0)
+    builder.paste(np.zeros((4, 4), dtype=np.uint8), 0, 2)
+
+    dense = builder.build().to_dense()
+
+    expected = np.zeros((4, 6), dtype=np.uint8)
+    expected[:, :2] = 1
+    np.testing.assert_array_equal(dense, expected)
+
+
+def test_label_matches_skimage():
+    mask = synthesize_crack_mask((300, 400), num_cracks=8, seed=3)
+    sparse = SparseCrackMask.from_dense(mask)
+
+    labels, num = label_sparse_mask(sparse)
+    dense_labels, dense_num = label(mask, connectivity=2, return_num=True)
+
+    assert num == dense_num
+    np.testing.assert_array_equal(labels, dense_labels[sparse.rows, sparse.cols])
+
+
+def test_rasterize_lines_matches_cv2_line():
+    lines = [((5, 5), (60, 30)), ((70, 10), (20, 45))]
+    canvas = np.zeros((50, 80), dtype=np.uint8)
+    for pt1, pt2 in lines:
+        canvas = cv2.line(canvas, pt1, pt2, 1, 3)
+
+    np.testing.assert_array_equal(rasterize_lines((50, 80), lines, 3).to_dense(), canvas)
+
+
+def test_sparse_quantification_matches_dense():
+    mask = synthesize_crack_mask((600, 800), num_cracks=6, seed=1)
+
+    _, dense_results = quantify_crack_width_length(None, mask.copy(), (0, 0, 255))
+    _, sparse_results = quantify_crack_width_length(None, SparseCrackMask.from_dense(mask), (0, 0, 255))
+
+    assert dense_results
+    assert len(sparse_results) == len(dense_results)
+    # medial axis는 동점 픽셀을 임의로 고르므로 길이는 몇 픽셀 차이 날 수 있음
+    for (box, area, sparse), (dense_box, dense_area, dense) in zip(_measurements(sparse_results),
+                                                                   _measurements(dense_results)):
+        assert (box, area) == (dense_box, dense_area)
+        np.testing.assert_allclose(sparse, dense, rtol=0.02, atol=0.05)
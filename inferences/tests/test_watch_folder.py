@@ -0,0 +1,62 @@
+"""폴더 감시 테스트 (완성된 파일 보고, 실패한 이미지 재시도)"""
+
+import os
+
+import numpy as np
+import cv2
+import pytest
+
+pytest.importorskip('mmseg')
+pytest.importorskip('torch')
+from watch_folder import DirectoryWatcher  # noqa: E402
+
+
+def _write_image(path, value=0):
+    cv2.imwrite(path, np.full((8, 8, 3), value, dtype=np.uint8))
+
+
+def _settled(watcher):
+    """크기/수정 시각을 두 번 확인해야 보고되므로 두 번 스캔"""
+    return watcher.ready_files() + watcher.ready_files()
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    watcher = DirectoryWatcher(str(tmp_path), settle_seconds=0, poll_interval=0, use_inotify=False, max_retries=2)
+    yield watcher
+    watcher.close()
+
+
+def test_complete_files_are_reported_once(tmp_path, watcher):
+    path = str(tmp_path / 'a.jpg')
+    _write_image(path)
+    (tmp_path / '.a.jpg.partial').write_bytes(b'')
+
+    assert _settled(watcher) == [path]
+    assert _settled(watcher) == []
+
+
+def test_failed_image_is_retried_up_to_max_retries(tmp_path, watcher):
+    path = str(tmp_path / 'a.jpg')
+    _write_image(path)
+    assert _settled(watcher) == [path]
+
+    for _ in range(2):
+        assert watcher.retry(path)
+        assert _settled(watcher) == [path]
+
+    assert not watcher.retry(path)
+    assert _settled(watcher) == []
+
+
+def test_changed_file_is_retried_after_giving_up(tmp_path, watcher):
+    path = str(tmp_path / 'a.jpg')
+    _write_image(path)
+    _settled(watcher)
+    watcher.max_retries = 0
+    assert not watcher.retry(path)
+
+    _write_image(path, value=255)
+    os.utime(path, ns=(0, 10 ** 9))
+
+    assert _settled(watcher) == [path]
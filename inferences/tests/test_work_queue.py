@@ -0,0 +1,113 @@
+"""공유 파일시스템 작업 대기열 테스트 (임대, 연장, 실패 재시도, 여러 워커)"""
+
+import numpy as np
+import cv2
+import pytest
+
+from work_queue import WorkQueue, default_worker_id, init_queue
+
+
+def _items(*names):
+    return [{'image_name': name, 'image_path': f'/images/{name}', 'latitude': 37.5, 'longitude': 127.0}
+            for name in names]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), lease_seconds=60, max_attempts=2)
+    queue.add_tasks(_items('a.jpg', 'b.jpg'))
+    yield queue
+    queue.close()
+
+
+def test_add_tasks_skips_existing_images(queue):
+    assert queue.add_tasks(_items('a.jpg', 'c.jpg')) == 1
+    assert queue.counts()['pending'] == 3
+
+
+def test_workers_sharing_the_file_claim_different_tasks(queue):
+    other = WorkQueue(queue.path, lease_seconds=60, max_attempts=2)
+
+    first = queue.claim('w1')
+    second = other.claim('w2')
+
+    assert {first['image_name'], second['image_name']} == {'a.jpg', 'b.jpg'}
+    assert first['metadata']['latitude'] == 37.5 and first['attempts'] == 1
+    assert queue.claim('w1') is None
+    assert queue.workers() == {'w1': {'done': 0, 'leased': 1, 'failed': 0, 'pending': 0},
+                               'w2': {'done': 0, 'leased': 1, 'failed': 0, 'pending': 0}}
+    other.close()
+
+
+def test_only_the_lease_owner_can_complete(queue):
+    task = queue.claim('w1')
+
+    assert queue.heartbeat('w1', task['image_name'])
+    assert not queue.complete('w2', task['image_name'])
+    assert queue.complete('w1', task['image_name'])
+    assert queue.counts()['done'] == 1
+    assert not queue.heartbeat('w1', task['image_name'])
+
+
+def test_expired_lease_is_claimed_by_another_worker(queue):
+    task = queue.claim('w1')
+    queue._db.execute('UPDATE tasks SET lease_expires = 0 WHERE image_name = ?', (task['image_name'],))
+
+    assert queue.counts()['expired'] == 1
+    claimed = [queue.claim('w2')['image_name'], queue.claim('w2')['image_name']]
+    assert task['image_name'] in claimed
+    # 임대를 잃은 워커의 완료 기록은 무시됨
+    assert not queue.complete('w1', task['image_name'])
+
+
+def test_failed_task_is_retried_until_max_attempts(queue):
+    queue.add_tasks(_items('c.jpg'))
+    queue._db.execute("UPDATE tasks SET status = 'done' WHERE image_name IN ('a.jpg', 'b.jpg')")
+
+    task = queue.claim('w1')
+    assert queue.fail('w1', task['image_name'], 'decode error')
+    assert queue.counts()['pending'] == 1
+
+    task = queue.claim('w1')
+    assert task['attempts'] == 2
+    queue.fail('w1', task['image_name'], 'decode error')
+
+    assert queue.claim('w1') is None
+    failed = queue.tasks('failed')
+    assert [row['image_name'] for row in failed] == ['c.jpg'] and failed[0]['last_error'] == 'decode error'
+
+    assert queue.retry_failed() == 1
+    assert queue.claim('w1')['attempts'] == 1
+
+
+def test_release_restores_attempts(queue):
+    task = queue.claim('w1')
+    assert queue.release('w1', task['image_name'])
+
+    again = queue.claim('w2')
+    assert again['image_name'] == task['image_name'] and again['attempts'] == 1
+
+
+def test_settings_round_trip(queue):
+    queue.set_settings({'shooting_distance_mm': 1500.0, 'approx_factor': 1})
+    assert queue.settings() == {'shooting_distance_mm': 1500.0, 'approx_factor': 1}
+
+
+def test_init_queue_skips_images_without_gps(tmp_path):
+    input_dir = tmp_path / 'images'
+    input_dir.mkdir()
+    cv2.imwrite(str(input_dir / 'a.png'), np.zeros((8, 8, 3), dtype=np.uint8))
+
+    queue = init_queue(str(tmp_path / 'queue.sqlite'), str(input_dir), {'shooting_distance_mm': 1500.0},
+                       no_gps_policy='skip')
+
+    assert queue.counts()['pending'] == 0
+    assert queue.settings()['no_gps_policy'] == 'skip'
+    queue.close()
+
+
+def test_default_worker_id_is_stable_per_slot():
+    # 재시작해도 같은 ID여야 워커별 진행 기록을 이어받음
+    assert default_worker_id() == default_worker_id(0)
+    assert default_worker_id(1) != default_worker_id(0)
+    assert default_worker_id(1).endswith('-1')
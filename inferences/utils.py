@@ -7,7 +7,34 @@ from mmseg.apis import inference_model
 
 import slidingwindow as sw
 
-def inference_segmentor_sliding_window(model, input_img, color_mask, score_thr = 0.1, window_size = 1024, overlap_ratio = 0.5, alpha=0.6):
+from sparse_mask import SparseCrackMaskBuilder
+
+def predict_windows(model, img, windows, batch_infer=None):
+    """
+    Predict the crack mask of each sliding window.
+    Args:
+        model (nn.Module): The loaded detector.
+        img (ndarray): The loaded image.
+        windows (list): Windows from slidingwindow.generate.
+        batch_infer (callable): Takes a list of window images and returns their (h, w) masks, e.g. a
+            batcher that coalesces windows from concurrent requests. None runs one window at a time.
+
+    Yields:
+        tuple: (window, mask) in window order.
+    """
+    if batch_infer is not None:
+        # windows are views into img, so submitting all of them at once does not copy the image
+        masks = batch_infer([img[window.indices()] for window in windows])
+        yield from zip(windows, masks)
+        return
+
+    for window in mmengine.track_iter_progress(windows):
+        # Add print option for sliding window detection
+        results = inference_model(model, img[window.indices()])
+        yield window, results.pred_sem_seg.data.cpu().numpy().squeeze(0)
+
+
+def inference_segmentor_sliding_window(model, input_img, color_mask, score_thr = 0.1, window_size = 1024, overlap_ratio = 0.5, alpha=0.6, return_sparse=False, batch_infer=None):
 
     """
     Inference by sliding window
@@ -19,10 +46,13 @@ def inference_segmentor_sliding_window(model, input_img, color_mask, score_thr =
         window_size (int): The size of sliding window.
         overlap_ratio (float): The overlap ratio of sliding window.
         alpha (float): The transparency of mask.
+        return_sparse (bool): Return a SparseCrackMask instead of a dense mask. The full-frame
+            mask is never allocated, so memory scales with crack pixels.
+        batch_infer (callable): Batched window inference (see predict_windows). None runs one window at a time.
 
     Returns:
         img_result (ndarray): The result image. The shape is (H, W, 3).
-        mask_output (ndarray): The result mask. The shape is (H, W).
+        mask_output (ndarray or SparseCrackMask): The result mask. The shape is (H, W).
     """
 
     # color mask has to be updated for multiple-class object detection
@@ -33,14 +63,28 @@ def inference_segmentor_sliding_window(model, input_img, color_mask, score_thr =
 
     # Generate the set of windows, with a 256-pixel max window size and 50% overlap
     windows = sw.generate(img, sw.DimOrder.HeightWidthChannel, window_size, overlap_ratio)
+
+    if return_sparse:
+        mask_builder = SparseCrackMaskBuilder(img.shape[:2])
+
+        for window, window_mask in predict_windows(model, img, windows, batch_infer):
+            mask_builder.paste(window_mask, window.y, window.x)
+
+        mask_output = mask_builder.build()
+
+        img_result = img
+
+        if color_mask is not None:
+            rows, cols = mask_output.rows, mask_output.cols
+            img_result[rows, cols, :] = img_result[rows, cols, :] * (1-alpha) + color_mask * alpha
+
+        return img_result, mask_output
+
     mask_output = np.zeros((img.shape[0], img.shape[1]), dtype=bool)
 
 
-    for window in mmengine.track_iter_progress(windows):
-        # Add print option for sliding window detection
-        img_subset = img[window.indices()]
-        results = inference_model(model, img_subset)
-        mask_output[window.indices()] = results.pred_sem_seg.data.cpu().numpy()
+    for window, window_mask in predict_windows(model, img, windows, batch_infer):
+        mask_output[window.indices()] = window_mask
 
     mask_output = mask_output.astype(np.uint8)
     mask_output[mask_output > 1] = 1
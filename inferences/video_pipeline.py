@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Streaming crack detection on inspection video
+점검 동영상 스트리밍 균열 탐지
+
+차량 탑재 카메라/드론 동영상을 프레임 이미지로 풀어 저장하지 않고, 디코딩한 프레임을 메모리에서 바로
+초해상화 → 슬라이딩 윈도우 탐지 → 정량화(CrackPipeline)로 처리합니다.
+
+1. 디코딩: VIDEO_FRAME_STRIDE 프레임마다 1장만 디코딩 (나머지는 grab으로 건너뜀)
+2. 중복 제거: 정차/저속 구간처럼 거의 움직이지 않은 연속 프레임(위상 상관 이동량 < VIDEO_MIN_MOTION,
+   상관 응답 ≥ MIN_SIMILARITY)은 가장 선명한 1장만 처리
+3. 위치: 동영상과 같은 이름의 GPX/SRT 트랙(또는 --gps_track)에서 프레임 시각의 위치를 보간 (gps_track.py)
+
+디코딩/중복 제거/위치 보간은 백그라운드 스레드에서 진행되어 GPU 추론과 겹칩니다. 결과 이미지(균열이 있는
+프레임만), 균열목록.csv/xlsx, 균열별 상세 테이블, 이동 경로 지도는 폴더 입력과 같은 형식이며, 프레임 이름은
+<동영상 이름>_<프레임 번호>.jpg입니다.
+
+Usage:
+    python inferences/video_pipeline.py --video 주행영상.mp4 --result_dir 주행영상_결과 --shooting_distance_mm 1500 \\
+        --sr_config 모델/초해상화/초해상화_config.py --sr_checkpoint 모델/초해상화/초해상화_weight.pth \\
+        --crack_config 모델/균열탐지/균열탐지_config.py --crack_checkpoint 모델/균열탐지/균열탐지_weight.pth \\
+        --map_output 주행영상_지도_결과.html
+"""
+
+import os
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import cv2
+import numpy as np
+
+from crack_pipeline import CrackPipeline
+from gps_track import load_track, find_sidecar_track
+from dedup_frames import dhash, hamming_distance, sharpness, write_dedup_report
+from run_pipeline import write_outputs
+from result_writers import CrackDetailWriter, DetectionSummaryWriter
+from run_manifest import RunManifest, atomic_imwrite
+from stage_planner import NO_GPS_POLICIES
+from pipeline_stages import prefetch
+from config import CONFIG
+
+
+# 중복 판정용 분석 이미지 폭 (픽셀)
+ANALYSIS_WIDTH = 256
+
+# 중복 판정 최소 위상 상관 응답 (0-1, 같은 장면은 압축 잡음이 있어도 0.9 안팎,
+# 지나가는 차량에 가려지거나 장면이 바뀌면 크게 떨어짐)
+MIN_SIMILARITY = 0.5
+
+
+def iter_video_frames(video_path, stride=None):
+    """
+    동영상 프레임을 stride 간격으로 디코딩 (건너뛰는 프레임은 grab만 하여 색 변환/복사 없음)
+
+    Args:
+        video_path (str): 동영상 경로
+        stride (int): 프레임 간격 (기본값: CONFIG['VIDEO_FRAME_STRIDE'])
+
+    Yields:
+        dict: {'index', 'seconds', 'image'} (index는 동영상의 프레임 번호, seconds는 동영상 시작부터의 시각)
+    """
+    stride = max(1, stride or CONFIG['VIDEO_FRAME_STRIDE'])
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Failed to open video: {video_path}")
+
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    try:
+        index = 0
+        while True:
+            if index % stride == 0:
+                ok, image = capture.read()
+                if not ok:
+                    break
+                yield {'index': index, 'seconds': index / fps, 'image': image}
+            elif not capture.grab():
+                break
+            index += 1
+    finally:
+        capture.release()
+
+
+def video_properties(video_path):
+    """동영상 정보 (width, height, fps, frames, duration_s)"""
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise IOError(f"Failed to open video: {video_path}")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        return {
+            'width': int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': fps,
+            'frames': frames,
+            'duration_s': frames / fps,
+        }
+    finally:
+        capture.release()
+
+
+def _analysis_gray(image):
+    """중복 판정용 축소 흑백 이미지"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+    if width > ANALYSIS_WIDTH:
+        gray = cv2.resize(gray, (ANALYSIS_WIDTH, max(1, round(height * ANALYSIS_WIDTH / width))),
+                          interpolation=cv2.INTER_AREA)
+    return gray
+
+
+class RedundantFrameFilter:
+    """
+    Drops consecutive frames showing the same scene, keeping the sharpest frame of each run.
+
+    A frame joins the current run when, compared with the run's first frame, the phase-correlation shift is
+    below min_motion percent of the frame width and the correlation response is at least min_similarity.
+    Only the current sharpest frame of the run is held in memory.
+
+    Args:
+        min_motion (float): Minimum shift in percent of the frame width (default: CONFIG['VIDEO_MIN_MOTION']).
+        min_similarity (float): Minimum phase-correlation response (default: MIN_SIMILARITY).
+        frame_name (callable): Frame index -> frame name used in the report.
+    """
+
+    def __init__(self, min_motion=None, min_similarity=None, frame_name=str):
+        self.min_motion = CONFIG['VIDEO_MIN_MOTION'] if min_motion is None else min_motion
+        self.min_similarity = MIN_SIMILARITY if min_similarity is None else min_similarity
+        self.frame_name = frame_name
+        self.dropped = []
+        self.total = 0
+        self._window = None
+
+    def motion(self, gray_a, gray_b):
+        """
+        두 분석 이미지 사이 이동량과 유사도 (위상 상관)
+
+        Returns:
+            tuple: (이동량 (프레임 폭 대비 %), 상관 응답 (0-1))
+        """
+        if self._window is None or self._window.shape != gray_a.shape:
+            self._window = cv2.createHanningWindow(gray_a.shape[::-1], cv2.CV_32F)
+        (dx, dy), response = cv2.phaseCorrelate(np.float32(gray_a), np.float32(gray_b), self._window)
+        return float(np.hypot(dx, dy)) / gray_a.shape[1] * 100, float(response)
+
+    def _is_redundant(self, anchor, frame):
+        motion, similarity = self.motion(anchor['gray'], frame['gray'])
+        return motion < self.min_motion and similarity >= self.min_similarity
+
+    def _close_run(self, best, members):
+        for member in members:
+            if member is best:
+                continue
+            # 시각은 동영상 시작부터의 초
+            self.dropped.append({
+                'dropped_image': self.frame_name(member['index']),
+                'kept_image': self.frame_name(best['index']),
+                'hash_distance': hamming_distance(member['hash'], best['hash']),
+                'dropped_sharpness': round(member['sharpness'], 1),
+                'kept_sharpness': round(best['sharpness'], 1),
+                'dropped_timestamp': member['timestamp'],
+                'kept_timestamp': best['timestamp'],
+            })
+
+    def filter(self, frames):
+        """
+        중복 프레임을 걸러 남은 프레임만 반환 (제너레이터)
+
+        Args:
+            frames (iterable): iter_video_frames 프레임 (image 포함)
+
+        Yields:
+            dict: 남은 프레임 (입력 항목에 'sharpness' 추가)
+        """
+        anchor = best = None
+        members = []
+        for frame in frames:
+            self.total += 1
+            gray = _analysis_gray(frame['image'])
+            # 판정 정보만 보관 (이미지는 현재 가장 선명한 프레임 하나만, 분석 이미지는 구간 첫 프레임만)
+            info = {'index': frame['index'], 'timestamp': f"{frame['seconds']:.2f}",
+                    'gray': gray, 'hash': dhash(gray), 'sharpness': sharpness(gray)}
+
+            if anchor is not None and self._is_redundant(anchor, info):
+                del info['gray']
+                members.append(info)
+                if info['sharpness'] > best[0]['sharpness']:
+                    best = (info, frame)
+                continue
+
+            if best is not None:
+                self._close_run(best[0], members)
+                yield dict(best[1], sharpness=best[0]['sharpness'])
+            anchor, best, members = info, (info, frame), [info]
+
+        if best is not None:
+            self._close_run(best[0], members)
+            yield dict(best[1], sharpness=best[0]['sharpness'])
+
+    def report(self):
+        """dedup_frames.write_dedup_report 형식 (keep는 남은 프레임 수만 사용)"""
+        return {'keep': [None] * (self.total - len(self.dropped)), 'dropped': self.dropped, 'total': self.total}
+
+
+def frame_name(video_path, index):
+    """프레임 이름 (<동영상 이름>_<프레임 번호>.jpg)"""
+    return f"{os.path.splitext(os.path.basename(video_path))[0]}_{index:06d}.jpg"
+
+
+def process_video(pipeline, video_path, result_dir, track=None, stride=None, dedup=True, min_motion=None,
+                  no_gps_policy=None, video_start=None, excel_output=None, map_output=None, crack_table=None,
+                  resume=False):
+    """
+    동영상 한 개를 프레임 단위로 탐지/정량화하고 결과 저장
+
+    Args:
+        pipeline (CrackPipeline): 모델이 로드된 파이프라인 (camera의 IMAGE_WIDTH_PX는 프레임 폭)
+        video_path (str): 동영상 경로
+        result_dir (str): 결과 디렉토리 (균열이미지/, 균열목록.csv, 진행기록.jsonl, 중복제거_목록.csv)
+        track (GpsTrack): 위치 트랙 (None이면 모든 프레임이 위치 없음)
+        stride (int): 프레임 간격 (기본값: CONFIG['VIDEO_FRAME_STRIDE'])
+        dedup (bool): 중복 프레임 제거
+        min_motion (float): 중복 판정 최소 이동량 (%, 기본값: CONFIG['VIDEO_MIN_MOTION'])
+        no_gps_policy (str): 위치 없는 프레임 처리 정책 ('skip' 또는 'no_map', 기본값: CONFIG['NO_GPS_POLICY'])
+        video_start (datetime): 첫 프레임 시각 (트랙에 시각이 없을 때 촬영시간 기록용, None이면 생략)
+        excel_output (str): 균열 목록 Excel 경로 (None이면 생략)
+        map_output (str): 지도 HTML 경로 (None이면 생략)
+        crack_table (str): 균열별 상세 테이블 경로 (None이면 생략)
+        resume (bool): 진행 기록에서 완료된 프레임은 초해상화/탐지를 건너뜀
+
+    Returns:
+        dict: {'decoded', 'dropped', 'no_gps', 'processed', 'failed', 'cracks'}
+    """
+    no_gps_policy = no_gps_policy or CONFIG['NO_GPS_POLICY']
+    if no_gps_policy not in NO_GPS_POLICIES:
+        raise ValueError(f"Unknown no-GPS policy: {no_gps_policy} (choose from {NO_GPS_POLICIES})")
+    if track is None and no_gps_policy == 'skip':
+        print("Warning: no GPS track, processing all frames without location (no_map)")
+        no_gps_policy = 'no_map'
+
+    image_output_dir = os.path.join(result_dir, '균열이미지')
+    os.makedirs(image_output_dir, exist_ok=True)
+
+    properties = video_properties(video_path)
+    stride = max(1, stride or CONFIG['VIDEO_FRAME_STRIDE'])
+    print(f"\nVideo: {properties['width']} x {properties['height']} px, {properties['fps']:.2f} fps, "
+          f"{properties['duration_s']:.0f} s")
+    print(f"Decoding every {stride} frames ({properties['fps'] / stride:.1f} frames/s), "
+          f"{pipeline.pixel_to_mm:.4f} mm/pixel")
+
+    def name_of(index):
+        return frame_name(video_path, index)
+
+    def locate(frame):
+        # 백그라운드 스레드에서 디코딩/중복 제거와 함께 실행
+        location = track.locate(frame['seconds']) if track is not None else None
+        timestamp = location['timestamp'] if location else None
+        if timestamp is None and video_start is not None:
+            timestamp = video_start + timedelta(seconds=frame['seconds'])
+        return {
+            'image_name': name_of(frame['index']),
+            'latitude': location['latitude'] if location else None,
+            'longitude': location['longitude'] if location else None,
+            'timestamp': timestamp.isoformat() if timestamp else None,
+            'has_gps': location is not None,
+        }
+
+    frames = iter_video_frames(video_path, stride)
+    frame_filter = None
+    if dedup:
+        frame_filter = RedundantFrameFilter(min_motion=min_motion, frame_name=name_of)
+        frames = frame_filter.filter(frames)
+
+    manifest = RunManifest(os.path.join(result_dir, '진행기록.jsonl'), resume=resume)
+    detection_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록.csv'))
+    no_map_writer = None
+    if no_gps_policy == 'no_map':
+        no_map_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록_위치없음.csv'))
+    crack_detail_writer = CrackDetailWriter(crack_table) if crack_table else None
+    detection_results, path = [], []
+    stats = {'decoded': 0, 'dropped': 0, 'no_gps': 0, 'processed': 0, 'failed': 0, 'cracks': 0}
+
+    start = time.perf_counter()
+    for frame, metadata, error in prefetch(locate, frames, CONFIG['PREFETCH_IMAGES']):
+        if frame is None:
+            # 디코딩 자체의 오류 (이후 프레임 없음)
+            raise error
+        name = metadata['image_name']
+        image, frame['image'] = frame['image'], None
+        if metadata['has_gps']:
+            path.append(metadata)
+        elif no_gps_policy == 'skip':
+            stats['no_gps'] += 1
+            continue
+
+        if manifest.is_done(name, 'detection'):
+            result = manifest.get_record(name, 'detection')
+        else:
+            try:
+                crack_result = pipeline.process(image, metadata, render=True)
+            except Exception as e:
+                print(f"{name}: Error: {e}")
+                manifest.mark_failed(name, 'detection', e)
+                stats['failed'] += 1
+                continue
+            finally:
+                image = None
+
+            result = {'output_name': None, 'detection': None, 'cracks': crack_result.cracks,
+                      'latitude': metadata['latitude'], 'longitude': metadata['longitude'],
+                      'timestamp': metadata['timestamp']}
+            if crack_result.cracks:
+                atomic_imwrite(os.path.join(image_output_dir, name), crack_result.rendered,
+                               [cv2.IMWRITE_JPEG_QUALITY, 85])
+                result.update({'output_name': name, 'detection': crack_result.detection})
+            manifest.mark_done(name, 'detection', result)
+            print(f"{name} ({frame['seconds']:.1f} s): {len(result['cracks'])} cracks")
+
+        stats['processed'] += 1
+        stats['cracks'] += len(result['cracks'])
+        if result['detection'] is None:
+            continue
+        if metadata['has_gps']:
+            detection_writer.append(result['detection'])
+            detection_results.append(result['detection'])
+        else:
+            no_map_writer.append(result['detection'])
+        if crack_detail_writer is not None:
+            crack_detail_writer.append(result['output_name'], result['cracks'], latitude=result['latitude'],
+                                       longitude=result['longitude'], timestamp=result['timestamp'])
+
+    elapsed = time.perf_counter() - start
+    if frame_filter is not None:
+        stats['decoded'] = frame_filter.total
+        stats['dropped'] = len(frame_filter.dropped)
+        if frame_filter.dropped:
+            report_path = os.path.join(result_dir, '중복제거_목록.csv')
+            write_dedup_report(frame_filter.report(), report_path)
+            print(f"\nNear-duplicate frames: {stats['dropped']}/{stats['decoded']} dropped before super resolution "
+                  f"(report: {report_path})")
+    else:
+        stats['decoded'] = stats['processed'] + stats['failed'] + stats['no_gps']
+    if stats['no_gps']:
+        print(f"Frames without GPS skipped: {stats['no_gps']} (no_gps_policy=skip)")
+    rate = stats['processed'] / elapsed if elapsed > 0 else 0
+    print(f"Processed {stats['processed']} frames in {elapsed:.0f} s ({rate:.2f} frames/s): "
+          f"{stats['cracks']} cracks, {stats['failed']} failed")
+
+    if crack_detail_writer is not None:
+        crack_detail_writer.close()
+        print(f"Per-crack table saved to: {crack_table} ({crack_detail_writer.num_rows} cracks)")
+    detection_writer.close()
+    if no_map_writer is not None:
+        no_map_writer.close()
+
+    write_outputs(detection_writer, no_map_writer, detection_results, path, result_dir, image_output_dir,
+                  excel_output=excel_output, map_output=map_output)
+
+    return stats
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Streaming crack detection on inspection video')
+    parser.add_argument('--video', required=True, help='동영상 경로')
+    parser.add_argument('--result_dir', required=True, help='결과 디렉토리')
+    parser.add_argument('--shooting_distance_mm', type=float, required=True, help='촬영거리 (mm)')
+    parser.add_argument('--gps_track', default=None, help='GPX/SRT 트랙 경로 (기본값: 동영상과 같은 이름의 .SRT/.gpx)')
+    parser.add_argument('--video_start', default=None, help='첫 프레임 현지 시각 (예: 2024-05-01T10:20:30, GPX 시각 맞춤용, 기본값: 첫 트랙 점)')
+    parser.add_argument('--time_offset', type=float, default=0.0, help='트랙 시각 보정 (초, 트랙이 동영상보다 늦게 기록되었으면 양수)')
+    parser.add_argument('--camera', default=None, help='카메라 프로필 이름 (CAMERA_PROFILES, IMAGE_WIDTH_PX는 프레임 폭으로 대체)')
+    parser.add_argument('--sr_config', required=True, help='초해상화 모델 설정 파일 경로')
+    parser.add_argument('--sr_checkpoint', required=True, help='초해상화 모델 체크포인트 파일 경로')
+    parser.add_argument('--sr_model_name', default='edsr', help='초해상화 모델 이름 (MMagic)')
+    parser.add_argument('--crack_config', required=True, help='크랙 탐지 모델 설정 파일 경로')
+    parser.add_argument('--crack_checkpoint', required=True, help='크랙 탐지 모델 체크포인트 파일 경로')
+    parser.add_argument('--device', default='cuda', help='추론 장치')
+    parser.add_argument('--stride', type=int, default=CONFIG['VIDEO_FRAME_STRIDE'], help='프레임 간격 (N 프레임마다 1장)')
+    parser.add_argument('--min_motion', type=float, default=CONFIG['VIDEO_MIN_MOTION'], help='중복 판정 최소 이동량 (프레임 폭 대비 %%)')
+    parser.add_argument('--no_dedup', action='store_true', help='중복 프레임 제거 안 함')
+    parser.add_argument('--no_gps_policy', choices=NO_GPS_POLICIES, default=CONFIG['NO_GPS_POLICY'],
+                        help='위치 없는 프레임 처리 (skip: 건너뜀, no_map: 지도 없이 결과만 저장)')
+    parser.add_argument('--excel_output', default=None, help='균열 목록 Excel 경로 (기본값: result_dir/균열목록.xlsx)')
+    parser.add_argument('--crack_table', default=None, help='균열별 상세 테이블 경로 (기본값: result_dir/균열목록_균열상세.parquet)')
+    parser.add_argument('--map_output', default=None, help='지도 HTML 경로')
+    parser.add_argument('--output_size', type=int, default=CONFIG['OUTPUT_IMAGE_SIZE'], help='결과 이미지 긴 변 크기 (픽셀)')
+    parser.add_argument('--approx_factor', type=int, default=CONFIG['APPROX_QUANTIFICATION_FACTOR'], help='근사 정량화 배율 (1이면 정확)')
+    parser.add_argument('--resume', action='store_true', help='진행 기록에서 완료된 프레임은 건너뜀')
+
+    args = parser.parse_args()
+
+    if args.stride < 1:
+        parser.error('--stride must be at least 1')
+    if args.camera and args.camera not in CONFIG['CAMERA_PROFILES']:
+        parser.error(f"unknown camera profile '{args.camera}' (known: {', '.join(sorted(CONFIG['CAMERA_PROFILES']))})")
+    video_start = None
+    if args.video_start:
+        try:
+            video_start = datetime.fromisoformat(args.video_start)
+        except ValueError:
+            parser.error(f'invalid --video_start: {args.video_start}')
+
+    # 모델 로드 전에 동영상/트랙 확인
+    try:
+        properties = video_properties(args.video)
+    except IOError as e:
+        parser.error(str(e))
+    track_path = args.gps_track or find_sidecar_track(args.video)
+    track = None
+    if track_path:
+        try:
+            track = load_track(track_path, video_start=video_start, time_offset_s=args.time_offset)
+        except (OSError, ValueError) as e:
+            parser.error(f'failed to read GPS track: {e}')
+        print(f"GPS track: {track_path} ({len(track)} points)")
+        if track_path.lower().endswith('.gpx') and video_start is None:
+            print("Warning: --video_start not given, assuming the video starts at the first GPX point")
+
+    camera = dict(CONFIG['CAMERA_PROFILES'].get(args.camera, {}), IMAGE_WIDTH_PX=properties['width'],
+                  IMAGE_HEIGHT_PX=properties['height'])
+
+    print("\nInitializing models...")
+    pipeline = CrackPipeline.from_checkpoints(
+        args.sr_config, args.sr_checkpoint, args.crack_config, args.crack_checkpoint, args.shooting_distance_mm,
+        sr_model_name=args.sr_model_name, device=args.device,
+        options={'approx_factor': args.approx_factor, 'output_size': args.output_size}, camera=camera
+    )
+    print("Models initialized successfully")
+
+    process_video(
+        pipeline, args.video, args.result_dir,
+        track=track,
+        stride=args.stride,
+        dedup=not args.no_dedup,
+        min_motion=args.min_motion,
+        no_gps_policy=args.no_gps_policy,
+        video_start=video_start,
+        excel_output=args.excel_output or os.path.join(args.result_dir, '균열목록.xlsx'),
+        map_output=args.map_output,
+        crack_table=args.crack_table or os.path.join(args.result_dir, '균열목록_균열상세.parquet'),
+        resume=args.resume
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Watch-folder streaming ingestion
+입력 폴더 감시 모드 (새 이미지가 들어오는 즉시 처리)
+
+드론/휴대폰이 하루 종일 촬영 이미지를 폴더로 동기화하는 경우, 폴더 전체를 다시 처리하는 대신
+새 파일이 완성되는 대로 한 장씩 메타데이터 → 초해상화 → 균열 탐지를 수행하고 균열 목록(CSV/Excel)과
+지도를 갱신합니다. 모델은 시작 시 한 번만 로드됩니다.
+
+- 감시: Linux에서는 inotify로 즉시 깨어나고, 지원되지 않거나 실패하면 주기적 폴링으로 동작합니다
+  (네트워크 공유 폴더는 inotify 이벤트가 오지 않으므로 inotify 사용 중에도 poll_interval마다 다시 확인)
+- 파일 완성 판단: 크기/수정 시각이 settle_seconds 동안 바뀌지 않고 이미지 헤더를 읽을 수 있을 때
+- 재시작: 진행 기록(result_dir/진행기록.jsonl)에서 완료된 이미지는 다시 처리하지 않습니다
+- 처리 시간: 이미지별 발견 → 결과까지 걸린 시간을 result_dir/처리시간.csv에 기록합니다
+
+Usage:
+    python inferences/watch_folder.py --input_dir 촬영이미지 --result_dir 균열탐지_결과 \\
+        --sr_config 모델/초해상화/초해상화_config.py --sr_checkpoint 모델/초해상화/초해상화_weight.pth \\
+        --crack_config 모델/균열탐지/균열탐지_config.py --crack_checkpoint 모델/균열탐지/균열탐지_weight.pth \\
+        --shooting_distance_mm 1500
+"""
+
+import os
+import csv
+import time
+import select
+import signal
+import ctypes
+import ctypes.util
+import argparse
+import threading
+from datetime import datetime
+
+import pandas as pd
+from PIL import Image
+
+from extract_image_metadata import read_image_metadata
+from run_pipeline import load_models, setup_cache_and_budget, pipeline_options, process_image
+from prototyping_crack_detection import calculate_pixel_to_mm
+from generate_maps import make_damage_list, make_total_damage_map
+from result_writers import DetectionSummaryWriter, csv_to_excel
+from run_manifest import RunManifest
+from stage_planner import NO_GPS_POLICIES, plan_images
+from config import CONFIG
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# inotify 이벤트 (쓰기 완료, 다른 곳에서 이동되어 옴, 생성)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_LATENCY_FIELDS = ['image_name', 'first_seen', 'completed', 'settle_wait_s', 'processing_s', 'time_to_result_s',
+                   'status']
+
+
+class _Inotify:
+    """Wake-up signal from inotify on one directory (events are drained, not parsed)."""
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch failed: {path}')
+
+    def wait(self, timeout):
+        """이벤트가 오거나 timeout(초)이 지날 때까지 대기"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+        return bool(ready)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """
+    Report image files in a directory once they have stopped changing.
+
+    Args:
+        input_dir (str): Directory to watch (not recursive).
+        settle_seconds (float): A file is complete when its size and mtime have not changed for this long.
+        poll_interval (float): Rescan interval (also the wake-up interval when inotify is used).
+        use_inotify (bool): Use inotify when available, otherwise poll.
+        max_retries (int): How many times a file reported as failed (retry()) is reported again.
+    """
+
+    def __init__(self, input_dir, settle_seconds=None, poll_interval=None, use_inotify=True, max_retries=None):
+        self.input_dir = input_dir
+        self.settle_seconds = CONFIG['WATCH_SETTLE_S'] if settle_seconds is None else settle_seconds
+        self.poll_interval = CONFIG['WATCH_POLL_INTERVAL_S'] if poll_interval is None else poll_interval
+        self.max_retries = CONFIG['WATCH_MAX_RETRIES'] if max_retries is None else max_retries
+        self.first_seen = {}
+        self._pending = {}   # name -> (size, mtime, 변화가 마지막으로 관측된 시각)
+        self._reported = {}  # name -> 보고할 때의 (size, mtime)
+        self._retries = {}   # name -> 실패 후 다시 보고한 횟수
+
+        self._inotify = None
+        if use_inotify:
+            try:
+                self._inotify = _Inotify(input_dir)
+            except (OSError, AttributeError) as e:
+                # inotify 미지원 (Linux 외 OS, 한도 초과 등)
+                print(f"inotify unavailable ({e}), polling every {self.poll_interval} s")
+
+    @property
+    def pending(self):
+        """완성을 기다리는 파일 수"""
+        return len(self._pending)
+
+    @property
+    def mode(self):
+        return 'inotify' if self._inotify is not None else 'polling'
+
+    def ready_files(self):
+        """
+        새로 완성된 이미지 경로 (발견 순서)
+
+        Returns:
+            list: 이미지 경로
+        """
+        now = time.time()
+        ready = []
+
+        for entry in sorted(os.scandir(self.input_dir), key=lambda e: e.name):
+            name = entry.name
+            # 동기화 도구의 임시 파일(.name.jpg.xxxx 등) 제외
+            if name.startswith('.') or not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if name in self._reported:
+                # 이미 보고한 파일은 재시도를 다 쓴 뒤 내용이 바뀐 경우(다시 동기화)에만 다시 확인
+                if self._reported[name] == signature or name not in self._retries:
+                    continue
+                del self._reported[name]
+                self._retries.pop(name)
+
+            self.first_seen.setdefault(name, now)
+            previous = self._pending.get(name)
+            if previous is None or previous[:2] != signature:
+                self._pending[name] = (*signature, now)
+                continue
+
+            if stat.st_size == 0 or now - previous[2] < self.settle_seconds or not _readable(entry.path):
+                continue
+
+            del self._pending[name]
+            self._reported[name] = signature
+            ready.append(entry.path)
+
+        return ready
+
+    def retry(self, img_path):
+        """
+        처리에 실패한 파일을 다시 보고하도록 등록 (max_retries번까지, 파일이 다시 완성되면 보고)
+
+        Returns:
+            bool: 다시 시도하면 True, 재시도 횟수를 다 썼으면 False
+        """
+        name = os.path.basename(img_path)
+        attempts = self._retries.get(name, 0)
+        if attempts >= self.max_retries:
+            # 내용이 바뀌면(다시 동기화되면) ready_files에서 횟수를 초기화하고 다시 확인
+            self._retries[name] = attempts
+            return False
+
+        self._retries[name] = attempts + 1
+        self._reported.pop(name, None)
+        return True
+
+    def wait(self):
+        """다음 확인까지 대기 (완성을 기다리는 파일이 있으면 settle_seconds 후 다시 확인)"""
+        timeout = min(self.poll_interval, self.settle_seconds) if self._pending else self.poll_interval
+        if self._inotify is not None:
+            self._inotify.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def _readable(img_path):
+    """이미지 헤더를 읽을 수 있는지 여부 (쓰는 중인 파일 제외)"""
+    try:
+        with Image.open(img_path) as image:
+            image.size
+        return True
+    except Exception:
+        return False
+
+
+class LatencyLog:
+    """Append per-image time-to-result rows to a CSV file (kept across restarts)."""
+
+    def __init__(self, path):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', encoding='utf-8-sig' if new_file else 'utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=_LATENCY_FIELDS)
+        if new_file:
+            self._writer.writeheader()
+            self._file.flush()
+
+    def append(self, row):
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class FolderWatchPipeline:
+    """
+    Process each new image of a watched folder and keep the crack list and map up to date.
+
+    Args:
+        sr_model: Super-resolution model (load_models).
+        crack_model: Crack segmentation model.
+        input_dir (str): Watched image directory (for the map path of images restored from the manifest).
+        result_dir (str): Result directory (same layout as run_pipeline).
+        shooting_distance_mm (float): Shooting distance (mm).
+        map_output (str): Total map HTML path (None to skip the map).
+        options (dict): postprocess_crack_image options.
+        no_gps_policy (str): 'skip' or 'no_map'.
+        cache (ArtifactCache): Artifact cache, None to disable.
+        model_keys (dict): {'sr', 'crack'} model fingerprints for the cache.
+        memory_budget (int): Per-image memory budget in bytes.
+    """
+
+    def __init__(self, sr_model, crack_model, input_dir, result_dir, shooting_distance_mm, map_output=None, options=None,
+                 no_gps_policy=None, cache=None, model_keys=None, memory_budget=None):
+        self.sr_model = sr_model
+        self.crack_model = crack_model
+        self.input_dir = input_dir
+        self.result_dir = result_dir
+        self.map_output = map_output
+        self.image_output_dir = os.path.join(result_dir, '균열이미지')
+        os.makedirs(self.image_output_dir, exist_ok=True)
+        self.no_gps_policy = no_gps_policy or CONFIG['NO_GPS_POLICY']
+        self.options = pipeline_options(self.image_output_dir, options, self.no_gps_policy)
+        self.pixel_to_mm = calculate_pixel_to_mm(shooting_distance_mm, CONFIG)
+        self.cache = cache
+        self.model_keys = model_keys
+        self.memory_budget = memory_budget
+
+        # 재시작해도 완료된 이미지는 다시 처리하지 않음
+        self.manifest = RunManifest(os.path.join(result_dir, '진행기록.jsonl'), resume=True)
+        self.metadata = []
+        self.detection_results = []
+        self.excel_output = os.path.join(result_dir, '균열목록.xlsx')
+        self.no_map_excel_output = os.path.join(result_dir, '균열목록_위치없음.xlsx')
+        self._dirty = False
+
+        # 요약 CSV는 진행 기록의 결과로 다시 쓴 뒤 이어서 추가 (재개와 동일한 방식)
+        self.detection_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록.csv'))
+        self.no_map_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록_위치없음.csv'))
+        for img_name in self.manifest.done_images('detection'):
+            img_path = os.path.join(input_dir, img_name)
+            item = read_image_metadata(img_path) if os.path.exists(img_path) else None
+            self._append_result(img_name, self.manifest.get_record(img_name, 'detection'), item)
+        if self.detection_writer.num_rows or self.no_map_writer.num_rows:
+            print(f"Restored {self.detection_writer.num_rows + self.no_map_writer.num_rows} detection results "
+                  f"from {self.manifest.path}")
+
+        self.latency_log = LatencyLog(os.path.join(result_dir, '처리시간.csv'))
+
+    def is_done(self, img_name):
+        return self.manifest.is_done(img_name, 'detection')
+
+    def _append_result(self, img_name, result, item=None):
+        if item is not None and item['has_gps']:
+            self.metadata.append(item)
+        if result is None or result['detection'] is None:
+            return
+        if result['latitude'] is None or result['longitude'] is None:
+            self.no_map_writer.append(result['detection'])
+        else:
+            self.detection_writer.append(result['detection'])
+            self.detection_results.append(result['detection'])
+        self._dirty = True
+
+    def process(self, img_path, first_seen):
+        """
+        새 이미지 한 장 처리 (메타데이터 → 초해상화 → 탐지 → 목록 추가)
+
+        Args:
+            img_path (str): 이미지 경로
+            first_seen (float): 감시 중 처음 발견된 시각 (time.time())
+
+        Returns:
+            dict: 처리 시간 기록 행
+        """
+        img_name = os.path.basename(img_path)
+        start = time.time()
+
+        item = read_image_metadata(img_path)
+        plan = plan_images([img_path], {img_name: item}, self.no_gps_policy)
+        if plan['skipped']:
+            status = 'skipped (no GPS)'
+            result = None
+        else:
+            result = process_image(self.sr_model, self.crack_model, item, self.pixel_to_mm, self.options, self.manifest,
+                                   cache=self.cache, model_keys=self.model_keys, memory_budget=self.memory_budget)
+            status = 'failed' if result is None else ('cracks' if result['detection'] is not None else 'no cracks')
+        self._append_result(img_name, result, item)
+
+        completed = time.time()
+        row = {
+            'image_name': img_name,
+            'first_seen': datetime.fromtimestamp(first_seen).isoformat(timespec='seconds'),
+            'completed': datetime.fromtimestamp(completed).isoformat(timespec='seconds'),
+            'settle_wait_s': round(start - first_seen, 2),
+            'processing_s': round(completed - start, 2),
+            'time_to_result_s': round(completed - first_seen, 2),
+            'status': status,
+        }
+        self.latency_log.append(row)
+        print(f"[{img_name}] {status}, time to result {row['time_to_result_s']:.1f} s "
+              f"(waiting for file {row['settle_wait_s']:.1f} s, processing {row['processing_s']:.1f} s)")
+
+        return row
+
+    def refresh_outputs(self):
+        """새 결과가 있으면 Excel과 지도 갱신 (대기 중인 이미지가 없을 때 호출)"""
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        if self.detection_writer.num_rows:
+            csv_to_excel(self.detection_writer.output_path, self.excel_output)
+        if self.no_map_writer.num_rows:
+            csv_to_excel(self.no_map_writer.output_path, self.no_map_excel_output)
+
+        if self.map_output and self.detection_results:
+            damage_data = make_damage_list(pd.DataFrame(self.detection_results))
+            # 이동 경로는 도착 순서가 아니라 촬영시간 순 (extract_metadata_from_images와 동일)
+            metadata = sorted(self.metadata, key=lambda x: x['timestamp_object'] or datetime.max)
+            make_total_damage_map(damage_data, self.map_output, self.image_output_dir, metadata)
+
+        print(f"Updated outputs: {self.detection_writer.num_rows} images with cracks"
+              + (f", {self.no_map_writer.num_rows} without GPS" if self.no_map_writer.num_rows else ""))
+
+    def close(self):
+        self.refresh_outputs()
+        self.detection_writer.close()
+        self.no_map_writer.close()
+        self.latency_log.close()
+
+
+def watch(pipeline, watcher, once=False, stop_event=None):
+    """
+    감시 루프 (stop_event가 설정되거나 once이고 남은 이미지가 없으면 종료)
+
+    Args:
+        pipeline (FolderWatchPipeline): 이미지 처리기
+        watcher (DirectoryWatcher): 폴더 감시기
+        once (bool): 현재 폴더의 이미지만 처리하고 종료
+        stop_event (threading.Event): 종료 요청
+    """
+    stop_event = stop_event or threading.Event()
+    latencies = []
+
+    while not stop_event.is_set():
+        ready = [p for p in watcher.ready_files() if not pipeline.is_done(os.path.basename(p))]
+
+        for img_path in ready:
+            if stop_event.is_set():
+                break
+            row = pipeline.process(img_path, watcher.first_seen[os.path.basename(img_path)])
+            latencies.append(row['time_to_result_s'])
+            if row['status'] == 'failed':
+                if watcher.retry(img_path):
+                    print(f"[{row['image_name']}] will be retried once the file is stable again")
+                else:
+                    print(f"[{row['image_name']}] giving up after {watcher.max_retries} retries "
+                          f"(retried again if the file changes)")
+
+        if not ready:
+            # 대기 중인 이미지가 없을 때만 Excel/지도 갱신 (연속 도착 시 매번 다시 그리지 않도록)
+            pipeline.refresh_outputs()
+            if once and not watcher.pending:
+                break
+            watcher.wait()
+
+    if latencies:
+        latencies.sort()
+        print(f"\nProcessed {len(latencies)} new images, time to result: "
+              f"median {latencies[len(latencies) // 2]:.1f} s, max {latencies[-1]:.1f} s")
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Watch a folder and process new images as they arrive')
+    parser.add_argument('--input_dir', required=True, help='감시할 촬영 이미지 디렉토리')
+    parser.add_argument('--result_dir', required=True, help='결과 디렉토리 (균열탐지_결과)')
+    parser.add_argument('--sr_config', required=True, help='초해상화 모델 설정 파일 경로')
+    parser.add_argument('--sr_checkpoint', required=True, help='초해상화 모델 체크포인트 파일 경로')
+    parser.add_argument('--sr_model_name', default='edsr', help='초해상화 모델 이름 (MMagic)')
+    parser.add_argument('--crack_config', required=True, help='크랙 탐지 모델 설정 파일 경로')
+    parser.add_argument('--crack_checkpoint', required=True, help='크랙 탐지 모델 체크포인트 파일 경로')
+    parser.add_argument('--shooting_distance_mm', type=float, required=True, help='촬영거리 (mm 단위)')
+    parser.add_argument('--device', default='cuda', help='추론 장치')
+    parser.add_argument('--map_output', default=None, help='전체 지도 HTML 경로 (기본값: result_dir 상위의 균열탐지_지도_결과.html)')
+    parser.add_argument('--approx_factor', type=int, default=CONFIG['APPROX_QUANTIFICATION_FACTOR'], help='근사 정량화 축소 배율 (1 = 정밀 모드)')
+    parser.add_argument('--output_size', type=int, default=CONFIG['OUTPUT_IMAGE_SIZE'], help='결과 이미지의 긴 변 길이 (픽셀, 비율 유지)')
+    parser.add_argument('--no_gps_policy', default=CONFIG['NO_GPS_POLICY'], choices=NO_GPS_POLICIES,
+                        help='GPS 없는 이미지 처리 정책 (skip: 처리하지 않음, no_map: 위치 없음 목록으로 분리)')
+    parser.add_argument('--poll_interval', type=float, default=CONFIG['WATCH_POLL_INTERVAL_S'], help='폴더 확인 주기 (초)')
+    parser.add_argument('--settle_seconds', type=float, default=CONFIG['WATCH_SETTLE_S'], help='크기가 이 시간 동안 바뀌지 않으면 파일 완성으로 판단 (초)')
+    parser.add_argument('--max_retries', type=int, default=CONFIG['WATCH_MAX_RETRIES'], help='처리에 실패한 이미지 재시도 횟수')
+    parser.add_argument('--no_inotify', action='store_true', help='inotify 대신 폴링만 사용')
+    parser.add_argument('--once', action='store_true', help='현재 폴더의 이미지만 처리하고 종료')
+    parser.add_argument('--cache_dir', default=CONFIG['ARTIFACT_CACHE_DIR'], help='산출물 캐시 디렉토리')
+    parser.add_argument('--no_cache', action='store_true', help='산출물 캐시 사용 안 함')
+    parser.add_argument('--memory_budget', default=CONFIG['MEMORY_BUDGET'], help='이미지당 메모리 예산 (예: 16G)')
+
+    args = parser.parse_args()
+
+    os.makedirs(args.result_dir, exist_ok=True)
+    map_output = args.map_output or os.path.join(os.path.dirname(os.path.abspath(args.result_dir)), '균열탐지_지도_결과.html')
+
+    print("="*60)
+    print("Crack Detection Watch Mode")
+    print("="*60)
+
+    print("\nInitializing models...")
+    sr_model, crack_model = load_models(
+        args.sr_config, args.sr_checkpoint, args.crack_config, args.crack_checkpoint,
+        sr_model_name=args.sr_model_name, device=args.device
+    )
+    print("Models initialized successfully")
+
+    cache, model_keys, memory_budget = setup_cache_and_budget(args)
+
+    pipeline = FolderWatchPipeline(
+        sr_model, crack_model, args.input_dir, args.result_dir, args.shooting_distance_mm,
+        map_output=map_output,
+        options={'approx_factor': args.approx_factor, 'output_size': args.output_size},
+        no_gps_policy=args.no_gps_policy,
+        cache=cache,
+        model_keys=model_keys,
+        memory_budget=memory_budget
+    )
+    watcher = DirectoryWatcher(args.input_dir, args.settle_seconds, args.poll_interval, use_inotify=not args.no_inotify,
+                               max_retries=args.max_retries)
+
+    # Ctrl+C / SIGTERM: 처리 중인 이미지를 마친 뒤 결과를 갱신하고 종료
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    print(f"\nWatching {args.input_dir} ({watcher.mode}), results: {args.result_dir}")
+    print("Press Ctrl+C to stop")
+    try:
+        watch(pipeline, watcher, once=args.once, stop_event=stop_event)
+    except KeyboardInterrupt:
+        print("\nStopping")
+    finally:
+        watcher.close()
+        pipeline.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Shared-filesystem work queue for multi-host processing
+여러 호스트의 워커가 공유 파일시스템에서 이미지 작업을 가져가는 작업 대기열
+
+대기열은 공유 폴더의 SQLite 파일 하나이며, 워커(queue_worker.py)는 작업을 임대(lease)하여 처리하고
+처리 중에는 주기적으로 임대를 연장(heartbeat)합니다. 워커가 종료되거나 호스트가 멈춰 임대가 만료된
+작업과 실패한 작업은 다른 워커가 다시 가져가며, QUEUE_MAX_ATTEMPTS번 실패하면 'failed'로 남습니다.
+모든 작업이 끝나면 merge 명령으로 워커별 진행 기록을 모아 균열목록.xlsx와 지도를 만듭니다.
+
+SQLite는 WAL 모드가 공유 메모리를 사용하므로 네트워크 파일시스템에서는 쓸 수 없어 롤백 저널 모드로
+사용합니다 (POSIX 잠금이 동작하는 NFSv4/SMB 필요). 쓰기는 작업 상태 변경 한 번에 한 번이라 잠금 경합은 작습니다.
+
+Usage:
+    # 대기열 생성 (메타데이터 추출 포함, 한 번만)
+    python inferences/work_queue.py init --queue /shared/survey/작업대기열.sqlite \\
+        --input_dir /shared/survey/촬영이미지 --shooting_distance_mm 1500
+
+    # 각 호스트에서 워커 실행 (queue_worker.py 참고), 진행 상황 확인, 실패 작업 재시도
+    python inferences/work_queue.py status --queue /shared/survey/작업대기열.sqlite
+    python inferences/work_queue.py retry --queue /shared/survey/작업대기열.sqlite
+
+    # 워커별 결과를 모아 균열목록.xlsx와 지도 생성
+    python inferences/work_queue.py merge --queue /shared/survey/작업대기열.sqlite \\
+        --result_dir /shared/survey/균열탐지_결과 --map_output /shared/survey/균열탐지_지도_결과.html
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import argparse
+from glob import glob
+from datetime import datetime
+
+import pandas as pd
+
+from extract_image_metadata import read_image_metadata
+from stage_planner import NO_GPS_POLICIES, plan_images
+from result_writers import DetectionSummaryWriter
+from run_manifest import RunManifest
+from generate_maps import make_damage_list, make_total_damage_map, make_each_damage_map
+from config import CONFIG
+
+
+# 작업 상태
+TASK_STATUSES = ('pending', 'leased', 'done', 'failed')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def default_worker_id(slot=0):
+    """
+    호스트 이름과 워커 번호로 만든 워커 ID
+
+    재시작한 워커가 같은 ID로 워커별 진행 기록을 이어받아, 처리했지만 대기열에 완료를 기록하기 전에
+    종료된 이미지를 다시 처리하지 않도록 실행마다 바뀌지 않는 값을 사용합니다.
+
+    Args:
+        slot (int): 같은 호스트에서 동시에 실행하는 워커의 번호 (워커마다 달라야 함)
+
+    Returns:
+        str: 워커 ID (예: gpu01-0)
+    """
+    return f"{socket.gethostname()}-{slot}"
+
+
+def worker_result_dir(result_dir, worker_id):
+    """워커별 진행 기록 디렉토리 (워커끼리 같은 파일에 쓰지 않도록 분리)"""
+    return os.path.join(result_dir, '워커', worker_id)
+
+
+class WorkQueue:
+    """
+    SQLite-backed image task queue with leases, heartbeats and retries.
+
+    A task is claimed by setting its lease expiry; a task whose lease has expired is treated as
+    pending again, so a crashed worker's image is picked up by another worker. Every state change
+    is one ``BEGIN IMMEDIATE`` transaction, which serializes claims across hosts through the
+    database file lock.
+
+    Args:
+        path (str): Queue database path on the shared filesystem.
+        lease_seconds (float): Lease length. Workers must heartbeat more often than this.
+        max_attempts (int): Attempts (claims) before a task is left as 'failed'.
+    """
+
+    def __init__(self, path, lease_seconds=None, max_attempts=None):
+        self.path = path
+        self.lease_seconds = CONFIG['QUEUE_LEASE_S'] if lease_seconds is None else lease_seconds
+        self.max_attempts = CONFIG['QUEUE_MAX_ATTEMPTS'] if max_attempts is None else max_attempts
+
+        queue_dir = os.path.dirname(path)
+        if queue_dir:
+            os.makedirs(queue_dir, exist_ok=True)
+
+        # isolation_level=None: 트랜잭션을 직접 시작 (BEGIN IMMEDIATE로 쓰기 잠금을 먼저 획득)
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        # 네트워크 파일시스템에서는 WAL(공유 메모리) 사용 불가
+        self._db.execute('PRAGMA journal_mode=DELETE')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS tasks ('
+            'image_name TEXT PRIMARY KEY, image_path TEXT, metadata TEXT, status TEXT, worker TEXT, '
+            'lease_expires REAL, attempts INTEGER, last_error TEXT, updated REAL)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)')
+
+    def _transaction(self, fn):
+        """쓰기 잠금을 잡고 fn(db) 실행 (예외 시 롤백)"""
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(self._db)
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+        return result
+
+    def set_settings(self, settings):
+        """모든 워커가 같은 값으로 처리하도록 공유할 설정 저장 (촬영거리, GPS 정책 등)"""
+        self._transaction(lambda db: db.executemany(
+            'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+            [(key, json.dumps(value)) for key, value in settings.items()]))
+
+    def settings(self):
+        """공유 설정"""
+        return {row['key']: json.loads(row['value']) for row in self._db.execute('SELECT key, value FROM settings')}
+
+    def add_tasks(self, items):
+        """
+        작업 추가 (이미 있는 이미지는 건너뜀)
+
+        Args:
+            items (list): 메타데이터 항목 (read_image_metadata 결과, 'image_name'과 'image_path' 필수)
+
+        Returns:
+            int: 새로 추가된 작업 수
+        """
+        now = time.time()
+        rows = [(item['image_name'], item['image_path'],
+                 json.dumps({k: v for k, v in item.items() if k != 'timestamp_object'}, ensure_ascii=False),
+                 'pending', None, None, 0, None, now)
+                for item in items]
+
+        def insert(db):
+            before = db.total_changes
+            db.executemany('INSERT OR IGNORE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            return db.total_changes - before
+
+        return self._transaction(insert)
+
+    def claim(self, worker_id):
+        """
+        다음 작업 임대 (대기 중이거나 임대가 만료된 작업, 시도 횟수가 적은 순)
+
+        Args:
+            worker_id (str): 워커 ID
+
+        Returns:
+            dict: 작업 {'image_name', 'image_path', 'metadata', 'attempts'} (남은 작업이 없으면 None)
+        """
+        def take(db):
+            now = time.time()
+            row = db.execute(
+                "SELECT * FROM tasks WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "AND attempts < ? ORDER BY attempts, image_name LIMIT 1", (now, self.max_attempts)).fetchone()
+            if row is None:
+                # 임대가 만료된 채 시도 횟수를 모두 쓴 작업은 실패로 정리
+                db.execute("UPDATE tasks SET status = 'failed', last_error = COALESCE(last_error, 'lease expired'), "
+                           "updated = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                           (now, now, self.max_attempts))
+                return None
+            db.execute("UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, "
+                       "updated = ? WHERE image_name = ?",
+                       (worker_id, now + self.lease_seconds, now, row['image_name']))
+            return {
+                'image_name': row['image_name'],
+                'image_path': row['image_path'],
+                'metadata': json.loads(row['metadata']),
+                'attempts': row['attempts'] + 1,
+            }
+
+        return self._transaction(take)
+
+    def _update_owned(self, worker_id, image_name, sql, params):
+        """이 워커가 임대 중인 작업만 갱신 (임대를 잃었으면 False)"""
+        def update(db):
+            cursor = db.execute(sql + " WHERE image_name = ? AND worker = ? AND status = 'leased'",
+                                (*params, image_name, worker_id))
+            return cursor.rowcount == 1
+
+        return self._transaction(update)
+
+    def heartbeat(self, worker_id, image_name):
+        """
+        임대 연장
+
+        Returns:
+            bool: 연장 성공 여부 (False면 임대가 만료되어 다른 워커가 가져감)
+        """
+        now = time.time()
+        return self._update_owned(worker_id, image_name, 'UPDATE tasks SET lease_expires = ?, updated = ?',
+                                  (now + self.lease_seconds, now))
+
+    def complete(self, worker_id, image_name):
+        """
+        작업 완료 기록
+
+        Returns:
+            bool: 기록 여부 (임대를 잃은 뒤 다른 워커가 이미 처리 중이면 False, 결과는 같으므로 무시해도 됨)
+        """
+        return self._update_owned(worker_id, image_name,
+                                  "UPDATE tasks SET status = 'done', lease_expires = NULL, last_error = NULL, updated = ?",
+                                  (time.time(),))
+
+    def fail(self, worker_id, image_name, error):
+        """
+        작업 실패 기록 (시도 횟수가 남았으면 다시 대기, 아니면 'failed')
+
+        Returns:
+            bool: 기록 여부
+        """
+        return self._update_owned(
+            worker_id, image_name,
+            "UPDATE tasks SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+            "lease_expires = NULL, last_error = ?, updated = ?",
+            (self.max_attempts, str(error), time.time()))
+
+    def release(self, worker_id, image_name):
+        """처리하지 않은 임대 작업 반환 (워커 종료 시, 시도 횟수 복원)"""
+        return self._update_owned(worker_id, image_name,
+                                  "UPDATE tasks SET status = 'pending', lease_expires = NULL, "
+                                  "attempts = attempts - 1, updated = ?", (time.time(),))
+
+    def retry_failed(self):
+        """
+        실패한 작업을 다시 대기 상태로 (시도 횟수 초기화)
+
+        Returns:
+            int: 재시도할 작업 수
+        """
+        return self._transaction(lambda db: db.execute(
+            "UPDATE tasks SET status = 'pending', attempts = 0, lease_expires = NULL, updated = ? "
+            "WHERE status = 'failed'", (time.time(),)).rowcount)
+
+    def counts(self):
+        """
+        상태별 작업 수 (임대가 만료된 작업은 'expired'로 따로 셈)
+
+        Returns:
+            dict: {status: count}
+        """
+        counts = {status: 0 for status in TASK_STATUSES}
+        counts['expired'] = 0
+        now = time.time()
+        for row in self._db.execute('SELECT status, lease_expires FROM tasks'):
+            if row['status'] == 'leased' and row['lease_expires'] < now:
+                counts['expired'] += 1
+            else:
+                counts[row['status']] += 1
+        return counts
+
+    def workers(self):
+        """
+        워커별 처리 현황
+
+        Returns:
+            dict: {worker_id: {'done', 'leased', 'failed'}}
+        """
+        workers = {}
+        for row in self._db.execute(
+                "SELECT worker, status, COUNT(*) AS n FROM tasks WHERE worker IS NOT NULL GROUP BY worker, status"):
+            workers.setdefault(row['worker'], {'done': 0, 'leased': 0, 'failed': 0, 'pending': 0})[row['status']] = row['n']
+        return workers
+
+    def tasks(self, status=None):
+        """
+        작업 목록
+
+        Args:
+            status (str): 이 상태의 작업만 (None이면 전체)
+
+        Returns:
+            list: 작업 행 (dict, metadata는 파싱됨)
+        """
+        query, params = 'SELECT * FROM tasks', ()
+        if status is not None:
+            query, params = query + ' WHERE status = ?', (status,)
+        rows = []
+        for row in self._db.execute(query + ' ORDER BY image_name', params):
+            row = dict(row)
+            row['metadata'] = json.loads(row['metadata'])
+            rows.append(row)
+        return rows
+
+    def close(self):
+        self._db.close()
+
+
+def init_queue(queue_path, input_dir, settings, no_gps_policy=None):
+    """
+    입력 폴더의 이미지로 대기열 생성 (메타데이터는 여기서 한 번만 추출해 작업에 저장)
+
+    Args:
+        queue_path (str): 대기열 경로
+        input_dir (str): 입력 이미지 디렉토리
+        settings (dict): 워커가 공유할 설정 (shooting_distance_mm, approx_factor, output_size)
+        no_gps_policy (str): GPS 없는 이미지 처리 정책 ('skip'이면 대기열에 넣지 않음)
+
+    Returns:
+        WorkQueue: 생성된 대기열
+    """
+    no_gps_policy = no_gps_policy or CONFIG['NO_GPS_POLICY']
+    img_paths = sorted(p for p in glob(os.path.join(input_dir, '*')) if p.lower().endswith(IMAGE_EXTENSIONS))
+    metadata_dict = {os.path.basename(p): read_image_metadata(p) for p in img_paths}
+
+    plan = plan_images(img_paths, metadata_dict, no_gps_policy)
+    if plan['skipped']:
+        print(f"Skipping {len(plan['skipped'])} images without GPS (no_gps_policy='skip')")
+
+    queue = WorkQueue(queue_path)
+    queue.set_settings(dict(settings, no_gps_policy=no_gps_policy))
+    added = queue.add_tasks([metadata_dict[os.path.basename(p)] for p in plan['process']])
+    print(f"Queued {added} new images ({len(plan['process']) - added} already in queue): {queue_path}")
+
+    return queue
+
+
+def load_worker_results(result_dir):
+    """
+    모든 워커 진행 기록의 탐지 결과
+
+    Args:
+        result_dir (str): 결과 디렉토리
+
+    Returns:
+        dict: {image_name: {worker_id: postprocess_crack_image 결과}}
+    """
+    results = {}
+    for manifest_path in sorted(glob(os.path.join(worker_result_dir(result_dir, '*'), '진행기록.jsonl'))):
+        worker_id = os.path.basename(os.path.dirname(manifest_path))
+        manifest = RunManifest(manifest_path, resume=True)
+        for img_name in manifest.done_images('detection'):
+            results.setdefault(img_name, {})[worker_id] = manifest.get_record(img_name, 'detection')
+    return results
+
+
+def merge_results(queue, result_dir, excel_output=None, map_output=None, individual_map_output=None):
+    """
+    워커별 결과를 하나의 균열목록과 지도로 병합 (입력 이미지 이름 순서)
+
+    같은 이미지를 여러 워커가 처리한 경우(임대 만료 후 재처리) 대기열에 완료를 기록한 워커의 결과를 사용합니다.
+
+    Args:
+        queue (WorkQueue): 작업 대기열
+        result_dir (str): 결과 디렉토리 (워커와 같은 경로)
+        excel_output (str): 균열목록 Excel 경로 (기본값: result_dir/균열목록.xlsx)
+        map_output (str): 전체 지도 HTML 경로 (None이면 생성 안 함)
+        individual_map_output (str): 개별 위치 지도 HTML 경로 (None이면 생성 안 함)
+
+    Returns:
+        list: 지도에 표시되는 탐지 결과
+    """
+    excel_output = excel_output or os.path.join(result_dir, '균열목록.xlsx')
+    image_output_dir = os.path.join(result_dir, '균열이미지')
+    worker_results = load_worker_results(result_dir)
+
+    tasks = queue.tasks()
+    counts = queue.counts()
+    unfinished = len(tasks) - counts['done']
+    if unfinished:
+        print(f"Warning: {unfinished} of {len(tasks)} images are not done "
+              f"({counts['pending']} pending, {counts['leased']} leased, {counts['expired']} expired, "
+              f"{counts['failed']} failed), merging finished images only")
+
+    metadata = sorted((task['metadata'] for task in tasks if task['metadata'].get('has_gps')),
+                      key=lambda x: (x['timestamp'] is None, x['timestamp'] or ''))
+    detection_results = []
+    missing = []
+
+    detection_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록.csv'))
+    no_map_writer = DetectionSummaryWriter(os.path.join(result_dir, '균열목록_위치없음.csv'))
+    for task in tasks:
+        if task['status'] != 'done':
+            continue
+        records = worker_results.get(task['image_name'], {})
+        result = records.get(task['worker']) or next(iter(records.values()), None)
+        if result is None:
+            missing.append(task['image_name'])
+            continue
+        if result['detection'] is None:
+            continue
+        if result['latitude'] is None or result['longitude'] is None:
+            no_map_writer.append(result['detection'])
+        else:
+            detection_writer.append(result['detection'])
+            detection_results.append(result['detection'])
+
+    if missing:
+        print(f"Warning: no worker result found for {len(missing)} done images (e.g. {missing[0]}), "
+              f"check that every worker writes to {result_dir}")
+
+    detection_writer.close()
+    no_map_writer.close()
+    if no_map_writer.num_rows:
+        no_map_output = os.path.join(result_dir, '균열목록_위치없음.xlsx')
+        no_map_writer.to_excel(no_map_output)
+        print(f"No-GPS detection results saved to: {no_map_output} ({no_map_writer.num_rows} images)")
+
+    if not detection_results:
+        print(f"\nWarning: No cracks detected in any images")
+        return detection_results
+
+    detection_writer.to_excel(excel_output)
+    print(f"\nDetection results saved to Excel: {excel_output} ({detection_writer.num_rows} images)")
+
+    damage_data = make_damage_list(pd.DataFrame(detection_results))
+    if map_output:
+        make_total_damage_map(damage_data, map_output, image_output_dir, metadata)
+    if individual_map_output:
+        make_each_damage_map(damage_data[0], individual_map_output, image_output_dir)
+
+    return detection_results
+
+
+def print_status(queue):
+    """대기열 진행 상황 출력"""
+    counts = queue.counts()
+    total = sum(counts.values())
+
+    print("="*60)
+    print(f"Work queue: {queue.path}")
+    print("="*60)
+    print(f"  total {total}, done {counts['done']} ({counts['done'] / total * 100 if total else 0:.1f}%), "
+          f"pending {counts['pending']}, leased {counts['leased']}, expired lease {counts['expired']}, "
+          f"failed {counts['failed']}")
+
+    workers = queue.workers()
+    if workers:
+        print(f"\n  {'worker':<32} {'done':>8} {'leased':>8} {'failed':>8}")
+        for worker_id, n in sorted(workers.items()):
+            print(f"  {worker_id:<32} {n['done']:>8} {n['leased']:>8} {n['failed']:>8}")
+
+    for task in queue.tasks('failed'):
+        print(f"  failed: {task['image_name']} ({task['attempts']} attempts): {task['last_error']}")
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description='Shared-filesystem work queue for multi-host crack detection')
+    parser.add_argument('command', choices=['init', 'status', 'retry', 'merge'], help='실행할 명령')
+    parser.add_argument('--queue', required=True, help='대기열 파일 경로 (공유 파일시스템)')
+    parser.add_argument('--input_dir', help='입력 이미지 디렉토리 (init)')
+    parser.add_argument('--shooting_distance_mm', type=float, help='촬영거리 (mm 단위, init)')
+    parser.add_argument('--approx_factor', type=int, default=CONFIG['APPROX_QUANTIFICATION_FACTOR'], help='근사 정량화 축소 배율 (init)')
+    parser.add_argument('--output_size', type=int, default=CONFIG['OUTPUT_IMAGE_SIZE'], help='결과 이미지의 긴 변 길이 (init)')
+    parser.add_argument('--no_gps_policy', default=CONFIG['NO_GPS_POLICY'], choices=NO_GPS_POLICIES,
+                        help='GPS 없는 이미지 처리 정책 (init)')
+    parser.add_argument('--result_dir', help='결과 디렉토리 (merge, 워커와 같은 경로)')
+    parser.add_argument('--excel_output', default=None, help='균열목록 Excel 경로 (merge, 기본값: result_dir/균열목록.xlsx)')
+    parser.add_argument('--map_output', default=None, help='전체 지도 HTML 경로 (merge)')
+    parser.add_argument('--individual_map_output', default=None, help='개별 위치 지도 HTML 경로 (merge)')
+
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        if not args.input_dir or args.shooting_distance_mm is None:
+            parser.error('init requires --input_dir and --shooting_distance_mm')
+        queue = init_queue(args.queue, args.input_dir, {
+            'shooting_distance_mm': args.shooting_distance_mm,
+            'approx_factor': args.approx_factor,
+            'output_size': args.output_size,
+            'created': datetime.now().isoformat(timespec='seconds'),
+        }, args.no_gps_policy)
+    else:
+        if not os.path.exists(args.queue):
+            parser.error(f'queue not found: {args.queue}')
+        queue = WorkQueue(args.queue)
+
+    if args.command == 'retry':
+        print(f"Re-queued {queue.retry_failed()} failed images")
+    elif args.command == 'merge':
+        if not args.result_dir:
+            parser.error('merge requires --result_dir')
+        merge_results(queue, args.result_dir, args.excel_output, args.map_output, args.individual_map_output)
+
+    print_status(queue)
+    queue.close()
+
+
+if __name__ == '__main__':
+    main()
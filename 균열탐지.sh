@@ -6,6 +6,15 @@
 #
 # 사용법:
 #   bash 균열탐지.sh
+#   bash 균열탐지.sh --resume   # 중단된 실행을 이어서 (완료된 이미지 건너뜀)
+#   bash 균열탐지.sh --dedup    # 연속 촬영된 중복 이미지는 가장 선명한 1장만 처리
+#   bash 균열탐지.sh --prescreen        # 원본 해상도에서 균열 후보가 없는 이미지는 초해상화 생략
+#   bash 균열탐지.sh --prescreen-audit  # 사전 선별 + 건너뛸 이미지 10%를 전체 처리하여 놓친 비율 측정
+#   bash 균열탐지.sh --watch    # 촬영이미지 폴더를 감시하며 새 이미지가 들어올 때마다 처리 (Ctrl+C로 종료)
+#   bash 균열탐지.sh --distance=1.5     # 촬영거리(m)를 입력받지 않고 지정 (환경변수 SHOOTING_DISTANCE도 가능)
+#   bash 균열탐지.sh --batch=촬영목록.csv  # 촬영 목록의 여러 촬영을 모델 한 번 로드로 처리 (촬영별 촬영거리/카메라)
+#   bash 균열탐지.sh --ortho=정사영상.tif  # 대용량 정사영상(GeoTIFF)을 타일 단위로 처리 (위치/GSD는 지리참조에서)
+#   bash 균열탐지.sh --video=주행영상.mp4  # 점검 동영상을 프레임 단위로 처리 (위치는 같은 이름의 .SRT/.gpx 트랙에서)
 ##############################################################################
 
 set -e
@@ -13,17 +22,97 @@ set -e
 # Path configuration (경로 설정)
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
+# 재개 옵션 (초해상화/균열 탐지 단계의 진행 기록에서 완료된 이미지 건너뜀)
+RESUME_FLAG=""
+# 중복 제거 옵션 (초해상화 전에 거의 같은 연속 촬영 이미지 제외)
+DEDUP_FLAG=""
+# 사전 선별 옵션 (균열 탐지 모델을 원본 이미지에 먼저 실행, 검증 표본 비율)
+PRESCREEN=""
+PRESCREEN_AUDIT_RATE="0"
+# 폴더 감시 모드 (모델을 한 번 로드하고 새 이미지만 처리)
+WATCH=""
+# 촬영거리 (미터, 지정하면 입력받지 않음)
+SHOOTING_DISTANCE="${SHOOTING_DISTANCE:-}"
+# 일괄 처리 촬영 목록 (CSV/YAML, 촬영거리는 목록에서 읽음)
+BATCH_MANIFEST=""
+# 정사영상 GeoTIFF (촬영거리 대신 정사영상의 픽셀 크기 사용)
+ORTHO_INPUT=""
+# 점검 동영상 (프레임을 파일로 저장하지 않고 처리)
+VIDEO_INPUT=""
+for arg in "$@"; do
+    case "$arg" in
+        --resume) RESUME_FLAG="--resume" ;;
+        --dedup) DEDUP_FLAG="--dedup" ;;
+        --prescreen) PRESCREEN="1" ;;
+        --prescreen-audit) PRESCREEN="1"; PRESCREEN_AUDIT_RATE="0.1" ;;
+        --watch) WATCH="1" ;;
+        --distance=*) SHOOTING_DISTANCE="${arg#--distance=}" ;;
+        --batch=*) BATCH_MANIFEST="${arg#--batch=}" ;;
+        --ortho=*) ORTHO_INPUT="${arg#--ortho=}" ;;
+        --video=*) VIDEO_INPUT="${arg#--video=}" ;;
+    esac
+done
+
+# Model configuration (모델 설정)
+SR_CONFIG="$SCRIPT_DIR/모델/초해상화/초해상화_config.py"
+SR_CHECKPOINT="$SCRIPT_DIR/모델/초해상화/초해상화_weight.pth"
+CRACK_CONFIG="$SCRIPT_DIR/모델/균열탐지/균열탐지_config.py"
+CRACK_CHECKPOINT="$SCRIPT_DIR/모델/균열탐지/균열탐지_weight.pth"
+
+##############################################################################
+# 일괄 처리 모드: 촬영 목록의 모든 촬영을 한 프로세스에서 처리
+##############################################################################
+if [ -n "$BATCH_MANIFEST" ]; then
+    BATCH_MANIFEST="$(cd "$(dirname "$BATCH_MANIFEST")" && pwd)/$(basename "$BATCH_MANIFEST")"
+    BATCH_ARGS=()
+    [ -n "$RESUME_FLAG" ] && BATCH_ARGS+=(--resume)
+    [ -n "$DEDUP_FLAG" ] && BATCH_ARGS+=(--dedup)
+    [ -n "$PRESCREEN" ] && BATCH_ARGS+=(--prescreen --prescreen_audit_rate "$PRESCREEN_AUDIT_RATE")
+    echo "촬영 목록: $BATCH_MANIFEST"
+    echo "결과 폴더: $SCRIPT_DIR/일괄처리_결과"
+    echo ""
+    cd "$SCRIPT_DIR"
+    exec python3 inferences/batch_run.py \
+        --manifest "$BATCH_MANIFEST" \
+        --output_root "$SCRIPT_DIR/일괄처리_결과" \
+        --sr_config "$SR_CONFIG" \
+        --sr_checkpoint "$SR_CHECKPOINT" \
+        --crack_config "$CRACK_CONFIG" \
+        --crack_checkpoint "$CRACK_CHECKPOINT" \
+        "${BATCH_ARGS[@]}"
+fi
+
+##############################################################################
+# 정사영상 모드: GeoTIFF를 처리 타일 단위로 탐지/정량화 (균열별 위치는 지리참조에서)
+##############################################################################
+if [ -n "$ORTHO_INPUT" ]; then
+    ORTHO_INPUT="$(cd "$(dirname "$ORTHO_INPUT")" && pwd)/$(basename "$ORTHO_INPUT")"
+    echo "정사영상: $ORTHO_INPUT"
+    echo "결과 폴더: $SCRIPT_DIR/정사영상_결과"
+    echo ""
+    cd "$SCRIPT_DIR"
+    exec python3 inferences/orthomosaic.py \
+        --input "$ORTHO_INPUT" \
+        --result_dir "$SCRIPT_DIR/정사영상_결과" \
+        --crack_config "$CRACK_CONFIG" \
+        --crack_checkpoint "$CRACK_CHECKPOINT" \
+        --map_output "$SCRIPT_DIR/정사영상_지도_결과.html" \
+        $RESUME_FLAG
+fi
+
 ##############################################################################
 # STEP -1: 촬영거리 입력받기
 ##############################################################################
 echo "============================================================"
 echo "균열 탐지 및 지도 생성 시스템"
 echo "============================================================"
-echo ""
-echo "실제 균열 크기를 계산하기 위해 촬영거리 정보가 필요합니다."
-echo ""
-echo "촬영거리 입력 (단위: 미터, 예: 1.5):"
-read -p "> " SHOOTING_DISTANCE
+if [ -z "$SHOOTING_DISTANCE" ]; then
+    echo ""
+    echo "실제 균열 크기를 계산하기 위해 촬영거리 정보가 필요합니다."
+    echo ""
+    echo "촬영거리 입력 (단위: 미터, 예: 1.5):"
+    read -p "> " SHOOTING_DISTANCE
+fi
 
 # 입력값 검증
 if ! [[ "$SHOOTING_DISTANCE" =~ ^[0-9]*\.?[0-9]+$ ]]; then
@@ -38,11 +127,11 @@ echo ""
 echo "입력된 촬영거리: ${SHOOTING_DISTANCE}m (${SHOOTING_DISTANCE_MM}mm)"
 echo ""
 
-# Model configuration (모델 설정)
-SR_CONFIG="$SCRIPT_DIR/모델/초해상화/초해상화_config.py"
-SR_CHECKPOINT="$SCRIPT_DIR/모델/초해상화/초해상화_weight.pth"
-CRACK_CONFIG="$SCRIPT_DIR/모델/균열탐지/균열탐지_config.py"
-CRACK_CHECKPOINT="$SCRIPT_DIR/모델/균열탐지/균열탐지_weight.pth"
+PRESCREEN_ARGS=()
+if [ -n "$PRESCREEN" ]; then
+    PRESCREEN_ARGS=(--prescreen --prescreen-config "$CRACK_CONFIG" --prescreen-ckpt "$CRACK_CHECKPOINT"
+                    --prescreen-audit-rate "$PRESCREEN_AUDIT_RATE")
+fi
 
 # Directory paths (디렉토리 경로)
 INPUT_DIR="$SCRIPT_DIR/촬영이미지"
@@ -53,6 +142,47 @@ EXCEL_OUTPUT="$SCRIPT_DIR/균열탐지_결과/균열목록.xlsx"
 MAP_OUTPUT="$SCRIPT_DIR/균열탐지_지도_결과.html"
 INDIVIDUAL_MAP_OUTPUT="$SCRIPT_DIR/균열탐지_결과/개별위치_지도.html"
 
+##############################################################################
+# 동영상 모드: 프레임 간격마다 디코딩 → 중복 프레임 제외 → 초해상화 → 탐지 (메모리에서 바로)
+##############################################################################
+if [ -n "$VIDEO_INPUT" ]; then
+    VIDEO_INPUT="$(cd "$(dirname "$VIDEO_INPUT")" && pwd)/$(basename "$VIDEO_INPUT")"
+    echo "동영상: $VIDEO_INPUT"
+    echo "결과 폴더: $SCRIPT_DIR/동영상_결과"
+    echo ""
+    cd "$SCRIPT_DIR"
+    exec python3 inferences/video_pipeline.py \
+        --video "$VIDEO_INPUT" \
+        --result_dir "$SCRIPT_DIR/동영상_결과" \
+        --sr_config "$SR_CONFIG" \
+        --sr_checkpoint "$SR_CHECKPOINT" \
+        --crack_config "$CRACK_CONFIG" \
+        --crack_checkpoint "$CRACK_CHECKPOINT" \
+        --shooting_distance_mm "$SHOOTING_DISTANCE_MM" \
+        --map_output "$SCRIPT_DIR/동영상_지도_결과.html" \
+        $RESUME_FLAG
+fi
+
+##############################################################################
+# 폴더 감시 모드: 새 이미지가 완성되는 대로 초해상화 → 탐지 → 목록/지도 갱신
+##############################################################################
+if [ -n "$WATCH" ]; then
+    mkdir -p "$INPUT_DIR"
+    echo "감시 폴더: $INPUT_DIR"
+    echo "결과 폴더: $SCRIPT_DIR/균열탐지_결과 (처리 시간: 처리시간.csv)"
+    echo ""
+    cd "$SCRIPT_DIR"
+    exec python3 inferences/watch_folder.py \
+        --input_dir "$INPUT_DIR" \
+        --result_dir "$SCRIPT_DIR/균열탐지_결과" \
+        --sr_config "$SR_CONFIG" \
+        --sr_checkpoint "$SR_CHECKPOINT" \
+        --crack_config "$CRACK_CONFIG" \
+        --crack_checkpoint "$CRACK_CHECKPOINT" \
+        --shooting_distance_mm "$SHOOTING_DISTANCE_MM" \
+        --map_output "$MAP_OUTPUT"
+fi
+
 # Create directories
 mkdir -p "$SR_OUTPUT_DIR"
 mkdir -p "$OUTPUT_DIR"
@@ -60,6 +190,15 @@ mkdir -p "$(dirname "$METADATA_JSON")"
 
 echo "입력 폴더: $INPUT_DIR"
 echo "결과 폴더: $SCRIPT_DIR/균열탐지_결과"
+if [ -n "$RESUME_FLAG" ]; then
+    echo "재개 모드: 완료된 이미지는 건너뜁니다"
+fi
+if [ -n "$DEDUP_FLAG" ]; then
+    echo "중복 제거: 연속 촬영된 중복 이미지는 가장 선명한 1장만 처리합니다"
+fi
+if [ -n "$PRESCREEN" ]; then
+    echo "사전 선별: 원본 해상도에서 균열 후보가 없는 이미지는 초해상화하지 않습니다 (검증 비율: $PRESCREEN_AUDIT_RATE)"
+fi
 echo ""
 
 ##############################################################################
@@ -98,7 +237,9 @@ python3 inferences/super_resolution.py \
     --model-ckpt "$SR_CHECKPOINT" \
     --img-dir "$INPUT_DIR" \
     --result-out-dir "$SR_OUTPUT_DIR" \
-    --device cuda
+    --device cuda \
+    --metadata-json "$METADATA_JSON" \
+    $RESUME_FLAG $DEDUP_FLAG "${PRESCREEN_ARGS[@]}"
 
 if [ $? -eq 0 ]; then
     echo "이미지 화질 향상 완료"
@@ -124,7 +265,8 @@ python3 inferences/prototyping_crack_detection.py \
     --output_dir "$OUTPUT_DIR" \
     --metadata_json "$METADATA_JSON" \
     --excel_output "$EXCEL_OUTPUT" \
-    --shooting_distance_mm "$SHOOTING_DISTANCE_MM"
+    --shooting_distance_mm "$SHOOTING_DISTANCE_MM" \
+    $RESUME_FLAG
 
 if [ $? -eq 0 ]; then
     echo "균열 탐지 완료"